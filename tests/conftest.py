@@ -13,23 +13,53 @@ from tokenflood.constants import (
     LLM_REQUESTS_FILE,
     NETWORK_LATENCY_FILE,
     LOAD_TEST_SPEC_FILE,
+    TOKEN_ARRIVALS_FILE,
 )
 from tokenflood.io import (
     FileIOContext,
+    ThreadedFileIOContext,
+    read_concurrency_test_spec,
     read_endpoint_spec,
     read_observation_spec,
     read_load_test_spec,
 )
 from tokenflood.models.endpoint_spec import EndpointSpec
+from tokenflood.models.run_specs.concurrency_test_spec import ConcurrencyTestSpec
 from tokenflood.models.run_specs.observation_spec import ObservationSpec
 from tokenflood.models.run_specs.load_test_spec import LoadTestSpec
 from tokenflood.networking import (
-    ObserveURLMiddleware,
+    ObservedEndpoint,
+    get_observed_endpoint,
     patch_aiohttp_client_session,
+    reset_observed_endpoints,
     unpatch_aiohttp_client_session,
 )
 
 
+def pytest_addoption(parser):
+    parser.addoption(
+        "--benchmark",
+        action="store_true",
+        default=False,
+        help="run the timing benchmarks marked with @pytest.mark.benchmark",
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "benchmark: timing comparison, only runs with --benchmark"
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--benchmark"):
+        return
+    skip_benchmark = pytest.mark.skip(reason="needs --benchmark to run")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip_benchmark)
+
+
 def join_folder_checked(path: str, folder: str) -> str:
     new_folder = os.path.join(path, folder)
     assert os.path.isdir(new_folder)
@@ -59,6 +89,11 @@ def observation_specs_folder(data_folder: str) -> str:
     return join_folder_checked(data_folder, "observation_specs")
 
 
+@pytest.fixture(scope="session")
+def concurrency_test_specs_folder(data_folder: str) -> str:
+    return join_folder_checked(data_folder, "concurrency_test_specs")
+
+
 @pytest.fixture(scope="session")
 def endpoint_specs_folder(data_folder: str) -> str:
     return join_folder_checked(data_folder, "endpoint_specs")
@@ -113,6 +148,12 @@ def tiny_load_test_spec(run_suites_folder) -> LoadTestSpec:
     return read_load_test_spec(filename)
 
 
+@pytest.fixture
+def tiny_concurrency_test_spec(concurrency_test_specs_folder) -> ConcurrencyTestSpec:
+    filename = os.path.join(concurrency_test_specs_folder, "tiny.yml")
+    return read_concurrency_test_spec(filename)
+
+
 @pytest.fixture
 def llm_requests_csv_file(load_test_results_folder) -> str:
     filename = os.path.join(load_test_results_folder, LLM_REQUESTS_FILE)
@@ -143,6 +184,11 @@ def base_endpoint_spec(endpoint_specs_folder) -> EndpointSpec:
     return read_endpoint_spec(filename)
 
 
+@pytest.fixture
+def native_endpoint_spec(base_endpoint_spec) -> EndpointSpec:
+    return base_endpoint_spec.model_copy(update={"client": "native"})
+
+
 @pytest.fixture
 def results_endpoint_spec(load_test_results_folder) -> EndpointSpec:
     filename = os.path.join(load_test_results_folder, ENDPOINT_SPEC_FILE)
@@ -170,11 +216,31 @@ def file_io_context(unique_temporary_folder) -> FileIOContext:
     error_file = os.path.join(unique_temporary_folder, ERROR_FILE)
     llm_request_file = os.path.join(unique_temporary_folder, LLM_REQUESTS_FILE)
     network_latency_file = os.path.join(unique_temporary_folder, NETWORK_LATENCY_FILE)
+    token_arrivals_file = os.path.join(unique_temporary_folder, TOKEN_ARRIVALS_FILE)
     return FileIOContext(
         llm_request_file=llm_request_file,
         network_latency_file=network_latency_file,
         error_file=error_file,
+        token_arrivals_file=token_arrivals_file,
+    )
+
+
+@pytest.fixture
+def threaded_file_io_context(
+    unique_temporary_folder,
+) -> Generator[ThreadedFileIOContext, None, None]:
+    error_file = os.path.join(unique_temporary_folder, ERROR_FILE)
+    llm_request_file = os.path.join(unique_temporary_folder, LLM_REQUESTS_FILE)
+    network_latency_file = os.path.join(unique_temporary_folder, NETWORK_LATENCY_FILE)
+    token_arrivals_file = os.path.join(unique_temporary_folder, TOKEN_ARRIVALS_FILE)
+    io_context = ThreadedFileIOContext(
+        llm_request_file=llm_request_file,
+        network_latency_file=network_latency_file,
+        error_file=error_file,
+        token_arrivals_file=token_arrivals_file,
     )
+    yield io_context
+    io_context.close()
 
 
 @pytest.fixture()
@@ -203,6 +269,6 @@ def with_patched_aiohttp_session() -> Generator[None, None, None]:
 
 
 @pytest.fixture()
-def url_observer() -> ObserveURLMiddleware:
-    ObserveURLMiddleware.reset()
-    return ObserveURLMiddleware()
+def observed_endpoint(base_endpoint_spec) -> ObservedEndpoint:
+    reset_observed_endpoints()
+    return get_observed_endpoint(base_endpoint_spec)
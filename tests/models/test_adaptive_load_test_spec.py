@@ -0,0 +1,44 @@
+from typing import Dict
+
+import pytest
+
+from tests.utils import does_not_raise
+from tokenflood.models.load_types.load_type import HeuristicLoad
+from tokenflood.models.run_specs.adaptive_load_test_spec import AdaptiveLoadTestSpec
+from tokenflood.models.run_specs.latency_slo import LatencySLO
+
+
+@pytest.fixture()
+def default_adaptive_load_test_spec_kwargs() -> Dict:
+    return AdaptiveLoadTestSpec(
+        name="ABC",
+        target=LatencySLO(limit_ms=800),
+        duration_seconds=60,
+        load_type=HeuristicLoad(
+            prompt_length=1024, prefix_length=400, output_length=12
+        ),
+    ).model_dump()
+
+
+@pytest.mark.parametrize(
+    "kwargs_override, expectation",
+    [
+        ({}, does_not_raise()),
+        ({"name": ""}, pytest.raises(ValueError)),
+        ({"duration_seconds": 0}, pytest.raises(ValueError)),
+        ({"multiplicative_decrease": 1.0}, pytest.raises(ValueError)),
+        ({"multiplicative_decrease": 0}, pytest.raises(ValueError)),
+        ({"additive_increase": 0}, pytest.raises(ValueError)),
+        ({"window_size": 0}, pytest.raises(ValueError)),
+        ({"start_requests_per_second": 0.05}, pytest.raises(ValueError)),
+        ({"max_requests_per_second": 0.5}, pytest.raises(ValueError)),
+        ({"max_requests_per_second": 1.0}, does_not_raise()),
+    ],
+)
+def test_adaptive_load_test_spec_validation(
+    kwargs_override, expectation, default_adaptive_load_test_spec_kwargs
+):
+    with expectation:
+        AdaptiveLoadTestSpec(
+            **{**default_adaptive_load_test_spec_kwargs, **kwargs_override}
+        )
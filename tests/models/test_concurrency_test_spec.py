@@ -0,0 +1,49 @@
+from typing import Dict
+
+import pytest
+
+from tests.utils import does_not_raise
+from tokenflood.models.load_types.load_type import HeuristicLoad
+from tokenflood.models.run_specs.concurrency_test_spec import ConcurrencyTestSpec
+
+
+@pytest.fixture()
+def default_concurrency_test_spec_kwargs() -> Dict:
+    return ConcurrencyTestSpec(
+        name="ABC",
+        concurrency_levels=(1, 2, 4, 8),
+        seconds_per_phase=30,
+        load_type=HeuristicLoad(
+            prompt_length=1024, prefix_length=400, output_length=12
+        ),
+    ).model_dump()
+
+
+@pytest.mark.parametrize(
+    "kwargs_override, expectation",
+    [
+        ({}, does_not_raise()),
+        ({"name": ""}, pytest.raises(ValueError)),
+        ({"concurrency_levels": ()}, pytest.raises(ValueError)),
+        ({"concurrency_levels": (0, 2)}, pytest.raises(ValueError)),
+        ({"concurrency_levels": (1, 1, 2)}, pytest.raises(ValueError)),
+        ({"seconds_per_phase": 0}, pytest.raises(ValueError)),
+        ({"load_type": None}, pytest.raises(ValueError)),
+    ],
+)
+def test_concurrency_test_spec_validation(
+    kwargs_override, expectation, default_concurrency_test_spec_kwargs
+):
+    with expectation:
+        ConcurrencyTestSpec(
+            **{**default_concurrency_test_spec_kwargs, **kwargs_override}
+        )
+
+
+def test_create_concurrency_test_phases(default_concurrency_test_spec_kwargs):
+    spec = ConcurrencyTestSpec(**default_concurrency_test_spec_kwargs)
+
+    phases = spec.create_concurrency_test_phases()
+    assert [phase.concurrency for phase in phases] == list(spec.concurrency_levels)
+    assert all(phase.duration_seconds == spec.seconds_per_phase for phase in phases)
+    assert spec.total_seconds == 120
@@ -1,5 +1,8 @@
 import pytest
 
+from tests.utils import does_not_raise
+from tokenflood.models.endpoint_spec import EndpointSpec
+
 
 def test_endpoint_spec_model_id_folder_name(base_endpoint_spec):
     assert (
@@ -24,3 +27,39 @@ def test_endpoint_spec_folder_name_sanitization(
 ):
     endpoint_spec = base_endpoint_spec.model_copy(update={"name": name})
     assert endpoint_spec.folder_name == expected_result
+
+
+@pytest.mark.parametrize(
+    "spec, expectation",
+    [
+        (dict(provider="openai", model="gpt-4o-mini"), does_not_raise()),
+        (
+            dict(provider="hosted_vllm", model="m", base_url="http://127.0.0.1/v1"),
+            does_not_raise(),
+        ),
+        (dict(provider="hosted_vllm", model="m"), pytest.raises(ValueError)),
+        (dict(provider="anthropic", model="m"), pytest.raises(ValueError)),
+        (
+            dict(provider="openai", model="m", deployment="d"),
+            pytest.raises(ValueError),
+        ),
+    ],
+)
+def test_endpoint_spec_native_client_support(spec, expectation):
+    with expectation:
+        EndpointSpec(**spec, client="native")
+    # the litellm client accepts all of them
+    EndpointSpec(**spec)
+
+
+@pytest.mark.parametrize(
+    "pool_size, pool_size_per_host, expected_result",
+    [(None, None, None), (10, None, 10), (None, 4, 4), (10, 4, 4), (3, 4, 3)],
+)
+def test_endpoint_spec_max_pool_size(
+    base_endpoint_spec, pool_size, pool_size_per_host, expected_result
+):
+    endpoint_spec = base_endpoint_spec.model_copy(
+        update={"pool_size": pool_size, "pool_size_per_host": pool_size_per_host}
+    )
+    assert endpoint_spec.max_pool_size == expected_result
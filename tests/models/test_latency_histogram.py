@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from tokenflood.models.data.latency_histogram import LatencyHistogram
+
+
+def make_histogram(values, relative_error: float = 0.01) -> LatencyHistogram:
+    histogram = LatencyHistogram(relative_error=relative_error)
+    for value in values:
+        histogram.record(value)
+    return histogram
+
+
+@pytest.mark.parametrize("relative_error", [0.01, 0.05])
+def test_quantiles_within_relative_error(relative_error):
+    values = np.random.default_rng(0).lognormal(mean=6, sigma=1.5, size=10_000)
+    histogram = make_histogram(values, relative_error)
+    for q in [0.0, 0.1, 0.5, 0.9, 0.99, 0.999, 1.0]:
+        exact = np.quantile(values, q, method="lower")
+        assert histogram.quantile(q) == pytest.approx(exact, rel=relative_error)
+    assert histogram.quantile(0.0) == values.min()
+    assert histogram.quantile(1.0) == values.max()
+    assert histogram.mean == pytest.approx(values.mean())
+    # buckets only grow with the logarithm of the value range
+    assert len(histogram.counts) < 1500
+
+
+def test_zero_values():
+    histogram = make_histogram([0, 0, 0, 10])
+    assert histogram.zero_count == 3
+    assert histogram.percentile(50) == 0
+    assert histogram.percentile(100) == 10
+
+
+def test_empty_histogram():
+    histogram = LatencyHistogram()
+    assert histogram.quantile(0.5) is None
+    assert histogram.mean is None
+    with pytest.raises(ValueError):
+        histogram.quantile(1.5)
+
+
+def test_merge():
+    rng = np.random.default_rng(1)
+    first_values = rng.exponential(100, size=1000)
+    second_values = rng.exponential(1000, size=3000)
+    first = make_histogram(first_values)
+    second = make_histogram(second_values)
+
+    merged = first.merge(second)
+
+    expected = make_histogram(np.concatenate([first_values, second_values]))
+    assert merged.counts == expected.counts
+    assert merged.count == 4000
+    assert (merged.minimum, merged.maximum) == (expected.minimum, expected.maximum)
+    assert merged.total == pytest.approx(expected.total)
+    assert first.count == 1000
+    with pytest.raises(ValueError):
+        first.merge(LatencyHistogram(relative_error=0.02))
+
+
+def test_serialization():
+    histogram = make_histogram([1.5, 20, 300, 300, 0])
+    restored = LatencyHistogram.model_validate_json(histogram.model_dump_json())
+    assert restored == histogram
+    assert restored.percentile(90) == histogram.percentile(90)
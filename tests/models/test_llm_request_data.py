@@ -11,6 +11,7 @@ def default_llm_request_data():
     return LLMRequestData(
         datetime=get_exact_date_str(),
         requests_per_second_phase=1.0,
+        concurrency=1,
         group_id=1,
         request_number=1,
         model="hf/standard",
@@ -18,6 +19,14 @@ def default_llm_request_data():
         time_to_first_token=68,
         decoding_latency=32,
         average_time_per_output_token=1,
+        inter_token_latency_p50=1,
+        inter_token_latency_p99=2,
+        max_stall=3,
+        dns_latency=0.0,
+        connect_latency=0.0,
+        tls_handshake_latency=0.0,
+        connection_reused=True,
+        time_to_headers=20.0,
         expected_input_tokens=1000,
         measured_input_tokens=1000,
         expected_prefix_tokens=500,
@@ -0,0 +1,51 @@
+from typing import Dict
+
+import pytest
+
+from tests.utils import does_not_raise
+from tokenflood.models.load_types.load_type import HeuristicLoad
+from tokenflood.models.run_specs.latency_slo import LatencySLO
+from tokenflood.models.run_specs.saturation_search_spec import SaturationSearchSpec
+
+
+@pytest.fixture()
+def default_saturation_search_spec_kwargs() -> Dict:
+    return SaturationSearchSpec(
+        name="ABC",
+        slo=LatencySLO(limit_ms=800),
+        seconds_per_probe=10,
+        load_type=HeuristicLoad(
+            prompt_length=1024, prefix_length=400, output_length=12
+        ),
+    ).model_dump()
+
+
+@pytest.mark.parametrize(
+    "kwargs_override, expectation",
+    [
+        ({}, does_not_raise()),
+        ({"name": ""}, pytest.raises(ValueError)),
+        ({"slo": {"limit_ms": 0}}, pytest.raises(ValueError)),
+        ({"slo": {"limit_ms": 800, "percentile": 101}}, pytest.raises(ValueError)),
+        ({"slo": {"limit_ms": 800, "metric": "prompt"}}, pytest.raises(ValueError)),
+        ({"growth_factor": 1.0}, pytest.raises(ValueError)),
+        ({"precision": 0}, pytest.raises(ValueError)),
+        ({"start_requests_per_second": 0.05}, pytest.raises(ValueError)),
+        ({"start_requests_per_second": 0.1}, does_not_raise()),
+    ],
+)
+def test_saturation_search_spec_validation(
+    kwargs_override, expectation, default_saturation_search_spec_kwargs
+):
+    with expectation:
+        SaturationSearchSpec(
+            **{**default_saturation_search_spec_kwargs, **kwargs_override}
+        )
+
+
+def test_create_probe_load_test_spec(default_saturation_search_spec_kwargs):
+    spec = SaturationSearchSpec(**default_saturation_search_spec_kwargs)
+    load_test_spec = spec.create_probe_load_test_spec()
+    assert load_test_spec.load_type == spec.load_type
+    assert load_test_spec.seconds_per_phase == spec.seconds_per_probe
+    assert spec.create_probe_phase(3.0).total_num_requests == 30
@@ -10,4 +10,5 @@ def test_get_fields():
         "output_length",
         "task",
         "prompt_filler_tokens",
+        "seed",
     ]
@@ -0,0 +1,102 @@
+import pandas as pd
+import pytest
+
+from tokenflood.adaptive_runner import (
+    AIMDRateController,
+    create_interval_send_offsets,
+    run_adaptive_load_test,
+)
+from tokenflood.constants import ADAPTIVE_MIN_WINDOW_SAMPLES
+from tokenflood.models.run_specs.adaptive_load_test_spec import AdaptiveLoadTestSpec
+from tokenflood.models.run_specs.latency_slo import LatencySLO
+
+
+@pytest.fixture
+def adaptive_load_test_spec(tiny_load_test_spec) -> AdaptiveLoadTestSpec:
+    return AdaptiveLoadTestSpec(
+        name="ABC",
+        target=LatencySLO(metric="latency", percentile=90, limit_ms=100),
+        duration_seconds=3,
+        start_requests_per_second=4.0,
+        min_requests_per_second=1.0,
+        max_requests_per_second=6.0,
+        additive_increase=1.0,
+        multiplicative_decrease=0.5,
+        adjustment_interval_seconds=0.5,
+        window_size=10,
+        load_type=tiny_load_test_spec.load_type,
+    )
+
+
+def fill_window(controller: AIMDRateController, latency: float):
+    for _ in range(ADAPTIVE_MIN_WINDOW_SAMPLES):
+        controller.add_llm_request(
+            {"group_id": controller.group_id, "latency": latency}
+        )
+
+
+def test_aimd_controller(adaptive_load_test_spec):
+    controller = AIMDRateController(adaptive_load_test_spec)
+    # too few samples to decide
+    assert controller.adjust() == 4.0
+    assert controller.group_id == 1
+    fill_window(controller, 50)
+    assert controller.adjust() == 5.0
+    assert controller.adjust() == 6.0
+    # capped at the max rate
+    assert controller.adjust() == 6.0
+    fill_window(controller, 500)
+    assert controller.adjust() == 3.0
+    assert len(controller.window) == 0
+    # results of requests sent before the decrease are ignored
+    controller.add_llm_request({"group_id": 3, "latency": 500})
+    assert len(controller.window) == 0
+    fill_window(controller, 500)
+    assert controller.adjust() == 1.5
+    fill_window(controller, 500)
+    # bounded by the min rate
+    assert controller.adjust() == 1.0
+    assert controller.max_requests_per_second_reached == 6.0
+
+
+def test_aimd_controller_decreases_on_errors(adaptive_load_test_spec):
+    controller = AIMDRateController(adaptive_load_test_spec)
+    fill_window(controller, 50)
+    controller.add_error({"group_id": 0})
+    assert controller.error_rate == pytest.approx(1 / 6)
+    assert controller.adjust() == 2.0
+
+
+def test_create_interval_send_offsets():
+    send_offsets, first_offset = create_interval_send_offsets(0.0, 4.0, 1.0)
+    assert send_offsets == [0.0, 0.25, 0.5, 0.75]
+    assert first_offset == pytest.approx(0.0)
+
+    # a rate below one request per interval carries over into the next ones
+    send_offsets, first_offset = create_interval_send_offsets(0.0, 0.4, 1.0)
+    assert send_offsets == [0.0]
+    assert first_offset == pytest.approx(1.5)
+    send_offsets, first_offset = create_interval_send_offsets(first_offset, 0.4, 1.0)
+    assert send_offsets == []
+    assert first_offset == pytest.approx(0.5)
+    send_offsets, first_offset = create_interval_send_offsets(first_offset, 0.4, 1.0)
+    assert send_offsets == [0.5]
+    assert first_offset == pytest.approx(2.0)
+
+
+@pytest.mark.asyncio
+async def test_run_adaptive_load_test(
+    adaptive_load_test_spec,
+    base_endpoint_spec,
+    file_io_context,
+    with_patched_aiohttp_session,
+):
+    await run_adaptive_load_test(
+        base_endpoint_spec, adaptive_load_test_spec, file_io_context
+    )
+    df = pd.read_csv(file_io_context.llm_request_sink.destination)
+    assert len(df) > 0
+    assert df["group_id"].nunique() > 1
+    # every group is sent at a single rate
+    assert (df.groupby("group_id")["requests_per_second_phase"].nunique() == 1).all()
+    assert df["requests_per_second_phase"].between(1.0, 6.0).all()
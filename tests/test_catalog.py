@@ -0,0 +1,137 @@
+import os
+import sqlite3
+
+import pytest
+
+from tokenflood.catalog import (
+    ROW_COLUMNS,
+    ResultsCatalog,
+    RunCatalogWriter,
+    get_catalog_file,
+)
+from tokenflood.constants import LOAD_TEST_SPEC_FILE, OBSERVATION_SPEC_FILE
+from tokenflood.models.data.catalog_data import CatalogEntry
+from tokenflood.summaries import RunSummaryCollector
+from tests.test_summaries import make_llm_request
+
+
+def make_entry(run: str, run_spec_file: str = LOAD_TEST_SPEC_FILE) -> CatalogEntry:
+    return CatalogEntry(
+        run=run,
+        run_spec_file=run_spec_file,
+        endpoint="openai/gpt-4o-mini",
+        endpoint_spec_hash="endpoint-hash",
+        run_spec_hash="run-hash",
+        created="2025-12-01_09-51-50",
+    )
+
+
+def make_row(group_id: int, latency: float) -> dict:
+    return {
+        **{name: 0 for name in ROW_COLUMNS},
+        **make_llm_request(group_id, latency),
+    }
+
+
+@pytest.fixture
+def catalog(unique_temporary_folder):
+    catalog = ResultsCatalog(get_catalog_file(unique_temporary_folder))
+    yield catalog
+    catalog.close()
+
+
+def test_update_run(catalog):
+    collector = RunSummaryCollector(percentiles=(50, 99))
+    for latency in [100, 200, 300]:
+        collector.add_llm_request(make_llm_request(0, latency))
+    collector.add_network_latency({"group_id": 0, "latency": 10})
+    collector.add_error({"group_id": 1})
+    collector.add_throughput({"group_id": 1, "throughput": 2.5})
+    summary = collector.summarize(complete=False)
+    catalog.update_run(make_entry("run_b"), summary)
+    catalog.update_run(make_entry("run_a", OBSERVATION_SPEC_FILE))
+
+    assert catalog.get_run_spec_files() == {
+        "run_b": LOAD_TEST_SPEC_FILE,
+        "run_a": OBSERVATION_SPEC_FILE,
+    }
+    assert list(catalog.get_run_spec_files()) == ["run_b", "run_a"]
+    assert catalog.get_entry("run_b") == make_entry("run_b")
+    assert catalog.get_entry("run_c") is None
+    assert catalog.get_run_summary("run_b") == summary
+    assert catalog.get_run_summary("run_a") is None
+
+    # updates replace the summaries of the groups they contain
+    collector.add_llm_request(make_llm_request(1, 50))
+    summary = collector.summarize(complete=True)
+    catalog.update_run(make_entry("run_b"), summary)
+    assert catalog.get_run_summary("run_b") == summary
+
+    catalog.remove_run("run_b")
+    assert catalog.get_run_summary("run_b") is None
+    assert list(catalog.get_run_spec_files()) == ["run_a"]
+
+
+def test_run_catalog_writer(catalog):
+    for store_rows, run in [(False, "without_rows"), (True, "with_rows")]:
+        writer = RunCatalogWriter(catalog, make_entry(run), store_rows=store_rows)
+        collector = RunSummaryCollector()
+        for group_id, latency in [(0, 100), (0, 200), (1, 300)]:
+            collector.add_llm_request(make_row(group_id, latency))
+            writer.add_llm_request(make_row(group_id, latency))
+            writer.update(collector.summarize(complete=False))
+        assert writer.rows == []
+
+    assert catalog.get_rows("without_rows").empty
+    rows = catalog.get_rows("with_rows")
+    assert list(rows.columns) == list(ROW_COLUMNS)
+    assert rows["latency"].tolist() == [100, 200, 300]
+    group_rows = catalog.get_rows("with_rows", ("latency",), group_id=0)
+    assert group_rows["latency"].tolist() == [100, 200]
+    with pytest.raises(ValueError):
+        catalog.get_rows("with_rows", ("prompt",))
+
+
+def test_catalog_adds_new_row_columns(unique_temporary_folder):
+    catalog_file = get_catalog_file(unique_temporary_folder)
+    connection = sqlite3.connect(catalog_file)
+    connection.execute("CREATE TABLE llm_requests (run TEXT NOT NULL, latency REAL)")
+    connection.execute("INSERT INTO llm_requests VALUES ('old_run', 100)")
+    connection.commit()
+    connection.close()
+
+    catalog = ResultsCatalog(catalog_file)
+    rows = catalog.get_rows("old_run")
+    assert list(rows.columns) == list(ROW_COLUMNS)
+    assert rows["latency"].tolist() == [100]
+    assert rows["time_to_headers"].isna().all()
+    catalog.close()
+
+
+def test_catalog_adds_new_group_columns(unique_temporary_folder):
+    catalog_file = get_catalog_file(unique_temporary_folder)
+    connection = sqlite3.connect(catalog_file)
+    connection.execute(
+        "CREATE TABLE groups (run TEXT NOT NULL, group_id INTEGER NOT NULL, "
+        "num_requests INTEGER NOT NULL, num_errors INTEGER NOT NULL, datetime TEXT, "
+        "requests_per_second_phase REAL, concurrency INTEGER, PRIMARY KEY (run, group_id))"
+    )
+    connection.commit()
+    connection.close()
+
+    catalog = ResultsCatalog(catalog_file)
+    collector = RunSummaryCollector()
+    collector.add_llm_request(make_llm_request(0, 100))
+    collector.add_throughput({"group_id": 0, "throughput": 2.5})
+    summary = collector.summarize(complete=True)
+    catalog.update_run(make_entry("run"), summary)
+    assert catalog.get_run_summary("run") == summary
+    catalog.close()
+
+
+def test_catalog_is_shared(unique_temporary_folder, catalog):
+    catalog.update_run(make_entry("run"))
+    assert os.path.isfile(get_catalog_file(unique_temporary_folder))
+    reader = ResultsCatalog(get_catalog_file(unique_temporary_folder))
+    assert reader.get_entry("run") == make_entry("run")
+    reader.close()
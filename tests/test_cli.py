@@ -3,6 +3,7 @@ import os
 import shutil
 import sys
 
+import pandas as pd
 import pytest
 import requests
 
@@ -11,15 +12,25 @@ from tokenflood.cli import (
     main,
     parse_args,
     run,
+    search,
+    report_run,
     start_visualization,
     count_prompt_tokens,
 )
+from tokenflood.catalog import ResultsCatalog, get_catalog_file
+from tokenflood.columnar import get_columnar_file
 from tokenflood.constants import (
     ENDPOINT_SPEC_FILE,
+    ERROR_FILE,
     OBSERVATION_SPEC_FILE,
     RESULTS_FOLDER,
     LOAD_TEST_SPEC_FILE,
     LLM_REQUESTS_FILE,
+    NETWORK_LATENCY_FILE,
+    SATURATION_SEARCH_SPEC_FILE,
+    SEARCH_SUMMARY_FILE,
+    SUMMARY_FILE,
+    TEXT_BLOBS_FILE,
 )
 from tokenflood.io import (
     is_observation_result_folder,
@@ -30,21 +41,25 @@ from tokenflood.io import (
     read_load_test_spec,
     write_pydantic_yaml,
 )
+from tokenflood.models.run_specs.latency_slo import LatencySLO
+from tokenflood.models.run_specs.saturation_search_spec import SaturationSearchSpec
 from tokenflood.starter_pack import (
     starter_endpoint_spec_vllm,
     starter_observation_spec,
     starter_run_suite,
 )
-from tokenflood.visualization_frontend.io import read_dataframe
+from tokenflood.summaries import read_run_summary
+from tokenflood.visualization_frontend.io import read_dataframe, resolve_texts
 
 
 def test_parse_args_run():
     endpoint_spec = "endpoint.yml"
     load_test_spec = "load_test.yml"
     args = parse_args(["run", load_test_spec, endpoint_spec])
-    assert args.endpoint == endpoint_spec
+    assert args.endpoint == [endpoint_spec]
     assert args.run_spec == load_test_spec
     assert args.func.__name__ == run.__name__
+    assert not args.round_robin
 
 
 def test_parse_args_init(unique_temporary_folder, monkeypatch):
@@ -100,6 +115,180 @@ def test_load_test(
 
     llm_requests_df = read_dataframe(run_folders[0], LLM_REQUESTS_FILE)
     assert len(llm_requests_df) == tiny_load_test_spec.total_num_requests
+    assert os.path.isfile(
+        get_columnar_file(os.path.join(run_folders[0], LLM_REQUESTS_FILE))
+    )
+    # the prompts are stored in the text blob file, the csv only keeps their hashes
+    assert os.path.isfile(os.path.join(run_folders[0], TEXT_BLOBS_FILE))
+    resolved_df = resolve_texts(run_folders[0], llm_requests_df)
+    assert all(len(prompt) == 32 for prompt in llm_requests_df["prompt"])
+    assert all(len(prompt) > 32 for prompt in resolved_df["prompt"])
+    summary = read_run_summary(os.path.join(run_folders[0], SUMMARY_FILE))
+    assert summary is not None and summary.complete
+    assert (
+        sum(group.num_requests for group in summary.groups)
+        == tiny_load_test_spec.total_num_requests
+    )
+
+
+def test_convert(monkeypatch, unique_temporary_folder, results_folder):
+    monkeypatch.chdir(unique_temporary_folder)
+    shutil.copytree(results_folder, RESULTS_FOLDER)
+    args = parse_args(["convert", RESULTS_FOLDER])
+    args.func(args)
+
+    run_folder = os.path.join(RESULTS_FOLDER, "load_test_results")
+    for csv_file in [LLM_REQUESTS_FILE, NETWORK_LATENCY_FILE, ERROR_FILE]:
+        assert os.path.isfile(get_columnar_file(os.path.join(run_folder, csv_file)))
+    df = read_dataframe(run_folder, LLM_REQUESTS_FILE)
+    assert len(df) == len(pd.read_csv(os.path.join(run_folder, LLM_REQUESTS_FILE)))
+
+
+def test_load_test_with_catalog(
+    monkeypatch,
+    unique_temporary_folder,
+    tiny_load_test_spec,
+    base_endpoint_spec,
+    with_patched_aiohttp_session,
+):
+    monkeypatch.chdir(unique_temporary_folder)
+    write_pydantic_yaml(LOAD_TEST_SPEC_FILE, tiny_load_test_spec)
+    write_pydantic_yaml(ENDPOINT_SPEC_FILE, base_endpoint_spec)
+    args = parse_args(
+        ["run", LOAD_TEST_SPEC_FILE, ENDPOINT_SPEC_FILE, "-y", "--catalog", "rows"]
+    )
+    run(args)
+    catalog = ResultsCatalog(get_catalog_file(RESULTS_FOLDER))
+    [(run_name, run_spec_file)] = catalog.get_run_spec_files().items()
+    assert run_spec_file == LOAD_TEST_SPEC_FILE
+    summary = catalog.get_run_summary(run_name)
+    assert summary == read_run_summary(
+        os.path.join(RESULTS_FOLDER, run_name, SUMMARY_FILE)
+    )
+    rows = catalog.get_rows(run_name, ("latency",))
+    assert len(rows) == tiny_load_test_spec.total_num_requests
+    catalog.close()
+
+
+@pytest.mark.parametrize("round_robin", [False, True])
+def test_load_test_against_several_endpoints(
+    monkeypatch,
+    unique_temporary_folder,
+    tiny_load_test_spec,
+    base_endpoint_spec,
+    with_patched_aiohttp_session,
+    round_robin,
+):
+    monkeypatch.chdir(unique_temporary_folder)
+    write_pydantic_yaml(LOAD_TEST_SPEC_FILE, tiny_load_test_spec)
+    endpoint_spec_files = ["a.yml", "b.yml"]
+    for endpoint_spec_file in endpoint_spec_files:
+        write_pydantic_yaml(
+            endpoint_spec_file,
+            base_endpoint_spec.model_copy(update={"name": endpoint_spec_file[0]}),
+        )
+    args = parse_args(
+        ["run", LOAD_TEST_SPEC_FILE, *endpoint_spec_files, "-y"]
+        + (["--round-robin"] if round_robin else [])
+    )
+    run(args)
+    run_folders = sorted(list_dir_relative(RESULTS_FOLDER))
+    assert len(run_folders) == 2
+    assert run_folders[0].endswith("_a") and run_folders[1].endswith("_b")
+    dfs = []
+    for run_folder in run_folders:
+        assert is_load_test_result_folder(run_folder)
+        df = read_dataframe(run_folder, LLM_REQUESTS_FILE)
+        dfs.append(
+            resolve_texts(run_folder, df).set_index(["group_id", "request_number"])
+        )
+    if round_robin:
+        assert sum(len(df) for df in dfs) == tiny_load_test_spec.total_num_requests
+        assert not set(dfs[0].index) & set(dfs[1].index)
+        # each endpoint records the rate it received
+        assert set(dfs[0]["requests_per_second_phase"]) == {
+            rate / 2 for rate in tiny_load_test_spec.requests_per_second_phases
+        }
+    else:
+        assert len(dfs[0]) == len(dfs[1]) == tiny_load_test_spec.total_num_requests
+        # both endpoints got the same prompts
+        assert dfs[0]["prompt"].sort_index().equals(dfs[1]["prompt"].sort_index())
+
+
+def test_load_test_against_several_endpoints_checks(
+    monkeypatch, unique_temporary_folder, tiny_load_test_spec, base_endpoint_spec
+):
+    monkeypatch.chdir(unique_temporary_folder)
+    write_pydantic_yaml(LOAD_TEST_SPEC_FILE, tiny_load_test_spec)
+    write_pydantic_yaml(ENDPOINT_SPEC_FILE, base_endpoint_spec)
+    args = parse_args(
+        ["run", LOAD_TEST_SPEC_FILE, ENDPOINT_SPEC_FILE, ENDPOINT_SPEC_FILE, "-y"]
+    )
+    with pytest.raises(ValueError, match="distinct names"):
+        run(args)
+    args = parse_args(
+        ["run", LOAD_TEST_SPEC_FILE, ENDPOINT_SPEC_FILE, ENDPOINT_SPEC_FILE, "-w", "2"]
+    )
+    with pytest.raises(ValueError, match="workers"):
+        run(args)
+    args = parse_args(["run", LOAD_TEST_SPEC_FILE, ENDPOINT_SPEC_FILE, "--round-robin"])
+    with pytest.raises(ValueError, match="more than one endpoint"):
+        run(args)
+    write_pydantic_yaml(
+        "pooled.yml",
+        base_endpoint_spec.model_copy(update={"name": "pooled", "pool_size": 10}),
+    )
+    args = parse_args(["run", LOAD_TEST_SPEC_FILE, ENDPOINT_SPEC_FILE, "pooled.yml"])
+    with pytest.raises(ValueError, match="pool options"):
+        run(args)
+    assert not os.path.exists(RESULTS_FOLDER)
+
+
+def test_catalog(
+    monkeypatch,
+    unique_temporary_folder,
+    load_test_results_folder,
+    tiny_load_test_spec,
+    base_endpoint_spec,
+):
+    monkeypatch.chdir(unique_temporary_folder)
+    run_folder = os.path.join(RESULTS_FOLDER, "load_test_results")
+    shutil.copytree(load_test_results_folder, run_folder)
+    write_pydantic_yaml(
+        os.path.join(run_folder, ENDPOINT_SPEC_FILE), base_endpoint_spec
+    )
+    write_pydantic_yaml(
+        os.path.join(run_folder, LOAD_TEST_SPEC_FILE), tiny_load_test_spec
+    )
+    os.makedirs(os.path.join(RESULTS_FOLDER, "not_a_run"))
+    args = parse_args(["catalog", RESULTS_FOLDER, "--rows"])
+    args.func(args)
+    # runs that are catalogued already are left as they are
+    args.func(args)
+
+    catalog = ResultsCatalog(get_catalog_file(RESULTS_FOLDER))
+    assert catalog.get_run_spec_files() == {"load_test_results": LOAD_TEST_SPEC_FILE}
+    entry = catalog.get_entry("load_test_results")
+    assert entry is not None
+    assert entry.endpoint == base_endpoint_spec.provider_model_str
+    summary = catalog.get_run_summary("load_test_results")
+    assert summary is not None and summary.complete
+    rows = catalog.get_rows("load_test_results")
+    assert len(rows) == len(pd.read_csv(os.path.join(run_folder, LLM_REQUESTS_FILE)))
+    # fields the old results files do not have are left empty
+    assert rows["max_stall"].isna().all()
+    catalog.close()
+
+
+def test_report(caplog, load_test_results_folder):
+    with caplog.at_level(logging.INFO):
+        args = parse_args(
+            ["report", load_test_results_folder, "-m", "latency", "-p", "50,99"]
+        )
+        report_run(args)
+    assert "Summary of latency in ms" in caplog.text
+    assert "group 0:" in caplog.text
+    assert "p99" in caplog.text
 
 
 def test_load_test_decline(
@@ -149,6 +338,36 @@ def test_observe_endpoint_decline(
     assert not os.path.exists(RESULTS_FOLDER)
 
 
+def test_search(
+    monkeypatch,
+    unique_temporary_folder,
+    tiny_load_test_spec,
+    base_endpoint_spec,
+    with_patched_aiohttp_session,
+):
+    monkeypatch.chdir(unique_temporary_folder)
+    search_spec = SaturationSearchSpec(
+        name="ABC",
+        slo=LatencySLO(limit_ms=60_000),
+        seconds_per_probe=1,
+        max_probes=1,
+        load_type=tiny_load_test_spec.load_type,
+    )
+    write_pydantic_yaml(SATURATION_SEARCH_SPEC_FILE, search_spec)
+    write_pydantic_yaml(ENDPOINT_SPEC_FILE, base_endpoint_spec)
+    args = parse_args(["search", SATURATION_SEARCH_SPEC_FILE, ENDPOINT_SPEC_FILE, "-y"])
+    search(args)
+    run_folders = list_dir_relative(RESULTS_FOLDER)
+    assert len(run_folders) == 1
+    assert is_load_test_result_folder(run_folders[0])
+    assert os.path.isfile(os.path.join(run_folders[0], SEARCH_SUMMARY_FILE))
+
+    # searches are not started with run
+    args = parse_args(["run", SATURATION_SEARCH_SPEC_FILE, ENDPOINT_SPEC_FILE, "-y"])
+    with pytest.raises(ValueError):
+        run(args)
+
+
 def test_load_dotenv(unique_temporary_folder, monkeypatch):
     monkeypatch.chdir(unique_temporary_folder)
     env_var = "TEST_X_ABC"
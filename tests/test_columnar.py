@@ -0,0 +1,152 @@
+import os
+import shutil
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tokenflood.columnar import (
+    CHUNK_HEADER,
+    convert_csv_to_columnar,
+    encode_chunk,
+    encode_manifest,
+    get_column_dtypes,
+    get_columnar_file,
+    read_chunk,
+    read_columnar,
+    write_columnar,
+)
+from tokenflood.constants import LLM_REQUESTS_FILE
+from tokenflood.models.data.error_data import ErrorData
+
+
+@pytest.fixture()
+def error_rows():
+    return [
+        {
+            "datetime": "2025-12-01_09-51-59.724(UTC)",
+            "request_per_second_phase": 1.5,
+            "type": "ValueError",
+            "message": "",
+            "group_id": -1,
+        },
+        {
+            "datetime": "2025-12-01_09-52-00.001(UTC)",
+            "request_per_second_phase": 2.0,
+            "type": "RuntimeError",
+            "message": "Überlastet, 503",
+            "group_id": 3,
+        },
+    ]
+
+
+def test_get_column_dtypes():
+    assert get_column_dtypes(ErrorData) == {
+        "datetime": "str",
+        "request_per_second_phase": "<f8",
+        "type": "str",
+        "message": "str",
+        "group_id": "<i8",
+    }
+
+
+def test_get_columnar_file():
+    assert get_columnar_file("a/llm_requests.csv") == "a/llm_requests.columns"
+
+
+def test_read_columnar(error_rows, unique_temporary_file):
+    dtypes = get_column_dtypes(ErrorData)
+    with open(unique_temporary_file, "wb") as f:
+        f.write(encode_manifest(dtypes))
+        f.write(encode_chunk(error_rows[:1], dtypes))
+        f.write(encode_chunk(error_rows[1:], dtypes))
+
+    df = read_columnar(unique_temporary_file)
+
+    assert df.to_dict("records") == error_rows
+    assert df["group_id"].dtype == np.int64
+    assert df["request_per_second_phase"].dtype == np.float64
+
+
+def test_read_columnar_columns(error_rows, unique_temporary_file):
+    dtypes = get_column_dtypes(ErrorData)
+    with open(unique_temporary_file, "wb") as f:
+        f.write(encode_manifest(dtypes))
+        f.write(encode_chunk(error_rows, dtypes))
+
+    df = read_columnar(unique_temporary_file, ("group_id", "message", "missing"))
+
+    assert df.to_dict("records") == [
+        {"message": row["message"], "group_id": row["group_id"]} for row in error_rows
+    ]
+
+
+class CountingBytesIO(BytesIO):
+    def __init__(self, data: bytes):
+        super().__init__(data)
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        data = super().read(size)
+        self.bytes_read += len(data)
+        return data
+
+
+def test_read_chunk_seeks_past_unselected_columns():
+    dtypes = {"group_id": "<i8", "message": "str"}
+    rows = [{"group_id": i, "message": "x" * 1000} for i in range(10)]
+    f = CountingBytesIO(encode_chunk(rows, dtypes)[CHUNK_HEADER.size :])
+
+    columns = read_chunk(f, len(rows), dtypes, ("group_id",))
+
+    assert list(columns) == ["group_id"]
+    assert columns["group_id"].tolist() == list(range(10))
+    # the group ids and the string lengths, none of the strings
+    assert f.bytes_read == 10 * 8 + 10 * 4
+    assert f.tell() == len(f.getvalue())
+
+
+def test_read_columnar_skips_partial_chunks(error_rows, unique_temporary_file):
+    dtypes = get_column_dtypes(ErrorData)
+    with open(unique_temporary_file, "wb") as f:
+        f.write(encode_manifest(dtypes))
+        f.write(encode_chunk(error_rows[:1], dtypes))
+        f.write(encode_chunk(error_rows[1:], dtypes)[: CHUNK_HEADER.size + 3])
+
+    assert read_columnar(unique_temporary_file).to_dict("records") == error_rows[:1]
+
+
+def test_read_empty_columnar(unique_temporary_file):
+    with open(unique_temporary_file, "wb") as f:
+        f.write(encode_manifest(get_column_dtypes(ErrorData)))
+
+    df = read_columnar(unique_temporary_file)
+    assert len(df) == 0
+    assert list(df.columns) == list(ErrorData.model_fields)
+
+
+def test_write_columnar(unique_temporary_file):
+    df = pd.DataFrame(
+        {
+            "a": list(range(1000)),
+            "b": [str(i) for i in range(1000)],
+            "c": [i % 2 == 0 for i in range(1000)],
+        }
+    )
+    write_columnar(unique_temporary_file, df)
+    pd.testing.assert_frame_equal(read_columnar(unique_temporary_file), df)
+
+
+def test_convert_csv_to_columnar(load_test_results_folder, unique_temporary_folder):
+    csv_file = os.path.join(unique_temporary_folder, LLM_REQUESTS_FILE)
+    shutil.copy(os.path.join(load_test_results_folder, LLM_REQUESTS_FILE), csv_file)
+
+    columnar_file = convert_csv_to_columnar(csv_file)
+
+    csv_df = pd.read_csv(csv_file)
+    columnar_df = read_columnar(columnar_file)
+    assert list(columnar_df.columns) == list(csv_df.columns)
+    numeric_columns = csv_df.select_dtypes("number").columns
+    pd.testing.assert_frame_equal(columnar_df[numeric_columns], csv_df[numeric_columns])
+    assert columnar_df["prompt"].tolist() == csv_df["prompt"].fillna("").tolist()
@@ -0,0 +1,74 @@
+import time
+
+import pandas as pd
+import pytest
+
+from tokenflood.concurrency_runner import (
+    PhaseThroughput,
+    run_concurrency_test,
+    run_concurrency_test_phase,
+)
+from tokenflood.runner import get_warm_session
+from tokenflood.summaries import RunSummaryCollector
+
+
+def test_phase_throughput():
+    throughput = PhaseThroughput(time.monotonic() - 2.0)
+    assert throughput.requests_per_second == 0.0
+    throughput.record_completion()
+    throughput.record_completion()
+    assert throughput.num_completed == 2
+    assert throughput.requests_per_second == pytest.approx(1.0, abs=0.05)
+
+
+@pytest.mark.asyncio
+async def test_run_concurrency_test_phase(
+    tiny_concurrency_test_spec,
+    base_endpoint_spec,
+    file_io_context,
+    with_patched_aiohttp_session,
+):
+    file_io_context.summary_collector = RunSummaryCollector()
+    file_io_context.activate()
+    error = await get_warm_session(base_endpoint_spec, file_io_context)
+    assert error is None
+    phase = tiny_concurrency_test_spec.create_concurrency_test_phases()[1]
+    start = time.time()
+    error_threshold_tripped = await run_concurrency_test_phase(
+        "test",
+        0,
+        tiny_concurrency_test_spec,
+        phase,
+        base_endpoint_spec,
+        file_io_context,
+    )
+    end = time.time()
+    assert not error_threshold_tripped
+    assert end - start < phase.duration_seconds + 5
+    await file_io_context.wait_for_pending_writes()
+    df = pd.read_csv(file_io_context.llm_request_sink.destination)
+    # the loop keeps refilling, so there are more requests than slots
+    assert len(df) > phase.concurrency
+    assert (df["concurrency"] == phase.concurrency).all()
+    assert df["request_number"].is_unique
+    # there is no target rate, the achieved throughput is kept in the summary
+    assert (df["requests_per_second_phase"] == 0).all()
+    [group] = file_io_context.summary_collector.summarize(complete=True).groups
+    assert group.throughput == pytest.approx(len(df) / phase.duration_seconds, rel=0.5)
+
+
+@pytest.mark.asyncio
+async def test_run_entire_tiny_concurrency_test(
+    tiny_concurrency_test_spec,
+    base_endpoint_spec,
+    file_io_context,
+    with_patched_aiohttp_session,
+):
+    await run_concurrency_test(
+        base_endpoint_spec, tiny_concurrency_test_spec, file_io_context
+    )
+    df = pd.read_csv(file_io_context.llm_request_sink.destination)
+    assert set(df["group_id"]) == {0, 1}
+    assert set(df["concurrency"]) == set(tiny_concurrency_test_spec.concurrency_levels)
+    error_df = pd.read_csv(file_io_context.error_sink.destination)
+    assert len(error_df) == 0
@@ -0,0 +1,70 @@
+import time
+
+import pytest
+
+from tokenflood.dispatcher import DeadlineDispatcher
+
+
+def test_dispatcher_deadlines():
+    dispatcher = DeadlineDispatcher.from_schedule([0.5, 0.25, 0.0])
+    with pytest.raises(RuntimeError):
+        dispatcher.deadline(0)
+    dispatcher.start(100.0)
+    assert dispatcher.deadline(0) == 100.0
+    assert dispatcher.deadline(1) == 100.5
+    assert dispatcher.deadline(2) == 100.75
+    # past the last send the deadline is the end of the phase
+    assert dispatcher.deadline(3) == 100.75
+    assert dispatcher.send_offset(3) == 0.75
+
+
+def test_dispatcher_empty_stats():
+    dispatcher = DeadlineDispatcher.from_schedule([])
+    assert dispatcher.num_sent == 0
+    assert dispatcher.achieved_requests_per_second == 0.0
+    assert dispatcher.mean_send_lag == 0.0
+    assert dispatcher.max_send_lag == 0.0
+
+
+def test_dispatcher_records_send_lag():
+    dispatcher = DeadlineDispatcher.from_schedule([0.1, 0.0])
+    dispatcher.start(time.monotonic() - 1.0)
+    lag = dispatcher.record_send(0)
+    assert lag >= 1000
+    assert dispatcher.max_send_lag == lag
+    assert dispatcher.num_sent == 1
+
+
+def test_dispatcher_achieved_rate_of_few_sends(monkeypatch):
+    dispatcher = DeadlineDispatcher.from_schedule([1.0, 1.0, 0.0])
+    dispatcher.start(100.0)
+    for i, now in enumerate([100.0, 101.0]):
+        monkeypatch.setattr(time, "monotonic", lambda: now)
+        dispatcher.record_send(i)
+        if i == 0:
+            # a single send has no rate yet
+            assert dispatcher.achieved_requests_per_second == 0.0
+    # two sends one second apart are one request per second
+    assert dispatcher.achieved_requests_per_second == pytest.approx(1.0)
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_does_not_drift():
+    num_requests = 20
+    pause = 0.02
+    schedule = [pause] * (num_requests - 1) + [0.0]
+    dispatcher = DeadlineDispatcher.from_schedule(schedule)
+    start = time.monotonic()
+    dispatcher.start()
+    for i in range(num_requests):
+        await dispatcher.wait_for_send_slot(i)
+        dispatcher.record_send(i)
+        # simulate per request overhead that would add up with relative sleeps
+        time.sleep(pause / 2)
+    duration = time.monotonic() - start
+    expected_duration = pause * (num_requests - 1)
+    assert duration < expected_duration + pause * 2
+    assert dispatcher.achieved_requests_per_second == pytest.approx(
+        (num_requests - 1) / expected_duration, rel=0.1
+    )
+    assert dispatcher.mean_send_lag < pause * 1000 / 2
@@ -0,0 +1,146 @@
+import asyncio
+import logging
+import time
+
+import pandas as pd
+import pytest
+
+from tests.utils import does_not_raise
+import tokenflood.distributed
+from tokenflood.constants import AGENT_WRITE_BUFFER_LIMIT
+from tokenflood.distributed import (
+    MessageStream,
+    is_valid_agent_token,
+    measure_clock_offset,
+    parse_agent_address,
+    run_load_test_with_agents,
+    start_agent,
+)
+
+
+@pytest.mark.parametrize(
+    "address, expectation, expected_result",
+    [
+        ("localhost:7777", does_not_raise(), ("localhost", 7777)),
+        ("10.0.0.1:80", does_not_raise(), ("10.0.0.1", 80)),
+        ("localhost", pytest.raises(ValueError), None),
+        (":7777", pytest.raises(ValueError), None),
+        ("localhost:port", pytest.raises(ValueError), None),
+    ],
+)
+def test_parse_agent_address(address, expectation, expected_result):
+    with expectation:
+        assert parse_agent_address(address) == expected_result
+
+
+@pytest.mark.asyncio
+async def test_measure_clock_offset():
+    server = await start_agent("127.0.0.1", 0, clock=lambda: time.time() + 5.0)
+    port = server.sockets[0].getsockname()[1]
+    async with server:
+        stream = await MessageStream.connect(f"127.0.0.1:{port}")
+        offset = await measure_clock_offset(stream)
+        await stream.close()
+    assert offset == pytest.approx(5.0, abs=0.05)
+
+
+@pytest.mark.asyncio
+async def test_run_entire_tiny_load_test_with_agents(
+    tiny_load_test_spec,
+    base_endpoint_spec,
+    file_io_context,
+    with_patched_aiohttp_session,
+):
+    servers = [await start_agent("127.0.0.1", 0) for _ in range(2)]
+    addresses = [f"127.0.0.1:{s.sockets[0].getsockname()[1]}" for s in servers]
+    await run_load_test_with_agents(
+        base_endpoint_spec, tiny_load_test_spec, file_io_context, addresses
+    )
+    for server in servers:
+        server.close()
+        await server.wait_closed()
+    df = pd.read_csv(file_io_context.llm_request_sink.destination)
+    assert sorted(df["request_number"]) == sorted(
+        n
+        for load_phase in tiny_load_test_spec.create_load_test_phases()
+        for n in range(load_phase.total_num_requests)
+    )
+    assert df["datetime"].str.endswith("(UTC)").all()
+
+
+@pytest.mark.parametrize(
+    "token, expected_token, expected_result",
+    [
+        (None, None, True),
+        ("abc", None, True),
+        ("abc", "abc", True),
+        ("abd", "abc", False),
+        (None, "abc", False),
+    ],
+)
+def test_is_valid_agent_token(token, expected_token, expected_result):
+    assert is_valid_agent_token(token, expected_token) == expected_result
+
+
+@pytest.mark.asyncio
+async def test_agent_needs_token_on_other_interfaces():
+    with pytest.raises(ValueError):
+        await start_agent("0.0.0.0", 0)
+    server = await start_agent("0.0.0.0", 0, token="abc")
+    server.close()
+    await server.wait_closed()
+
+
+@pytest.mark.asyncio
+async def test_agent_rejects_setup_with_wrong_token(
+    tiny_load_test_spec,
+    base_endpoint_spec,
+    file_io_context,
+    with_patched_aiohttp_session,
+):
+    server = await start_agent("127.0.0.1", 0, token="abc")
+    address = f"127.0.0.1:{server.sockets[0].getsockname()[1]}"
+    await run_load_test_with_agents(
+        base_endpoint_spec, tiny_load_test_spec, file_io_context, [address], "abd"
+    )
+    server.close()
+    await server.wait_closed()
+    assert len(pd.read_csv(file_io_context.llm_request_sink.destination)) == 0
+
+
+@pytest.mark.asyncio
+async def test_run_ends_when_an_agent_shard_fails(
+    tiny_load_test_spec,
+    base_endpoint_spec,
+    file_io_context,
+    with_patched_aiohttp_session,
+    monkeypatch,
+    caplog,
+):
+    async def failing_run_shard(*args, **kwargs):
+        raise OSError("too many open files")
+
+    monkeypatch.setattr(tokenflood.distributed, "run_shard", failing_run_shard)
+    server = await start_agent("127.0.0.1", 0)
+    address = f"127.0.0.1:{server.sockets[0].getsockname()[1]}"
+    with caplog.at_level(logging.ERROR):
+        await asyncio.wait_for(
+            run_load_test_with_agents(
+                base_endpoint_spec, tiny_load_test_spec, file_io_context, [address]
+            ),
+            timeout=30,
+        )
+    server.close()
+    await server.wait_closed()
+    assert "a load generator failed: OSError: too many open files" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_message_stream_limits_write_buffer():
+    server = await start_agent("127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    async with server:
+        stream = await MessageStream.connect(f"127.0.0.1:{port}")
+        limits = stream.writer.transport.get_write_buffer_limits()
+        await stream.close()
+    assert limits[1] == AGENT_WRITE_BUFFER_LIMIT
@@ -6,6 +6,7 @@ import requests
 from tokenflood.constants import DEFAULT_PERCENTILES_STR
 from tokenflood.visualization_frontend.gradio import (
     visualize_results,
+    CONCURRENCY_TEST,
     LOAD_TEST,
     OBSERVATION_TEST,
     initialize_run_type_from_url,
@@ -22,6 +23,7 @@ from tokenflood.visualization_frontend.metrics import (
     DecodingLatency,
     AverageTimePerOutputToken,
     NetworkLatency,
+    Throughput,
 )
 from tokenflood.visualization_frontend.percentiles import (
     percentiles_to_str,
@@ -169,6 +171,12 @@ def test_initialize_metric_from_url(params, expected_metric):
     assert initialize_metric_from_url(params) == expected_metric
 
 
+def test_throughput_only_for_concurrency_tests():
+    params = {METRIC_QUERY_PARAM: Throughput.name}
+    assert initialize_metric_from_url(params, CONCURRENCY_TEST) == Throughput.name
+    assert initialize_metric_from_url(params, LOAD_TEST) == RequestLatency.name
+
+
 @pytest.mark.parametrize(
     "params, expected_percentiles",
     [
@@ -1,6 +1,12 @@
+import random
+import time
+
 import pytest
 
+from tokenflood.messages import create_message_list_from_prompt
 from tokenflood.models.load_types.load_type import HeuristicLoad
+from tokenflood.models.message_list import MessageList
+from tokenflood.util import roughly_estimated_token_cost
 
 
 @pytest.fixture()
@@ -46,3 +52,76 @@ def test_create_heuristic_messages(heuristic_load, tokenizer):
 
     # lengths should be within +-10 token range of the desired length
     assert all([1014 <= len(t.tokens) <= 1034 for t in tokenized])
+
+
+def test_iter_message_lists(heuristic_load):
+    message_lists = heuristic_load.iter_message_lists(3)
+
+    assert not isinstance(message_lists, list)
+    assert len(list(message_lists)) == 3
+
+
+def test_iter_message_lists_endless(heuristic_load):
+    message_lists = heuristic_load.iter_message_lists()
+
+    prompts = [next(message_lists)[0]["content"] for _ in range(5)]
+    assert len(set(prompts)) == 5
+    assert all(prompt.endswith(heuristic_load.task) for prompt in prompts)
+
+
+def test_create_prompts_with_seed(heuristic_load):
+    seeded_load = heuristic_load.model_copy(update={"seed": 42})
+
+    assert seeded_load.create_prompts(3) == seeded_load.create_prompts(3)
+    assert seeded_load.create_prompts(3) != heuristic_load.create_prompts(3)
+    assert list(seeded_load.iter_message_lists(3, stream=(0,))) != list(
+        seeded_load.iter_message_lists(3, stream=(1,))
+    )
+
+
+def test_create_prompt_random_parts_uneven_fillers(heuristic_load):
+    uneven_load = heuristic_load.model_copy(
+        update={"prompt_filler_tokens": (" A", " hello", " C")}
+    )
+
+    random_parts = uneven_load.create_prompt_random_parts(20, 50)
+
+    assert all("\0" not in part for part in random_parts)
+    assert all(100 <= len(part) <= 300 for part in random_parts)
+    assert all(part.startswith((" A", " hello", " C")) for part in random_parts)
+
+
+def create_message_list_one_by_one(load: HeuristicLoad) -> MessageList:
+    """The message list creation before prompts were synthesized in batches."""
+    task_tokens = roughly_estimated_token_cost(load.task)
+    random_prompt_tokens = load.prompt_length - load.prefix_length - task_tokens
+    prompt = load.create_prompt_prefix(load.prefix_length)
+    if random_prompt_tokens > 0:
+        prompt += "".join(
+            random.choices(load.prompt_filler_tokens, k=random_prompt_tokens)
+        )
+    if len(prompt) > 0:
+        prompt += "\n\n"
+    prompt += load.task
+    return create_message_list_from_prompt(prompt)
+
+
+@pytest.mark.benchmark
+def test_create_message_lists_benchmark():
+    n = 500
+    load = HeuristicLoad(prompt_length=4000, prefix_length=500, output_length=12)
+
+    start = time.perf_counter()
+    for _ in range(n):
+        create_message_list_one_by_one(load)
+    per_prompt_rate = n / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    load.create_message_lists(n)
+    batched_rate = n / (time.perf_counter() - start)
+
+    print(
+        f"message lists of {load.prompt_length} tokens: {per_prompt_rate:.0f}/s "
+        f"one by one, {batched_rate:.0f}/s batched"
+    )
+    assert batched_rate > per_prompt_rate
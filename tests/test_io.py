@@ -1,17 +1,44 @@
+import asyncio
 import os
+import threading
+import time
 
+import pandas as pd
 import pytest
 
 from tests.utils import does_not_raise
-from tokenflood.constants import ERROR_RING_BUFFER_SIZE
+import tokenflood.io
+from tokenflood.catalog import ResultsCatalog, RunCatalogWriter, get_catalog_file
+from tokenflood.columnar import get_columnar_file, read_columnar
+from tokenflood.constants import (
+    COMMON_RESULT_FILES,
+    CONCURRENCY_TEST_SPEC_FILE,
+    ERROR_FILE,
+    ERROR_RECORD,
+    ERROR_RING_BUFFER_SIZE,
+    LLM_REQUEST_RECORD,
+    LLM_REQUESTS_FILE,
+    LOAD_TEST_SPEC_FILE,
+    NETWORK_LATENCY_FILE,
+    NETWORK_LATENCY_RECORD,
+    SUMMARY_FILE,
+)
 from tokenflood.io import (
     CSVFileSink,
+    BinaryFileSink,
+    ColumnarFileSink,
     FileSink,
+    FileIOContext,
+    FileWriterThread,
+    ForwardingIOContext,
     IOContext,
+    ObservedIOContext,
+    ThreadedFileIOContext,
     add_suffix_to_file_name,
     folder_contains_file,
     folder_contains_files,
     get_first_available_filename_like,
+    is_concurrency_test_result_folder,
     is_observation_result_folder,
     is_load_test_result_folder,
     list_dir_relative,
@@ -19,11 +46,16 @@ from tokenflood.io import (
     read_file,
     read_pydantic_yaml_list,
     read_load_test_spec,
+    read_run_spec,
     write_file,
     write_pydantic_yaml,
     write_pydantic_yaml_list,
+    write_record,
     read_jsonl_messages,
 )
+from tokenflood.models.run_specs.concurrency_test_spec import ConcurrencyTestSpec
+from tokenflood.models.data.catalog_data import CatalogEntry
+from tokenflood.summaries import read_run_summary
 from tokenflood.models.run_specs.load_test_spec import LoadTestSpec
 
 
@@ -142,6 +174,325 @@ async def test_csv_file_sink(unique_temporary_file):
         assert f.read() == "a,b\n1,2\n3,4\n"
 
 
+@pytest.mark.asyncio
+async def test_file_sink_flushes_full_batches(unique_temporary_file):
+    sink = FileSink(unique_temporary_file, max_items=3, flush_interval_seconds=60)
+    sink.activate()
+    for item in ["a\n", "b\n", "c\n", "d\n"]:
+        sink.write(item)
+    await asyncio.sleep(0.1)
+
+    # the first three items make a full batch, the fourth waits for the timer
+    with open(unique_temporary_file) as f:
+        assert f.read() == "a\nb\nc\n"
+
+    await sink.wait_for_pending_writes()
+    with open(unique_temporary_file) as f:
+        assert f.read() == "a\nb\nc\nd\n"
+    sink.close()
+
+
+@pytest.mark.asyncio
+async def test_file_sink_flushes_after_interval(unique_temporary_file):
+    sink = FileSink(unique_temporary_file, flush_interval_seconds=0.05)
+    sink.activate()
+    sink.write("a\n")
+    await asyncio.sleep(0.3)
+
+    with open(unique_temporary_file) as f:
+        assert f.read() == "a\n"
+    sink.close()
+
+
+class UnbatchedFileSink(FileSink):
+    """The sink before batching: one write and flush per item."""
+
+    async def _consume(self):
+        async with self._open() as f:
+            while True:
+                item = await self.queue.get()
+                if item is None:
+                    self.queue.task_done()
+                    break
+                await f.write(item)
+                await f.flush()
+                self.queue.task_done()
+
+
+async def measure_sink(sink: CSVFileSink, num_rows: int):
+    """Rows per second and mean and max event loop lag in ms while writing."""
+    lags = []
+    done = False
+
+    async def tick():
+        while not done:
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lags.append((time.perf_counter() - start - 0.001) * 1000)
+
+    ticker = asyncio.create_task(tick())
+    sink.activate()
+    start = time.perf_counter()
+    for i in range(num_rows):
+        sink.write_dict({"a": i, "b": "x" * 100})
+        if i % 100 == 0:
+            await asyncio.sleep(0)
+    sink.close()
+    await sink.wait_for_pending_writes()
+    rows_per_second = num_rows / (time.perf_counter() - start)
+    done = True
+    await ticker
+    return rows_per_second, sum(lags) / max(len(lags), 1), max(lags, default=0.0)
+
+
+class UnbatchedCSVFileSink(CSVFileSink, UnbatchedFileSink):
+    pass
+
+
+@pytest.mark.asyncio
+async def test_unbatched_and_batched_sinks_write_all_rows(unique_temporary_folder):
+    num_rows = 500
+    for name, sink_type in [
+        ("unbatched", UnbatchedCSVFileSink),
+        ("batched", CSVFileSink),
+    ]:
+        destination = os.path.join(unique_temporary_folder, f"{name}.csv")
+        await measure_sink(sink_type(destination, ["a", "b"]), num_rows)
+        with open(destination) as f:
+            lines = f.readlines()
+        assert len(lines) == num_rows + 1
+        assert lines[-1] == f"{num_rows - 1},{'x' * 100}\n"
+
+
+@pytest.mark.benchmark
+@pytest.mark.asyncio
+async def test_file_sink_benchmark(unique_temporary_folder):
+    num_rows = 5000
+    results = {}
+    for name, sink_type in [
+        ("unbatched", UnbatchedCSVFileSink),
+        ("batched", CSVFileSink),
+    ]:
+        destination = os.path.join(unique_temporary_folder, f"{name}.csv")
+        results[name] = await measure_sink(sink_type(destination, ["a", "b"]), num_rows)
+        with open(destination) as f:
+            assert len(f.readlines()) == num_rows + 1
+        rows_per_second, mean_lag, max_lag = results[name]
+        print(
+            f"{name} sink: {rows_per_second:.0f} rows/s, event loop lag "
+            f"{mean_lag:.2f}ms mean, {max_lag:.2f}ms max"
+        )
+    assert results["batched"][0] > results["unbatched"][0]
+
+
+@pytest.mark.asyncio
+async def test_file_writer_thread(unique_temporary_folder):
+    text_file = os.path.join(unique_temporary_folder, "a.csv")
+    binary_file = os.path.join(unique_temporary_folder, "b.bin")
+    writer_thread = FileWriterThread()
+    csv_sink = CSVFileSink(text_file, ["a", "b"], writer_thread=writer_thread)
+    binary_sink = BinaryFileSink(binary_file, writer_thread=writer_thread)
+    csv_sink.activate()
+    binary_sink.activate()
+    csv_sink.write_dict({"a": 1, "b": 2})
+    binary_sink.write(b"\x00\x01")
+
+    await csv_sink.wait_for_pending_writes()
+    with open(text_file) as f:
+        assert f.read() == "a,b\n1,2\n"
+    with open(binary_file, "rb") as f:
+        assert f.read() == b"\x00\x01"
+
+    csv_sink.close()
+    binary_sink.close()
+    with pytest.raises(RuntimeError):
+        csv_sink.write_dict({"a": 3, "b": 4})
+    writer_thread.stop()
+    assert not writer_thread.thread.is_alive()
+
+
+@pytest.mark.asyncio
+async def test_file_writer_thread_reports_errors(unique_temporary_folder):
+    writer_thread = FileWriterThread()
+    sink = FileSink(
+        os.path.join(unique_temporary_folder, "missing", "a.txt"),
+        writer_thread=writer_thread,
+    )
+    sink.activate()
+    with pytest.raises(FileNotFoundError):
+        await sink.wait_for_pending_writes()
+    writer_thread.stop()
+
+
+@pytest.mark.asyncio
+async def test_threaded_file_io_context(threaded_file_io_context):
+    threaded_file_io_context.activate()
+    threaded_file_io_context.write_error(
+        {
+            "datetime": "now",
+            "request_per_second_phase": 1,
+            "type": "ValueError",
+            "message": "",
+            "group_id": 0,
+        }
+    )
+    await threaded_file_io_context.wait_for_pending_writes()
+
+    with open(threaded_file_io_context.error_sink.destination) as f:
+        lines = f.readlines()
+    assert len(lines) == 2
+    assert threaded_file_io_context.error_rate() == 1.0
+    threaded_file_io_context.close()
+    assert not threaded_file_io_context.writer_thread.thread.is_alive()
+
+
+@pytest.mark.asyncio
+async def test_columnar_file_sink(unique_temporary_file):
+    sink = ColumnarFileSink(
+        unique_temporary_file, {"a": "<i8", "b": "str"}, chunk_rows=2
+    )
+    sink.activate()
+    for i in range(5):
+        sink.write_dict({"a": i, "b": str(i)})
+    await sink.wait_for_pending_writes()
+
+    df = read_columnar(unique_temporary_file)
+    assert df["a"].tolist() == list(range(5))
+    assert df["b"].tolist() == [str(i) for i in range(5)]
+    sink.close()
+
+
+@pytest.mark.asyncio
+async def test_file_io_context_columnar(unique_temporary_folder):
+    io_context = FileIOContext(
+        os.path.join(unique_temporary_folder, LLM_REQUESTS_FILE),
+        os.path.join(unique_temporary_folder, NETWORK_LATENCY_FILE),
+        os.path.join(unique_temporary_folder, ERROR_FILE),
+        columnar=True,
+    )
+    io_context.activate()
+    io_context.write_network_latency(
+        {
+            "datetime": "now",
+            "endpoint_url": "http://localhost",
+            "requests_per_second_phase": 1.0,
+            "latency": 12.5,
+            "tls_handshake_latency": 0.0,
+            "group_id": 0,
+            "method": "tcp",
+        }
+    )
+    await io_context.wait_for_pending_writes()
+    io_context.close()
+
+    network_file = os.path.join(unique_temporary_folder, NETWORK_LATENCY_FILE)
+    df = read_columnar(get_columnar_file(network_file))
+    pd.testing.assert_frame_equal(df, pd.read_csv(network_file))
+    assert len(read_columnar(get_columnar_file(io_context.error_sink.destination))) == 0
+
+
+@pytest.mark.asyncio
+async def test_file_io_context_summary(unique_temporary_folder):
+    summary_file = os.path.join(unique_temporary_folder, SUMMARY_FILE)
+    io_context = FileIOContext(
+        os.path.join(unique_temporary_folder, LLM_REQUESTS_FILE),
+        os.path.join(unique_temporary_folder, NETWORK_LATENCY_FILE),
+        os.path.join(unique_temporary_folder, ERROR_FILE),
+        summary_file=summary_file,
+    )
+    io_context.activate()
+    io_context.write_network_latency(
+        {
+            "datetime": "now",
+            "endpoint_url": "http://localhost",
+            "requests_per_second_phase": 1.0,
+            "latency": 12,
+            "group_id": 0,
+        }
+    )
+    io_context.write_error(
+        {
+            "datetime": "now",
+            "request_per_second_phase": 1.0,
+            "type": "ValueError",
+            "message": "",
+            "group_id": 0,
+        }
+    )
+    await io_context.wait_for_pending_writes()
+    summary = read_run_summary(summary_file)
+    assert summary is not None and not summary.complete
+    assert summary.groups[0].num_errors == 1
+    assert summary.groups[0].metrics[NETWORK_LATENCY_FILE]["latency"].mean == 12
+
+    io_context.close()
+    summary = read_run_summary(summary_file)
+    assert summary is not None and summary.complete
+
+
+@pytest.mark.asyncio
+async def test_threaded_file_io_context_writes_summaries_on_writer_thread(
+    unique_temporary_folder, monkeypatch
+):
+    threads = []
+    catalog = ResultsCatalog(get_catalog_file(unique_temporary_folder))
+    update_run = catalog.update_run
+    write_summary_file = tokenflood.io.replace_summary
+
+    def record_update_run(*args):
+        threads.append(threading.current_thread())
+        update_run(*args)
+
+    def record_replace_summary(*args):
+        threads.append(threading.current_thread())
+        write_summary_file(*args)
+
+    monkeypatch.setattr(catalog, "update_run", record_update_run)
+    monkeypatch.setattr(tokenflood.io, "replace_summary", record_replace_summary)
+    summary_file = os.path.join(unique_temporary_folder, SUMMARY_FILE)
+    io_context = ThreadedFileIOContext(
+        os.path.join(unique_temporary_folder, LLM_REQUESTS_FILE),
+        os.path.join(unique_temporary_folder, NETWORK_LATENCY_FILE),
+        os.path.join(unique_temporary_folder, ERROR_FILE),
+        summary_file=summary_file,
+        catalog_writer=RunCatalogWriter(
+            catalog,
+            CatalogEntry(
+                run="run",
+                run_spec_file=LOAD_TEST_SPEC_FILE,
+                endpoint="openai/gpt-4o-mini",
+                endpoint_spec_hash="endpoint-hash",
+                run_spec_hash="run-hash",
+                created="2025-12-01_09-51-50",
+            ),
+        ),
+    )
+    io_context.activate()
+    io_context.write_error(
+        {
+            "datetime": "now",
+            "request_per_second_phase": 1.0,
+            "type": "ValueError",
+            "message": "",
+            "group_id": 0,
+        }
+    )
+    await io_context.wait_for_pending_writes()
+    # the writes are done by the time the pending writes are awaited
+    assert len(threads) == 2
+    summary = read_run_summary(summary_file)
+    assert summary is not None and summary.groups[0].num_errors == 1
+
+    io_context.close()
+    assert len(threads) == 4
+    assert all(thread is io_context.writer_thread.thread for thread in threads)
+    summary = read_run_summary(summary_file)
+    assert summary is not None and summary.complete
+    reopened = ResultsCatalog(get_catalog_file(unique_temporary_folder))
+    assert reopened.get_run_summary("run") == summary
+    reopened.close()
+
+
 @pytest.mark.asyncio
 async def test_io_context_abstract_methods():
     io_context = IOContext()
@@ -168,6 +519,78 @@ async def test_io_context_abstract_methods():
         io_context.close()
 
 
+@pytest.mark.asyncio
+async def test_forwarding_io_context():
+    records = []
+    io_context = ForwardingIOContext(
+        lambda record_type, data: records.append((record_type, data)), lambda: 0.25
+    )
+    io_context.activate()
+    io_context.write_llm_request({"a": 1})
+    io_context.write_network_latency({"b": 2})
+    io_context.write_error({"c": 3})
+    await io_context.wait_for_pending_writes()
+    io_context.close()
+    assert records == [
+        (LLM_REQUEST_RECORD, {"a": 1}),
+        (NETWORK_LATENCY_RECORD, {"b": 2}),
+        (ERROR_RECORD, {"c": 3}),
+    ]
+    assert io_context.error_rate() == 0.25
+
+    target = ForwardingIOContext(
+        lambda record_type, data: records.append((record_type, data)), lambda: 0.0
+    )
+    records.clear()
+    write_record(target, NETWORK_LATENCY_RECORD, {"b": 2})
+    write_record(target, ERROR_RECORD, {"c": 3})
+    assert records == [(NETWORK_LATENCY_RECORD, {"b": 2}), (ERROR_RECORD, {"c": 3})]
+    with pytest.raises(ValueError):
+        write_record(target, "unknown", {})
+
+
+@pytest.mark.asyncio
+async def test_forwarding_io_context_waits_for_capacity():
+    waits = []
+
+    async def wait_for_capacity():
+        waits.append(True)
+
+    io_context = ForwardingIOContext(lambda *_: None, lambda: 0.0, wait_for_capacity)
+    await io_context.wait_for_capacity()
+    await ObservedIOContext(io_context, print, print).wait_for_capacity()
+    assert len(waits) == 2
+    # without a receiver to wait for it returns right away
+    await ForwardingIOContext(lambda *_: None, lambda: 0.0).wait_for_capacity()
+
+
+@pytest.mark.asyncio
+async def test_observed_io_context():
+    records = []
+    observed = []
+    inner = ForwardingIOContext(
+        lambda record_type, data: records.append((record_type, data)), lambda: 0.5
+    )
+    io_context = ObservedIOContext(
+        inner,
+        lambda data: observed.append((LLM_REQUEST_RECORD, data)),
+        lambda data: observed.append((ERROR_RECORD, data)),
+    )
+    io_context.activate()
+    io_context.write_llm_request({"a": 1})
+    io_context.write_network_latency({"b": 2})
+    io_context.write_error({"c": 3})
+    await io_context.wait_for_pending_writes()
+    io_context.close()
+    assert records == [
+        (LLM_REQUEST_RECORD, {"a": 1}),
+        (NETWORK_LATENCY_RECORD, {"b": 2}),
+        (ERROR_RECORD, {"c": 3}),
+    ]
+    assert observed == [(LLM_REQUEST_RECORD, {"a": 1}), (ERROR_RECORD, {"c": 3})]
+    assert io_context.error_rate() == 0.5
+
+
 def test_read_short_observation_spec(short_observation_spec):
     assert short_observation_spec.duration_hours == 0.03
     assert short_observation_spec.polling_interval_minutes == 1
@@ -208,6 +631,24 @@ def test_is_observation_result_folder(observation_results_folder):
     assert is_observation_result_folder(observation_results_folder)
 
 
+def test_is_concurrency_test_result_folder(
+    unique_temporary_folder, load_test_results_folder
+):
+    assert not is_concurrency_test_result_folder(load_test_results_folder)
+    for filename in COMMON_RESULT_FILES:
+        write_file(os.path.join(unique_temporary_folder, filename), "")
+    assert not is_concurrency_test_result_folder(unique_temporary_folder)
+    write_file(os.path.join(unique_temporary_folder, CONCURRENCY_TEST_SPEC_FILE), "")
+    assert is_concurrency_test_result_folder(unique_temporary_folder)
+    assert not is_load_test_result_folder(unique_temporary_folder)
+
+
+def test_read_concurrency_test_spec(concurrency_test_specs_folder):
+    run_spec = read_run_spec(os.path.join(concurrency_test_specs_folder, "tiny.yml"))
+    assert isinstance(run_spec, ConcurrencyTestSpec)
+    assert run_spec.concurrency_levels == (1, 3)
+
+
 @pytest.mark.parametrize(
     "file, expectation, num_lines",
     [
@@ -0,0 +1,160 @@
+import json
+import time
+
+import pytest
+
+from tokenflood.messages import create_message_list_from_prompt
+from tokenflood.models.data.llm_request_data import LLMRequestResult
+from tokenflood.models.endpoint_spec import EndpointSpec
+from tokenflood.native_client import (
+    StreamAccumulator,
+    close_native_session,
+    get_body,
+    get_chat_completions_url,
+    get_headers,
+    get_native_session,
+    send_native_llm_request,
+)
+from tokenflood.networking import ObservedEndpoint
+from tokenflood.runner import send_llm_request
+
+
+def make_line(chunk: dict) -> bytes:
+    return f"data: {json.dumps(chunk)}\n".encode()
+
+
+def test_stream_accumulator():
+    accumulator = StreamAccumulator(time.time() - 0.1)
+    lines = [
+        b": keep-alive\n",
+        b"\n",
+        make_line({"choices": [{"delta": {"role": "assistant"}}]}),
+        make_line({"choices": [{"delta": {"reasoning_content": "hmm"}}]}),
+        make_line({"choices": [{"delta": {"content": "Hello"}}]}),
+        make_line({"choices": [{"delta": {"content": " world"}}]}),
+        make_line(
+            {
+                "choices": [],
+                "usage": {
+                    "prompt_tokens": 10,
+                    "completion_tokens": 3,
+                    "prompt_tokens_details": {"cached_tokens": 4},
+                    "completion_tokens_details": None,
+                },
+            }
+        ),
+        b"data: [DONE]\n",
+    ]
+    for line in lines:
+        accumulator.add_line(line)
+    assert accumulator.first_token_time is not None
+    result = accumulator.to_result(accumulator.start_time + 0.3)
+    assert result.generated_text == "Hello world"
+    assert result.generated_reasoning == "hmm"
+    assert result.measured_input_tokens == 10
+    assert result.measured_prefix_tokens == 4
+    assert result.measured_output_tokens == 3
+    assert result.measured_reasoning_tokens == 0
+    assert result.time_to_first_token == pytest.approx(100, abs=5)
+    assert result.decoding_latency == pytest.approx(200, abs=5)
+    assert result.latency == pytest.approx(300, abs=1)
+    assert result.average_time_per_output_token == pytest.approx(100, abs=5)
+    assert len(result.token_arrivals) == 3
+    assert result.token_arrivals[0] == pytest.approx(100_000, abs=5_000)
+    assert result.max_stall >= result.inter_token_latency_p99
+
+
+def test_stream_accumulator_without_usage():
+    accumulator = StreamAccumulator(1.0)
+    result = accumulator.to_result(2.0)
+    assert result.measured_output_tokens == 0
+    assert result.time_to_first_token == 0
+    assert result.latency == 1000
+
+
+def test_request_building(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "abc")
+    endpoint_spec = EndpointSpec(
+        provider="openai",
+        model="gpt-4o-mini",
+        client="native",
+        extra_headers={"X-Test": "1"},
+        extra_body={"temperature": 0.0},
+    )
+    messages = create_message_list_from_prompt("ping")
+    assert (
+        get_chat_completions_url(endpoint_spec)
+        == "https://api.openai.com/v1/chat/completions"
+    )
+    headers = get_headers(endpoint_spec)
+    assert headers["Authorization"] == "Bearer abc"
+    assert headers["X-Test"] == "1"
+    body = get_body(endpoint_spec, messages, 5)
+    assert body["model"] == "gpt-4o-mini"
+    assert body["max_tokens"] == 5
+    assert body["stream"]
+    assert body["temperature"] == 0.0
+    assert "reasoning_effort" not in body
+
+
+@pytest.mark.asyncio
+async def test_send_native_llm_request(native_endpoint_spec: EndpointSpec):
+    messages = create_message_list_from_prompt("ping")
+    result = await send_native_llm_request(native_endpoint_spec, messages, 5)
+    await close_native_session()
+    assert isinstance(result, LLMRequestResult)
+    assert result.measured_output_tokens == 5
+    assert len(result.token_arrivals) == 5
+    assert result.inter_token_latency_p50 > 0
+    assert result.generated_text
+    assert result.latency >= result.time_to_first_token
+
+
+@pytest.mark.asyncio
+async def test_native_session_pool_options(native_endpoint_spec: EndpointSpec):
+    default_session = get_native_session(native_endpoint_spec)
+    assert default_session.connector is not None
+    assert default_session.connector.limit == 0
+    pooled_spec = native_endpoint_spec.model_copy(
+        update={"pool_size": 8, "pool_size_per_host": 4, "keepalive_timeout": 60}
+    )
+    session = get_native_session(pooled_spec)
+    assert session is not default_session
+    assert session is get_native_session(pooled_spec)
+    assert session.connector is not None
+    assert session.connector.limit == 8
+    assert session.connector.limit_per_host == 4
+    await close_native_session()
+    assert session.closed and default_session.closed
+
+
+@pytest.mark.asyncio
+async def test_native_client_connection_timings(native_endpoint_spec: EndpointSpec):
+    await close_native_session()
+    messages = create_message_list_from_prompt("ping")
+    first = await send_llm_request(native_endpoint_spec, messages, 1)
+    second = await send_llm_request(native_endpoint_spec, messages, 1)
+    await close_native_session()
+    assert not first.connection_reused
+    assert first.connect_latency > 0
+    # the fake endpoint speaks plain http
+    assert first.tls_handshake_latency == 0
+    assert 0 < first.time_to_headers <= first.latency + 1
+    assert second.connection_reused
+    assert second.dns_latency == second.connect_latency == 0
+    assert second.time_to_headers > 0
+
+
+@pytest.mark.asyncio
+async def test_native_client_is_observed(
+    native_endpoint_spec: EndpointSpec,
+    observed_endpoint: ObservedEndpoint,
+    with_patched_aiohttp_session,
+):
+    messages = create_message_list_from_prompt("ping")
+    result = await send_llm_request(native_endpoint_spec, messages, 1)
+    assert result
+    assert observed_endpoint.host == "127.0.0.1"
+    assert observed_endpoint.port == 8000
+    assert observed_endpoint.session is not None
+    await close_native_session()
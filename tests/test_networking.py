@@ -1,12 +1,23 @@
+import ssl
+
 import pytest
+from multidict import CIMultiDict
 
 from tokenflood.messages import create_message_list_from_prompt
 from tokenflood.models.endpoint_spec import EndpointSpec
 from tokenflood.networking import (
-    ObserveURLMiddleware,
+    ConnectionTimings,
+    ObservedEndpoint,
+    TimedSSLObject,
+    get_litellm_ssl_context,
+    get_observed_endpoint,
+    get_timed_ssl_context,
+    make_ping_headers,
     option_request_endpoint,
+    patch_aiohttp_client_session,
     ping_endpoint,
     time_async_func,
+    unpatch_aiohttp_client_session,
 )
 from tokenflood.runner import send_llm_request
 
@@ -14,75 +25,124 @@ from tokenflood.runner import send_llm_request
 @pytest.mark.asyncio
 async def test_observe_url_middleware(
     base_endpoint_spec: EndpointSpec,
-    url_observer: ObserveURLMiddleware,
+    observed_endpoint: ObservedEndpoint,
     with_patched_aiohttp_session,
 ):
     prompt = "ping"
     messages = create_message_list_from_prompt(prompt)
     response = await send_llm_request(base_endpoint_spec, messages, 1)
     assert response
-    assert url_observer.host == "127.0.0.1"
-    assert url_observer.port == 8000
-    assert url_observer.session is not None
+    assert observed_endpoint.host == "127.0.0.1"
+    assert observed_endpoint.port == 8000
+    assert observed_endpoint.session is not None
 
 
 @pytest.mark.asyncio
 async def test_unpatched_observe_url_middleware(
-    base_endpoint_spec: EndpointSpec, url_observer: ObserveURLMiddleware
+    base_endpoint_spec: EndpointSpec, observed_endpoint: ObservedEndpoint
 ):
-    assert url_observer.host is None
-    assert url_observer.port is None
-    assert url_observer.session is None
+    assert observed_endpoint.host is None
+    assert observed_endpoint.port is None
+    assert observed_endpoint.session is None
     prompt = "ping"
     messages = create_message_list_from_prompt(prompt)
     response = await send_llm_request(base_endpoint_spec, messages, 1)
     assert response
-    assert url_observer.host is None
-    assert url_observer.port is None
-    assert url_observer.session is None
+    assert observed_endpoint.host is None
+    assert observed_endpoint.port is None
+    assert observed_endpoint.session is None
+
+
+@pytest.mark.asyncio
+async def test_connection_timings_are_traced(
+    base_endpoint_spec: EndpointSpec, with_patched_aiohttp_session
+):
+    messages = create_message_list_from_prompt("ping")
+    result = await send_llm_request(base_endpoint_spec, messages, 1)
+    assert 0 < result.time_to_headers <= result.latency + 1
+    if not result.connection_reused:
+        assert result.connect_latency > 0
+
+
+def test_connection_timings_fields():
+    timings = ConnectionTimings()
+    timings.dns_latency = 2.0
+    timings.connection_latency = 10.0
+    timings.tls_handshake_latency = 5.0
+    timings.time_to_headers = 30.0
+    assert timings.get_fields() == {
+        "dns_latency": 2.0,
+        "connect_latency": 3.0,
+        "tls_handshake_latency": 5.0,
+        "connection_reused": False,
+        "time_to_headers": 30.0,
+    }
 
 
 @pytest.mark.asyncio
 async def test_ping_endpoint():
-    latency = await time_async_func(ping_endpoint("127.0.0.1", 8000))
-    assert latency < 100
+    latency = await ping_endpoint("127.0.0.1", 8000)
+    assert 0 < latency < 100
 
 
 @pytest.mark.asyncio
 async def test_option_request_endpoint(
     base_endpoint_spec: EndpointSpec,
     with_patched_aiohttp_session,
-    url_observer: ObserveURLMiddleware,
+    observed_endpoint: ObservedEndpoint,
 ):
     prompt = "ping"
     messages = create_message_list_from_prompt(prompt)
     await send_llm_request(base_endpoint_spec, messages, 1)
     latency = await time_async_func(
         option_request_endpoint(
-            url_observer.session, str(url_observer.url), url_observer.headers
+            observed_endpoint.session,
+            str(observed_endpoint.url),
+            observed_endpoint.ping_headers,
         )
     )
     assert latency < 100
 
 
 @pytest.mark.asyncio
-async def test_observe_url_middleware_singleton(
+async def test_observation_per_endpoint(
     base_endpoint_spec: EndpointSpec,
-    url_observer: ObserveURLMiddleware,
+    observed_endpoint: ObservedEndpoint,
     with_patched_aiohttp_session,
 ):
-    prompt = "ping"
-    messages = create_message_list_from_prompt(prompt)
-    response = await send_llm_request(base_endpoint_spec, messages, 1)
-    assert response
-    assert url_observer.host == "127.0.0.1"
-    assert url_observer.port == 8000
-    assert url_observer.session is not None
+    other_endpoint_spec = base_endpoint_spec.model_copy(update={"name": "other"})
+    messages = create_message_list_from_prompt("ping")
+    await send_llm_request(base_endpoint_spec, messages, 1)
+    assert observed_endpoint.host == "127.0.0.1"
+    assert get_observed_endpoint(base_endpoint_spec) is observed_endpoint
+    other_observed_endpoint = get_observed_endpoint(other_endpoint_spec)
+    assert other_observed_endpoint is not observed_endpoint
+    assert other_observed_endpoint.url is None
+
+
+def test_make_ping_headers():
+    headers = CIMultiDict(
+        {
+            "Authorization": "Bearer abc",
+            "Content-Length": "123",
+            "X-Stainless-Lang": "python",
+        }
+    )
+    assert make_ping_headers(headers) == CIMultiDict({"Authorization": "Bearer abc"})
+    # the headers of the request are left as they are
+    assert len(headers) == 3
+
 
-    url_observer_2 = ObserveURLMiddleware()
+def test_patch_times_tls_handshakes_of_the_client_contexts_only():
+    litellm_ssl_context = get_litellm_ssl_context()
+    assert litellm_ssl_context is not None
+    assert get_timed_ssl_context().sslobject_class is TimedSSLObject
 
-    assert url_observer == url_observer_2
+    patch_aiohttp_client_session()
+    assert litellm_ssl_context.sslobject_class is TimedSSLObject
+    assert ssl.create_default_context().sslobject_class is ssl.SSLObject
+    assert ssl.SSLContext.sslobject_class is ssl.SSLObject
 
-    assert url_observer.host == "127.0.0.1"
-    assert url_observer.port == 8000
-    assert url_observer.session is not None
+    unpatch_aiohttp_client_session()
+    assert litellm_ssl_context.sslobject_class is ssl.SSLObject
+    assert get_timed_ssl_context().sslobject_class is TimedSSLObject
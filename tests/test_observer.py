@@ -43,7 +43,7 @@ async def test_run_observation(
     base_endpoint_spec,
     file_io_context,
     with_patched_aiohttp_session,
-    url_observer,
+    observed_endpoint,
 ):
     await run_observation(
         base_endpoint_spec, superfast_observation_spec, file_io_context
@@ -67,7 +67,7 @@ async def test_run_observation_openai_missing_api_key(
     file_io_context,
     caplog,
     with_patched_aiohttp_session,
-    url_observer,
+    observed_endpoint,
 ):
     with caplog.at_level(logging.ERROR):
         await run_observation(
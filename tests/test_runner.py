@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import os.path
 import time
@@ -7,10 +8,15 @@ import numpy as np
 import pandas as pd
 import pytest
 
+from tokenflood.constants import WARMUP_GENERATION_TOKENS
 from tokenflood.messages import create_message_list_from_prompt
 from tokenflood.models.endpoint_spec import EndpointSpec
 from tokenflood.models.run_specs.load_test_spec import LoadTestPhase
+from tokenflood.models.data.error_data import ErrorContext
 from tokenflood.runner import (
+    NetworkLatencySampler,
+    apply_litellm_pool_options,
+    estimate_peak_concurrency,
     get_warm_session,
     make_empty_response,
     run_load_test_phase,
@@ -18,6 +24,7 @@ from tokenflood.runner import (
     send_llm_request,
 )
 from tokenflood.schedule import create_load_test_phase_schedule
+from tokenflood.token_arrivals import read_token_arrivals
 
 
 @pytest.mark.parametrize(
@@ -69,6 +76,119 @@ async def test_run_load_test_phase(
     assert len(df) == load_test_phase.total_num_requests
 
 
+@pytest.mark.parametrize(
+    "requests_per_second, latency_seconds, expected_result",
+    [(0, 1.0, 0), (1, 0.5, 1), (10, 2.0, 30), (50, 0.3, 23)],
+)
+def test_estimate_peak_concurrency(
+    requests_per_second, latency_seconds, expected_result
+):
+    assert estimate_peak_concurrency(requests_per_second, latency_seconds) == (
+        expected_result
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "update, requests_per_second, concurrency, expected_num_requests",
+    [
+        ({}, 0.0, 1, 1),
+        ({}, 0.0, 5, 1 + 5),
+        # 0.1s of latency at 100 requests per second with headroom
+        ({}, 100.0, 1, 1 + 15),
+        ({"pool_size": 4}, 100.0, 1, 1 + 4),
+    ],
+)
+async def test_get_warm_session_fills_pool(
+    base_endpoint_spec,
+    file_io_context,
+    update,
+    requests_per_second,
+    concurrency,
+    expected_num_requests,
+):
+    async def slow_warm_up(*args):
+        await asyncio.sleep(0.1)
+
+    endpoint_spec = base_endpoint_spec.model_copy(update=update)
+    with (
+        mock.patch(
+            "tokenflood.runner.warm_up_session", side_effect=slow_warm_up
+        ) as mocked_warm_up,
+        mock.patch("tokenflood.runner.apply_litellm_pool_options"),
+    ):
+        error = await get_warm_session(
+            endpoint_spec,
+            file_io_context,
+            requests_per_second=requests_per_second,
+            concurrency=concurrency,
+            num_generation_tokens=200,
+        )
+    assert error is None
+    # only the latency probe generates the run's output length
+    num_tokens = [call.args[2] for call in mocked_warm_up.call_args_list]
+    assert num_tokens[0] == 200
+    assert set(num_tokens[1:]) <= {WARMUP_GENERATION_TOKENS}
+    # the measured latency is a little above 0.1s
+    assert (
+        expected_num_requests
+        <= mocked_warm_up.call_count
+        <= (expected_num_requests + 1)
+    )
+
+
+def test_apply_litellm_pool_options(base_endpoint_spec, monkeypatch):
+    import litellm.llms.custom_httpx.http_handler as litellm_http_handler
+
+    for name in [
+        "AIOHTTP_CONNECTOR_LIMIT",
+        "AIOHTTP_CONNECTOR_LIMIT_PER_HOST",
+        "AIOHTTP_KEEPALIVE_TIMEOUT",
+    ]:
+        monkeypatch.setattr(litellm_http_handler, name, -1)
+    apply_litellm_pool_options(
+        base_endpoint_spec.model_copy(
+            update={"pool_size": 64, "keepalive_timeout": 30.5}
+        )
+    )
+    assert litellm_http_handler.AIOHTTP_CONNECTOR_LIMIT == 64
+    # options not given keep litellm's defaults
+    assert litellm_http_handler.AIOHTTP_CONNECTOR_LIMIT_PER_HOST == -1
+    assert litellm_http_handler.AIOHTTP_KEEPALIVE_TIMEOUT == 31
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("ping_method", ["tcp", "tls", "options"])
+async def test_network_latency_sampler(
+    base_endpoint_spec,
+    file_io_context,
+    with_patched_aiohttp_session,
+    observed_endpoint,
+    ping_method,
+):
+    file_io_context.activate()
+    await send_llm_request(base_endpoint_spec, create_message_list_from_prompt("hi"), 1)
+    endpoint_spec = base_endpoint_spec.model_copy(
+        update={"ping_method": ping_method, "pings_per_second": 10}
+    )
+    sampler = NetworkLatencySampler(
+        endpoint_spec,
+        file_io_context,
+        ErrorContext(requests_per_second_phase=1, group_id=3),
+    )
+    sampler.start()
+    await asyncio.sleep(0.35)
+    await sampler.stop()
+    assert not sampler.ping_tasks
+    await file_io_context.wait_for_pending_writes()
+    df = pd.read_csv(file_io_context.network_latency_sink.destination)
+    assert 3 <= len(df) <= 5
+    assert (df["method"] == ping_method).all()
+    assert (df["group_id"] == 3).all()
+    # the fake endpoint speaks plain http, so there is no handshake
+    assert (df["tls_handshake_latency"] == 0).all()
+
+
 @pytest.mark.asyncio
 async def test_run_entire_tiny_load_test(
     tiny_load_test_spec,
@@ -85,6 +205,57 @@ async def test_run_entire_tiny_load_test(
         ]
     )
     assert len(df) == total_num_requests
+    assert (df["concurrency"] >= 1).all()
+    assert (df["shard_concurrency"] == 0).all()
+
+
+@pytest.mark.asyncio
+async def test_run_entire_tiny_load_test_threaded_io(
+    tiny_load_test_spec,
+    base_endpoint_spec,
+    threaded_file_io_context,
+    with_patched_aiohttp_session,
+):
+    await run_load_test(
+        base_endpoint_spec, tiny_load_test_spec, threaded_file_io_context
+    )
+    df = pd.read_csv(threaded_file_io_context.llm_request_sink.destination)
+    assert len(df) == sum(
+        [
+            load_phase.total_num_requests
+            for load_phase in tiny_load_test_spec.create_load_test_phases()
+        ]
+    )
+
+
+@pytest.mark.asyncio
+async def test_run_entire_tiny_load_test_native_client(
+    tiny_load_test_spec,
+    native_endpoint_spec,
+    file_io_context,
+    with_patched_aiohttp_session,
+):
+    await run_load_test(native_endpoint_spec, tiny_load_test_spec, file_io_context)
+    df = pd.read_csv(file_io_context.llm_request_sink.destination)
+    total_num_requests = sum(
+        [
+            load_phase.total_num_requests
+            for load_phase in tiny_load_test_spec.create_load_test_phases()
+        ]
+    )
+    assert len(df) == total_num_requests
+    assert (df["measured_output_tokens"] > 0).all()
+    assert (df["inter_token_latency_p99"] >= df["inter_token_latency_p50"]).all()
+    token_arrivals = read_token_arrivals(
+        file_io_context.token_arrivals_sink.destination
+    )
+    assert len(token_arrivals) == total_num_requests
+    for (group_id, request_number), arrivals in token_arrivals.items():
+        assert (
+            len(arrivals) == tiny_load_test_spec.load_type.get_expected_output_length()
+        )
+    network_latency_df = pd.read_csv(file_io_context.network_latency_sink.destination)
+    assert len(network_latency_df) > 0
 
 
 @pytest.mark.asyncio
@@ -130,7 +301,12 @@ async def test_run_tiny_suite_bad_endpoint(
 @mock.patch("tokenflood.runner.warm_up_session")
 @pytest.mark.asyncio
 async def test_run_tiny_suite_bad_endpoint_but_fake_warmup(
-    mocked_warm_up, tiny_load_test_spec, base_endpoint_spec, file_io_context, caplog
+    mocked_warm_up,
+    tiny_load_test_spec,
+    base_endpoint_spec,
+    file_io_context,
+    observed_endpoint,
+    caplog,
 ):
     mocked_warm_up.return_value = make_empty_response()
     # creating endpoint spec with bad port number
@@ -139,10 +315,8 @@ async def test_run_tiny_suite_bad_endpoint_but_fake_warmup(
     )
     with caplog.at_level(logging.ERROR):
         await run_load_test(bad_endpoint_spec, tiny_load_test_spec, file_io_context)
-    assert len(caplog.messages) == 4
+    # without an observed url, no network latency is sampled
+    assert len(caplog.messages) == 3
     assert caplog.messages[0].endswith("[Connect call failed ('127.0.0.1', 8001)]")
-    assert caplog.messages[1].endswith(
-        "observed session, url or headers."
-    ) or caplog.messages[1].endswith("Session is closed")
-    assert caplog.messages[2].startswith("Aborting the phase")
-    assert caplog.messages[3].startswith("Ending the run because")
+    assert caplog.messages[1].startswith("Aborting the phase")
+    assert caplog.messages[2].startswith("Ending the run because")
@@ -0,0 +1,118 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from tokenflood.models.run_specs.latency_slo import LatencySLO
+from tokenflood.models.run_specs.saturation_search_spec import SaturationSearchSpec
+from tokenflood.saturation_search import (
+    ProbeTally,
+    SaturationBracket,
+    run_saturation_search,
+)
+
+
+@pytest.fixture
+def tiny_saturation_search_spec(tiny_load_test_spec) -> SaturationSearchSpec:
+    return SaturationSearchSpec(
+        name="ABC",
+        slo=LatencySLO(metric="latency", percentile=90, limit_ms=60_000),
+        seconds_per_probe=1,
+        start_requests_per_second=2,
+        max_probes=3,
+        load_type=tiny_load_test_spec.load_type,
+    )
+
+
+def run_bracket(capacity: float, max_probes: int = 30) -> SaturationBracket:
+    bracket = SaturationBracket(1.0, 2.0, 0.05, 0.1)
+    for _ in range(max_probes):
+        if bracket.rate is None:
+            break
+        bracket.record(bracket.rate, bracket.rate <= capacity)
+    return bracket
+
+
+@pytest.mark.parametrize("capacity", [0.3, 1.0, 5.0, 37.5, 100.0])
+def test_saturation_bracket_converges(capacity):
+    bracket = run_bracket(capacity)
+    assert bracket.rate is None
+    assert bracket.lower is not None and bracket.upper is not None
+    assert bracket.lower <= capacity < bracket.upper
+    assert bracket.upper - bracket.lower <= 0.05 * bracket.upper
+
+
+def test_saturation_bracket_gives_up_below_the_min_rate():
+    bracket = run_bracket(0.01)
+    assert bracket.rate is None
+    assert bracket.lower is None
+
+
+def test_saturation_bracket_grows_exponentially():
+    bracket = SaturationBracket(1.0, 3.0, 0.05, 0.1)
+    bracket.record(1.0, True)
+    assert bracket.rate == 3.0
+    bracket.record(3.0, True)
+    assert bracket.rate == 9.0
+    bracket.record(9.0, False)
+    assert bracket.rate == 6.0
+
+
+def test_probe_tally():
+    tally = ProbeTally(LatencySLO(metric="latency", percentile=50, limit_ms=100))
+    for latency in [10, 20, 30]:
+        tally.add_llm_request({"group_id": 0, "latency": latency})
+    tally.add_llm_request({"group_id": 1, "latency": 500})
+    tally.add_error({"group_id": 1})
+    probe = tally.evaluate(0, 1.0, False)
+    assert probe.passed
+    assert probe.metric_value == 20
+    assert probe.num_requests == 3
+    assert not tally.evaluate(0, 1.0, True).passed
+    probe = tally.evaluate(1, 2.0, False)
+    assert not probe.passed
+    assert probe.error_rate == 0.5
+    assert tally.evaluate(2, 4.0, False).metric_value is None
+
+
+@pytest.mark.asyncio
+async def test_run_saturation_search(
+    tiny_saturation_search_spec,
+    base_endpoint_spec,
+    file_io_context,
+    unique_temporary_folder,
+    with_patched_aiohttp_session,
+):
+    summary_file = os.path.join(unique_temporary_folder, "summary.json")
+    summary = await run_saturation_search(
+        base_endpoint_spec, tiny_saturation_search_spec, file_io_context, summary_file
+    )
+    assert summary is not None
+    # the fake endpoint meets the generous SLO at every rate
+    assert [p.requests_per_second for p in summary.probes] == [2.0, 4.0, 8.0]
+    assert summary.capacity_requests_per_second == 8.0
+    with open(summary_file) as f:
+        assert json.load(f)["capacity_requests_per_second"] == 8.0
+    df = pd.read_csv(file_io_context.llm_request_sink.destination)
+    assert sorted(set(df["group_id"])) == [0, 1, 2]
+    assert len(df) == 2 + 4 + 8
+
+
+@pytest.mark.asyncio
+async def test_run_saturation_search_unreachable_slo(
+    tiny_saturation_search_spec,
+    base_endpoint_spec,
+    file_io_context,
+    with_patched_aiohttp_session,
+):
+    search_spec = tiny_saturation_search_spec.model_copy(
+        update={"slo": LatencySLO(metric="latency", limit_ms=0.001)}
+    )
+    summary = await run_saturation_search(
+        base_endpoint_spec, search_spec, file_io_context
+    )
+    assert summary is not None
+    assert summary.capacity_requests_per_second is None
+    assert [p.requests_per_second for p in summary.probes] == [2.0, 1.0]
+    assert not any(p.passed for p in summary.probes)
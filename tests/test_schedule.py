@@ -1,6 +1,13 @@
+import numpy as np
 import pytest
 
-from tokenflood.schedule import burstiness_to_burstiness_control
+from tokenflood.models.run_specs.load_test_spec import LoadTestPhase
+from tokenflood.schedule import (
+    burstiness_to_burstiness_control,
+    create_load_test_phase_schedule,
+    create_load_test_phase_shards,
+    create_send_offsets,
+)
 
 
 @pytest.mark.parametrize(
@@ -21,3 +28,35 @@ from tokenflood.schedule import burstiness_to_burstiness_control
 )
 def test_burstiness_to_burstiness_control(burstiness, expected_control):
     assert burstiness_to_burstiness_control(burstiness) == expected_control
+
+
+@pytest.mark.parametrize(
+    "schedule, expected_offsets",
+    [
+        ([], []),
+        ([0.0], [0.0]),
+        ([0.5, 0.25, 0.0], [0.0, 0.5, 0.75]),
+        ([1.0, 1.0, 1.0, 0.0], [0.0, 1.0, 2.0, 3.0]),
+    ],
+)
+def test_create_send_offsets(schedule, expected_offsets):
+    assert np.allclose(create_send_offsets(schedule), expected_offsets)
+
+
+@pytest.mark.parametrize("num_shards", [1, 2, 3, 7])
+def test_create_load_test_phase_shards(num_shards):
+    load_phase = LoadTestPhase(requests_per_second=5, duration_seconds=4)
+    schedule = create_load_test_phase_schedule(load_phase, 1)
+    shards = create_load_test_phase_shards(2, load_phase, schedule, num_shards, 100.0)
+    assert len(shards) == num_shards
+    assert [shard.shard_idx for shard in shards] == list(range(num_shards))
+    assert all(shard.phase == 2 for shard in shards)
+    assert all(shard.start_time == 100.0 for shard in shards)
+    assert all(np.isclose(shard.end_offset, 4) for shard in shards)
+    request_numbers = sorted(n for shard in shards for n in shard.request_numbers)
+    assert request_numbers == list(range(len(schedule)))
+    offsets = create_send_offsets(schedule)
+    for shard in shards:
+        assert len(shard.send_offsets) == len(shard.request_numbers)
+        for request_number, offset in zip(shard.request_numbers, shard.send_offsets):
+            assert np.isclose(offsets[request_number], offset)
@@ -0,0 +1,130 @@
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+from tokenflood.constants import LLM_REQUESTS_FILE, NETWORK_LATENCY_FILE, SUMMARY_FILE
+from tokenflood.summaries import (
+    RunSummaryCollector,
+    format_group_summary,
+    compute_run_summary,
+    read_run_summary,
+    make_histogram,
+    summarize_histogram,
+    summarize_run_folder,
+)
+
+
+def make_llm_request(group_id: int, latency: float) -> dict:
+    return {
+        "datetime": f"2025-12-01_09-51-5{group_id}.000(UTC)",
+        "requests_per_second_phase": float(group_id + 1),
+        "concurrency": 1,
+        "group_id": group_id,
+        "latency": latency,
+        "time_to_first_token": latency / 2,
+        "decoding_latency": latency / 2,
+        "average_time_per_output_token": 1.0,
+        "inter_token_latency_p50": 1.0,
+        "inter_token_latency_p99": 2.0,
+        "max_stall": 3.0,
+        "dns_latency": 0.0,
+        "connect_latency": 0.0,
+        "tls_handshake_latency": 0.0,
+        "time_to_headers": latency / 4,
+    }
+
+
+def test_summarize_histogram():
+    summary = summarize_histogram(make_histogram([1.0, 2.0, 3.0, 4.0, 100.0]), (50, 90))
+    assert summary.count == 5
+    assert summary.mean == pytest.approx(22.0)
+    assert summary.percentiles == {
+        50: pytest.approx(3.0, rel=0.01),
+        90: pytest.approx(4.0, rel=0.01),
+    }
+    assert summary.histogram.count == 5
+
+
+def test_run_summary_collector():
+    collector = RunSummaryCollector(percentiles=(50,))
+    for latency in [100, 200, 300]:
+        collector.add_llm_request(make_llm_request(0, latency))
+    collector.add_network_latency({"group_id": 0, "latency": 10})
+    collector.add_error({"group_id": 1})
+    collector.add_throughput({"group_id": 1, "throughput": 2.5})
+
+    summary = collector.summarize(complete=False)
+    assert not summary.complete
+    assert [group.group_id for group in summary.groups] == [0, 1]
+    first, second = summary.groups
+    assert first.num_requests == 3
+    assert first.requests_per_second_phase == 1.0
+    assert first.metrics[LLM_REQUESTS_FILE]["latency"].percentiles == {
+        50: pytest.approx(200.0, rel=0.01)
+    }
+    assert first.metrics[NETWORK_LATENCY_FILE]["latency"].mean == 10.0
+    assert first.throughput is None
+    assert second.num_errors == 1
+    assert second.throughput == 2.5
+    assert second.datetime is None
+    assert second.metrics[LLM_REQUESTS_FILE] == {}
+
+    # only changed groups are summarized again, written summaries stay as they are
+    collector.add_llm_request(make_llm_request(1, 50))
+    summary = collector.summarize(complete=True)
+    assert summary.complete
+    assert summary.groups[0] is first
+    assert summary.groups[1].num_requests == 1
+    collector.add_llm_request(make_llm_request(0, 400))
+    assert first.metrics[LLM_REQUESTS_FILE]["latency"].count == 3
+    assert collector.summarize(complete=True).groups[0].num_requests == 4
+
+
+def test_summarize_run_folder(load_test_results_folder):
+    summary = summarize_run_folder(load_test_results_folder, (50, 99))
+    df = pd.read_csv(os.path.join(load_test_results_folder, LLM_REQUESTS_FILE))
+    groups = df.groupby("group_id")
+    assert [group.group_id for group in summary.groups] == list(groups.groups)
+    for group in summary.groups:
+        latencies = groups.get_group(group.group_id)["latency"]
+        latency_summary = group.metrics[LLM_REQUESTS_FILE]["latency"]
+        assert latency_summary.count == len(latencies)
+        assert latency_summary.mean == pytest.approx(latencies.mean())
+        assert latency_summary.percentiles[99] == pytest.approx(
+            latencies.quantile(0.99, interpolation="lower"), rel=0.01
+        )
+        # fields the old results files do not have are left out
+        assert "max_stall" not in group.metrics[LLM_REQUESTS_FILE]
+        assert "latency" in group.metrics[NETWORK_LATENCY_FILE]
+
+
+def test_compute_run_summary(load_test_results_folder, unique_temporary_folder):
+    run_folder = os.path.join(unique_temporary_folder, "run")
+    shutil.copytree(load_test_results_folder, run_folder)
+    summary_file = os.path.join(run_folder, SUMMARY_FILE)
+    # without a written summary, the raw results are summarized
+    written_summary = compute_run_summary(run_folder)
+    assert written_summary == summarize_run_folder(run_folder)
+    with open(summary_file, "w") as f:
+        f.write(written_summary.model_copy(update={"groups": ()}).model_dump_json())
+
+    assert read_run_summary(summary_file).groups == ()
+    assert compute_run_summary(run_folder).groups == ()
+
+
+def test_format_group_summary():
+    collector = RunSummaryCollector(percentiles=(50,))
+    collector.add_llm_request(make_llm_request(0, 100))
+    group = collector.summarize(complete=True).groups[0]
+    assert format_group_summary(group, LLM_REQUESTS_FILE, "latency", (50, 99)) == (
+        "group 0: 1 requests, 0 errors, 1.00 requests/s, concurrency 1, "
+        "latency: mean 100.0, p50 100.0, p99 100.0"
+    )
+    collector.add_throughput({"group_id": 0, "throughput": 3.0})
+    group = collector.summarize(complete=True).groups[0]
+    assert format_group_summary(group, LLM_REQUESTS_FILE, "latency", ()) == (
+        "group 0: 1 requests, 0 errors, 1.00 requests/s, concurrency 1, "
+        "throughput 3.00 requests/s, latency: mean 100.0"
+    )
@@ -0,0 +1,74 @@
+import os
+
+import pytest
+
+from tokenflood import text_blobs
+from tokenflood.text_blobs import (
+    RECORD_HEADER,
+    TextBlobReader,
+    TextBlobStore,
+    encode_text_blob,
+    get_text_hash,
+    read_text_blob_index,
+)
+
+
+@pytest.mark.parametrize("compression", ["none", "gzip"])
+def test_text_blob_store_roundtrip(compression, unique_temporary_file):
+    texts = ["A" * 10_000, "Hello world", "A" * 10_000, "", "ÄÖÜ 😀"]
+    records = []
+    store = TextBlobStore(lambda encode: records.append(encode()), compression)
+    hashes = [store.put(text) for text in texts]
+    with open(unique_temporary_file, "wb") as f:
+        f.write(b"".join(records))
+
+    # duplicates and empty texts are not stored again
+    assert len(records) == 3
+    assert hashes[0] == hashes[2] == get_text_hash(texts[0])
+    assert hashes[3] == ""
+    reader = TextBlobReader(unique_temporary_file)
+    assert [reader.get(text_hash) for text_hash in hashes] == texts
+
+
+def test_text_blob_store_encodes_new_texts_only(monkeypatch):
+    compressed = []
+
+    def record_compression(data: bytes, compression: str) -> bytes:
+        compressed.append(data)
+        return data
+
+    monkeypatch.setattr(text_blobs, "compress", record_compression)
+    pending = []
+    store = TextBlobStore(pending.append, "gzip")
+    for text in ["first", "first", "second", "first"]:
+        store.put(text)
+    # encoding is left to whoever writes the records
+    assert compressed == []
+    for encode in pending:
+        encode()
+    assert compressed == [b"first", b"second"]
+
+
+def test_gzip_compresses_repetitive_text():
+    _, record = encode_text_blob("A" * 10_000, "gzip")
+    assert len(record) < RECORD_HEADER.size + 1_000
+
+
+def test_unknown_compression():
+    with pytest.raises(ValueError):
+        TextBlobStore(lambda encode: None, "brotli")
+
+
+def test_read_text_blob_index_skips_partial_records(unique_temporary_folder):
+    path = os.path.join(unique_temporary_folder, "texts.blobs")
+    first_hash, first_record = encode_text_blob("first", "none")
+    second_hash, second_record = encode_text_blob("second", "none")
+    with open(path, "wb") as f:
+        f.write(first_record + second_record[:-2])
+
+    index = read_text_blob_index(path)
+    assert list(index) == [first_hash]
+
+    with open(path, "ab") as f:
+        f.write(second_record[-2:])
+    assert TextBlobReader(path).get(second_hash) == "second"
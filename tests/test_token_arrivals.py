@@ -0,0 +1,54 @@
+import os
+
+import numpy as np
+import pytest
+
+from tokenflood.models.data.token_arrival_data import TokenArrivalData
+from tokenflood.token_arrivals import (
+    RECORD_HEADER,
+    calculate_inter_token_latencies,
+    decode_token_arrivals,
+    encode_token_arrivals,
+    read_token_arrivals,
+)
+
+
+@pytest.mark.parametrize(
+    "arrivals",
+    [(), (5,), (1000, 1500, 2500, 2501), tuple(range(0, 10_000_000, 12345))],
+)
+def test_encode_decode_token_arrivals(arrivals):
+    data = TokenArrivalData(group_id=-1, request_number=7, arrivals=arrivals)
+    encoded = encode_token_arrivals(data)
+    assert len(encoded) == RECORD_HEADER.size + 4 * len(arrivals)
+    assert list(decode_token_arrivals(encoded)) == [data]
+
+
+def test_read_token_arrivals(unique_temporary_folder):
+    records = [
+        TokenArrivalData(group_id=0, request_number=0, arrivals=(10, 20, 30)),
+        TokenArrivalData(group_id=0, request_number=1, arrivals=()),
+        TokenArrivalData(group_id=1, request_number=0, arrivals=(100, 200_000)),
+    ]
+    path = os.path.join(unique_temporary_folder, "token_arrivals.bin")
+    with open(path, "wb") as f:
+        for record in records:
+            f.write(encode_token_arrivals(record))
+    assert read_token_arrivals(path) == {
+        (0, 0): (10, 20, 30),
+        (0, 1): (),
+        (1, 0): (100, 200_000),
+    }
+
+
+@pytest.mark.parametrize(
+    "arrivals, expected_result",
+    [
+        ((), (0.0, 0.0, 0.0)),
+        ((1000,), (0.0, 0.0, 0.0)),
+        ((1000, 2000, 3000), (1.0, 1.0, 1.0)),
+        ((0, 1000, 2000, 3000, 103_000), (1.0, 97.03, 100.0)),
+    ],
+)
+def test_calculate_inter_token_latencies(arrivals, expected_result):
+    assert np.allclose(calculate_inter_token_latencies(arrivals), expected_result)
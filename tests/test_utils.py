@@ -12,6 +12,7 @@ from tokenflood.util import (
     find_idx,
     get_date_str,
     get_run_name,
+    shift_exact_date_str,
 )
 
 
@@ -90,3 +91,15 @@ async def test_tasking():
 
     await asyncio.wait([task])
     print("done")
+
+
+@pytest.mark.parametrize(
+    "date_str, seconds, expected_result",
+    [
+        ("2025-01-01_12-00-00.000(UTC)", 0, "2025-01-01_12-00-00.000(UTC)"),
+        ("2025-01-01_12-00-00.000(UTC)", 1.5, "2025-01-01_12-00-01.500(UTC)"),
+        ("2025-01-01_00-00-00.250(UTC)", -0.5, "2024-12-31_23-59-59.750(UTC)"),
+    ],
+)
+def test_shift_exact_date_str(date_str, seconds, expected_result):
+    assert shift_exact_date_str(date_str, seconds) == expected_result
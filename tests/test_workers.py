@@ -0,0 +1,71 @@
+import time
+
+import pandas as pd
+import pytest
+
+from tokenflood.io import ForwardingIOContext
+from tokenflood.schedule import (
+    create_load_test_phase_schedule,
+    create_load_test_phase_shards,
+)
+from tokenflood.workers import run_load_test_with_workers, run_shard
+
+
+@pytest.mark.asyncio
+async def test_run_entire_tiny_load_test_with_workers(
+    tiny_load_test_spec,
+    base_endpoint_spec,
+    file_io_context,
+):
+    await run_load_test_with_workers(
+        base_endpoint_spec, tiny_load_test_spec, file_io_context, 2
+    )
+    df = pd.read_csv(file_io_context.llm_request_sink.destination)
+    total_num_requests = sum(
+        [
+            load_phase.total_num_requests
+            for load_phase in tiny_load_test_spec.create_load_test_phases()
+        ]
+    )
+    assert len(df) == total_num_requests
+    assert sorted(df["request_number"]) == sorted(
+        n
+        for load_phase in tiny_load_test_spec.create_load_test_phases()
+        for n in range(load_phase.total_num_requests)
+    )
+    # no worker sees the requests in flight of the others
+    assert (df["concurrency"] == 0).all()
+    assert (df["shard_concurrency"] >= 1).all()
+    network_latency_df = pd.read_csv(file_io_context.network_latency_sink.destination)
+    assert len(network_latency_df) > 0
+
+
+@pytest.mark.asyncio
+async def test_run_shard_waits_for_capacity_before_every_send(
+    tiny_load_test_spec, base_endpoint_spec
+):
+    waits = []
+
+    async def wait_for_capacity():
+        waits.append(True)
+
+    io_context = ForwardingIOContext(
+        lambda record_type, data: None,
+        lambda: 0.0,
+        wait_for_capacity,
+    )
+    load_phase = tiny_load_test_spec.create_load_test_phases()[0]
+    schedule = create_load_test_phase_schedule(
+        load_phase, tiny_load_test_spec.burstiness
+    )
+    shard = create_load_test_phase_shards(0, load_phase, schedule, 1, time.time())[0]
+
+    result = await run_shard(
+        base_endpoint_spec,
+        tiny_load_test_spec,
+        shard,
+        io_context,
+        time.monotonic(),
+    )
+
+    assert len(waits) == result["num_sent"] == len(schedule)
@@ -0,0 +1,80 @@
+import os
+
+import pandas as pd
+
+from tokenflood.columnar import (
+    CHUNK_HEADER,
+    encode_chunk,
+    encode_manifest,
+    read_columnar,
+)
+from tokenflood.visualization_frontend.columnar_tail import ColumnarTailReader
+
+DTYPES = {"group_id": "<i8", "model": "str", "text": "str"}
+
+
+def make_rows(start: int, end: int):
+    return [
+        {"group_id": i, "model": f"m{i % 2}", "text": f"text {i}"}
+        for i in range(start, end)
+    ]
+
+
+def append(path: str, data: bytes):
+    with open(path, "ab") as f:
+        f.write(data)
+
+
+def test_columnar_tail_reader(unique_temporary_file):
+    with open(unique_temporary_file, "wb") as f:
+        f.write(encode_manifest(DTYPES))
+    reader = ColumnarTailReader(
+        unique_temporary_file,
+        ("group_id", "model"),
+        {"group_id": "int32", "model": "category"},
+    )
+    assert len(reader.read()) == 0
+
+    append(unique_temporary_file, encode_chunk(make_rows(0, 2), DTYPES))
+    assert reader.read()["group_id"].tolist() == [0, 1]
+    offset = reader.offset
+
+    # nothing new
+    assert reader.read()["group_id"].tolist() == [0, 1]
+    assert reader.offset == offset
+
+    # a chunk that is still being written is left for later
+    chunk = encode_chunk(make_rows(2, 4), DTYPES)
+    append(unique_temporary_file, chunk[: CHUNK_HEADER.size + 5])
+    assert reader.read()["group_id"].tolist() == [0, 1]
+    assert reader.offset == offset
+    append(unique_temporary_file, chunk[CHUNK_HEADER.size + 5 :])
+    append(unique_temporary_file, encode_chunk(make_rows(4, 6), DTYPES))
+
+    df = reader.read()
+    expected = read_columnar(unique_temporary_file, ("group_id", "model")).astype(
+        {"group_id": "int32", "model": "category"}
+    )
+    pd.testing.assert_frame_equal(df, expected)
+    assert list(df.columns) == ["group_id", "model"]
+    assert df["model"].dtype == "category"
+    assert reader.offset == os.path.getsize(unique_temporary_file)
+
+
+def test_columnar_tail_reader_rereads_shrunk_and_replaced_files(
+    unique_temporary_file,
+):
+    with open(unique_temporary_file, "wb") as f:
+        f.write(encode_manifest(DTYPES) + encode_chunk(make_rows(0, 3), DTYPES))
+    reader = ColumnarTailReader(unique_temporary_file)
+    assert len(reader.read()) == 3
+
+    with open(unique_temporary_file, "wb") as f:
+        f.write(encode_manifest(DTYPES) + encode_chunk(make_rows(0, 1), DTYPES))
+    assert reader.read()["group_id"].tolist() == [0]
+
+    replacement = unique_temporary_file + ".new"
+    with open(replacement, "wb") as f:
+        f.write(encode_manifest(DTYPES) + encode_chunk(make_rows(1, 5), DTYPES))
+    os.replace(replacement, unique_temporary_file)
+    assert reader.read()["group_id"].tolist() == [1, 2, 3, 4]
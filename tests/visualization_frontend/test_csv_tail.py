@@ -0,0 +1,82 @@
+import csv
+import os
+
+import pandas as pd
+import pytest
+
+from tokenflood.visualization_frontend.csv_tail import (
+    CSVTailReader,
+    find_last_record_end,
+)
+
+
+@pytest.mark.parametrize(
+    "data, expected_end",
+    [
+        (b"", 0),
+        (b"a,b", 0),
+        (b"a,b\r\n", 5),
+        (b"a,b\r\n1,2", 5),
+        (b'a,b\r\n1,"x\ny"\r\n', 14),
+        (b'a,b\r\n1,"x\ny', 5),
+        (b'a,b\r\n1,"x\n""y""\n', 5),
+    ],
+)
+def test_find_last_record_end(data, expected_end):
+    assert find_last_record_end(data) == expected_end
+
+
+def write_rows(path: str, rows, header: bool = False, mode: str = "a"):
+    with open(path, mode, newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["group_id", "model", "text"])
+        if header:
+            writer.writeheader()
+        writer.writerows(rows)
+
+
+def test_csv_tail_reader(unique_temporary_file):
+    rows = [
+        {"group_id": i, "model": f"m{i % 2}", "text": f"a\nb {i}"} for i in range(6)
+    ]
+    write_rows(unique_temporary_file, rows[:2], header=True, mode="w")
+    reader = CSVTailReader(
+        unique_temporary_file, dtype={"group_id": "int32", "model": "category"}
+    )
+    assert reader.read()["group_id"].tolist() == [0, 1]
+    offset = reader.offset
+
+    # nothing new
+    assert reader.read()["group_id"].tolist() == [0, 1]
+    assert reader.offset == offset
+
+    # a record that is still being written is left for later
+    write_rows(unique_temporary_file, rows[2:3])
+    with open(unique_temporary_file, "a") as f:
+        f.write('3,m1,"a\nb')
+    assert reader.read()["group_id"].tolist() == [0, 1, 2]
+    with open(unique_temporary_file, "a") as f:
+        f.write(' 3"\r\n')
+    write_rows(unique_temporary_file, rows[4:])
+
+    df = reader.read()
+    expected = pd.read_csv(
+        unique_temporary_file, dtype={"group_id": "int32", "model": "category"}
+    )
+    pd.testing.assert_frame_equal(df, expected)
+    assert df["model"].dtype == "category"
+    assert reader.offset == os.path.getsize(unique_temporary_file)
+
+
+def test_csv_tail_reader_rereads_shrunk_and_replaced_files(unique_temporary_file):
+    rows = [{"group_id": i, "model": "m", "text": "t"} for i in range(3)]
+    write_rows(unique_temporary_file, rows, header=True, mode="w")
+    reader = CSVTailReader(unique_temporary_file)
+    assert len(reader.read()) == 3
+
+    write_rows(unique_temporary_file, rows[:1], header=True, mode="w")
+    assert reader.read()["group_id"].tolist() == [0]
+
+    replacement = unique_temporary_file + ".new"
+    write_rows(replacement, rows[1:] * 2, header=True, mode="w")
+    os.replace(replacement, unique_temporary_file)
+    assert reader.read()["group_id"].tolist() == [1, 2, 1, 2]
@@ -0,0 +1,168 @@
+import os
+
+import pandas as pd
+import pytest
+
+from tokenflood.constants import (
+    LLM_REQUESTS_FILE,
+    NETWORK_LATENCY_FILE,
+    SUMMARY_FILE,
+    SUMMARY_METRIC_FIELDS,
+)
+from tokenflood.summaries import RunSummaryCollector
+from tokenflood.visualization_frontend.aggregation_func import AggregationFunc
+from tokenflood.visualization_frontend.data import (
+    aggregate_data,
+    aggregate_group_values,
+    get_load_group_label,
+)
+from tokenflood.visualization_frontend.metrics import (
+    MaxStall,
+    NetworkLatency,
+    RequestLatency,
+    TLSHandshakeLatency,
+    Throughput,
+)
+from tokenflood.visualization_frontend.percentiles import (
+    percentiles_to_aggregation_funcs,
+)
+
+
+def test_aggregate_data_skips_missing_metric(unique_temporary_folder):
+    pd.DataFrame(
+        {
+            "group_id": [0, 0, 1],
+            "requests_per_second_phase": [1.0, 1.0, 2.0],
+            "latency": [100, 200, 300],
+        }
+    ).to_csv(os.path.join(unique_temporary_folder, LLM_REQUESTS_FILE), index=False)
+
+    def aggregation_funcs(field: str):
+        return (
+            AggregationFunc(
+                get_load_group_label, "label", 100, "requests_per_second_phase"
+            ),
+            AggregationFunc(lambda x: x.mean(), "mean", 49.5, field),
+        )
+
+    traces = aggregate_data(
+        unique_temporary_folder,
+        RequestLatency,
+        aggregation_funcs(RequestLatency.field_name),
+    )
+    assert len(traces) == 1
+    assert traces[0].y == [150, 300]
+    assert (
+        aggregate_data(
+            unique_temporary_folder, MaxStall, aggregation_funcs(MaxStall.field_name)
+        )
+        == []
+    )
+
+
+def test_aggregate_data_prefers_summaries(unique_temporary_folder):
+    pd.DataFrame(
+        {
+            "group_id": [0, 0, 1],
+            "requests_per_second_phase": [1.0, 1.0, 2.0],
+            "latency": [100, 200, 300],
+        }
+    ).to_csv(os.path.join(unique_temporary_folder, LLM_REQUESTS_FILE), index=False)
+    collector = RunSummaryCollector(percentiles=(50,))
+    for group_id, latency in [(0, 1000), (1, 3000)]:
+        collector.add_llm_request(
+            {
+                **{
+                    field: latency for field in SUMMARY_METRIC_FIELDS[LLM_REQUESTS_FILE]
+                },
+                "group_id": group_id,
+                "datetime": "now",
+                "requests_per_second_phase": float(group_id + 1),
+                "concurrency": 1,
+            }
+        )
+    with open(os.path.join(unique_temporary_folder, SUMMARY_FILE), "w") as f:
+        f.write(collector.summarize(complete=True).model_dump_json())
+
+    label = AggregationFunc(
+        get_load_group_label, "label", 100, "requests_per_second_phase"
+    )
+    mean = AggregationFunc(lambda x: x.mean(), "mean", 49.5, "latency")
+    traces = aggregate_data(
+        unique_temporary_folder,
+        RequestLatency,
+        (label, mean, *percentiles_to_aggregation_funcs("50", RequestLatency)),
+    )
+    assert [trace.aggregation_name for trace in traces] == ["mean", "p50"]
+    assert traces[0].x == [1.0, 2.0]
+    assert traces[0].y == [1000, 3000]
+    assert traces[1].y == [pytest.approx(1000, rel=0.01), pytest.approx(3000, rel=0.01)]
+
+    # other percentiles come from the histograms
+    traces = aggregate_data(
+        unique_temporary_folder,
+        RequestLatency,
+        (label, mean, *percentiles_to_aggregation_funcs("37", RequestLatency)),
+    )
+    assert traces[1].y == [pytest.approx(1000, rel=0.01), pytest.approx(3000, rel=0.01)]
+
+    # other aggregations come from the raw data
+    maximum = AggregationFunc(lambda x: x.max(), "max", 100, "latency")
+    traces = aggregate_data(
+        unique_temporary_folder, RequestLatency, (label, mean, maximum)
+    )
+    assert traces[0].y == [150, 300]
+
+
+def test_aggregate_data_labels_network_latency_of_concurrency_tests(
+    unique_temporary_folder,
+):
+    # a live concurrency test, without a summary file yet
+    pd.DataFrame(
+        {
+            "group_id": [0, 0, 1],
+            "concurrency": [2, 2, 4],
+            "latency": [100, 200, 300],
+        }
+    ).to_csv(os.path.join(unique_temporary_folder, LLM_REQUESTS_FILE), index=False)
+    pd.DataFrame(
+        {
+            "group_id": [0, 1, 1, 2],
+            "latency": [10, 20, 40, 50],
+            "tls_handshake_latency": [1, 2, 4, 5],
+        }
+    ).to_csv(os.path.join(unique_temporary_folder, NETWORK_LATENCY_FILE), index=False)
+
+    label = AggregationFunc(get_load_group_label, "label", 100, "concurrency")
+    for metric, expected in [(NetworkLatency, [10, 30]), (TLSHandshakeLatency, [1, 3])]:
+        mean = AggregationFunc(lambda x: x.mean(), "mean", 49.5, metric.field_name)
+        traces = aggregate_data(unique_temporary_folder, metric, (label, mean))
+        # the group without llm requests yet has no label
+        assert traces[0].x == [2, 4]
+        assert traces[0].y == expected
+
+
+def test_aggregate_group_values(unique_temporary_folder):
+    label = AggregationFunc(get_load_group_label, "label", 100, "concurrency")
+    assert aggregate_group_values(unique_temporary_folder, Throughput, label) == []
+
+    collector = RunSummaryCollector()
+    for group_id in [0, 1, 2]:
+        collector.add_llm_request(
+            {
+                **{field: 100 for field in SUMMARY_METRIC_FIELDS[LLM_REQUESTS_FILE]},
+                "group_id": group_id,
+                "datetime": "now",
+                "requests_per_second_phase": 0.0,
+                "concurrency": 2**group_id,
+            }
+        )
+    # the last phase is still running
+    for group_id, throughput in [(0, 1.5), (1, 2.5)]:
+        collector.add_throughput({"group_id": group_id, "throughput": throughput})
+    with open(os.path.join(unique_temporary_folder, SUMMARY_FILE), "w") as f:
+        f.write(collector.summarize(complete=False).model_dump_json())
+
+    [trace] = aggregate_group_values(unique_temporary_folder, Throughput, label)
+    assert trace.x == [1, 2]
+    assert trace.y == [1.5, 2.5]
@@ -0,0 +1,168 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tokenflood.catalog import ResultsCatalog, get_catalog_file
+from tokenflood.columnar import (
+    convert_csv_to_columnar,
+    encode_chunk,
+    encode_manifest,
+    get_columnar_file,
+)
+from tokenflood.constants import (
+    COMMON_RESULT_FILES,
+    LLM_REQUESTS_FILE,
+    LOAD_TEST_SPEC_FILE,
+    OBSERVATION_SPEC_FILE,
+    SATURATION_SEARCH_SPEC_FILE,
+    TEXT_BLOBS_FILE,
+)
+from tokenflood.summaries import RunSummaryCollector
+from tokenflood.text_blobs import TextBlobStore
+from tokenflood.visualization_frontend.io import (
+    get_load_test_runs,
+    get_observation_runs,
+    find_run_summary,
+    read_dataframe,
+    resolve_texts,
+)
+from tests.test_catalog import make_entry
+from tests.test_summaries import make_llm_request
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_read_dataframe_columns(unique_temporary_folder, columnar):
+    csv_file = os.path.join(unique_temporary_folder, LLM_REQUESTS_FILE)
+    pd.DataFrame(
+        {
+            "group_id": [0, 1],
+            "model": ["a", "a"],
+            "requests_per_second_phase": [1.5, 2.0],
+            "latency": [100, 200],
+            "prompt": ["long prompt", "another long prompt"],
+        }
+    ).to_csv(csv_file, index=False)
+    if columnar:
+        convert_csv_to_columnar(csv_file)
+
+    df = read_dataframe(
+        unique_temporary_folder,
+        LLM_REQUESTS_FILE,
+        columns=(
+            "group_id",
+            "latency",
+            "model",
+            "requests_per_second_phase",
+            "max_stall",
+        ),
+    )
+
+    assert sorted(df.columns) == [
+        "group_id",
+        "latency",
+        "model",
+        "requests_per_second_phase",
+    ]
+    assert df["latency"].dtype == np.int32
+    assert df["group_id"].dtype == np.int32
+    assert df["requests_per_second_phase"].dtype == np.float32
+    assert df["model"].dtype == "category"
+    assert df["latency"].tolist() == [100, 200]
+    full_df = read_dataframe(unique_temporary_folder, LLM_REQUESTS_FILE)
+    assert "prompt" in full_df.columns
+    assert full_df["latency"].dtype == np.int64
+
+
+def test_resolve_texts(unique_temporary_folder):
+    records = []
+    store = TextBlobStore(lambda encode: records.append(encode()), "gzip")
+    df = pd.DataFrame(
+        {
+            "latency": [10, 20],
+            "prompt": [store.put("prompt 1"), store.put("prompt 2")],
+            "generated_text": [store.put("answer"), float("nan")],
+            "generated_reasoning": [float("nan"), "0" * 32],
+        }
+    )
+    with open(os.path.join(unique_temporary_folder, TEXT_BLOBS_FILE), "wb") as f:
+        f.write(b"".join(records))
+
+    resolved = resolve_texts(unique_temporary_folder, df)
+
+    assert resolved["prompt"].tolist() == ["prompt 1", "prompt 2"]
+    assert resolved["generated_text"].tolist() == ["answer", ""]
+    # unknown hashes stay as they are
+    assert resolved["generated_reasoning"].tolist() == ["", "0" * 32]
+    assert df["prompt"].tolist() != resolved["prompt"].tolist()
+
+
+def test_resolve_texts_without_blob_file(unique_temporary_folder):
+    df = pd.DataFrame({"prompt": ["full prompt"]})
+    assert resolve_texts(unique_temporary_folder, df) is df
+
+
+def test_read_dataframe_of_growing_csv(unique_temporary_folder):
+    csv_file = os.path.join(unique_temporary_folder, LLM_REQUESTS_FILE)
+    with open(csv_file, "w") as f:
+        f.write("group_id,latency\n0,100\n")
+    assert read_dataframe(unique_temporary_folder, LLM_REQUESTS_FILE)[
+        "latency"
+    ].tolist() == [100]
+    with open(csv_file, "a") as f:
+        f.write("1,200\n1,3")
+    df = read_dataframe(unique_temporary_folder, LLM_REQUESTS_FILE)
+    assert df["latency"].tolist() == [100, 200]
+
+
+def test_read_dataframe_of_growing_columnar_file(unique_temporary_folder):
+    dtypes = {"group_id": "<i8", "latency": "<i8", "prompt": "str"}
+    columnar_file = get_columnar_file(
+        os.path.join(unique_temporary_folder, LLM_REQUESTS_FILE)
+    )
+    with open(columnar_file, "wb") as f:
+        f.write(encode_manifest(dtypes))
+        f.write(encode_chunk([{"group_id": 0, "latency": 100, "prompt": "a"}], dtypes))
+    columns = ("group_id", "latency")
+    assert read_dataframe(unique_temporary_folder, LLM_REQUESTS_FILE, columns)[
+        "latency"
+    ].tolist() == [100]
+    chunk = encode_chunk(
+        [{"group_id": 1, "latency": 200 + i, "prompt": "b"} for i in range(2)], dtypes
+    )
+    with open(columnar_file, "ab") as f:
+        f.write(chunk[:-1])
+    df = read_dataframe(unique_temporary_folder, LLM_REQUESTS_FILE, columns)
+    assert df["latency"].tolist() == [100]
+    with open(columnar_file, "ab") as f:
+        f.write(chunk[-1:])
+    df = read_dataframe(unique_temporary_folder, LLM_REQUESTS_FILE, columns)
+    assert df["latency"].tolist() == [100, 200, 201]
+    assert df["latency"].dtype == np.int32
+
+
+def test_get_runs_from_catalog(unique_temporary_folder):
+    uncatalogued_run = os.path.join(unique_temporary_folder, "run_d")
+    os.makedirs(uncatalogued_run)
+    for filename in COMMON_RESULT_FILES | {LOAD_TEST_SPEC_FILE}:
+        open(os.path.join(uncatalogued_run, filename), "w").close()
+    for run in ["run_a", "run_b", "run_c"]:
+        os.makedirs(os.path.join(unique_temporary_folder, run))
+    assert get_load_test_runs(unique_temporary_folder) == ["run_d"]
+
+    catalog = ResultsCatalog(get_catalog_file(unique_temporary_folder))
+    collector = RunSummaryCollector()
+    collector.add_llm_request(make_llm_request(0, 100))
+    summary = collector.summarize(complete=True)
+    catalog.update_run(make_entry("run_a", SATURATION_SEARCH_SPEC_FILE), summary)
+    catalog.update_run(make_entry("run_b", OBSERVATION_SPEC_FILE))
+    # the folder of a catalogued run was removed
+    catalog.update_run(make_entry("run_e"))
+    catalog.close()
+
+    # the catalog is trusted over the result files of its runs
+    assert get_load_test_runs(unique_temporary_folder) == ["run_d", "run_a"]
+    assert get_observation_runs(unique_temporary_folder) == ["run_b"]
+    assert find_run_summary(os.path.join(unique_temporary_folder, "run_a")) == summary
+    assert find_run_summary(os.path.join(unique_temporary_folder, "run_d")) is None
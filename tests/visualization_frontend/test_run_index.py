@@ -0,0 +1,83 @@
+import os
+import shutil
+
+from tokenflood.constants import (
+    COMMON_RESULT_FILES,
+    LOAD_TEST_SPEC_FILE,
+    OBSERVATION_SPEC_FILE,
+)
+from tokenflood.io import find_run_spec_file_name
+from tokenflood.visualization_frontend.run_index import RunIndex
+
+
+def set_mtime(path: str, seconds: int):
+    os.utime(path, ns=(seconds * 1_000_000_000, seconds * 1_000_000_000))
+
+
+def add_run_files(run_folder: str, run_spec_file: str, mtime: int):
+    os.makedirs(run_folder, exist_ok=True)
+    for filename in COMMON_RESULT_FILES | {run_spec_file}:
+        open(os.path.join(run_folder, filename), "w").close()
+    set_mtime(run_folder, mtime)
+
+
+def test_run_index(unique_temporary_folder, monkeypatch):
+    validated = []
+
+    def find_and_record(path: str):
+        validated.append(os.path.basename(path))
+        return find_run_spec_file_name(path)
+
+    monkeypatch.setattr(
+        "tokenflood.visualization_frontend.run_index.find_run_spec_file_name",
+        find_and_record,
+    )
+    folder = unique_temporary_folder
+    add_run_files(os.path.join(folder, "run_a"), LOAD_TEST_SPEC_FILE, 1000)
+    add_run_files(os.path.join(folder, "run_b"), OBSERVATION_SPEC_FILE, 1000)
+    os.makedirs(os.path.join(folder, "run_c"))
+    set_mtime(os.path.join(folder, "run_c"), 1000)
+    set_mtime(folder, 1000)
+
+    run_index = RunIndex(folder, lambda _: {})
+    run_index.refresh()
+    assert run_index.get_runs() == ["run_b", "run_a"]
+    assert run_index.get_runs(frozenset({LOAD_TEST_SPEC_FILE})) == ["run_a"]
+    assert sorted(validated) == ["run_a", "run_b", "run_c"]
+
+    # nothing changed, nothing is validated again
+    validated.clear()
+    run_index.refresh()
+    assert validated == []
+
+    # a folder that was no run yet becomes one
+    add_run_files(os.path.join(folder, "run_c"), LOAD_TEST_SPEC_FILE, 2000)
+    run_index.refresh()
+    assert validated == ["run_c"]
+    assert run_index.get_runs(frozenset({LOAD_TEST_SPEC_FILE})) == ["run_c", "run_a"]
+
+    # a run is added and another one removed
+    validated.clear()
+    shutil.rmtree(os.path.join(folder, "run_b"))
+    add_run_files(os.path.join(folder, "run_d"), LOAD_TEST_SPEC_FILE, 3000)
+    set_mtime(folder, 3000)
+    run_index.refresh()
+    assert validated == ["run_d"]
+    assert run_index.get_runs() == ["run_d", "run_c", "run_a"]
+
+
+def test_run_index_prefers_catalog(unique_temporary_folder):
+    add_run_files(
+        os.path.join(unique_temporary_folder, "run"), LOAD_TEST_SPEC_FILE, 1000
+    )
+    run_index = RunIndex(
+        unique_temporary_folder, lambda _: {"run": OBSERVATION_SPEC_FILE}
+    )
+    run_index.refresh()
+    assert run_index.get_runs(frozenset({OBSERVATION_SPEC_FILE})) == ["run"]
+
+
+def test_run_index_of_missing_folder(unique_temporary_folder):
+    run_index = RunIndex(os.path.join(unique_temporary_folder, "missing"), lambda _: {})
+    run_index.refresh()
+    assert run_index.get_runs() == []
@@ -0,0 +1,223 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from tqdm import tqdm
+
+from tokenflood.constants import ADAPTIVE_MIN_WINDOW_SAMPLES, ERROR_RING_BUFFER_SIZE
+from tokenflood.dispatcher import DeadlineDispatcher
+from tokenflood.io import IOContext, ObservedIOContext
+from tokenflood.models.data.error_data import ErrorContext
+from tokenflood.models.endpoint_spec import EndpointSpec
+from tokenflood.models.run_specs.adaptive_load_test_spec import AdaptiveLoadTestSpec
+from tokenflood.native_client import close_native_session
+from tokenflood.runner import (
+    drain_requests,
+    get_warm_session,
+    send_load_request,
+    warn_on_send_lag,
+    NetworkLatencySampler,
+)
+
+log = logging.getLogger(__name__)
+
+
+class AIMDRateController:
+    """Additive increase, multiplicative decrease of the request rate.
+
+    Every adjustment starts a new group. Once the rate was decreased, results
+    of requests sent before the decrease no longer count, so that an earlier
+    overload does not push the rate down twice."""
+
+    def __init__(self, spec: AdaptiveLoadTestSpec):
+        self.spec = spec
+        self.target = spec.target
+        self.requests_per_second = spec.start_requests_per_second
+        self.max_requests_per_second_reached = self.requests_per_second
+        self.group_id = 0
+        self.first_valid_group_id = 0
+        # metric value of each completed request, None for errors
+        self.window: Deque[Optional[float]] = deque(maxlen=spec.window_size)
+
+    def add_llm_request(self, data: Dict):
+        if data["group_id"] >= self.first_valid_group_id:
+            self.window.append(data[self.target.metric])
+
+    def add_error(self, data: Dict):
+        if data["group_id"] >= self.first_valid_group_id:
+            self.window.append(None)
+
+    @property
+    def error_rate(self) -> float:
+        if len(self.window) == 0:
+            return 0.0
+        return sum(value is None for value in self.window) / len(self.window)
+
+    @property
+    def metric_value(self) -> Optional[float]:
+        values = [value for value in self.window if value is not None]
+        if not values:
+            return None
+        return float(np.percentile(values, self.target.percentile))
+
+    def is_over_target(self) -> bool:
+        metric_value = self.metric_value
+        return self.error_rate > self.target.max_error_rate or (
+            metric_value is not None and metric_value > self.target.limit_ms
+        )
+
+    def adjust(self) -> float:
+        """Adjust the rate to the current window and start a new group."""
+        self.group_id += 1
+        if len(self.window) < ADAPTIVE_MIN_WINDOW_SAMPLES:
+            return self.requests_per_second
+        if self.is_over_target():
+            self.requests_per_second = max(
+                self.spec.min_requests_per_second,
+                self.requests_per_second * self.spec.multiplicative_decrease,
+            )
+            self.window.clear()
+            self.first_valid_group_id = self.group_id
+        else:
+            self.requests_per_second = min(
+                self.spec.max_requests_per_second or float("inf"),
+                self.requests_per_second + self.spec.additive_increase,
+            )
+        self.max_requests_per_second_reached = max(
+            self.max_requests_per_second_reached, self.requests_per_second
+        )
+        return self.requests_per_second
+
+
+def create_interval_send_offsets(
+    first_offset: float, requests_per_second: float, interval: float
+) -> Tuple[List[float], float]:
+    """Evenly spaced send offsets within an adjustment interval at the given rate.
+
+    Also returns the offset of the following send into the next interval, so
+    that rates below one request per interval still hold across intervals."""
+    pause = 1 / requests_per_second
+    send_offsets = [
+        float(offset) for offset in np.arange(first_offset, interval, pause)
+    ]
+    return send_offsets, first_offset + len(send_offsets) * pause - interval
+
+
+async def run_adaptive_load_test(
+    endpoint_spec: EndpointSpec,
+    adaptive_load_test_spec: AdaptiveLoadTestSpec,
+    io_context: IOContext,
+):
+    """Send requests at a rate that follows the latency target.
+
+    The rate in effect is recorded as requests_per_second_phase of every
+    request, with a new group per adjustment interval."""
+    io_context.activate()
+    await io_context.wait_for_pending_writes()
+    log.info("Warming up.")
+    error = await get_warm_session(
+        endpoint_spec,
+        io_context,
+        requests_per_second=adaptive_load_test_spec.start_requests_per_second,
+        num_generation_tokens=adaptive_load_test_spec.load_type.get_expected_output_length(),
+    )
+    if error:
+        log.error(f"Not starting run due to error during warmup: {error}")
+        # letting any writes finish
+        await io_context.wait_for_pending_writes()
+        await close_native_session()
+        return
+
+    spec = adaptive_load_test_spec
+    load_type = spec.load_type
+    message_lists = load_type.iter_message_lists()
+    controller = AIMDRateController(spec)
+    observed_io_context = ObservedIOContext(
+        io_context, controller.add_llm_request, controller.add_error
+    )
+    error_threshold_tripped = False
+    error_rate = 0.0
+    request_number = 0
+    llm_request_tasks: Set[asyncio.Task] = set()
+
+    pbar = tqdm(
+        total=spec.duration_seconds,
+        desc=f"Adaptive load test {spec.name}",
+        unit="s",
+        bar_format="{l_bar}{bar}| {n:.0f}/{total}s [{elapsed}<{remaining}{postfix}]",
+    )
+    start_time = time.monotonic()
+    end_time = start_time + spec.duration_seconds
+    interval_start = start_time
+    # offset of the next send into the coming interval
+    first_offset = 0.0
+    error_context = ErrorContext(
+        requests_per_second_phase=controller.requests_per_second, group_id=0
+    )
+    sampler = NetworkLatencySampler(endpoint_spec, io_context, error_context)
+    sampler.start()
+    while interval_start < end_time:
+        interval = min(spec.adjustment_interval_seconds, end_time - interval_start)
+        send_offsets, first_offset = create_interval_send_offsets(
+            first_offset, controller.requests_per_second, interval
+        )
+        dispatcher = DeadlineDispatcher(send_offsets, interval)
+        dispatcher.start(interval_start)
+        for i in range(len(send_offsets)):
+            await dispatcher.wait_for_send_slot(i)
+            error_rate = observed_io_context.error_rate()
+            if error_rate > spec.error_limit:
+                error_threshold_tripped = True
+                break
+            send_lag = dispatcher.record_send(i)
+            send_load_request(
+                endpoint_spec,
+                observed_io_context,
+                load_type,
+                next(message_lists),
+                request_number,
+                error_context,
+                llm_request_tasks,
+            )
+            request_number += 1
+            warn_on_send_lag(send_lag)
+            pbar.update(time.monotonic() - start_time - pbar.n)
+        if error_threshold_tripped:
+            break
+        await dispatcher.wait_for_send_slot(len(send_offsets))
+        interval_start += interval
+        pbar.update(time.monotonic() - start_time - pbar.n)
+        if interval_start >= end_time:
+            break
+        controller.adjust()
+        error_context = ErrorContext(
+            requests_per_second_phase=controller.requests_per_second,
+            group_id=controller.group_id,
+        )
+        sampler.error_context = error_context
+        metric_value = controller.metric_value
+        pbar.set_postfix(
+            {
+                "rate": f"{controller.requests_per_second:.2f} requests/s",
+                f"p{spec.target.percentile:g}": f"{metric_value:.0f}ms"
+                if metric_value is not None
+                else "n/a",
+                "error rate": round(observed_io_context.error_rate(), 2),
+            }
+        )
+    pbar.close()
+    log.info(
+        f"Sent {request_number} requests. The rate peaked at "
+        f"{controller.max_requests_per_second_reached:.2f} requests/s and ended at "
+        f"{controller.requests_per_second:.2f} requests/s."
+    )
+    log.info("Waiting for all requests to come back.")
+    await drain_requests([llm_request_tasks], [sampler], [io_context])
+    if error_threshold_tripped:
+        log.error(
+            f"Aborting the run because the error rate exceeded {int(error_rate * 100)}% for the last {ERROR_RING_BUFFER_SIZE} requests."
+        )
+    await close_native_session()
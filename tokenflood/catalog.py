@@ -0,0 +1,348 @@
+import hashlib
+import json
+import os
+import sqlite3
+from functools import partial
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from tokenflood.columnar import BOOL_DTYPE, STRING_DTYPE, get_column_dtypes
+from tokenflood.constants import (
+    CATALOG_FILE,
+    CATALOG_TIMEOUT_SECONDS,
+    SUMMARY_METRIC_FIELDS,
+)
+from tokenflood.models.data.catalog_data import CatalogEntry
+from tokenflood.models.data.latency_histogram import LatencyHistogram
+from tokenflood.models.data.llm_request_data import LLMRequestData
+from tokenflood.models.data.summary_data import GroupSummary, MetricSummary, RunSummary
+
+CATALOG_OFF = "off"
+CATALOG_SUMMARIES = "summaries"
+CATALOG_ROWS = "rows"
+CATALOG_MODES = (CATALOG_OFF, CATALOG_SUMMARIES, CATALOG_ROWS)
+
+SQL_TYPES = {
+    BOOL_DTYPE: "INTEGER",
+    "<i8": "INTEGER",
+    "<f8": "REAL",
+    STRING_DTYPE: "TEXT",
+}
+
+# the time and the numeric fields of the llm requests kept as raw rows
+ROW_COLUMNS: Dict[str, str] = {
+    "datetime": "TEXT",
+    **{
+        name: SQL_TYPES[dtype]
+        for name, dtype in get_column_dtypes(LLMRequestData).items()
+        if dtype != STRING_DTYPE
+    },
+}
+
+# group columns added after the groups table was introduced
+GROUP_COLUMNS: Dict[str, str] = {"throughput": "REAL"}
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS runs (
+    run TEXT PRIMARY KEY,
+    run_spec_file TEXT NOT NULL,
+    endpoint TEXT NOT NULL,
+    endpoint_spec_hash TEXT NOT NULL,
+    run_spec_hash TEXT NOT NULL,
+    created TEXT NOT NULL,
+    complete INTEGER NOT NULL DEFAULT 0,
+    percentiles TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_created ON runs (created);
+CREATE TABLE IF NOT EXISTS groups (
+    run TEXT NOT NULL,
+    group_id INTEGER NOT NULL,
+    num_requests INTEGER NOT NULL,
+    num_errors INTEGER NOT NULL,
+    datetime TEXT,
+    requests_per_second_phase REAL,
+    concurrency INTEGER,
+    throughput REAL,
+    PRIMARY KEY (run, group_id)
+);
+CREATE INDEX IF NOT EXISTS groups_datetime ON groups (datetime);
+CREATE TABLE IF NOT EXISTS metrics (
+    run TEXT NOT NULL,
+    group_id INTEGER NOT NULL,
+    results_file TEXT NOT NULL,
+    field TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    mean REAL NOT NULL,
+    percentiles TEXT NOT NULL,
+    histogram TEXT NOT NULL,
+    PRIMARY KEY (run, group_id, results_file, field)
+);
+CREATE TABLE IF NOT EXISTS llm_requests (
+    run TEXT NOT NULL,
+    {", ".join(f"{name} {sql_type}" for name, sql_type in ROW_COLUMNS.items())}
+);
+CREATE INDEX IF NOT EXISTS llm_requests_group ON llm_requests (run, group_id);
+CREATE INDEX IF NOT EXISTS llm_requests_datetime ON llm_requests (run, datetime);
+"""
+
+
+def get_catalog_file(results_folder: str) -> str:
+    return os.path.join(results_folder, CATALOG_FILE)
+
+
+def make_empty_metrics() -> Dict[str, Dict[str, MetricSummary]]:
+    return {results_file: {} for results_file in SUMMARY_METRIC_FIELDS}
+
+
+def hash_file(filename: str) -> str:
+    with open(filename, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def make_rows(llm_request_df: pd.DataFrame) -> List[Tuple]:
+    """Raw rows of llm requests, fields that older runs did not record are left empty."""
+    df = llm_request_df.reindex(columns=list(ROW_COLUMNS)).astype(object)
+    return [
+        tuple(None if pd.isna(value) else value for value in row)
+        for row in df.itertuples(index=False)
+    ]
+
+
+class ResultsCatalog:
+    """SQLite index of the runs in a results folder.
+
+    Holds the metadata and the per group summaries of every run and,
+    optionally, the numeric fields of its llm requests, so that runs can be
+    listed and compared without touching their results files."""
+
+    def __init__(self, catalog_file: str) -> None:
+        # a run's catalog is written on the file writer thread, one write at a time
+        self.connection = sqlite3.connect(
+            catalog_file, timeout=CATALOG_TIMEOUT_SECONDS, check_same_thread=False
+        )
+        # lets the visualization read while a run writes
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        # before the schema, whose indexes may use the new columns
+        self.add_missing_columns("llm_requests", ROW_COLUMNS)
+        self.add_missing_columns("groups", GROUP_COLUMNS)
+        self.connection.executescript(SCHEMA)
+
+    def add_missing_columns(self, table: str, columns: Dict[str, str]) -> None:
+        """Add the columns introduced since the catalog was created to a table."""
+        existing_columns = {
+            row[1] for row in self.connection.execute(f"PRAGMA table_info({table})")
+        }
+        if not existing_columns:
+            return
+        with self.connection:
+            for name, sql_type in columns.items():
+                if name not in existing_columns:
+                    self.connection.execute(
+                        f"ALTER TABLE {table} ADD COLUMN {name} {sql_type}"
+                    )
+
+    def update_run(
+        self,
+        entry: CatalogEntry,
+        summary: Optional[RunSummary] = None,
+        rows: Sequence[Tuple] = (),
+    ) -> None:
+        """Add or update a run along with its summary and new raw rows at once."""
+        with self.connection:
+            self.connection.execute(
+                "INSERT INTO runs (run, run_spec_file, endpoint, endpoint_spec_hash, run_spec_hash, created) "
+                "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (run) DO NOTHING",
+                (
+                    entry.run,
+                    entry.run_spec_file,
+                    entry.endpoint,
+                    entry.endpoint_spec_hash,
+                    entry.run_spec_hash,
+                    entry.created,
+                ),
+            )
+            if summary is not None:
+                self.write_summary(entry.run, summary)
+            if rows:
+                self.connection.executemany(
+                    f"INSERT INTO llm_requests (run, {', '.join(ROW_COLUMNS)}) "
+                    f"VALUES (?, {', '.join('?' for _ in ROW_COLUMNS)})",
+                    [(entry.run, *row) for row in rows],
+                )
+
+    def write_summary(self, run: str, summary: RunSummary) -> None:
+        self.connection.execute(
+            "UPDATE runs SET complete = ?, percentiles = ? WHERE run = ?",
+            (summary.complete, json.dumps(summary.percentiles), run),
+        )
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO groups "
+            "(run, group_id, num_requests, num_errors, datetime, requests_per_second_phase, concurrency, throughput) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    run,
+                    group.group_id,
+                    group.num_requests,
+                    group.num_errors,
+                    group.datetime,
+                    group.requests_per_second_phase,
+                    group.concurrency,
+                    group.throughput,
+                )
+                for group in summary.groups
+            ],
+        )
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO metrics VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    run,
+                    group.group_id,
+                    results_file,
+                    field,
+                    metric.count,
+                    metric.mean,
+                    json.dumps(metric.percentiles),
+                    metric.histogram.model_dump_json(),
+                )
+                for group in summary.groups
+                for results_file, field_metrics in group.metrics.items()
+                for field, metric in field_metrics.items()
+            ],
+        )
+
+    def remove_run(self, run: str) -> None:
+        with self.connection:
+            for table in ["runs", "groups", "metrics", "llm_requests"]:
+                self.connection.execute(f"DELETE FROM {table} WHERE run = ?", (run,))
+
+    def get_run_spec_files(self) -> Dict[str, str]:
+        """Spec file of every catalogued run, newest run first."""
+        return dict(
+            self.connection.execute(
+                "SELECT run, run_spec_file FROM runs ORDER BY run DESC"
+            ).fetchall()
+        )
+
+    def get_entry(self, run: str) -> Optional[CatalogEntry]:
+        row = self.connection.execute(
+            "SELECT run, run_spec_file, endpoint, endpoint_spec_hash, run_spec_hash, created "
+            "FROM runs WHERE run = ?",
+            (run,),
+        ).fetchone()
+        if row is None:
+            return None
+        return CatalogEntry(**dict(zip(CatalogEntry.model_fields, row)))
+
+    def get_run_summary(self, run: str) -> Optional[RunSummary]:
+        """The last summary written for a run, None if it has none."""
+        row = self.connection.execute(
+            "SELECT complete, percentiles FROM runs WHERE run = ?", (run,)
+        ).fetchone()
+        if row is None or row[1] is None:
+            return None
+        complete, percentiles = row
+        metrics: Dict[int, Dict[str, Dict[str, MetricSummary]]] = {}
+        for (
+            group_id,
+            results_file,
+            field,
+            count,
+            mean,
+            metric_percentiles,
+            histogram,
+        ) in self.connection.execute(
+            "SELECT group_id, results_file, field, count, mean, percentiles, histogram "
+            "FROM metrics WHERE run = ?",
+            (run,),
+        ):
+            group_metrics = metrics.setdefault(group_id, make_empty_metrics())
+            group_metrics.setdefault(results_file, {})[field] = MetricSummary(
+                count=count,
+                mean=mean,
+                percentiles=json.loads(metric_percentiles),
+                histogram=LatencyHistogram.model_validate_json(histogram),
+            )
+        groups = [
+            GroupSummary(
+                group_id=group_id,
+                num_requests=num_requests,
+                num_errors=num_errors,
+                datetime=datetime,
+                requests_per_second_phase=requests_per_second_phase,
+                concurrency=concurrency,
+                throughput=throughput,
+                metrics=metrics.get(group_id, make_empty_metrics()),
+            )
+            for (
+                group_id,
+                num_requests,
+                num_errors,
+                datetime,
+                requests_per_second_phase,
+                concurrency,
+                throughput,
+            ) in self.connection.execute(
+                "SELECT group_id, num_requests, num_errors, datetime, requests_per_second_phase, concurrency, throughput "
+                "FROM groups WHERE run = ? ORDER BY group_id",
+                (run,),
+            )
+        ]
+        return RunSummary(
+            percentiles=tuple(json.loads(percentiles)),
+            complete=bool(complete),
+            groups=tuple(groups),
+        )
+
+    def get_rows(
+        self,
+        run: str,
+        columns: Sequence[str] = tuple(ROW_COLUMNS),
+        group_id: Optional[int] = None,
+    ) -> pd.DataFrame:
+        """Raw llm request rows of a run, optionally of a single group."""
+        unknown_columns = set(columns) - set(ROW_COLUMNS)
+        if unknown_columns:
+            raise ValueError(f"Unknown catalog columns: {sorted(unknown_columns)}")
+        query = f"SELECT {', '.join(columns)} FROM llm_requests WHERE run = ?"
+        parameters: Tuple = (run,)
+        if group_id is not None:
+            query += " AND group_id = ?"
+            parameters += (group_id,)
+        return pd.read_sql_query(query, self.connection, params=parameters)
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+class RunCatalogWriter:
+    """Keeps the catalog entry of a run up to date while it is running.
+
+    Raw rows are only kept when asked for. They are buffered and written
+    together with each summary."""
+
+    def __init__(
+        self, catalog: ResultsCatalog, entry: CatalogEntry, store_rows: bool = False
+    ) -> None:
+        self.catalog = catalog
+        self.entry = entry
+        self.store_rows = store_rows
+        self.rows: List[Tuple] = []
+
+    def add_llm_request(self, data: Dict):
+        if self.store_rows:
+            self.rows.append(tuple(data[name] for name in ROW_COLUMNS))
+
+    def update(self, summary: RunSummary):
+        self.prepare_update(summary)()
+
+    def prepare_update(self, summary: RunSummary) -> Callable[[], None]:
+        """Take the buffered rows now and return the write, to run on any thread."""
+        rows = self.rows
+        self.rows = []
+        return partial(self.catalog.update_run, self.entry, summary, rows)
+
+    def close(self):
+        self.catalog.close()
@@ -1,63 +1,105 @@
 import argparse
 import asyncio
+import functools
 import json
 import os
 import sys
 from io import StringIO
-from typing import List, Tuple, Callable, Coroutine, TypeVar, Any
+from typing import List, Optional, Tuple, Callable, Coroutine, TypeVar, Any
 
 import gradio.routes
 from rich import print
 import logging
-import warnings
-
-from rich.highlighter import NullHighlighter
-from rich.logging import RichHandler
 
 from tokenflood import __version__
 
 from dotenv import load_dotenv
 
 from tokenflood.constants import (
+    AGENT_DEFAULT_PORT,
+    AGENT_TOKEN_ENV_VAR,
+    DEFAULT_TEXT_COMPRESSION,
     ENDPOINT_SPEC_FILE,
     ERROR_FILE,
     NETWORK_LATENCY_FILE,
     LLM_REQUESTS_FILE,
     OBSERVATION_SPEC_FILE,
     LOAD_TEST_SPEC_FILE,
+    SEARCH_SUMMARY_FILE,
+    SUMMARY_FILE,
+    SUMMARY_METRIC_FIELDS,
+    SUMMARY_PERCENTILES,
+    TEXT_BLOBS_FILE,
+    TOKEN_ARRIVALS_FILE,
 )
 from tokenflood.models.endpoint_spec import EndpointSpec
 from tokenflood.messages import (
     create_message_list_from_prompt,
     get_input_output_prefix_token_lengths,
 )
+from tokenflood.models.run_specs.adaptive_load_test_spec import AdaptiveLoadTestSpec
+from tokenflood.models.run_specs.concurrency_test_spec import ConcurrencyTestSpec
 from tokenflood.models.run_specs.load_test_spec import LoadTestSpec
 from tokenflood.models.run_specs.observation_spec import ObservationSpec
+from tokenflood.models.run_specs.run_spec import RunSpec
+from tokenflood.models.run_specs.saturation_search_spec import SaturationSearchSpec
 from tokenflood.visualization_frontend.gradio import visualize_results
+from tokenflood.visualization_frontend.percentiles import (
+    percentiles_to_str,
+    str_to_percentiles,
+)
 from tokenflood.io import (
     FileIOContext,
+    ThreadedFileIOContext,
     get_first_available_filename_like,
     make_run_folder,
     read_endpoint_spec,
     write_pydantic_yaml,
     read_run_spec,
+    read_saturation_search_spec,
     IOContext,
     read_file,
     read_jsonl_messages,
+    find_run_spec_file_name,
+)
+from tokenflood.catalog import (
+    CATALOG_MODES,
+    CATALOG_OFF,
+    CATALOG_ROWS,
+    ROW_COLUMNS,
+    ResultsCatalog,
+    RunCatalogWriter,
+    get_catalog_file,
+    hash_file,
+    make_rows,
+)
+from tokenflood.models.data.catalog_data import CatalogEntry
+from tokenflood.columnar import convert_csv_to_columnar, get_columnar_file
+from tokenflood.logging_utils import configure_logging
+from tokenflood.summaries import (
+    format_group_summary,
+    compute_run_summary,
+    read_results_columns,
 )
-from tokenflood.logging_utils import global_warn_once_filter, TextFilter
+from tokenflood.text_blobs import TEXT_COMPRESSIONS
+from tokenflood.util import get_date_str
 from tokenflood.networking import (
     patch_aiohttp_client_session,
     unpatch_aiohttp_client_session,
 )
+from tokenflood.adaptive_runner import run_adaptive_load_test
+from tokenflood.concurrency_runner import run_concurrency_test
 from tokenflood.observer import run_observation
-from tokenflood.runner import run_load_test
+from tokenflood.runner import run_comparison_load_test, run_load_test
+from tokenflood.saturation_search import run_saturation_search
 from tokenflood.starter_pack import (
     starter_endpoint_spec_vllm,
     starter_model_id,
     starter_observation_spec,
     starter_run_suite,
 )
+from tokenflood.distributed import run_load_test_with_agents, serve_agent
+from tokenflood.workers import run_load_test_with_workers
 
 log = logging.getLogger(__name__)
 
@@ -85,24 +127,6 @@ the_wave = f"""[blue]⠀⡀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀
 ⣸⣿⣿⣿⣿⣿⣿⣿⣿⣿⣿⣿⣿⣿⣿⣟⣐⣾⡿⡟⢶⠾⢋⢹⠿⢿⣿⣿⣷⣦⡈⠙⠛⠿⠿⢿⣶⣶⣶⣶⣶⢶⠟⠚⠀⠁⠀⠀⠙⠛⠛⠛⠛⠛⠋⠉⠁⠀⠀⠀⠀⠀⢀⠀⠀[/]"""
 
 
-def configure_logging():
-    tokenflood_logger = logging.getLogger("tokenflood")
-    tokenflood_logger.setLevel(logging.INFO)
-    tokenflood_logger.addHandler(
-        RichHandler(markup=True, highlighter=NullHighlighter(), keywords=[])
-    )
-    for handler in tokenflood_logger.handlers:
-        handler.addFilter(global_warn_once_filter)
-
-    # for sagemaker endpoints streaming answer
-    logging.getLogger("LiteLLM").addFilter(
-        TextFilter("Warning: Unparseable JSON data remained: [DONE]")
-    )
-    warnings.filterwarnings(
-        "ignore", message=".*HTTP_422_UNPROCESSABLE_ENTITY.*", module="gradio"
-    )
-
-
 def create_argument_parser():
     parser = argparse.ArgumentParser(
         prog="tokenflood",
@@ -113,10 +137,15 @@ def create_argument_parser():
 
     # RUN
     run_cmd_parser = subparsers.add_parser(
-        "run", help="[blue]Execute a load- or observation test.[/]"
+        "run", help="[blue]Execute a load-, concurrency- or observation test.[/]"
     )
     run_cmd_parser.add_argument("run_spec", type=str)
-    run_cmd_parser.add_argument("endpoint", type=str)
+    run_cmd_parser.add_argument(
+        "endpoint",
+        type=str,
+        nargs="+",
+        help="One or more endpoint specs. Load tests against several endpoints send them the same requests along one schedule, each endpoint gets its own run folder.",
+    )
     run_cmd_parser.set_defaults(func=run)
     run_cmd_parser.add_argument(
         "-y",
@@ -124,6 +153,59 @@ def create_argument_parser():
         help="Auto accept run start.",
         action="store_true",
     )
+    run_cmd_parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of processes generating the load. Use more than one if a single process cannot keep up with the request rate.",
+    )
+    run_cmd_parser.add_argument(
+        "--agents",
+        type=str,
+        nargs="+",
+        default=None,
+        metavar="HOST:PORT",
+        help="Coordinate the load test across tokenflood agents instead of sending the requests from this machine.",
+    )
+    run_cmd_parser.add_argument(
+        "--round-robin",
+        help="Send each request of a load test against several endpoints to only one of them, taking turns, instead of to all of them.",
+        action="store_true",
+    )
+    add_text_compression_argument(run_cmd_parser)
+    add_catalog_argument(run_cmd_parser)
+
+    # Search
+    search_cmd_parser = subparsers.add_parser(
+        "search",
+        help="[blue]Search the highest request rate that meets a latency SLO.[/]",
+    )
+    search_cmd_parser.add_argument("search_spec", type=str)
+    search_cmd_parser.add_argument("endpoint", type=str)
+    search_cmd_parser.add_argument(
+        "-y",
+        "--autoaccept",
+        help="Auto accept run start.",
+        action="store_true",
+    )
+    add_text_compression_argument(search_cmd_parser)
+    add_catalog_argument(search_cmd_parser)
+    search_cmd_parser.set_defaults(func=search)
+
+    # Agent
+    agent_cmd_parser = subparsers.add_parser(
+        "agent",
+        help="[blue]Start an agent that sends the requests of a coordinated load test.[/]",
+    )
+    agent_cmd_parser.add_argument(
+        "--host",
+        type=str,
+        default="127.0.0.1",
+        help=f"Interface to listen on. Anyone who can connect can make the agent send requests with its API keys, so any interface other than 127.0.0.1 requires a shared secret in {AGENT_TOKEN_ENV_VAR} on the agent and the coordinator. Use 0.0.0.0 to accept coordinators from other machines.",
+    )
+    agent_cmd_parser.add_argument("--port", type=int, default=AGENT_DEFAULT_PORT)
+    agent_cmd_parser.set_defaults(func=start_agent)
 
     # Visualize
     viz_cmd_parser = subparsers.add_parser(
@@ -134,6 +216,52 @@ def create_argument_parser():
     )
     viz_cmd_parser.set_defaults(func=start_visualization)
 
+    # Convert
+    convert_cmd_parser = subparsers.add_parser(
+        "convert",
+        help="[blue]Add columnar results files to run folders that only have csv files.[/]",
+    )
+    convert_cmd_parser.add_argument(
+        "results_folder", type=str, nargs="?", default="./results"
+    )
+    convert_cmd_parser.set_defaults(func=convert_results)
+
+    # Catalog
+    catalog_cmd_parser = subparsers.add_parser(
+        "catalog",
+        help="[blue]Add the runs of a results folder that are not catalogued yet to its catalog.[/]",
+    )
+    catalog_cmd_parser.add_argument(
+        "results_folder", type=str, nargs="?", default="./results"
+    )
+    catalog_cmd_parser.add_argument(
+        "--rows",
+        help="Also store the numeric fields of every llm request.",
+        action="store_true",
+    )
+    catalog_cmd_parser.set_defaults(func=catalog_results)
+
+    # Report
+    report_cmd_parser = subparsers.add_parser(
+        "report", help="[blue]Summarize the groups of a run.[/]"
+    )
+    report_cmd_parser.add_argument("run_folder", type=str)
+    report_cmd_parser.add_argument(
+        "-m",
+        "--metric",
+        choices=SUMMARY_METRIC_FIELDS[LLM_REQUESTS_FILE],
+        default="latency",
+        help="LLM request metric to report.",
+    )
+    report_cmd_parser.add_argument(
+        "-p",
+        "--percentiles",
+        type=str,
+        default=percentiles_to_str(list(SUMMARY_PERCENTILES)),
+        help="Comma separated percentiles to report.",
+    )
+    report_cmd_parser.set_defaults(func=report_run)
+
     # Initialization
     init_cmd_parser = subparsers.add_parser(
         "init",
@@ -195,6 +323,26 @@ def start_visualization(
     return visualize_results(args.results_folder, keep_running, go_to_browser)
 
 
+def add_text_compression_argument(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--text-compression",
+        type=str,
+        choices=TEXT_COMPRESSIONS,
+        default=DEFAULT_TEXT_COMPRESSION,
+        help=f"Compression of the prompts and generated texts stored in {TEXT_BLOBS_FILE}. zstd needs the zstandard package.",
+    )
+
+
+def add_catalog_argument(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        "--catalog",
+        type=str,
+        choices=CATALOG_MODES,
+        default=CATALOG_OFF,
+        help="Keep the run in the catalog of the results folder, with its group summaries or also the numeric fields of every llm request.",
+    )
+
+
 def create_starter_files(args: argparse.Namespace):
     available_endpoint_spec_filename = get_first_available_filename_like(
         ENDPOINT_SPEC_FILE
@@ -227,15 +375,126 @@ def create_starter_files(args: argparse.Namespace):
 
 
 def run(args: argparse.Namespace):
-    endpoint_spec = read_endpoint_spec(args.endpoint)
+    if len(args.endpoint) > 1:
+        run_comparison(args)
+        return
+    if args.round_robin:
+        raise ValueError("Round robin needs more than one endpoint.")
+    endpoint_spec = read_endpoint_spec(args.endpoint[0])
     run_spec = read_run_spec(args.run_spec)
-    run_name = run_spec.get_run_name(endpoint_spec)
+    test_procedure = get_test_procedure(run_spec, args.workers, args.agents)
+    prepared_run = prepare_run(
+        endpoint_spec, run_spec, args.autoaccept, args.text_compression, args.catalog
+    )
+    if prepared_run is None:
+        return
+    _, io_context = prepared_run
+    asyncio.run(test_procedure(endpoint_spec, run_spec, io_context))
+    io_context.close()
+    log.info("Done.")
 
-    confirm_start_run = confirm_starting_run(args.autoaccept)
-    if not confirm_start_run:
+
+def run_comparison(args: argparse.Namespace):
+    endpoint_specs = [read_endpoint_spec(endpoint) for endpoint in args.endpoint]
+    run_spec = read_run_spec(args.run_spec)
+    if not isinstance(run_spec, LoadTestSpec):
+        raise ValueError("Only load tests can run against several endpoints at once.")
+    check_comparison_run(endpoint_specs, args.workers, args.agents)
+    if not confirm_starting_run(args.autoaccept):
         log.info("Stopping because starting confirmation was not given.")
         return
+    io_contexts = [
+        prepare_run_folder(
+            endpoint_spec, run_spec, args.text_compression, args.catalog
+        )[1]
+        for endpoint_spec in endpoint_specs
+    ]
+    asyncio.run(
+        run_comparison_load_test(
+            endpoint_specs, run_spec, io_contexts, args.round_robin
+        )
+    )
+    for io_context in io_contexts:
+        io_context.close()
+    log.info("Done.")
+
 
+def check_comparison_run(
+    endpoint_specs: List[EndpointSpec],
+    num_workers: int = 1,
+    agents: Optional[List[str]] = None,
+) -> None:
+    """Raise if the load test cannot be compared across the endpoints."""
+    if num_workers > 1 or agents:
+        raise ValueError(
+            "Load tests against several endpoints support neither multiple workers nor agents."
+        )
+    folder_names = [endpoint_spec.folder_name for endpoint_spec in endpoint_specs]
+    if len(set(folder_names)) != len(folder_names):
+        raise ValueError(
+            f"The endpoints need distinct names to tell their run folders apart, got {folder_names}."
+        )
+    # litellm keeps a single connection pool for all of its requests
+    litellm_pool_options = {
+        (
+            endpoint_spec.pool_size,
+            endpoint_spec.pool_size_per_host,
+            endpoint_spec.keepalive_timeout,
+        )
+        for endpoint_spec in endpoint_specs
+        if endpoint_spec.client == "litellm"
+    }
+    if len(litellm_pool_options) > 1:
+        raise ValueError(
+            "Endpoints using the litellm client share one connection pool, so their pool options have to be the same."
+        )
+
+
+def search(args: argparse.Namespace):
+    endpoint_spec = read_endpoint_spec(args.endpoint)
+    search_spec = read_saturation_search_spec(args.search_spec)
+    prepared_run = prepare_run(
+        endpoint_spec,
+        search_spec,
+        args.autoaccept,
+        args.text_compression,
+        args.catalog,
+    )
+    if prepared_run is None:
+        return
+    run_folder, io_context = prepared_run
+    summary_file = os.path.join(run_folder, SEARCH_SUMMARY_FILE)
+    log.info(f"Writing the search summary to: [blue]{summary_file}[/]")
+    asyncio.run(
+        run_saturation_search(endpoint_spec, search_spec, io_context, summary_file)
+    )
+    io_context.close()
+    log.info("Done.")
+
+
+def prepare_run(
+    endpoint_spec: EndpointSpec,
+    run_spec: RunSpec,
+    autoaccept: bool,
+    text_compression: str = DEFAULT_TEXT_COMPRESSION,
+    catalog: str = CATALOG_OFF,
+) -> Optional[Tuple[str, FileIOContext]]:
+    """Ask for confirmation and set up the results folder of a run."""
+    confirm_start_run = confirm_starting_run(autoaccept)
+    if not confirm_start_run:
+        log.info("Stopping because starting confirmation was not given.")
+        return None
+    return prepare_run_folder(endpoint_spec, run_spec, text_compression, catalog)
+
+
+def prepare_run_folder(
+    endpoint_spec: EndpointSpec,
+    run_spec: RunSpec,
+    text_compression: str = DEFAULT_TEXT_COMPRESSION,
+    catalog: str = CATALOG_OFF,
+) -> Tuple[str, FileIOContext]:
+    """Set up the results folder of a run."""
+    run_name = run_spec.get_run_name(endpoint_spec)
     run_folder = make_run_folder(run_name)
     log.info(f"Preparing results folder: [blue]{run_folder}[/]")
 
@@ -250,15 +509,111 @@ def run(args: argparse.Namespace):
     error_file = os.path.join(run_folder, ERROR_FILE)
     llm_requests_file = os.path.join(run_folder, LLM_REQUESTS_FILE)
     network_latency_file = os.path.join(run_folder, NETWORK_LATENCY_FILE)
-    io_context = FileIOContext(llm_requests_file, network_latency_file, error_file)
+    token_arrivals_file = os.path.join(run_folder, TOKEN_ARRIVALS_FILE)
+    text_blob_file = os.path.join(run_folder, TEXT_BLOBS_FILE)
+    catalog_writer = None
+    if catalog != CATALOG_OFF:
+        catalog_file = get_catalog_file(os.path.dirname(run_folder))
+        log.info(f"Cataloguing the run in: [blue]{catalog_file}[/]")
+        catalog_writer = RunCatalogWriter(
+            ResultsCatalog(catalog_file),
+            CatalogEntry(
+                run=run_name,
+                run_spec_file=run_spec.run_spec_file,
+                endpoint=endpoint_spec.provider_model_str,
+                endpoint_spec_hash=hash_file(endpoint_spec_file),
+                run_spec_hash=hash_file(run_spec_file),
+                created=get_date_str(),
+            ),
+            store_rows=catalog == CATALOG_ROWS,
+        )
+    io_context = ThreadedFileIOContext(
+        llm_requests_file,
+        network_latency_file,
+        error_file,
+        token_arrivals_file,
+        text_blob_file=text_blob_file,
+        text_compression=text_compression,
+        columnar=True,
+        summary_file=os.path.join(run_folder, SUMMARY_FILE),
+        catalog_writer=catalog_writer,
+    )
     log.info("Starting load test")
     log.info(f"Streaming any errors to: [blue]{error_file}[/]")
     log.info(f"Streaming LLM request data to: [blue]{llm_requests_file}[/]")
     log.info(f"Streaming network latency data to: [blue]{network_latency_file}[/]")
-    test_procedure = get_test_procedure(run_spec)
-    asyncio.run(test_procedure(endpoint_spec, run_spec, io_context))
-    io_context.close()
-    log.info("Done.")
+    return run_folder, io_context
+
+
+def convert_results(args: argparse.Namespace):
+    if not os.path.isdir(args.results_folder):
+        raise ValueError(f"Results folder {args.results_folder} does not exist.")
+    num_converted = 0
+    for run in sorted(os.listdir(args.results_folder)):
+        run_folder = os.path.join(args.results_folder, run)
+        for csv_file in [LLM_REQUESTS_FILE, NETWORK_LATENCY_FILE, ERROR_FILE]:
+            csv_path = os.path.join(run_folder, csv_file)
+            if not os.path.isfile(csv_path) or os.path.isfile(
+                get_columnar_file(csv_path)
+            ):
+                continue
+            columnar_file = convert_csv_to_columnar(csv_path)
+            log.info(f"Wrote [blue]{columnar_file}[/]")
+            num_converted += 1
+    log.info(f"Converted {num_converted} csv files.")
+
+
+def catalog_results(args: argparse.Namespace):
+    if not os.path.isdir(args.results_folder):
+        raise ValueError(f"Results folder {args.results_folder} does not exist.")
+    catalog = ResultsCatalog(get_catalog_file(args.results_folder))
+    catalogued_runs = catalog.get_run_spec_files()
+    num_catalogued = 0
+    for run in sorted(os.listdir(args.results_folder)):
+        run_folder = os.path.join(args.results_folder, run)
+        run_spec_file = find_run_spec_file_name(run_folder)
+        if run_spec_file is None or run in catalogued_runs:
+            continue
+        endpoint_spec_file = os.path.join(run_folder, ENDPOINT_SPEC_FILE)
+        entry = CatalogEntry(
+            run=run,
+            run_spec_file=run_spec_file,
+            endpoint=read_endpoint_spec(endpoint_spec_file).provider_model_str,
+            endpoint_spec_hash=hash_file(endpoint_spec_file),
+            run_spec_hash=hash_file(os.path.join(run_folder, run_spec_file)),
+            created=get_date_str(os.path.getmtime(endpoint_spec_file)),
+        )
+        rows: List[Tuple] = []
+        if args.rows:
+            rows = make_rows(
+                read_results_columns(
+                    os.path.join(run_folder, LLM_REQUESTS_FILE), tuple(ROW_COLUMNS)
+                )
+            )
+        catalog.update_run(entry, compute_run_summary(run_folder), rows)
+        log.info(f"Catalogued [blue]{run}[/]")
+        num_catalogued += 1
+    catalog.close()
+    log.info(f"Catalogued {num_catalogued} runs.")
+
+
+def report_run(args: argparse.Namespace):
+    if not os.path.isdir(args.run_folder):
+        raise ValueError(f"Run folder {args.run_folder} does not exist.")
+    percentiles = str_to_percentiles(args.percentiles)
+    summary = compute_run_summary(args.run_folder)
+    log.info(f"Summary of {args.metric} in ms")
+    log.info("=" * len(f"Summary of {args.metric} in ms"))
+    if not summary.groups:
+        log.info("no data")
+    for group in summary.groups:
+        log.info(
+            format_group_summary(group, LLM_REQUESTS_FILE, args.metric, percentiles)
+        )
+
+
+def start_agent(args: argparse.Namespace):
+    asyncio.run(serve_agent(args.host, args.port, os.getenv(AGENT_TOKEN_ENV_VAR)))
 
 
 def count_prompt_tokens(args: argparse.Namespace):
@@ -328,19 +683,61 @@ def count_prompt_tokens(args: argparse.Namespace):
         log.info("no data")
 
 
-T = TypeVar("T", bound=LoadTestSpec | ObservationSpec)
+T = TypeVar(
+    "T",
+    bound=LoadTestSpec
+    | ObservationSpec
+    | ConcurrencyTestSpec
+    | SaturationSearchSpec
+    | AdaptiveLoadTestSpec,
+)
 
 
 def get_test_procedure(
-    run_spec: T,
+    run_spec: T, num_workers: int = 1, agents: Optional[List[str]] = None
 ) -> Callable[[EndpointSpec, Any, IOContext], Coroutine]:
+    if num_workers < 1:
+        raise ValueError(f"Number of workers must be at least 1, got {num_workers}.")
+    if agents and num_workers > 1:
+        raise ValueError("Use either multiple workers or agents, not both.")
     if isinstance(run_spec, LoadTestSpec):
+        if agents:
+            return functools.partial(
+                run_load_test_with_agents,
+                agent_addresses=agents,
+                agent_token=os.getenv(AGENT_TOKEN_ENV_VAR),
+            )
+        if num_workers > 1:
+            return functools.partial(
+                run_load_test_with_workers, num_workers=num_workers
+            )
         return run_load_test
     elif isinstance(run_spec, ObservationSpec):
+        if num_workers > 1 or agents:
+            raise ValueError(
+                "Observation runs support neither multiple workers nor agents."
+            )
         return run_observation
+    elif isinstance(run_spec, SaturationSearchSpec):
+        raise ValueError(
+            "Saturation searches are started with `tokenflood search` instead."
+        )
+    elif isinstance(run_spec, ConcurrencyTestSpec):
+        if num_workers > 1 or agents:
+            raise ValueError(
+                "Concurrency test runs support neither multiple workers nor agents."
+            )
+        return run_concurrency_test
+    elif isinstance(run_spec, AdaptiveLoadTestSpec):
+        if num_workers > 1 or agents:
+            raise ValueError(
+                "Adaptive load tests support neither multiple workers nor agents."
+            )
+        return run_adaptive_load_test
     raise ValueError(
         f"Invalid run spec type: {type(run_spec)}. "
-        f"Must be {LoadTestSpec.__name__} or {ObservationSpec.__name__}."
+        f"Must be one of {LoadTestSpec.__name__}, {ObservationSpec.__name__}, "
+        f"{ConcurrencyTestSpec.__name__} or {AdaptiveLoadTestSpec.__name__}."
     )
 
 
@@ -0,0 +1,216 @@
+import json
+import os
+import struct
+from typing import (
+    Any,
+    BinaryIO,
+    Collection,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    cast,
+)
+
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel
+
+from tokenflood.constants import COLUMNAR_CHUNK_ROWS, COLUMNAR_FILE_SUFFIX
+
+# magic bytes and manifest length, followed by the json manifest
+FILE_HEADER = struct.Struct("<8sI")
+MAGIC = b"TFCOLS01"
+# number of rows and size of the chunk payload
+CHUNK_HEADER = struct.Struct("<II")
+STRING_DTYPE = "str"
+BOOL_DTYPE = "|b1"
+STRING_LENGTH_DTYPE = np.dtype("<u4")
+
+
+def get_columnar_file(csv_file: str) -> str:
+    """The columnar counterpart of a csv results file."""
+    return os.path.splitext(csv_file)[0] + COLUMNAR_FILE_SUFFIX
+
+
+def get_column_dtypes(model_type: Type[BaseModel]) -> Dict[str, str]:
+    dtypes = {}
+    for name, field in model_type.model_fields.items():
+        if field.annotation is bool:
+            dtypes[name] = BOOL_DTYPE
+        elif field.annotation is int:
+            dtypes[name] = "<i8"
+        elif field.annotation is float:
+            dtypes[name] = "<f8"
+        else:
+            dtypes[name] = STRING_DTYPE
+    return dtypes
+
+
+def infer_column_dtypes(df: pd.DataFrame) -> Dict[str, str]:
+    dtypes = {}
+    for name, dtype in df.dtypes.items():
+        if pd.api.types.is_bool_dtype(dtype):
+            dtypes[str(name)] = BOOL_DTYPE
+        elif pd.api.types.is_integer_dtype(dtype):
+            dtypes[str(name)] = "<i8"
+        elif pd.api.types.is_float_dtype(dtype):
+            dtypes[str(name)] = "<f8"
+        else:
+            dtypes[str(name)] = STRING_DTYPE
+    return dtypes
+
+
+def encode_manifest(dtypes: Dict[str, str]) -> bytes:
+    manifest = json.dumps(
+        {"columns": [{"name": name, "dtype": dtype} for name, dtype in dtypes.items()]}
+    ).encode()
+    return FILE_HEADER.pack(MAGIC, len(manifest)) + manifest
+
+
+def encode_column(values: List[Any], dtype: str) -> bytes:
+    if dtype != STRING_DTYPE:
+        return np.asarray(values, dtype=dtype).tobytes()
+    encoded = [("" if value is None else str(value)).encode() for value in values]
+    lengths = np.fromiter(
+        (len(value) for value in encoded), dtype=STRING_LENGTH_DTYPE, count=len(values)
+    )
+    return lengths.tobytes() + b"".join(encoded)
+
+
+def encode_chunk(rows: List[Dict[str, Any]], dtypes: Dict[str, str]) -> bytes:
+    """Encode rows column by column: fixed width values, or lengths followed by utf-8 strings."""
+    payload = b"".join(
+        encode_column([row.get(name) for row in rows], dtype)
+        for name, dtype in dtypes.items()
+    )
+    return CHUNK_HEADER.pack(len(rows), len(payload)) + payload
+
+
+def read_manifest(f: BinaryIO) -> Tuple[Dict[str, str], int]:
+    """The column dtypes of an open columnar file and the offset of its first chunk."""
+    f.seek(0)
+    magic, manifest_length = FILE_HEADER.unpack(f.read(FILE_HEADER.size))
+    if magic != MAGIC:
+        raise ValueError("Not a tokenflood columnar file.")
+    manifest = json.loads(f.read(manifest_length))
+    dtypes = {column["name"]: column["dtype"] for column in manifest["columns"]}
+    return dtypes, FILE_HEADER.size + manifest_length
+
+
+def read_chunk(
+    f: BinaryIO,
+    num_rows: int,
+    dtypes: Dict[str, str],
+    selected: Optional[Collection[str]] = None,
+) -> Dict[str, np.ndarray]:
+    """Read the columns of the chunk payload at the current position.
+
+    The payloads of the columns that are not selected are seeked past, only
+    the lengths of their strings are read."""
+    columns = {}
+    for name, dtype in dtypes.items():
+        skip = selected is not None and name not in selected
+        if dtype != STRING_DTYPE:
+            size = num_rows * np.dtype(dtype).itemsize
+            if skip:
+                f.seek(size, os.SEEK_CUR)
+                continue
+            columns[name] = np.frombuffer(f.read(size), dtype=dtype, count=num_rows)
+            continue
+        lengths = np.frombuffer(
+            f.read(num_rows * STRING_LENGTH_DTYPE.itemsize),
+            dtype=STRING_LENGTH_DTYPE,
+            count=num_rows,
+        )
+        if skip:
+            f.seek(int(lengths.sum()), os.SEEK_CUR)
+            continue
+        payload = f.read(int(lengths.sum()))
+        strings = []
+        offset = 0
+        for length in lengths.tolist():
+            strings.append(payload[offset : offset + length].decode())
+            offset += length
+        columns[name] = np.array(strings, dtype=object)
+    return columns
+
+
+def read_chunks(
+    f: BinaryIO,
+    offset: int,
+    end: int,
+    dtypes: Dict[str, str],
+    selected: Optional[Collection[str]] = None,
+) -> Tuple[List[Dict[str, np.ndarray]], int]:
+    """Read the complete chunks between offset and end of an open columnar file.
+
+    Returns them with the offset after the last one. A chunk that is cut off
+    at the end, because it is still being written, is left for a later read."""
+    chunks = []
+    while offset + CHUNK_HEADER.size <= end:
+        f.seek(offset)
+        num_rows, payload_size = CHUNK_HEADER.unpack(f.read(CHUNK_HEADER.size))
+        if offset + CHUNK_HEADER.size + payload_size > end:
+            break
+        chunks.append(read_chunk(f, num_rows, dtypes, selected))
+        offset += CHUNK_HEADER.size + payload_size
+    return chunks, offset
+
+
+def select_dtypes(
+    dtypes: Dict[str, str], selected: Optional[Collection[str]] = None
+) -> Dict[str, str]:
+    return {
+        name: dtype
+        for name, dtype in dtypes.items()
+        if selected is None or name in selected
+    }
+
+
+def make_columnar_frame(
+    dtypes: Dict[str, str], chunks: List[Dict[str, np.ndarray]]
+) -> pd.DataFrame:
+    data = {}
+    for name, dtype in dtypes.items():
+        if chunks:
+            data[name] = np.concatenate([chunk[name] for chunk in chunks])
+        else:
+            data[name] = np.array([], dtype=object if dtype == STRING_DTYPE else dtype)
+    return pd.DataFrame(data)
+
+
+def read_columnar(path: str, columns: Optional[Collection[str]] = None) -> pd.DataFrame:
+    """Read a columnar file, only reading the given columns if any are given.
+
+    Requested columns the file does not have are left out."""
+    with open(path, "rb") as f:
+        dtypes, offset = read_manifest(f)
+        chunks, _ = read_chunks(
+            f, offset, os.fstat(f.fileno()).st_size, dtypes, columns
+        )
+    return make_columnar_frame(select_dtypes(dtypes, columns), chunks)
+
+
+def write_columnar(
+    path: str, df: pd.DataFrame, dtypes: Optional[Dict[str, str]] = None
+):
+    dtypes = dtypes or infer_column_dtypes(df)
+    rows = cast(List[Dict[str, Any]], df.to_dict("records"))
+    with open(path, "wb") as f:
+        f.write(encode_manifest(dtypes))
+        for start in range(0, len(rows), COLUMNAR_CHUNK_ROWS):
+            f.write(encode_chunk(rows[start : start + COLUMNAR_CHUNK_ROWS], dtypes))
+
+
+def convert_csv_to_columnar(csv_file: str) -> str:
+    """Write the columnar counterpart of an existing csv results file."""
+    df = pd.read_csv(csv_file)
+    dtypes = infer_column_dtypes(df)
+    for name, dtype in dtypes.items():
+        if dtype == STRING_DTYPE:
+            df[name] = df[name].fillna("")
+    columnar_file = get_columnar_file(csv_file)
+    write_columnar(columnar_file, df, dtypes)
+    return columnar_file
@@ -0,0 +1,213 @@
+import asyncio
+import logging
+import time
+from typing import Callable, Set
+
+from tqdm import tqdm
+
+from tokenflood.constants import ERROR_RING_BUFFER_SIZE, GROUP_ID
+from tokenflood.io import IOContext
+from tokenflood.logging_utils import global_warn_once_filter
+from tokenflood.models.data.error_data import ErrorContext
+from tokenflood.models.data.llm_request_data import (
+    LLMRequestContext,
+    LLMRequestResult,
+)
+from tokenflood.models.endpoint_spec import EndpointSpec
+from tokenflood.models.run_specs.concurrency_test_spec import (
+    ConcurrencyTestPhase,
+    ConcurrencyTestSpec,
+)
+from tokenflood.native_client import close_native_session
+from tokenflood.runner import (
+    get_warm_session,
+    handle_llm_result,
+    send_llm_request,
+    NetworkLatencySampler,
+)
+from tokenflood.util import get_exact_date_str
+
+log = logging.getLogger(__name__)
+
+
+class PhaseThroughput:
+    """Counts the completed requests of a phase since its start."""
+
+    def __init__(self, start_time: float):
+        self.start_time = start_time
+        self.num_completed = 0
+
+    def record_completion(self):
+        self.num_completed += 1
+
+    @property
+    def requests_per_second(self) -> float:
+        elapsed = time.monotonic() - self.start_time
+        if elapsed <= 0:
+            return 0.0
+        return self.num_completed / elapsed
+
+
+def handle_closed_loop_result(
+    io_context: IOContext,
+    llm_request_context: LLMRequestContext,
+    error_context: ErrorContext,
+    throughput: PhaseThroughput,
+    pbar: tqdm,
+) -> Callable[[asyncio.Task[LLMRequestResult]], None]:
+    """Callback recording a result and counting its completion."""
+
+    def on_done(task: asyncio.Task[LLMRequestResult]):
+        throughput.record_completion()
+        handle_llm_result(io_context, llm_request_context, error_context)(task)
+        pbar.update()
+
+    return on_done
+
+
+def make_test_description(
+    concurrency_test_spec: ConcurrencyTestSpec,
+    phase: int,
+    concurrency_test_phase: ConcurrencyTestPhase,
+) -> str:
+    return f"Concurrency test {concurrency_test_spec.name} phase {phase}: {concurrency_test_phase.concurrency} concurrent requests"
+
+
+async def run_concurrency_test_phase(
+    test_description: str,
+    phase: int,
+    concurrency_test_spec: ConcurrencyTestSpec,
+    concurrency_phase: ConcurrencyTestPhase,
+    endpoint_spec: EndpointSpec,
+    io_context: IOContext,
+) -> bool:
+    """Keep a fixed number of requests in flight for the duration of the phase.
+
+    A new request is sent as soon as one completes. There is no target
+    request rate, so requests_per_second_phase is recorded as 0. The
+    throughput the phase achieved, its completed requests per second, is
+    recorded once the phase is over."""
+    load_type = concurrency_test_spec.load_type
+    message_lists = load_type.iter_message_lists(stream=(phase,))
+    concurrency = concurrency_phase.concurrency
+    error_threshold_tripped = False
+    error_rate = 0.0
+    request_number = 0
+    llm_request_tasks: Set[asyncio.Task] = set()
+
+    pbar = tqdm(desc=test_description, unit="requests")
+    start_time = time.monotonic()
+    end_time = start_time + concurrency_phase.duration_seconds
+    throughput = PhaseThroughput(start_time)
+    error_context = ErrorContext(requests_per_second_phase=0.0, group_id=phase)
+    sampler = NetworkLatencySampler(endpoint_spec, io_context, error_context)
+    sampler.start()
+    while (now := time.monotonic()) < end_time:
+        error_rate = io_context.error_rate()
+        pbar.set_postfix(
+            {
+                "error rate": round(error_rate, 2),
+                "throughput": f"{throughput.requests_per_second:.2f} requests/s",
+            }
+        )
+        if error_rate > concurrency_test_spec.error_limit:
+            error_threshold_tripped = True
+            break
+        while len(llm_request_tasks) < concurrency:
+            message_list = next(message_lists)
+            request_context = LLMRequestContext(
+                datetime=get_exact_date_str(),
+                expected_input_tokens=load_type.get_expected_prompt_length(),
+                expected_prefix_tokens=load_type.get_expected_prefix_length(),
+                expected_output_tokens=load_type.get_expected_output_length(),
+                requests_per_second_phase=0.0,
+                concurrency=concurrency,
+                request_number=request_number,
+                model=endpoint_spec.provider_model_str,
+                prompt=message_list[0]["content"],
+                group_id=phase,
+            )
+            t = asyncio.create_task(
+                send_llm_request(
+                    endpoint_spec,
+                    message_list,
+                    load_type.get_expected_output_length(),
+                )
+            )
+            t.add_done_callback(
+                handle_closed_loop_result(
+                    io_context, request_context, error_context, throughput, pbar
+                )
+            )
+            llm_request_tasks.add(t)
+            t.add_done_callback(llm_request_tasks.discard)
+            request_number += 1
+        await asyncio.wait(
+            llm_request_tasks,
+            timeout=min(end_time - now, 1.0),
+            return_when=asyncio.FIRST_COMPLETED,
+        )
+    # completions during the phase, not of the requests still in flight at its end
+    requests_per_second = throughput.requests_per_second
+    log.info(
+        f"Completed {throughput.num_completed} requests at "
+        f"{requests_per_second:.2f} requests/s "
+        f"with {concurrency} requests in flight."
+    )
+    log.info("Waiting for all requests to come back.")
+    while llm_request_tasks:
+        await asyncio.sleep(1.0)
+    await sampler.stop()
+    pbar.close()
+    io_context.write_throughput({GROUP_ID: phase, "throughput": requests_per_second})
+
+    # make sure all data can be flushed
+    await io_context.wait_for_pending_writes()
+    if error_threshold_tripped:
+        log.error(
+            f"Aborting the phase because the error rate exceeded {int(error_rate * 100)}% for the last {ERROR_RING_BUFFER_SIZE} requests."
+        )
+    else:
+        log.info("Finished the phase.")
+    return error_threshold_tripped
+
+
+async def run_concurrency_test(
+    endpoint_spec: EndpointSpec,
+    concurrency_test_spec: ConcurrencyTestSpec,
+    io_context: IOContext,
+):
+    io_context.activate()
+    await io_context.wait_for_pending_writes()
+    log.info("Warming up.")
+    error = await get_warm_session(
+        endpoint_spec,
+        io_context,
+        concurrency=concurrency_test_spec.concurrency_levels[0],
+        num_generation_tokens=concurrency_test_spec.load_type.get_expected_output_length(),
+    )
+    if error:
+        log.error(f"Not starting run due to error during warmup: {error}")
+        # letting any writes finish
+        await io_context.wait_for_pending_writes()
+        await close_native_session()
+        return
+    for i, concurrency_phase in enumerate(
+        concurrency_test_spec.create_concurrency_test_phases()
+    ):
+        test_description = make_test_description(
+            concurrency_test_spec, i + 1, concurrency_phase
+        )
+        error_threshold_tripped = await run_concurrency_test_phase(
+            test_description,
+            i,
+            concurrency_test_spec,
+            concurrency_phase,
+            endpoint_spec,
+            io_context,
+        )
+        if error_threshold_tripped:
+            log.error("Ending the run because the error threshold was tripped.")
+            break
+        global_warn_once_filter.clear()
+    await close_native_session()
@@ -4,9 +4,79 @@ NETWORK_LATENCY_FILE = "network_latency.csv"
 ENDPOINT_SPEC_FILE = "endpoint.yml"
 LOAD_TEST_SPEC_FILE = "load_test.yml"
 OBSERVATION_SPEC_FILE = "observation.yml"
+CONCURRENCY_TEST_SPEC_FILE = "concurrency_test.yml"
+SATURATION_SEARCH_SPEC_FILE = "saturation_search.yml"
+SEARCH_SUMMARY_FILE = "search_summary.json"
+ADAPTIVE_LOAD_TEST_SPEC_FILE = "adaptive_load_test.yml"
 ERROR_FILE = "errors.csv"
+TOKEN_ARRIVALS_FILE = "token_arrivals.bin"
+TEXT_BLOBS_FILE = "texts.blobs"
+SUMMARY_FILE = "summary.json"
+# index of the runs in a results folder
+CATALOG_FILE = "catalog.sqlite"
+# how long to wait for a catalog locked by another writer
+CATALOG_TIMEOUT_SECONDS = 30
+# suffix of the columnar copy of a csv results file
+COLUMNAR_FILE_SUFFIX = ".columns"
+COLUMNAR_CHUNK_ROWS = 256
+# number of growing csv files whose parsed rows the visualization keeps
+CSV_TAIL_READER_CACHE_SIZE = 128
+# folders modified this recently are checked again by the run index,
+# since later changes within the resolution of their mtime would go unnoticed
+RUN_INDEX_SETTLE_SECONDS = 2
 REQUESTS_PER_SECOND_COLUMN_NAME = "requests_per_second_at_the_time"
 
+LLM_REQUEST_RECORD = "llm_request"
+NETWORK_LATENCY_RECORD = "network_latency"
+ERROR_RECORD = "error"
+TOKEN_ARRIVALS_RECORD = "token_arrivals"
+THROUGHPUT_RECORD = "throughput"
+
+WORKER_PHASE_START_DELAY_SECONDS = 1.0
+WORKER_RESULT_BATCH_SIZE = 256
+
+AGENT_DEFAULT_PORT = 7777
+AGENT_MESSAGE_SIZE_LIMIT = 64 * 1024 * 1024
+AGENT_PHASE_START_DELAY_SECONDS = 2.0
+AGENT_ERROR_RATE_UPDATE_INTERVAL_SECONDS = 0.25
+# buffered bytes on a connection above which the agent stops sending requests
+AGENT_WRITE_BUFFER_LIMIT = 16 * 1024 * 1024
+# shared secret the coordinator has to present to the agents
+AGENT_TOKEN_ENV_VAR = "TOKENFLOOD_AGENT_TOKEN"
+CLOCK_SYNC_ROUNDS = 10
+CLOCK_OFFSET_WARNING_LIMIT_SECONDS = 0.5
+
+NATIVE_CLIENT_TIMEOUT_SECONDS = 600
+
+# ways of sampling the network latency to an endpoint
+PING_METHOD_TCP = "tcp"
+PING_METHOD_TLS = "tls"
+PING_METHOD_OPTIONS = "options"
+PING_TIMEOUT_SECONDS = 10
+
+# warm-up of the connection pool before a run
+WARMUP_GENERATION_TOKENS = 20
+# headroom over the mean number of requests in flight for its fluctuations
+WARMUP_CONCURRENCY_HEADROOM = 1.5
+WARMUP_MAX_CONNECTIONS = 500
+
+SINK_FLUSH_MAX_ITEMS = 1000
+SINK_FLUSH_MAX_BYTES = 1024 * 1024
+SINK_FLUSH_INTERVAL_SECONDS = 0.25
+
+# llm request fields whose texts are moved into the text blob file
+TEXT_BLOB_FIELDS = ("prompt", "generated_text", "generated_reasoning")
+DEFAULT_TEXT_COMPRESSION = "gzip"
+
+WRITER_OPEN = "open"
+WRITER_WRITE = "write"
+WRITER_CLOSE = "close"
+WRITER_FLUSH = "flush"
+WRITER_CALL = "call"
+WRITER_STOP = "stop"
+# names the catalog writes in the file writer thread's logs
+CATALOG_WRITE_DESTINATION = "results catalog"
+
 CLIENT_SESSION_INIT_BACKUP_ATTR = "_tokenflood_init_backup"
 
 COMMON_RESULT_FILES = {
@@ -20,14 +90,56 @@ LOAD_TEST_RESULT_FILES = {LOAD_TEST_SPEC_FILE}
 
 OBSERVATION_RESULT_FILES = {OBSERVATION_SPEC_FILE}
 
+CONCURRENCY_TEST_RESULT_FILES = {CONCURRENCY_TEST_SPEC_FILE}
+
+SATURATION_SEARCH_RESULT_FILES = {SATURATION_SEARCH_SPEC_FILE}
+
+ADAPTIVE_LOAD_TEST_RESULT_FILES = {ADAPTIVE_LOAD_TEST_SPEC_FILE}
+
+# spec files of the run types, searches and adaptive load tests before load tests
+RUN_SPEC_FILES = (
+    SATURATION_SEARCH_SPEC_FILE,
+    ADAPTIVE_LOAD_TEST_SPEC_FILE,
+    LOAD_TEST_SPEC_FILE,
+    OBSERVATION_SPEC_FILE,
+    CONCURRENCY_TEST_SPEC_FILE,
+)
+
 WARNING_LIMIT = 0.1
 WARNING_LIMIT_PERCENTAGE = WARNING_LIMIT * 100
 DEFAULT_ERROR_RATE_LIMIT = 0.3
 ERROR_RING_BUFFER_SIZE = 30
+SEND_LAG_WARNING_LIMIT_MS = 100
+# completed requests needed in the window before the adaptive rate is adjusted
+ADAPTIVE_MIN_WINDOW_SAMPLES = 5
 
 DEFAULT_PERCENTILES_STR = "95,99"
 
+# percentiles listed in the per group summaries of a run
+SUMMARY_PERCENTILES = (50, 75, 90, 95, 99)
+# bound on the relative error of the quantiles of a latency histogram
+HISTOGRAM_RELATIVE_ERROR = 0.01
+# summarized fields per results file
+SUMMARY_METRIC_FIELDS = {
+    LLM_REQUESTS_FILE: (
+        "latency",
+        "time_to_first_token",
+        "decoding_latency",
+        "average_time_per_output_token",
+        "inter_token_latency_p50",
+        "inter_token_latency_p99",
+        "max_stall",
+        "dns_latency",
+        "connect_latency",
+        "tls_handshake_latency",
+        "time_to_headers",
+        "requests_per_second_phase",
+    ),
+    NETWORK_LATENCY_FILE: ("latency",),
+}
+
 DEFAULT_HEURISTIC_TASK = "Task: Write a 3-page essay on Popperian falsification."
 DEFAULT_PROMPT_FILLER_TOKENS = tuple([" " + chr(c) for c in range(65, 91)])
+PROMPT_BATCH_SIZE = 64
 GROUP_ID = "group_id"
 PERCENTILE_PREFIX = "p"
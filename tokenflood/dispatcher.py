@@ -0,0 +1,98 @@
+import asyncio
+import time
+from typing import Callable, List, Optional, Self
+
+import numpy as np
+
+from tokenflood.models.run_specs.load_test_spec import LoadTestPhaseShard
+from tokenflood.schedule import create_send_offsets
+
+
+class DeadlineDispatcher:
+    """Paces requests along absolute send deadlines on the monotonic clock.
+
+    Sleeping until the next deadline instead of sleeping for the next pause
+    keeps per-request overhead from adding up over the course of a phase.
+    The lateness of every send is recorded to detect a generator that
+    cannot keep up with the schedule."""
+
+    def __init__(self, send_offsets: List[float], end_offset: Optional[float] = None):
+        self.send_offsets = send_offsets
+        self.end_offset = (
+            end_offset
+            if end_offset is not None
+            else (send_offsets[-1] if send_offsets else 0.0)
+        )
+        self.start_time: Optional[float] = None
+        self.send_times: List[float] = []
+        self.send_lags: List[float] = []
+
+    @classmethod
+    def from_shard(cls, shard: LoadTestPhaseShard) -> Self:
+        return cls(list(shard.send_offsets), shard.end_offset)
+
+    @classmethod
+    def from_schedule(cls, schedule: List[float]) -> Self:
+        return cls(create_send_offsets(schedule), float(sum(schedule)))
+
+    def start(self, start_time: Optional[float] = None):
+        """Anchor all deadlines at the given monotonic time (default: now)."""
+        self.start_time = time.monotonic() if start_time is None else start_time
+
+    def deadline(self, idx: int) -> float:
+        """Monotonic deadline of the idx-th send. Indices past the last send map to the end of the phase."""
+        if self.start_time is None:
+            raise RuntimeError("Dispatcher has to be started before using deadlines.")
+        return self.start_time + self.send_offset(idx)
+
+    def send_offset(self, idx: int) -> float:
+        """Planned send time of the idx-th send relative to the phase start."""
+        if idx < len(self.send_offsets):
+            return self.send_offsets[idx]
+        return self.end_offset
+
+    async def wait_for_send_slot(self, idx: int):
+        delay = self.deadline(idx) - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def record_send(self, idx: int) -> float:
+        """Record that the idx-th send happened now and return its lateness in ms."""
+        now = time.monotonic()
+        lag = max(0.0, (now - self.deadline(idx)) * 1000)
+        self.send_times.append(now)
+        self.send_lags.append(lag)
+        return lag
+
+    @property
+    def num_sent(self) -> int:
+        return len(self.send_times)
+
+    @property
+    def achieved_requests_per_second(self) -> float:
+        """Rate of the sends over the intervals between them, 0 with fewer than two sends."""
+        if self.num_sent < 2:
+            return 0.0
+        elapsed = self.send_times[-1] - self.send_times[0]
+        if elapsed <= 0:
+            return 0.0
+        return (self.num_sent - 1) / elapsed
+
+    @property
+    def mean_send_lag(self) -> float:
+        if not self.send_lags:
+            return 0.0
+        return float(np.mean(self.send_lags))
+
+    @property
+    def max_send_lag(self) -> float:
+        if not self.send_lags:
+            return 0.0
+        return float(np.max(self.send_lags))
+
+
+def monotonic_from_timestamp(
+    timestamp: float, clock: Callable[[], float] = time.time
+) -> float:
+    """Convert a timestamp of the given wall clock into the equivalent point on this process' monotonic clock."""
+    return time.monotonic() + (timestamp - clock())
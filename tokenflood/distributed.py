@@ -0,0 +1,410 @@
+import asyncio
+import hmac
+import ipaddress
+import json
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Self, Tuple
+
+from tokenflood.constants import (
+    AGENT_ERROR_RATE_UPDATE_INTERVAL_SECONDS,
+    AGENT_MESSAGE_SIZE_LIMIT,
+    AGENT_PHASE_START_DELAY_SECONDS,
+    AGENT_TOKEN_ENV_VAR,
+    AGENT_WRITE_BUFFER_LIMIT,
+    CLOCK_OFFSET_WARNING_LIMIT_SECONDS,
+    CLOCK_SYNC_ROUNDS,
+)
+from tokenflood.dispatcher import monotonic_from_timestamp
+from tokenflood.io import ForwardingIOContext, IOContext
+from tokenflood.logging_utils import global_warn_once_filter
+from tokenflood.models.endpoint_spec import EndpointSpec
+from tokenflood.models.run_specs.load_test_spec import (
+    LoadTestPhaseShard,
+    LoadTestSpec,
+)
+from tokenflood.native_client import close_native_session
+from tokenflood.runner import warm_up_for_load_test
+from tokenflood.util import shift_exact_date_str
+from tokenflood.workers import (
+    PHASE_DONE,
+    READY,
+    ShardResultCollector,
+    make_failed_phase_result,
+    run_shard,
+    run_sharded_load_test_phases,
+)
+
+log = logging.getLogger(__name__)
+
+CLOCK = "clock"
+SETUP = "setup"
+SHARD = "shard"
+ERROR_RATE = "error_rate"
+STOP = "stop"
+RECORD = "record"
+
+
+def parse_agent_address(address: str) -> Tuple[str, int]:
+    host, sep, port = address.rpartition(":")
+    if not sep or not host or not port.isdigit():
+        raise ValueError(f"Invalid agent address {address}. Must be of form host:port.")
+    return host, int(port)
+
+
+def is_loopback_host(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def is_valid_agent_token(token: Optional[str], expected_token: Optional[str]) -> bool:
+    if expected_token is None:
+        return True
+    return token is not None and hmac.compare_digest(
+        token.encode(), expected_token.encode()
+    )
+
+
+class MessageStream:
+    """Newline delimited JSON messages over a TCP connection.
+
+    Messages are buffered until the connection takes them. Senders await
+    drain() to wait for the buffer to fall below its limit again."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        writer.transport.set_write_buffer_limits(high=AGENT_WRITE_BUFFER_LIMIT)
+
+    async def drain(self):
+        await self.writer.drain()
+
+    @classmethod
+    async def connect(cls, address: str) -> Self:
+        host, port = parse_agent_address(address)
+        reader, writer = await asyncio.open_connection(
+            host, port, limit=AGENT_MESSAGE_SIZE_LIMIT
+        )
+        return cls(reader, writer)
+
+    def send(self, message_type: str, **payload: Any):
+        message = {"type": message_type, **payload}
+        self.writer.write(json.dumps(message).encode() + b"\n")
+
+    async def receive(self) -> Optional[Dict[str, Any]]:
+        """Return the next message or None if the other side closed the connection."""
+        line = await self.reader.readline()
+        if not line:
+            return None
+        return json.loads(line)
+
+    async def close(self):
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+class AgentSession:
+    """Serves a single coordinator connection on the agent side.
+
+    With a token, the setup is only accepted from a coordinator presenting
+    the same token."""
+
+    def __init__(
+        self,
+        stream: MessageStream,
+        clock: Callable[[], float] = time.time,
+        token: Optional[str] = None,
+    ):
+        self.stream = stream
+        self.clock = clock
+        self.token = token
+        self.clock_offset = 0.0
+        self.error_rate = 0.0
+        self.endpoint_spec: Optional[EndpointSpec] = None
+        self.load_test_spec: Optional[LoadTestSpec] = None
+        # a slow link to the coordinator holds back the requests of the shards
+        self.io_context = ForwardingIOContext(
+            self.forward_record, self.get_error_rate, self.stream.drain
+        )
+        self.shard_tasks: set[asyncio.Task] = set()
+
+    def get_error_rate(self) -> float:
+        return self.error_rate
+
+    def forward_record(self, record_type: str, data: Dict):
+        self.stream.send(RECORD, record_type=record_type, data=data)
+
+    async def run(self):
+        try:
+            while (message := await self.stream.receive()) is not None:
+                if message["type"] == STOP:
+                    break
+                await self.handle(message)
+        finally:
+            for task in self.shard_tasks:
+                task.cancel()
+            await close_native_session()
+            await self.stream.close()
+
+    async def handle(self, message: Dict[str, Any]):
+        message_type = message["type"]
+        if message_type == CLOCK:
+            self.stream.send(CLOCK, time=self.clock())
+        elif message_type == SETUP:
+            if not is_valid_agent_token(message.get("token"), self.token):
+                log.warning("Rejected a setup with a missing or wrong agent token.")
+                self.stream.send(
+                    READY,
+                    error=f"The agent rejected the setup: {AGENT_TOKEN_ENV_VAR} "
+                    "does not match the agent's token.",
+                )
+                return
+            self.endpoint_spec = EndpointSpec.model_validate(message["endpoint_spec"])
+            self.load_test_spec = LoadTestSpec.model_validate(message["load_test_spec"])
+            self.clock_offset = message["clock_offset"]
+            log.info(
+                f"Warming up for load test {self.load_test_spec.name} "
+                f"against {self.endpoint_spec.provider_model_str}."
+            )
+            error = await warm_up_for_load_test(
+                self.endpoint_spec,
+                self.load_test_spec,
+                self.io_context,
+                message.get("num_agents", 1),
+            )
+            self.stream.send(READY, error=error)
+        elif message_type == SHARD:
+            shard = LoadTestPhaseShard.model_validate(message["shard"])
+            task = asyncio.create_task(self.run_shard(shard))
+            self.shard_tasks.add(task)
+            task.add_done_callback(self.shard_tasks.discard)
+        elif message_type == ERROR_RATE:
+            self.error_rate = message["value"]
+        else:
+            raise ValueError(f"Unknown message type: {message_type}")
+
+    async def run_shard(self, shard: LoadTestPhaseShard):
+        """Run a shard and report its stats, or the error it failed with."""
+        try:
+            phase_result = await self.dispatch_shard(shard)
+        except Exception as e:
+            log.exception(f"Phase {shard.phase + 1} failed.")
+            phase_result = make_failed_phase_result(f"{type(e).__name__}: {e}")
+        self.stream.send(PHASE_DONE, **phase_result)
+        await self.stream.drain()
+        global_warn_once_filter.clear()
+
+    async def dispatch_shard(self, shard: LoadTestPhaseShard) -> Dict[str, Any]:
+        if self.endpoint_spec is None or self.load_test_spec is None:
+            raise RuntimeError("Received a shard before the setup.")
+        log.info(
+            f"Running {len(shard.request_numbers)} requests of phase {shard.phase + 1}."
+        )
+        # the start time is given on the coordinator's clock
+        start_time = monotonic_from_timestamp(
+            shard.start_time + self.clock_offset, self.clock
+        )
+        return await run_shard(
+            self.endpoint_spec,
+            self.load_test_spec,
+            shard,
+            self.io_context,
+            start_time,
+        )
+
+
+async def start_agent(
+    host: str,
+    port: int,
+    clock: Callable[[], float] = time.time,
+    token: Optional[str] = None,
+) -> asyncio.Server:
+    """Start an agent server that serves one coordinator at a time.
+
+    Without a token, it only listens on loopback interfaces, since anyone who
+    can connect makes it send requests with its API keys to any url."""
+    if token is None and not is_loopback_host(host):
+        raise ValueError(
+            f"Set {AGENT_TOKEN_ENV_VAR} on the agent and the coordinator "
+            f"to listen on {host}, or listen on 127.0.0.1 only."
+        )
+    lock = asyncio.Lock()
+
+    async def handle_connection(
+        reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        peer = writer.get_extra_info("peername")
+        async with lock:
+            log.info(f"Coordinator connected from {peer}.")
+            await AgentSession(MessageStream(reader, writer), clock, token).run()
+            log.info(f"Coordinator {peer} disconnected.")
+
+    return await asyncio.start_server(
+        handle_connection, host, port, limit=AGENT_MESSAGE_SIZE_LIMIT
+    )
+
+
+async def serve_agent(host: str, port: int, token: Optional[str] = None):
+    server = await start_agent(host, port, token=token)
+    log.info(f"Agent listening on {host}:{port}.")
+    async with server:
+        await server.serve_forever()
+
+
+async def measure_clock_offset(
+    stream: MessageStream, rounds: int = CLOCK_SYNC_ROUNDS
+) -> float:
+    """Estimate how far the agent's clock is ahead of the local clock in seconds.
+
+    Uses the round trip with the lowest latency, assuming that the agent
+    read its clock halfway through it."""
+    best_rtt = float("inf")
+    offset = 0.0
+    for _ in range(rounds):
+        send_time = time.time()
+        stream.send(CLOCK)
+        message = await stream.receive()
+        receive_time = time.time()
+        if message is None or message["type"] != CLOCK:
+            raise RuntimeError("Agent did not answer the clock synchronization.")
+        rtt = receive_time - send_time
+        if rtt < best_rtt:
+            best_rtt = rtt
+            offset = message["time"] - (send_time + receive_time) / 2
+    return offset
+
+
+class AgentConnection:
+    def __init__(self, address: str, stream: MessageStream, clock_offset: float):
+        self.address = address
+        self.stream = stream
+        self.clock_offset = clock_offset
+        self.closed = False
+
+
+class AgentResultCollector(ShardResultCollector):
+    """Merges the records that agents stream back into the coordinator's IOContext.
+
+    Datetimes are moved from the agent's clock onto the coordinator's clock."""
+
+    def __init__(self, io_context: IOContext, agents: List[AgentConnection]):
+        super().__init__(io_context)
+        self.agents = agents
+        self.tasks: List[asyncio.Task] = []
+
+    def start(self):
+        self.tasks = [
+            asyncio.create_task(self._read(agent)) for agent in self.agents
+        ] + [asyncio.create_task(self._publish_error_rate())]
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+
+    async def _read(self, agent: AgentConnection):
+        while (message := await agent.stream.receive()) is not None:
+            message_type = message.pop("type")
+            if message_type == RECORD:
+                data = message["data"]
+                if "datetime" in data:
+                    data["datetime"] = shift_exact_date_str(
+                        data["datetime"], -agent.clock_offset
+                    )
+                self.handle_message(message["record_type"], data)
+            else:
+                self.handle_message(message_type, message)
+        agent.closed = True
+
+    async def _publish_error_rate(self):
+        while True:
+            await asyncio.sleep(AGENT_ERROR_RATE_UPDATE_INTERVAL_SECONDS)
+            for agent in self.agents:
+                if agent.closed:
+                    continue
+                agent.stream.send(ERROR_RATE, value=self.io_context.error_rate())
+                await agent.stream.drain()
+
+    def check_alive(self):
+        for agent in self.agents:
+            if agent.closed:
+                raise RuntimeError(
+                    f"Agent {agent.address} closed the connection unexpectedly."
+                )
+
+
+async def run_load_test_with_agents(
+    endpoint_spec: EndpointSpec,
+    load_test_spec: LoadTestSpec,
+    io_context: IOContext,
+    agent_addresses: List[str],
+    agent_token: Optional[str] = None,
+):
+    """Coordinate a load test whose requests are sent by remote agents.
+
+    Every agent receives one shard of each phase. The shards share a start
+    timestamp that each agent translates onto its own clock, using the
+    offset measured during the connection setup. The agent token is sent
+    along with the setup."""
+    io_context.activate()
+    await io_context.wait_for_pending_writes()
+    agents: List[AgentConnection] = []
+    try:
+        for address in agent_addresses:
+            stream = await MessageStream.connect(address)
+            clock_offset = await measure_clock_offset(stream)
+            agents.append(AgentConnection(address, stream, clock_offset))
+            log.info(
+                f"Connected to agent {address} with a clock offset of {clock_offset * 1000:.1f}ms."
+            )
+            if abs(clock_offset) > CLOCK_OFFSET_WARNING_LIMIT_SECONDS:
+                log.warning(
+                    f"The clock of agent {address} is off by {clock_offset:.2f}s. "
+                    "Datetimes are corrected, but consider synchronizing the clocks."
+                )
+        collector = AgentResultCollector(io_context, agents)
+        collector.start()
+
+        async def send_shards(shards: List[LoadTestPhaseShard]):
+            for agent, shard in zip(agents, shards):
+                agent.stream.send(SHARD, shard=shard.model_dump(mode="json"))
+                await agent.stream.drain()
+
+        try:
+            log.info(f"Warming up {len(agents)} agents.")
+            for agent in agents:
+                agent.stream.send(
+                    SETUP,
+                    endpoint_spec=endpoint_spec.model_dump(mode="json"),
+                    load_test_spec=load_test_spec.model_dump(mode="json"),
+                    clock_offset=agent.clock_offset,
+                    num_agents=len(agents),
+                    token=agent_token,
+                )
+            ready_messages = await collector.receive(READY, len(agents))
+            errors = [m["error"] for m in ready_messages if m["error"]]
+            if errors:
+                log.error(f"Not starting run due to error during warmup: {errors[0]}")
+                return
+            await run_sharded_load_test_phases(
+                load_test_spec,
+                collector,
+                send_shards,
+                len(agents),
+                AGENT_PHASE_START_DELAY_SECONDS,
+            )
+        finally:
+            await collector.stop()
+    finally:
+        for agent in agents:
+            if not agent.closed:
+                agent.stream.send(STOP)
+            await agent.stream.close()
+        await io_context.wait_for_pending_writes()
@@ -1,10 +1,28 @@
 import asyncio
 import csv
 import json
+import logging
 import os
+import queue
+import threading
+import time
 from collections import deque
+from functools import partial
 from io import StringIO
-from typing import Any, Callable, Dict, List, Set, Type, TypeVar, Iterable
+from typing import (
+    IO,
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    TypeVar,
+)
 
 import aiofiles
 import yaml
@@ -13,21 +31,60 @@ from jsonschema.exceptions import ValidationError
 from pydantic import BaseModel, TypeAdapter
 
 from tokenflood.constants import (
+    CATALOG_WRITE_DESTINATION,
+    ADAPTIVE_LOAD_TEST_RESULT_FILES,
     COMMON_RESULT_FILES,
+    RUN_SPEC_FILES,
+    COLUMNAR_CHUNK_ROWS,
+    CONCURRENCY_TEST_RESULT_FILES,
+    DEFAULT_TEXT_COMPRESSION,
+    ERROR_RECORD,
     ERROR_RING_BUFFER_SIZE,
+    LLM_REQUEST_RECORD,
+    NETWORK_LATENCY_RECORD,
+    THROUGHPUT_RECORD,
+    TOKEN_ARRIVALS_RECORD,
     OBSERVATION_RESULT_FILES,
     RESULTS_FOLDER,
+    SATURATION_SEARCH_RESULT_FILES,
     LOAD_TEST_RESULT_FILES,
+    SINK_FLUSH_INTERVAL_SECONDS,
+    SINK_FLUSH_MAX_BYTES,
+    SINK_FLUSH_MAX_ITEMS,
+    TEXT_BLOB_FIELDS,
+    WRITER_CALL,
+    WRITER_CLOSE,
+    WRITER_FLUSH,
+    WRITER_OPEN,
+    WRITER_STOP,
+    WRITER_WRITE,
+)
+from tokenflood.catalog import RunCatalogWriter
+from tokenflood.columnar import (
+    encode_manifest,
+    encode_chunk,
+    get_column_dtypes,
+    get_columnar_file,
 )
 from tokenflood.models.endpoint_spec import EndpointSpec
 from tokenflood.models.data.error_data import ErrorData
 from tokenflood.models.data.llm_request_data import LLMRequestData
 from tokenflood.models.message_list import MessageList, chat_schema
+from tokenflood.models.run_specs.adaptive_load_test_spec import AdaptiveLoadTestSpec
+from tokenflood.models.run_specs.concurrency_test_spec import ConcurrencyTestSpec
 from tokenflood.models.run_specs.observation_spec import ObservationSpec
+from tokenflood.models.run_specs.saturation_search_spec import SaturationSearchSpec
 from tokenflood.models.data.ping_request_data import PingData
+from tokenflood.models.data.summary_data import RunSummary
+from tokenflood.models.data.token_arrival_data import TokenArrivalData
 from tokenflood.models.run_specs.load_test_spec import LoadTestSpec
 from tokenflood.models.run_specs.typing import SpecificRunSpec
 from tokenflood.models.util import get_fields
+from tokenflood.summaries import RunSummaryCollector
+from tokenflood.text_blobs import TextBlobStore
+from tokenflood.token_arrivals import encode_token_arrivals
+
+log = logging.getLogger(__name__)
 
 T = TypeVar("T", bound=BaseModel)
 
@@ -116,6 +173,18 @@ def read_observation_spec(filename: str) -> ObservationSpec:
     return read_pydantic_yaml(ObservationSpec)(filename)
 
 
+def read_concurrency_test_spec(filename: str) -> ConcurrencyTestSpec:
+    return read_pydantic_yaml(ConcurrencyTestSpec)(filename)
+
+
+def read_saturation_search_spec(filename: str) -> SaturationSearchSpec:
+    return read_pydantic_yaml(SaturationSearchSpec)(filename)
+
+
+def read_adaptive_load_test_spec(filename: str) -> AdaptiveLoadTestSpec:
+    return read_pydantic_yaml(AdaptiveLoadTestSpec)(filename)
+
+
 def make_run_folder(run_name: str) -> str:
     run_folder = os.path.join(RESULTS_FOLDER, run_name)
     os.makedirs(run_folder)
@@ -202,55 +271,261 @@ def is_observation_result_folder(folder: str) -> bool:
 
 
 def is_load_test_result_folder(folder) -> bool:
+    """Load test results, including saturation searches and adaptive load tests."""
+    return folder_contains_files(folder, COMMON_RESULT_FILES) and (
+        folder_contains_files(folder, LOAD_TEST_RESULT_FILES)
+        or folder_contains_files(folder, SATURATION_SEARCH_RESULT_FILES)
+        or folder_contains_files(folder, ADAPTIVE_LOAD_TEST_RESULT_FILES)
+    )
+
+
+def is_concurrency_test_result_folder(folder) -> bool:
     return folder_contains_files(folder, COMMON_RESULT_FILES) and folder_contains_files(
-        folder, LOAD_TEST_RESULT_FILES
+        folder, CONCURRENCY_TEST_RESULT_FILES
     )
 
 
+def find_run_spec_file_name(folder: str) -> Optional[str]:
+    """Name of the spec file of a result folder, None if it is none."""
+    if not folder_contains_files(folder, COMMON_RESULT_FILES):
+        return None
+    for spec_file in RUN_SPEC_FILES:
+        if folder_contains_file(folder, spec_file):
+            return spec_file
+    return None
+
+
+class FileWriterThread:
+    """Writes to files on a single long-lived background thread.
+
+    The event loop only pays for putting an item on the queue. The thread
+    owns buffered file handles, opened on first use, and flushes them
+    whenever it has caught up with the queue."""
+
+    def __init__(self) -> None:
+        self.queue: queue.SimpleQueue[Tuple[str, str, Any]] = queue.SimpleQueue()
+        self.files: Dict[str, IO] = {}
+        self.error: Optional[BaseException] = None
+        self.thread = threading.Thread(
+            target=self._run, name="tokenflood-file-writer", daemon=True
+        )
+        self.thread.start()
+
+    def _get_file(self, destination: str, binary: bool) -> IO:
+        if destination not in self.files:
+            if binary:
+                self.files[destination] = open(destination, "wb")
+            else:
+                self.files[destination] = open(destination, "w", encoding="utf-8")
+        return self.files[destination]
+
+    def _handle(self, command: str, destination: str, payload: Any):
+        if command == WRITER_OPEN:
+            self._get_file(destination, payload)
+        elif command == WRITER_WRITE:
+            if callable(payload):
+                # deferred encoding, done here instead of on the event loop
+                payload = payload()
+            self._get_file(destination, isinstance(payload, bytes)).write(payload)
+        elif command == WRITER_CLOSE:
+            f = self.files.pop(destination, None)
+            if f is not None:
+                f.close()
+        elif command == WRITER_CALL:
+            payload()
+        elif command == WRITER_FLUSH:
+            self._flush()
+            payload(self.error)
+        else:
+            raise ValueError(f"Unknown file writer command: {command}")
+
+    def _flush(self):
+        for f in self.files.values():
+            f.flush()
+
+    def _run(self):
+        while True:
+            command, destination, payload = self.queue.get()
+            if command == WRITER_STOP:
+                break
+            try:
+                self._handle(command, destination, payload)
+                if self.queue.empty():
+                    self._flush()
+            except Exception as e:
+                log.exception(f"Writing to {destination} failed.")
+                self.error = e
+        for f in self.files.values():
+            f.close()
+        self.files.clear()
+
+    def open(self, destination: str, binary: bool):
+        self.queue.put((WRITER_OPEN, destination, binary))
+
+    def write(self, destination: str, item: str | bytes | Callable[[], str | bytes]):
+        self.queue.put((WRITER_WRITE, destination, item))
+
+    def close_file(self, destination: str):
+        self.queue.put((WRITER_CLOSE, destination, None))
+
+    def call(self, destination: str, function: Callable[[], None]):
+        """Run a write that does not go through a file handle, like a sqlite commit."""
+        self.queue.put((WRITER_CALL, destination, function))
+
+    async def flush(self) -> None:
+        """Wait until everything queued so far is flushed to the files."""
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[None] = loop.create_future()
+
+        def on_flushed(error: Optional[BaseException]):
+            loop.call_soon_threadsafe(resolve_future, future, error)
+
+        self.queue.put((WRITER_FLUSH, "", on_flushed))
+        await future
+
+    def stop(self):
+        """Write everything queued so far, close all files and end the thread."""
+        self.queue.put((WRITER_STOP, "", None))
+        self.thread.join()
+
+
+def resolve_future(future: asyncio.Future, error: Optional[BaseException]):
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(None)
+
+
 class FileSink:
-    def __init__(self, destination: str):
-        self.queue: asyncio.Queue[str | None] = asyncio.Queue()
+    """Writes items to a file in the background.
+
+    Queued items are coalesced into a single write that happens once
+    max_items or max_bytes are queued or flush_interval_seconds passed since
+    the first queued item, whichever comes first. Closing the sink or waiting
+    for pending writes flushes right away. Given a writer_thread, items are
+    handed to it instead."""
+
+    binary = False
+
+    def __init__(
+        self,
+        destination: str,
+        max_items: int = SINK_FLUSH_MAX_ITEMS,
+        max_bytes: int = SINK_FLUSH_MAX_BYTES,
+        flush_interval_seconds: float = SINK_FLUSH_INTERVAL_SECONDS,
+        writer_thread: Optional[FileWriterThread] = None,
+    ):
+        self.queue: asyncio.Queue[str | bytes | None] = asyncio.Queue()
         self.destination = destination
+        self.writer_thread = writer_thread
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.flush_interval_seconds = flush_interval_seconds
+        self.queued_bytes = 0
+        self.num_waiting = 0
+        self.flush_requested = asyncio.Event()
         self.consumer_task = None
         self.closed = False
 
+    def _open(self):
+        if self.binary:
+            return aiofiles.open(self.destination, "wb")
+        return aiofiles.open(self.destination, "w", encoding="utf-8")
+
+    def _should_flush(self) -> bool:
+        return (
+            self.closed
+            or self.num_waiting > 0
+            or self.queue.qsize() >= self.max_items
+            or self.queued_bytes >= self.max_bytes
+        )
+
+    def _take_batch(self, first_item: str | bytes | None) -> List[str | bytes | None]:
+        batch = [first_item]
+        while len(batch) < self.max_items and not self.queue.empty():
+            batch.append(self.queue.get_nowait())
+        self.queued_bytes -= sum(len(item) for item in batch if item is not None)
+        if not self._should_flush():
+            self.flush_requested.clear()
+        return batch
+
     async def _consume(self):
-        async with aiofiles.open(self.destination, "w", encoding="utf-8") as f:
+        async with self._open() as f:
             while True:
+                # the timer of a batch starts with its first item
+                first_item = await self.queue.get()
                 try:
-                    item = await asyncio.wait_for(self.queue.get(), timeout=2)
-                    if isinstance(item, str):
-                        await f.write(item)
-                        await f.flush()
-                        self.queue.task_done()
-                    else:
-                        self.queue.task_done()
-                        break
+                    await asyncio.wait_for(
+                        self.flush_requested.wait(), self.flush_interval_seconds
+                    )
                 except asyncio.TimeoutError:
                     pass
-
-    def write(self, item: str):
+                batch = self._take_batch(first_item)
+                items = [item for item in batch if item is not None]
+                if items:
+                    await f.write(items[0][:0].join(items))
+                    await f.flush()
+                for _ in batch:
+                    self.queue.task_done()
+                if len(items) < len(batch):
+                    break
+
+    def write(self, item: str | bytes):
         if self.closed:
             raise RuntimeError(
                 f"Cannot write to FileSink for {self.destination} that was already closed"
             )
+        if self.writer_thread is not None:
+            self.writer_thread.write(self.destination, item)
+            return
         self.queue.put_nowait(item)
+        self.queued_bytes += len(item)
+        if self._should_flush():
+            self.flush_requested.set()
+
+    def write_deferred(self, encode: Callable[[], str | bytes]):
+        """Write the item encode returns, calling it on the writer thread if there is one."""
+        if self.writer_thread is not None and not self.closed:
+            self.writer_thread.write(self.destination, encode)
+            return
+        self.write(encode())
 
     def close(self):
         self.closed = True
+        if self.writer_thread is not None:
+            self.writer_thread.close_file(self.destination)
+            return
         self.queue.put_nowait(None)
+        self.flush_requested.set()
 
     def activate(self):
+        if self.writer_thread is not None:
+            self.writer_thread.open(self.destination, self.binary)
+            return
         self.consumer_task = asyncio.create_task(self._consume())
 
     async def wait_for_pending_writes(self):
-        await self.queue.join()
+        if self.writer_thread is not None:
+            await self.writer_thread.flush()
+            return
+        self.num_waiting += 1
+        self.flush_requested.set()
+        try:
+            await self.queue.join()
+        finally:
+            self.num_waiting -= 1
         # await self.consumer_task
 
 
+class BinaryFileSink(FileSink):
+    binary = True
+
+
 class CSVFileSink(FileSink):
-    def __init__(self, destination: str, columns: List[str]):
-        super().__init__(destination)
+    def __init__(self, destination: str, columns: List[str], **kwargs: Any):
+        super().__init__(destination, **kwargs)
         self.columns = columns
         self.stringio = StringIO()
         self.writer = csv.DictWriter(self.stringio, fieldnames=columns)
@@ -277,6 +552,50 @@ class CSVFileSink(FileSink):
         self.stringio.truncate(0)
 
 
+class ColumnarFileSink(BinaryFileSink):
+    """Writes rows to a columnar file in chunks of chunk_rows rows.
+
+    Buffered rows are also written once they are flush_interval_seconds old
+    when the next row arrives, and when waiting for pending writes."""
+
+    def __init__(
+        self,
+        destination: str,
+        dtypes: Dict[str, str],
+        chunk_rows: int = COLUMNAR_CHUNK_ROWS,
+        **kwargs: Any,
+    ):
+        super().__init__(destination, **kwargs)
+        self.dtypes = dtypes
+        self.chunk_rows = chunk_rows
+        self.rows: List[Dict[str, Any]] = []
+        self.first_row_time = 0.0
+        self.write(encode_manifest(dtypes))
+
+    def write_dict(self, item: Dict[str, Any]):
+        if not self.rows:
+            self.first_row_time = time.monotonic()
+        self.rows.append(item)
+        if (
+            len(self.rows) >= self.chunk_rows
+            or time.monotonic() - self.first_row_time >= self.flush_interval_seconds
+        ):
+            self.flush()
+
+    def flush(self):
+        if self.rows:
+            self.write(encode_chunk(self.rows, self.dtypes))
+            self.rows = []
+
+    def close(self):
+        self.flush()
+        super().close()
+
+    async def wait_for_pending_writes(self):
+        self.flush()
+        await super().wait_for_pending_writes()
+
+
 class IOContext:
     def __init__(self):
         self.state_watch = deque(maxlen=ERROR_RING_BUFFER_SIZE)
@@ -295,50 +614,347 @@ class IOContext:
     def write_network_latency(self, data: Dict):
         raise NotImplementedError
 
+    def write_token_arrivals(self, data: Dict):
+        raise NotImplementedError
+
+    def write_throughput(self, data: Dict):
+        """Record the throughput a group achieved, once the group is done."""
+        raise NotImplementedError
+
     def activate(self):
         raise NotImplementedError
 
     async def wait_for_pending_writes(self):
         raise NotImplementedError
 
+    async def wait_for_capacity(self):
+        """Wait until the destination of the records can take more of them.
+
+        Load generators call it before every send, so that results piling up
+        slow down the sending instead of growing a buffer without limit."""
+        pass
+
     def close(self):
         raise NotImplementedError
 
 
+class ForwardingIOContext(IOContext):
+    """IOContext that hands every record to a callback instead of writing it.
+
+    Used by load generators that ship their results to another process or
+    machine. The error rate comes from the receiving side, so that the error
+    limit applies across all load generators."""
+
+    def __init__(
+        self,
+        forward: Callable[[str, Dict], None],
+        get_error_rate: Callable[[], float],
+        wait_for_capacity: Optional[Callable[[], Awaitable[None]]] = None,
+    ):
+        super().__init__()
+        self.forward = forward
+        self.get_error_rate = get_error_rate
+        self.wait_for_receiver = wait_for_capacity
+
+    async def wait_for_capacity(self):
+        if self.wait_for_receiver is not None:
+            await self.wait_for_receiver()
+
+    def error_rate(self) -> float:
+        return self.get_error_rate()
+
+    def write_error(self, data: Dict):
+        self.forward(ERROR_RECORD, data)
+
+    def write_llm_request(self, data: Dict):
+        self.forward(LLM_REQUEST_RECORD, data)
+
+    def write_network_latency(self, data: Dict):
+        self.forward(NETWORK_LATENCY_RECORD, data)
+
+    def write_token_arrivals(self, data: Dict):
+        self.forward(TOKEN_ARRIVALS_RECORD, data)
+
+    def write_throughput(self, data: Dict):
+        self.forward(THROUGHPUT_RECORD, data)
+
+    def activate(self):
+        pass
+
+    async def wait_for_pending_writes(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class ObservedIOContext(IOContext):
+    """IOContext that passes every record on to another one and to observers.
+
+    Used by run modes that adapt the load to the results as they come in."""
+
+    def __init__(
+        self,
+        io_context: IOContext,
+        on_llm_request: Callable[[Dict], None],
+        on_error: Callable[[Dict], None],
+    ):
+        super().__init__()
+        self.io_context = io_context
+        self.on_llm_request = on_llm_request
+        self.on_error = on_error
+
+    def error_rate(self) -> float:
+        return self.io_context.error_rate()
+
+    def write_error(self, data: Dict):
+        self.io_context.write_error(data)
+        self.on_error(data)
+
+    def write_llm_request(self, data: Dict):
+        self.io_context.write_llm_request(data)
+        self.on_llm_request(data)
+
+    def write_network_latency(self, data: Dict):
+        self.io_context.write_network_latency(data)
+
+    def write_token_arrivals(self, data: Dict):
+        self.io_context.write_token_arrivals(data)
+
+    def write_throughput(self, data: Dict):
+        self.io_context.write_throughput(data)
+
+    def activate(self):
+        self.io_context.activate()
+
+    async def wait_for_pending_writes(self):
+        await self.io_context.wait_for_pending_writes()
+
+    async def wait_for_capacity(self):
+        await self.io_context.wait_for_capacity()
+
+    def close(self):
+        self.io_context.close()
+
+
+def write_record(io_context: IOContext, record_type: str, data: Dict):
+    """Write a forwarded record into the matching sink of an IOContext."""
+    if record_type == LLM_REQUEST_RECORD:
+        io_context.write_llm_request(data)
+    elif record_type == NETWORK_LATENCY_RECORD:
+        io_context.write_network_latency(data)
+    elif record_type == ERROR_RECORD:
+        io_context.write_error(data)
+    elif record_type == TOKEN_ARRIVALS_RECORD:
+        io_context.write_token_arrivals(data)
+    elif record_type == THROUGHPUT_RECORD:
+        io_context.write_throughput(data)
+    else:
+        raise ValueError(f"Unknown record type: {record_type}")
+
+
 class FileIOContext(IOContext):
-    def __init__(self, llm_request_file, network_latency_file, error_file):
+    def __init__(
+        self,
+        llm_request_file,
+        network_latency_file,
+        error_file,
+        token_arrivals_file: Optional[str] = None,
+        writer_thread: Optional[FileWriterThread] = None,
+        text_blob_file: Optional[str] = None,
+        text_compression: str = DEFAULT_TEXT_COMPRESSION,
+        columnar: bool = False,
+        summary_file: Optional[str] = None,
+        catalog_writer: Optional[RunCatalogWriter] = None,
+    ):
         super().__init__()
         self.llm_request_sink = CSVFileSink(
-            llm_request_file, columns=get_fields(LLMRequestData)
+            llm_request_file,
+            columns=get_fields(LLMRequestData),
+            writer_thread=writer_thread,
         )
         self.network_latency_sink = CSVFileSink(
-            network_latency_file, columns=get_fields(PingData)
+            network_latency_file,
+            columns=get_fields(PingData),
+            writer_thread=writer_thread,
+        )
+        self.error_sink = CSVFileSink(
+            error_file, columns=get_fields(ErrorData), writer_thread=writer_thread
+        )
+        self.token_arrivals_sink = (
+            BinaryFileSink(token_arrivals_file, writer_thread=writer_thread)
+            if token_arrivals_file
+            else None
+        )
+        # with a text blob file, the llm request file only keeps the hashes of large texts
+        self.text_blob_sink = (
+            BinaryFileSink(text_blob_file, writer_thread=writer_thread)
+            if text_blob_file
+            else None
+        )
+        self.text_blob_store = (
+            TextBlobStore(self.text_blob_sink.write_deferred, text_compression)
+            if self.text_blob_sink is not None
+            else None
+        )
+        # columnar copies of the csv files, keyed by record type
+        self.columnar_sinks: Dict[str, ColumnarFileSink] = {}
+        columnar_files: List[Tuple[str, str, Type[BaseModel]]] = [
+            (LLM_REQUEST_RECORD, llm_request_file, LLMRequestData),
+            (NETWORK_LATENCY_RECORD, network_latency_file, PingData),
+            (ERROR_RECORD, error_file, ErrorData),
+        ]
+        if columnar:
+            for record_type, csv_file, model_type in columnar_files:
+                self.columnar_sinks[record_type] = ColumnarFileSink(
+                    get_columnar_file(csv_file),
+                    get_column_dtypes(model_type),
+                    writer_thread=writer_thread,
+                )
+        # per group summaries, rewritten whenever the pending writes are awaited
+        self.writer_thread = writer_thread
+        self.summary_file = summary_file
+        self.catalog_writer = catalog_writer
+        self.summary_collector = (
+            RunSummaryCollector()
+            if summary_file is not None or catalog_writer is not None
+            else None
         )
-        self.error_sink = CSVFileSink(error_file, columns=get_fields(ErrorData))
+
+    def get_sinks(self) -> List[FileSink]:
+        sinks: List[FileSink] = [
+            self.error_sink,
+            self.llm_request_sink,
+            self.network_latency_sink,
+        ]
+        if self.token_arrivals_sink is not None:
+            sinks.append(self.token_arrivals_sink)
+        if self.text_blob_sink is not None:
+            sinks.append(self.text_blob_sink)
+        sinks.extend(self.columnar_sinks.values())
+        return sinks
+
+    def write_columnar(self, record_type: str, data: Dict):
+        if record_type in self.columnar_sinks:
+            self.columnar_sinks[record_type].write_dict(data)
 
     def write_error(self, data: Dict):
         self.error_sink.write_dict(data)
+        self.write_columnar(ERROR_RECORD, data)
+        if self.summary_collector is not None:
+            self.summary_collector.add_error(data)
         self.state_watch.append(1)
 
     def write_llm_request(self, data: Dict):
+        if self.summary_collector is not None:
+            self.summary_collector.add_llm_request(data)
+        if self.catalog_writer is not None:
+            self.catalog_writer.add_llm_request(data)
+        if self.text_blob_store is not None:
+            data = {
+                **data,
+                **{
+                    field: self.text_blob_store.put(data[field])
+                    for field in TEXT_BLOB_FIELDS
+                },
+            }
         self.llm_request_sink.write_dict(data)
+        self.write_columnar(LLM_REQUEST_RECORD, data)
         self.state_watch.append(0)
 
     def write_network_latency(self, data: Dict):
         self.network_latency_sink.write_dict(data)
+        self.write_columnar(NETWORK_LATENCY_RECORD, data)
+        if self.summary_collector is not None:
+            self.summary_collector.add_network_latency(data)
+
+    def write_token_arrivals(self, data: Dict):
+        if self.token_arrivals_sink is not None:
+            self.token_arrivals_sink.write(
+                encode_token_arrivals(TokenArrivalData(**data))
+            )
+
+    def write_throughput(self, data: Dict):
+        if self.summary_collector is not None:
+            self.summary_collector.add_throughput(data)
 
     def activate(self):
-        self.error_sink.activate()
-        self.network_latency_sink.activate()
-        self.llm_request_sink.activate()
+        for sink in self.get_sinks():
+            sink.activate()
 
     async def wait_for_pending_writes(self):
         await asyncio.sleep(0.1)
-        await self.error_sink.wait_for_pending_writes()
-        await self.llm_request_sink.wait_for_pending_writes()
-        await self.network_latency_sink.wait_for_pending_writes()
+        for sink in self.get_sinks():
+            await sink.wait_for_pending_writes()
+        self.write_summary(complete=False)
+        if self.writer_thread is not None:
+            await self.writer_thread.flush()
+
+    def run_write(self, destination: str, function: Callable[[], None]):
+        if self.writer_thread is not None:
+            self.writer_thread.call(destination, function)
+        else:
+            function()
+
+    def write_summary(self, complete: bool):
+        if self.summary_collector is None:
+            return
+        # the collector is only touched here, the file and catalog writes
+        # happen on the writer thread if there is one
+        summary = self.summary_collector.summarize(complete)
+        if self.summary_file is not None:
+            self.run_write(
+                self.summary_file, partial(replace_summary, self.summary_file, summary)
+            )
+        if self.catalog_writer is not None:
+            self.run_write(
+                CATALOG_WRITE_DESTINATION, self.catalog_writer.prepare_update(summary)
+            )
+
+    def close(self):
+        for sink in self.get_sinks():
+            sink.close()
+        self.write_summary(complete=True)
+        if self.catalog_writer is not None:
+            self.run_write(CATALOG_WRITE_DESTINATION, self.catalog_writer.close)
+
+
+def replace_summary(summary_file: str, summary: RunSummary):
+    # replace the summary at once so that readers never see a partial one
+    temporary_file = summary_file + ".tmp"
+    write_file(temporary_file, summary.model_dump_json())
+    os.replace(temporary_file, summary_file)
+
+
+class ThreadedFileIOContext(FileIOContext):
+    """FileIOContext whose sinks all write on one dedicated writer thread."""
+
+    def __init__(
+        self,
+        llm_request_file,
+        network_latency_file,
+        error_file,
+        token_arrivals_file: Optional[str] = None,
+        text_blob_file: Optional[str] = None,
+        text_compression: str = DEFAULT_TEXT_COMPRESSION,
+        columnar: bool = False,
+        summary_file: Optional[str] = None,
+        catalog_writer: Optional[RunCatalogWriter] = None,
+    ):
+        self.writer_thread = FileWriterThread()
+        super().__init__(
+            llm_request_file,
+            network_latency_file,
+            error_file,
+            token_arrivals_file,
+            writer_thread=self.writer_thread,
+            text_blob_file=text_blob_file,
+            text_compression=text_compression,
+            columnar=columnar,
+            summary_file=summary_file,
+            catalog_writer=catalog_writer,
+        )
 
     def close(self):
-        self.error_sink.close()
-        self.llm_request_sink.close()
-        self.network_latency_sink.close()
+        super().close()
+        self.writer_thread.stop()
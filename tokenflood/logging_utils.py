@@ -1,4 +1,8 @@
 import logging
+import warnings
+
+from rich.highlighter import NullHighlighter
+from rich.logging import RichHandler
 
 WARN_ONCE_KEY = "warn_once_key"
 
@@ -30,3 +34,21 @@ class TextFilter(logging.Filter):
     def __init__(self, message_to_filter: str):
         super().__init__()
         self.message_to_filter = message_to_filter
+
+
+def configure_logging():
+    tokenflood_logger = logging.getLogger("tokenflood")
+    tokenflood_logger.setLevel(logging.INFO)
+    tokenflood_logger.addHandler(
+        RichHandler(markup=True, highlighter=NullHighlighter(), keywords=[])
+    )
+    for handler in tokenflood_logger.handlers:
+        handler.addFilter(global_warn_once_filter)
+
+    # for sagemaker endpoints streaming answer
+    logging.getLogger("LiteLLM").addFilter(
+        TextFilter("Warning: Unparseable JSON data remained: [DONE]")
+    )
+    warnings.filterwarnings(
+        "ignore", message=".*HTTP_422_UNPROCESSABLE_ENTITY.*", module="gradio"
+    )
@@ -0,0 +1,13 @@
+from pydantic import BaseModel
+
+from tokenflood.models.validation_types import NonEmptyString
+
+
+class CatalogEntry(BaseModel, frozen=True):
+    run: NonEmptyString
+    # spec file of the run, tells the run type apart
+    run_spec_file: NonEmptyString
+    endpoint: str
+    endpoint_spec_hash: str
+    run_spec_hash: str
+    created: str
@@ -0,0 +1,97 @@
+import math
+from typing import Dict, Optional, Self
+
+from pydantic import BaseModel, Field, NonNegativeInt, PrivateAttr
+
+from tokenflood.constants import HISTOGRAM_RELATIVE_ERROR
+
+
+class LatencyHistogram(BaseModel):
+    """Log-bucketed histogram whose quantiles are within relative_error of the true values.
+
+    Bucket i holds the values in (gamma^(i-1), gamma^i] with
+    gamma = (1 + relative_error) / (1 - relative_error), so the number of
+    buckets only grows with the logarithm of the value range. Values of zero
+    or less are counted separately. Histograms with the same relative error
+    can be merged without losing accuracy."""
+
+    relative_error: float = Field(default=HISTOGRAM_RELATIVE_ERROR, gt=0.0, lt=1.0)
+    # sparse bucket counts keyed by bucket index
+    counts: Dict[int, NonNegativeInt] = {}
+    zero_count: NonNegativeInt = 0
+    count: NonNegativeInt = 0
+    total: float = 0.0
+    minimum: Optional[float] = None
+    maximum: Optional[float] = None
+    _log_gamma: float = PrivateAttr()
+
+    def model_post_init(self, __context) -> None:
+        gamma = (1 + self.relative_error) / (1 - self.relative_error)
+        self._log_gamma = math.log(gamma)
+
+    def get_bucket(self, value: float) -> int:
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def get_bucket_value(self, bucket: int) -> float:
+        """The value within relative_error of every value in the bucket."""
+        return 2 * math.exp(bucket * self._log_gamma) / (1 + math.exp(self._log_gamma))
+
+    def record(self, value: float):
+        if value > 0:
+            bucket = self.get_bucket(value)
+            self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        else:
+            self.zero_count += 1
+        self.count += 1
+        self.total += value
+        self.minimum = value if self.minimum is None else min(self.minimum, value)
+        self.maximum = value if self.maximum is None else max(self.maximum, value)
+
+    def merge(self, other: "LatencyHistogram") -> Self:
+        if self.relative_error != other.relative_error:
+            raise ValueError(
+                f"Cannot merge histograms with relative errors {self.relative_error} and {other.relative_error}."
+            )
+        counts = dict(self.counts)
+        for bucket, count in other.counts.items():
+            counts[bucket] = counts.get(bucket, 0) + count
+        minima = [value for value in [self.minimum, other.minimum] if value is not None]
+        maxima = [value for value in [self.maximum, other.maximum] if value is not None]
+        return self.model_copy(
+            update={
+                "counts": counts,
+                "zero_count": self.zero_count + other.zero_count,
+                "count": self.count + other.count,
+                "total": self.total + other.total,
+                "minimum": min(minima) if minima else None,
+                "maximum": max(maxima) if maxima else None,
+            }
+        )
+
+    @property
+    def mean(self) -> Optional[float]:
+        if self.count == 0:
+            return None
+        return self.total / self.count
+
+    def quantile(self, q: float) -> Optional[float]:
+        """The value below which a fraction q of the recorded values lie, None if empty."""
+        if not 0.0 <= q <= 1.0:
+            raise ValueError(f"Quantile must be between 0 and 1, got {q}.")
+        if self.count == 0 or self.minimum is None or self.maximum is None:
+            return None
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return self.minimum
+        seen = self.zero_count
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if rank < seen:
+                # the recorded extremes are exact
+                return min(
+                    max(self.get_bucket_value(bucket), self.minimum), self.maximum
+                )
+        return self.maximum
+
+    def percentile(self, p: float) -> Optional[float]:
+        return self.quantile(p / 100)
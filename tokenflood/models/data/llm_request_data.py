@@ -1,5 +1,5 @@
 import logging
-from typing import Self
+from typing import Self, Tuple
 
 from litellm.types.utils import ModelResponse
 from pydantic import BaseModel, NonNegativeFloat, NonNegativeInt
@@ -7,28 +7,44 @@ from pydantic import BaseModel, NonNegativeFloat, NonNegativeInt
 from tokenflood.constants import WARNING_LIMIT
 from tokenflood.logging_utils import WARN_ONCE_KEY
 from tokenflood.models.validation_types import NonEmptyString, GroupID
+from tokenflood.token_arrivals import calculate_inter_token_latencies
 from tokenflood.util import calculate_relative_error
 
 log = logging.getLogger(__name__)
 
+TOKEN_ARRIVALS_KEY = "token_arrivals"
+
 
 class LLMRequestResult(BaseModel, frozen=True):
     latency: NonNegativeInt
     time_to_first_token: NonNegativeInt
     decoding_latency: NonNegativeInt
     average_time_per_output_token: NonNegativeFloat
+    inter_token_latency_p50: NonNegativeFloat
+    inter_token_latency_p99: NonNegativeFloat
+    max_stall: NonNegativeFloat
     measured_input_tokens: NonNegativeInt
     measured_prefix_tokens: NonNegativeInt
     measured_output_tokens: NonNegativeInt
     measured_reasoning_tokens: NonNegativeInt
     generated_text: str
     generated_reasoning: str
+    # arrival time of each streamed chunk in microseconds since the request was sent
+    token_arrivals: Tuple[NonNegativeInt, ...]
+    # connection phases in ms, zero for phases a reused connection skipped
+    dns_latency: NonNegativeFloat = 0.0
+    connect_latency: NonNegativeFloat = 0.0
+    tls_handshake_latency: NonNegativeFloat = 0.0
+    connection_reused: bool = False
+    time_to_headers: NonNegativeFloat = 0.0
 
     @classmethod
     def from_model_response(cls, model_response: ModelResponse) -> Self:
         usage = model_response.usage  # type:ignore[attr-defined]
         hp = model_response._hidden_params
         msg = model_response.choices[0]["message"]
+        token_arrivals = tuple(hp.get(TOKEN_ARRIVALS_KEY, ()))
+        itl_p50, itl_p99, max_stall = calculate_inter_token_latencies(token_arrivals)
         return cls(
             latency=int(hp[LLMRequestData.F.latency]),
             time_to_first_token=int(hp[LLMRequestData.F.time_to_first_token]),
@@ -36,6 +52,10 @@ class LLMRequestResult(BaseModel, frozen=True):
             average_time_per_output_token=hp[
                 LLMRequestData.F.average_time_per_output_token
             ],
+            inter_token_latency_p50=itl_p50,
+            inter_token_latency_p99=itl_p99,
+            max_stall=max_stall,
+            token_arrivals=token_arrivals,
             measured_input_tokens=usage.prompt_tokens,
             measured_prefix_tokens=(usage.prompt_tokens_details.cached_tokens or 0)
             if usage.prompt_tokens_details
@@ -57,6 +77,12 @@ class LLMRequestContext(BaseModel, frozen=True):
     expected_prefix_tokens: NonNegativeInt
     expected_output_tokens: NonNegativeInt
     requests_per_second_phase: NonNegativeFloat
+    # requests in flight including this one at the time it was sent, 0 in
+    # sharded runs where no single process sees all requests in flight
+    concurrency: NonNegativeInt
+    # requests in flight of the worker or agent that sent this one in sharded
+    # runs, 0 otherwise
+    shard_concurrency: NonNegativeInt = 0
     request_number: NonNegativeInt
     model: NonEmptyString
     group_id: GroupID
@@ -66,12 +92,22 @@ class LLMRequestContext(BaseModel, frozen=True):
 class LLMRequestData(BaseModel, frozen=True):
     datetime: NonEmptyString
     requests_per_second_phase: NonNegativeFloat
+    concurrency: NonNegativeInt
+    shard_concurrency: NonNegativeInt = 0
     request_number: NonNegativeInt
     model: NonEmptyString
     latency: NonNegativeInt
     time_to_first_token: NonNegativeInt
     decoding_latency: NonNegativeInt
     average_time_per_output_token: NonNegativeFloat
+    inter_token_latency_p50: NonNegativeFloat
+    inter_token_latency_p99: NonNegativeFloat
+    max_stall: NonNegativeFloat
+    dns_latency: NonNegativeFloat
+    connect_latency: NonNegativeFloat
+    tls_handshake_latency: NonNegativeFloat
+    connection_reused: bool
+    time_to_headers: NonNegativeFloat
     expected_input_tokens: NonNegativeInt
     measured_input_tokens: NonNegativeInt
     expected_prefix_tokens: NonNegativeInt
@@ -88,7 +124,12 @@ class LLMRequestData(BaseModel, frozen=True):
     def from_result_and_context(
         cls, result: LLMRequestResult, context: LLMRequestContext
     ) -> Self:
-        return cls(**{**result.model_dump(), **context.model_dump()})
+        return cls(
+            **{
+                **result.model_dump(exclude={"token_arrivals"}),
+                **context.model_dump(),
+            }
+        )
 
     @classmethod
     def from_response_and_context(
@@ -125,7 +166,18 @@ class LLMRequestData(BaseModel, frozen=True):
 
     # field names for access in analytics code
     class F:
+        requests_per_second_phase = "requests_per_second_phase"
+        concurrency = "concurrency"
+        shard_concurrency = "shard_concurrency"
         latency = "latency"
         time_to_first_token = "time_to_first_token"
         decoding_latency = "decoding_latency"
         average_time_per_output_token = "average_time_per_output_token"
+        inter_token_latency_p50 = "inter_token_latency_p50"
+        inter_token_latency_p99 = "inter_token_latency_p99"
+        max_stall = "max_stall"
+        dns_latency = "dns_latency"
+        connect_latency = "connect_latency"
+        tls_handshake_latency = "tls_handshake_latency"
+        connection_reused = "connection_reused"
+        time_to_headers = "time_to_headers"
@@ -1,6 +1,6 @@
 from typing import Self
 
-from pydantic import BaseModel, NonNegativeFloat, NonNegativeInt
+from pydantic import BaseModel, NonNegativeFloat
 
 from tokenflood.models.validation_types import NonEmptyString, GroupID
 
@@ -10,18 +10,33 @@ class PingRequestContext(BaseModel, frozen=True):
     endpoint_url: NonEmptyString
     requests_per_second_phase: NonNegativeFloat
     group_id: GroupID
+    method: NonEmptyString
 
 
 class PingData(BaseModel, frozen=True):
     datetime: NonEmptyString
     endpoint_url: NonEmptyString
     requests_per_second_phase: NonNegativeFloat
-    latency: NonNegativeInt
+    # tcp connect or options request latency, depending on the method
+    latency: NonNegativeFloat
+    # 0 unless the method is tls
+    tls_handshake_latency: NonNegativeFloat
     group_id: GroupID
+    method: NonEmptyString
 
     @classmethod
-    def from_context(cls, context_data: PingRequestContext, latency: int) -> Self:
-        return cls(latency=latency, **context_data.model_dump())
+    def from_context(
+        cls,
+        context_data: PingRequestContext,
+        latency: float,
+        tls_handshake_latency: float = 0.0,
+    ) -> Self:
+        return cls(
+            latency=latency,
+            tls_handshake_latency=tls_handshake_latency,
+            **context_data.model_dump(),
+        )
 
     class F:
         latency = "latency"
+        tls_handshake_latency = "tls_handshake_latency"
@@ -0,0 +1,24 @@
+from typing import Optional, Tuple
+
+from pydantic import BaseModel, NonNegativeFloat, NonNegativeInt, PositiveFloat
+
+from tokenflood.models.run_specs.latency_slo import LatencySLO
+from tokenflood.models.validation_types import GroupID
+
+
+class SearchProbe(BaseModel, frozen=True):
+    group_id: GroupID
+    requests_per_second: PositiveFloat
+    num_requests: NonNegativeInt
+    num_errors: NonNegativeInt
+    error_rate: NonNegativeFloat
+    # the SLO percentile of the SLO metric, None if no request succeeded
+    metric_value: Optional[NonNegativeFloat]
+    passed: bool
+
+
+class SaturationSearchSummary(BaseModel, frozen=True):
+    slo: LatencySLO
+    # highest probed rate that met the SLO, None if none did
+    capacity_requests_per_second: Optional[PositiveFloat]
+    probes: Tuple[SearchProbe, ...]
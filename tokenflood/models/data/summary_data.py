@@ -0,0 +1,35 @@
+from typing import Dict, Optional, Tuple
+
+from pydantic import BaseModel, NonNegativeFloat, NonNegativeInt
+
+from tokenflood.models.data.latency_histogram import LatencyHistogram
+from tokenflood.models.validation_types import GroupID
+
+
+class MetricSummary(BaseModel, frozen=True):
+    count: NonNegativeInt
+    mean: float
+    # the run summary's percentiles, any other can be taken from the histogram
+    percentiles: Dict[int, float]
+    histogram: LatencyHistogram
+
+
+class GroupSummary(BaseModel, frozen=True):
+    group_id: GroupID
+    num_requests: NonNegativeInt
+    num_errors: NonNegativeInt
+    # values of the first request of the group, None if all requests failed
+    datetime: Optional[str]
+    requests_per_second_phase: Optional[NonNegativeFloat]
+    concurrency: Optional[NonNegativeInt]
+    # completed requests per second over the phase, recorded by concurrency tests
+    throughput: Optional[NonNegativeFloat] = None
+    # metric summaries keyed by results file and field
+    metrics: Dict[str, Dict[str, MetricSummary]]
+
+
+class RunSummary(BaseModel, frozen=True):
+    percentiles: Tuple[int, ...]
+    # whether the run had ended when the summary was written
+    complete: bool
+    groups: Tuple[GroupSummary, ...]
@@ -0,0 +1,12 @@
+from typing import Tuple
+
+from pydantic import BaseModel, NonNegativeInt
+
+from tokenflood.models.validation_types import GroupID
+
+
+class TokenArrivalData(BaseModel, frozen=True):
+    group_id: GroupID
+    request_number: NonNegativeInt
+    # arrival time of each streamed chunk in microseconds since the request was sent
+    arrivals: Tuple[NonNegativeInt, ...]
@@ -1,7 +1,14 @@
-from typing import Dict, Optional, Literal
+from typing import Dict, Optional, Literal, Self
 import re
 
-from pydantic import BaseModel
+from pydantic import BaseModel, PositiveFloat, PositiveInt, model_validator
+
+# OpenAI-compatible providers supported by the native client and their default base urls
+NATIVE_CLIENT_PROVIDERS: Dict[str, Optional[str]] = {
+    "openai": "https://api.openai.com/v1",
+    "hosted_vllm": None,
+    "custom_openai": None,
+}
 
 
 class EndpointSpec(BaseModel):
@@ -16,6 +23,40 @@ class EndpointSpec(BaseModel):
     reasoning_effort: (
         Literal["none", "minimal", "low", "medium", "high", "xhigh", "default"] | None
     ) = None
+    client: Literal["litellm", "native"] = "litellm"
+    # how and how often the network latency to the endpoint is sampled during runs
+    ping_method: Literal["tcp", "tls", "options"] = "tcp"
+    pings_per_second: PositiveFloat = 1.0
+    # connection pool of the client, the client's defaults if not given
+    pool_size: Optional[PositiveInt] = None
+    pool_size_per_host: Optional[PositiveInt] = None
+    keepalive_timeout: Optional[PositiveFloat] = None
+
+    @model_validator(mode="after")
+    def check_native_client_support(self) -> Self:
+        if self.client != "native":
+            return self
+        if self.provider not in NATIVE_CLIENT_PROVIDERS:
+            raise ValueError(
+                f"The native client only supports the providers {', '.join(NATIVE_CLIENT_PROVIDERS)}, not {self.provider}."
+            )
+        if self.base_url is None and NATIVE_CLIENT_PROVIDERS[self.provider] is None:
+            raise ValueError(
+                f"The native client needs a base_url for provider {self.provider}."
+            )
+        if self.deployment is not None:
+            raise ValueError("The native client does not support deployments.")
+        return self
+
+    @property
+    def max_pool_size(self) -> Optional[int]:
+        """The most connections the pool keeps to the endpoint, None if unlimited."""
+        limits = [
+            limit
+            for limit in (self.pool_size, self.pool_size_per_host)
+            if limit is not None
+        ]
+        return min(limits) if limits else None
 
     @property
     def folder_name(self) -> str:
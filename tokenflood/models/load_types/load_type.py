@@ -1,9 +1,13 @@
-import random
-from typing import Literal, Annotated
+from typing import Annotated, Iterator, Literal, Optional, Sequence
 
+import numpy as np
 from pydantic import BaseModel, Field
 
-from tokenflood.constants import DEFAULT_HEURISTIC_TASK, DEFAULT_PROMPT_FILLER_TOKENS
+from tokenflood.constants import (
+    DEFAULT_HEURISTIC_TASK,
+    DEFAULT_PROMPT_FILLER_TOKENS,
+    PROMPT_BATCH_SIZE,
+)
 from tokenflood.messages import create_message_list_from_prompt
 from tokenflood.models.message_list import MessageList
 from tokenflood.models.validation_types import (
@@ -18,11 +22,33 @@ from tokenflood.util import roughly_estimated_token_cost
 class LoadType(BaseModel, frozen=True):
     type: str
 
-    def create_prompts(self, n: int) -> list[str]:
+    def create_prompts(
+        self, n: int, rng: Optional[np.random.Generator] = None
+    ) -> list[str]:
         raise NotImplementedError
 
+    def create_rng(self, stream: Sequence[int] = ()) -> np.random.Generator:
+        return np.random.default_rng()
+
     def create_message_lists(self, n: int) -> list[MessageList]:
-        raise NotImplementedError
+        return list(self.iter_message_lists(n))
+
+    def iter_message_lists(
+        self, n: Optional[int] = None, stream: Sequence[int] = ()
+    ) -> Iterator[MessageList]:
+        """Create message lists in small batches as they are needed.
+
+        Only the current batch is kept in memory. Without n, message lists are
+        created endlessly. Different streams draw different prompts."""
+        rng = self.create_rng(stream)
+        remaining = n
+        while remaining is None or remaining > 0:
+            batch_size = PROMPT_BATCH_SIZE
+            if remaining is not None:
+                batch_size = min(batch_size, remaining)
+                remaining -= batch_size
+            for prompt in self.create_prompts(batch_size, rng):
+                yield create_message_list_from_prompt(prompt)
 
     def get_expected_prompt_length(self) -> int:
         raise NotImplementedError
@@ -41,14 +67,20 @@ class HeuristicLoad(LoadType, frozen=True):
     output_length: PositiveInteger
     task: NonEmptyString = DEFAULT_HEURISTIC_TASK
     prompt_filler_tokens: AtLeastTwoUniqueStrings = DEFAULT_PROMPT_FILLER_TOKENS
+    seed: Optional[int] = None
 
-    def create_prompts(self, n: int) -> list[str]:
-        return [self.create_prompt() for _ in range(n)]
+    def create_rng(self, stream: Sequence[int] = ()) -> np.random.Generator:
+        """Random generator for the prompts, reproducible if a seed is given."""
+        return np.random.default_rng(
+            np.random.SeedSequence(self.seed, spawn_key=tuple(stream))
+        )
 
-    def create_prompt(self) -> str:
-        """Create a prompt that suffices the length constraints.
+    def create_prompts(
+        self, n: int, rng: Optional[np.random.Generator] = None
+    ) -> list[str]:
+        """Create n prompts that suffice the length constraints.
 
-        The prompt is structured like this:
+        The prompts are structured like this:
 
         1. Common Prefix (using the prompt filler tokens)
         2. Random Tokens (using the prompt filler tokens)
@@ -57,14 +89,13 @@ class HeuristicLoad(LoadType, frozen=True):
         """
         task_tokens = roughly_estimated_token_cost(self.task)
         random_prompt_tokens = self.prompt_length - self.prefix_length - task_tokens
-        prompt = ""
-        prompt += self.create_prompt_prefix(self.prefix_length)
-        if random_prompt_tokens > 0:
-            prompt += self.create_prompt_random_part(random_prompt_tokens)
-        if len(prompt) > 0:
-            prompt += "\n\n"
-        prompt += self.task
-        return prompt
+        prefix = self.create_prompt_prefix(self.prefix_length)
+        random_parts = self.create_prompt_random_parts(n, random_prompt_tokens, rng)
+        separator = "\n\n" if prefix or random_prompt_tokens > 0 else ""
+        return [prefix + part + separator + self.task for part in random_parts]
+
+    def create_prompt(self) -> str:
+        return self.create_prompts(1)[0]
 
     def create_prompt_prefix(self, length: int) -> str:
         """Create a predictable prefix for prompts."""
@@ -72,12 +103,26 @@ class HeuristicLoad(LoadType, frozen=True):
 
     def create_prompt_random_part(self, length: int) -> str:
         """Create the random prompt part between prefix and task."""
-        return "".join(random.choices(self.prompt_filler_tokens, k=length))
-
-    def create_message_lists(self, n: int) -> list[MessageList]:
-        return [
-            create_message_list_from_prompt(prompt) for prompt in self.create_prompts(n)
-        ]
+        return self.create_prompt_random_parts(1, length)[0]
+
+    def create_prompt_random_parts(
+        self, n: int, length: int, rng: Optional[np.random.Generator] = None
+    ) -> list[str]:
+        """Create n random prompt parts from a single matrix of filler indices.
+
+        Each row of filler tokens is read as one fixed width string. Filler
+        tokens shorter than the longest one are padded with null characters,
+        which are removed afterwards."""
+        if length <= 0:
+            return [""] * n
+        rng = rng or self.create_rng()
+        fillers = np.array(self.prompt_filler_tokens)
+        filler_width = fillers.dtype.itemsize // np.dtype("U1").itemsize
+        indices = rng.integers(len(fillers), size=(n, length))
+        rows = fillers[indices].view(f"U{filler_width * length}").ravel().tolist()
+        if any(len(filler) < filler_width for filler in self.prompt_filler_tokens):
+            return [row.replace("\0", "") for row in rows]
+        return rows
 
     def get_expected_prompt_length(self) -> int:
         return self.prompt_length
@@ -0,0 +1,46 @@
+from typing import Literal, Optional, Self
+
+from pydantic import Field, NonNegativeFloat, PositiveFloat, model_validator
+
+from tokenflood.constants import ADAPTIVE_LOAD_TEST_SPEC_FILE, DEFAULT_ERROR_RATE_LIMIT
+from tokenflood.models.load_types.load_type import SpecificLoadType
+from tokenflood.models.run_specs.latency_slo import LatencySLO
+from tokenflood.models.run_specs.run_spec import RunSpec
+from tokenflood.models.validation_types import NonEmptyString, PositiveInteger
+
+
+class AdaptiveLoadTestSpec(RunSpec, frozen=True):
+    """Load test that adjusts its request rate to hold a latency target (AIMD)."""
+
+    type: Literal["adaptive_load_test"] = "adaptive_load_test"
+    name: NonEmptyString
+    target: LatencySLO
+    duration_seconds: PositiveInteger
+    start_requests_per_second: PositiveFloat = 1.0
+    min_requests_per_second: PositiveFloat = 0.1
+    max_requests_per_second: Optional[PositiveFloat] = None
+    # requests per second added after every adjustment interval below the target
+    additive_increase: PositiveFloat = 0.5
+    # factor applied to the rate after every adjustment interval above the target
+    multiplicative_decrease: float = Field(gt=0, lt=1, default=0.5)
+    adjustment_interval_seconds: PositiveFloat = 2.0
+    # number of most recently completed requests the percentile is computed from
+    window_size: PositiveInteger = 50
+    load_type: SpecificLoadType
+    error_limit: NonNegativeFloat = DEFAULT_ERROR_RATE_LIMIT
+
+    @model_validator(mode="after")
+    def check_rate_bounds(self) -> Self:
+        max_rate = self.max_requests_per_second or float("inf")
+        if not (
+            self.min_requests_per_second <= self.start_requests_per_second <= max_rate
+        ):
+            raise ValueError(
+                "start_requests_per_second must lie between min_requests_per_second "
+                "and max_requests_per_second."
+            )
+        return self
+
+    @property
+    def run_spec_file(self) -> str:
+        return ADAPTIVE_LOAD_TEST_SPEC_FILE
@@ -0,0 +1,44 @@
+from typing import List, Literal
+
+from pydantic import BaseModel, NonNegativeFloat, PositiveInt
+
+from tokenflood.constants import CONCURRENCY_TEST_SPEC_FILE, DEFAULT_ERROR_RATE_LIMIT
+from tokenflood.models.load_types.load_type import SpecificLoadType
+from tokenflood.models.run_specs.run_spec import RunSpec
+from tokenflood.models.validation_types import (
+    NonEmptyString,
+    PositiveInteger,
+    PositiveUniqueIntegers,
+)
+
+
+class ConcurrencyTestPhase(BaseModel, frozen=True):
+    concurrency: PositiveInt
+    duration_seconds: PositiveInt
+
+
+class ConcurrencyTestSpec(RunSpec, frozen=True):
+    """Closed-loop test keeping a fixed number of requests in flight per phase."""
+
+    type: Literal["concurrency_test"] = "concurrency_test"
+    name: NonEmptyString
+    concurrency_levels: PositiveUniqueIntegers
+    seconds_per_phase: PositiveInteger
+    load_type: SpecificLoadType
+    error_limit: NonNegativeFloat = DEFAULT_ERROR_RATE_LIMIT
+
+    def create_concurrency_test_phases(self) -> List[ConcurrencyTestPhase]:
+        return [
+            ConcurrencyTestPhase(
+                concurrency=concurrency, duration_seconds=self.seconds_per_phase
+            )
+            for concurrency in self.concurrency_levels
+        ]
+
+    @property
+    def total_seconds(self) -> int:
+        return len(self.concurrency_levels) * self.seconds_per_phase
+
+    @property
+    def run_spec_file(self) -> str:
+        return CONCURRENCY_TEST_SPEC_FILE
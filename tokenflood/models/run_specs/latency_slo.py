@@ -0,0 +1,22 @@
+from typing import Literal
+
+from pydantic import BaseModel, Field, PositiveFloat
+
+SLOMetric = Literal[
+    "latency",
+    "time_to_first_token",
+    "decoding_latency",
+    "average_time_per_output_token",
+    "inter_token_latency_p50",
+    "inter_token_latency_p99",
+    "max_stall",
+]
+
+
+class LatencySLO(BaseModel, frozen=True):
+    """A percentile of a request metric has to stay below a limit, e.g. p99 TTFT < 800ms."""
+
+    metric: SLOMetric = "time_to_first_token"
+    percentile: float = Field(gt=0, le=100, default=99)
+    limit_ms: PositiveFloat
+    max_error_rate: float = Field(ge=0, le=1, default=0.01)
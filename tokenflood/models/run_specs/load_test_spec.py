@@ -1,8 +1,9 @@
-from typing import List, Literal, Self
+from typing import List, Literal, Self, Tuple
 
 from pydantic import (
     BaseModel,
     NonNegativeFloat,
+    NonNegativeInt,
     Field,
     PositiveFloat,
     PositiveInt,
@@ -38,6 +39,18 @@ class LoadTestPhase(BaseModel, frozen=True):
         return self
 
 
+class LoadTestPhaseShard(BaseModel, frozen=True):
+    """The part of a load test phase that a single load generator is responsible for."""
+
+    phase: NonNegativeInt
+    load_phase: LoadTestPhase
+    shard_idx: NonNegativeInt
+    send_offsets: Tuple[float, ...]
+    request_numbers: Tuple[int, ...]
+    end_offset: NonNegativeFloat
+    start_time: float
+
+
 class LoadTestSpec(RunSpec, frozen=True):
     type: Literal["load_test"] = "load_test"
     name: NonEmptyString
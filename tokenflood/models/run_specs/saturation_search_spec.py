@@ -0,0 +1,65 @@
+from typing import Literal, Self
+
+from pydantic import (
+    Field,
+    NonNegativeFloat,
+    PositiveFloat,
+    model_validator,
+)
+
+from tokenflood.constants import DEFAULT_ERROR_RATE_LIMIT, SATURATION_SEARCH_SPEC_FILE
+from tokenflood.models.load_types.load_type import SpecificLoadType
+from tokenflood.models.run_specs.latency_slo import LatencySLO
+from tokenflood.models.run_specs.load_test_spec import LoadTestPhase, LoadTestSpec
+from tokenflood.models.run_specs.run_spec import RunSpec
+from tokenflood.models.validation_types import NonEmptyString, PositiveInteger
+
+
+class SaturationSearchSpec(RunSpec, frozen=True):
+    type: Literal["saturation_search"] = "saturation_search"
+    name: NonEmptyString
+    slo: LatencySLO
+    start_requests_per_second: PositiveFloat = 1.0
+    growth_factor: float = Field(gt=1, default=2.0)
+    # the search stops once the bracket around the capacity is narrower than this fraction
+    precision: float = Field(gt=0, lt=1, default=0.05)
+    seconds_per_probe: PositiveInteger
+    max_probes: PositiveInteger = 12
+    load_type: SpecificLoadType
+    burstiness: int = Field(ge=0, le=10, default=1)
+    error_limit: NonNegativeFloat = DEFAULT_ERROR_RATE_LIMIT
+
+    @model_validator(mode="after")
+    def check_start_rate_sends_a_request(self) -> Self:
+        if self.start_requests_per_second < self.min_requests_per_second:
+            raise ValueError(
+                f"A probe at {self.start_requests_per_second} requests/s over "
+                f"{self.seconds_per_probe}s would not send a single request."
+            )
+        return self
+
+    @property
+    def min_requests_per_second(self) -> float:
+        """Lowest rate for which a probe still sends a request."""
+        return 1 / self.seconds_per_probe
+
+    def create_probe_phase(self, requests_per_second: float) -> LoadTestPhase:
+        return LoadTestPhase(
+            requests_per_second=requests_per_second,
+            duration_seconds=self.seconds_per_probe,
+        )
+
+    def create_probe_load_test_spec(self) -> LoadTestSpec:
+        """Load test spec carrying the settings shared by all probes."""
+        return LoadTestSpec(
+            name=self.name,
+            requests_per_second_phases=(self.start_requests_per_second,),
+            seconds_per_phase=self.seconds_per_probe,
+            load_type=self.load_type,
+            burstiness=self.burstiness,
+            error_limit=self.error_limit,
+        )
+
+    @property
+    def run_spec_file(self) -> str:
+        return SATURATION_SEARCH_SPEC_FILE
@@ -2,7 +2,17 @@ from typing import Annotated
 
 from pydantic import Field
 
+from tokenflood.models.run_specs.adaptive_load_test_spec import AdaptiveLoadTestSpec
+from tokenflood.models.run_specs.concurrency_test_spec import ConcurrencyTestSpec
 from tokenflood.models.run_specs.load_test_spec import LoadTestSpec
 from tokenflood.models.run_specs.observation_spec import ObservationSpec
+from tokenflood.models.run_specs.saturation_search_spec import SaturationSearchSpec
 
-SpecificRunSpec = Annotated[LoadTestSpec | ObservationSpec, Field(discriminator="type")]
+SpecificRunSpec = Annotated[
+    LoadTestSpec
+    | ObservationSpec
+    | ConcurrencyTestSpec
+    | SaturationSearchSpec
+    | AdaptiveLoadTestSpec,
+    Field(discriminator="type"),
+]
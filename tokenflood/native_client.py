@@ -0,0 +1,214 @@
+import asyncio
+import json
+import logging
+import os
+import time
+import weakref
+from typing import Any, Dict, List, Optional, Tuple
+
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
+
+from tokenflood.constants import NATIVE_CLIENT_TIMEOUT_SECONDS
+from tokenflood.logging_utils import WARN_ONCE_KEY
+from tokenflood.models.data.llm_request_data import LLMRequestResult
+from tokenflood.models.endpoint_spec import NATIVE_CLIENT_PROVIDERS, EndpointSpec
+from tokenflood.models.message_list import MessageList
+from tokenflood.networking import get_request_trace_config, get_timed_ssl_context
+from tokenflood.token_arrivals import calculate_inter_token_latencies
+
+log = logging.getLogger(__name__)
+
+PoolOptions = Tuple[Optional[int], Optional[int], Optional[float]]
+
+# sessions of each event loop per connection pool options
+_sessions: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, Dict[PoolOptions, ClientSession]
+] = weakref.WeakKeyDictionary()
+
+
+def get_pool_options(endpoint_spec: EndpointSpec) -> PoolOptions:
+    return (
+        endpoint_spec.pool_size,
+        endpoint_spec.pool_size_per_host,
+        endpoint_spec.keepalive_timeout,
+    )
+
+
+def make_connector(endpoint_spec: EndpointSpec) -> TCPConnector:
+    kwargs: Dict[str, Any] = {
+        "limit": endpoint_spec.pool_size or 0,
+        "limit_per_host": endpoint_spec.pool_size_per_host or 0,
+        "ssl": get_timed_ssl_context(),
+    }
+    if endpoint_spec.keepalive_timeout is not None:
+        kwargs["keepalive_timeout"] = endpoint_spec.keepalive_timeout
+    return TCPConnector(**kwargs)
+
+
+def get_native_session(endpoint_spec: EndpointSpec) -> ClientSession:
+    """Pooled session of the running event loop with the endpoint's pool options, created on first use."""
+    sessions = _sessions.setdefault(asyncio.get_running_loop(), {})
+    pool_options = get_pool_options(endpoint_spec)
+    session = sessions.get(pool_options)
+    if session is None or session.closed:
+        session = ClientSession(
+            connector=make_connector(endpoint_spec),
+            timeout=ClientTimeout(total=NATIVE_CLIENT_TIMEOUT_SECONDS),
+            trace_configs=[get_request_trace_config()],
+        )
+        sessions[pool_options] = session
+    return session
+
+
+async def close_native_session():
+    sessions = _sessions.pop(asyncio.get_running_loop(), {})
+    for session in sessions.values():
+        await session.close()
+
+
+def get_chat_completions_url(endpoint_spec: EndpointSpec) -> str:
+    base_url = endpoint_spec.base_url or NATIVE_CLIENT_PROVIDERS[endpoint_spec.provider]
+    if base_url is None:
+        raise ValueError(f"No base_url given for {endpoint_spec.provider_model_str}.")
+    return f"{base_url.rstrip('/')}/chat/completions"
+
+
+def get_headers(endpoint_spec: EndpointSpec) -> Dict[str, str]:
+    headers = {"Content-Type": "application/json"}
+    api_key_env_var = endpoint_spec.api_key_env_var
+    if api_key_env_var is None and endpoint_spec.provider == "openai":
+        api_key_env_var = "OPENAI_API_KEY"
+    api_key = os.getenv(api_key_env_var) if api_key_env_var is not None else None
+    if api_key:
+        headers["Authorization"] = f"Bearer {api_key}"
+    return {**headers, **endpoint_spec.extra_headers}
+
+
+def get_body(
+    endpoint_spec: EndpointSpec, messages: MessageList, num_generation_tokens: int
+) -> Dict[str, Any]:
+    body: Dict[str, Any] = {
+        "model": endpoint_spec.model,
+        "messages": messages,
+        "max_tokens": num_generation_tokens,
+        "stream": True,
+        "stream_options": {"include_usage": True},
+    }
+    if endpoint_spec.reasoning_effort is not None:
+        body["reasoning_effort"] = endpoint_spec.reasoning_effort
+    return {**body, **endpoint_spec.extra_body}
+
+
+class StreamAccumulator:
+    """Collects the parts of a streamed chat completion chunk by chunk."""
+
+    def __init__(self, start_time: float) -> None:
+        self.start_time = start_time
+        self.first_token_time: Optional[float] = None
+        self.token_arrivals: List[int] = []
+        self.text_parts: List[str] = []
+        self.reasoning_parts: List[str] = []
+        self.usage: Optional[Dict[str, Any]] = None
+
+    def add_chunk(self, chunk: Dict[str, Any]):
+        if chunk.get("usage"):
+            self.usage = chunk["usage"]
+        choices = chunk.get("choices")
+        if not choices:
+            return
+        delta = choices[0].get("delta") or {}
+        content = delta.get("content")
+        reasoning = delta.get("reasoning_content") or delta.get("reasoning")
+        if content or reasoning:
+            arrival_time = time.time()
+            if self.first_token_time is None:
+                self.first_token_time = arrival_time
+            self.token_arrivals.append(
+                int((arrival_time - self.start_time) * 1_000_000)
+            )
+        if content:
+            self.text_parts.append(content)
+        if reasoning:
+            self.reasoning_parts.append(reasoning)
+
+    def add_line(self, line: bytes):
+        """Add a line of the server-sent event stream."""
+        if not line.startswith(b"data:"):
+            return
+        data = line[5:].strip()
+        if data == b"[DONE]":
+            return
+        self.add_chunk(json.loads(data))
+
+    def get_usage_value(self, key: str, details_key: str = "") -> int:
+        if self.usage is None:
+            return 0
+        if details_key:
+            details = self.usage.get(details_key) or {}
+            return details.get(key) or 0
+        return self.usage.get(key) or 0
+
+    def to_result(self, end_time: float) -> LLMRequestResult:
+        start_time = self.start_time
+        if self.usage is None:
+            log.warning(
+                "The endpoint did not report token usage for a streamed response. This warning type will only appear once per phase.",
+                extra={WARN_ONCE_KEY: "native_client_missing_usage"},
+            )
+        if self.first_token_time is not None:
+            time_to_first_token = self.first_token_time - start_time
+            decoding_latency = end_time - self.first_token_time
+        else:
+            time_to_first_token = 0
+            decoding_latency = 0
+        completion_tokens = self.get_usage_value("completion_tokens")
+        if completion_tokens > 1:
+            avg_tpot = decoding_latency / (completion_tokens - 1)
+        else:
+            avg_tpot = 0
+        itl_p50, itl_p99, max_stall = calculate_inter_token_latencies(
+            self.token_arrivals
+        )
+        return LLMRequestResult(
+            latency=int((end_time - start_time) * 1000),
+            time_to_first_token=int(time_to_first_token * 1000),
+            decoding_latency=int(decoding_latency * 1000),
+            average_time_per_output_token=avg_tpot * 1000,
+            inter_token_latency_p50=itl_p50,
+            inter_token_latency_p99=itl_p99,
+            max_stall=max_stall,
+            token_arrivals=tuple(self.token_arrivals),
+            measured_input_tokens=self.get_usage_value("prompt_tokens"),
+            measured_prefix_tokens=self.get_usage_value(
+                "cached_tokens", "prompt_tokens_details"
+            ),
+            measured_output_tokens=completion_tokens,
+            measured_reasoning_tokens=self.get_usage_value(
+                "reasoning_tokens", "completion_tokens_details"
+            ),
+            generated_text="".join(self.text_parts),
+            generated_reasoning="".join(self.reasoning_parts),
+        )
+
+
+async def send_native_llm_request(
+    endpoint_spec: EndpointSpec,
+    messages: MessageList,
+    num_generation_tokens: int,
+) -> LLMRequestResult:
+    """Stream a chat completion from an OpenAI-compatible endpoint without litellm."""
+    session = get_native_session(endpoint_spec)
+    accumulator = StreamAccumulator(time.time())
+    async with session.post(
+        get_chat_completions_url(endpoint_spec),
+        headers=get_headers(endpoint_spec),
+        json=get_body(endpoint_spec, messages, num_generation_tokens),
+    ) as response:
+        if response.status >= 400:
+            raise RuntimeError(
+                f"{endpoint_spec.provider_model_str} responded with status {response.status}: {await response.text()}"
+            )
+        async for line in response.content:
+            accumulator.add_line(line)
+    end_time = time.time()
+    return accumulator.to_result(end_time)
@@ -1,46 +1,228 @@
 import asyncio
+import socket
+import ssl
 import time
 from asyncio import Protocol
-from typing import Coroutine
-from functools import wraps
+from contextvars import ContextVar
+from types import SimpleNamespace
+from typing import Any, Coroutine, Dict, Optional, Tuple
+from functools import lru_cache, wraps
 
-from aiohttp import ClientHandlerType, ClientRequest, ClientResponse, ClientSession
+import litellm.llms.custom_httpx.http_handler as litellm_http_handler
+from aiohttp import (
+    ClientHandlerType,
+    ClientRequest,
+    ClientResponse,
+    ClientSession,
+    TraceConfig,
+)
 from multidict import CIMultiDict
+from yarl import URL
 
 from tokenflood.constants import CLIENT_SESSION_INIT_BACKUP_ATTR
+from tokenflood.models.endpoint_spec import EndpointSpec
+
+
+class ObservedEndpoint:
+    """Where the requests to an endpoint went, so that it can be pinged.
+
+    The ping headers are derived once per url instead of for every ping."""
+
+    def __init__(self) -> None:
+        self.url: Optional[URL] = None
+        self.host: Optional[str] = None
+        self.port: Optional[int] = None
+        self.session: Optional[ClientSession] = None
+        self.ping_headers: Optional[CIMultiDict[str]] = None
+
+    def observe(self, req: ClientRequest):
+        if req.url != self.url:
+            self.url = req.url
+            self.host = req.url.host
+            self.port = req.url.port
+            self.ping_headers = make_ping_headers(req.headers)
+        self.session = req.session
+
+
+# observations per endpoint, see get_endpoint_key
+_observed_endpoints: Dict[
+    Tuple[str, Optional[str], Optional[str]], ObservedEndpoint
+] = {}
+
+# observation of the endpoint the current task sends its requests to
+observed_endpoint: ContextVar[Optional[ObservedEndpoint]] = ContextVar(
+    "observed_endpoint", default=None
+)
+
+
+def get_endpoint_key(
+    endpoint_spec: EndpointSpec,
+) -> Tuple[str, Optional[str], Optional[str]]:
+    return (
+        endpoint_spec.provider_model_str,
+        endpoint_spec.base_url,
+        endpoint_spec.name,
+    )
+
+
+def get_observed_endpoint(endpoint_spec: EndpointSpec) -> ObservedEndpoint:
+    key = get_endpoint_key(endpoint_spec)
+    if key not in _observed_endpoints:
+        _observed_endpoints[key] = ObservedEndpoint()
+    return _observed_endpoints[key]
+
+
+def reset_observed_endpoints():
+    _observed_endpoints.clear()
+
+
+def make_ping_headers(headers: CIMultiDict[str]) -> CIMultiDict[str]:
+    """Headers of a request without the ones that only fit its body or client."""
+    return CIMultiDict(
+        (key, value)
+        for key, value in headers.items()
+        if not key.lower().startswith("x-stainless") and key.lower() != "content-length"
+    )
 
 
 class ObserveURLMiddleware:
-    _instance = None
+    """Records the requests into the observed endpoint of the current context."""
 
     async def __call__(
         self, req: ClientRequest, handler: ClientHandlerType
     ) -> ClientResponse:
-        self.url = req.url
-        self.host = req.url.host
-        self.port = req.url.port
-        self.headers = req.headers
-        self.session = req.session
+        observed = observed_endpoint.get()
+        if observed is not None:
+            observed.observe(req)
         return await handler(req)
 
-    @classmethod
-    def reset(cls):
-        if cls._instance:
-            cls._instance.url = None
-            cls._instance.host = None
-            cls._instance.port = None
-            cls._instance.headers = None
-            cls._instance.session = None
-
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(ObserveURLMiddleware, cls).__new__(cls)
-            cls._instance.url = None
-            cls._instance.host = None
-            cls._instance.port = None
-            cls._instance.headers = None
-            cls._instance.session = None
-        return cls._instance
+
+@lru_cache(maxsize=1)
+def get_observe_url_middleware() -> ObserveURLMiddleware:
+    return ObserveURLMiddleware()
+
+
+class ConnectionTimings:
+    """Connection phases of a single request in ms, filled in by the tracing hooks."""
+
+    def __init__(self) -> None:
+        self.request_start: Optional[float] = None
+        self.dns_start: Optional[float] = None
+        self.connection_start: Optional[float] = None
+        self.dns_latency = 0.0
+        # dns, tcp connect and tls handshake together
+        self.connection_latency = 0.0
+        self.tls_handshake_latency = 0.0
+        self.connection_reused = False
+        self.time_to_headers = 0.0
+
+    def get_fields(self) -> Dict[str, Any]:
+        return {
+            "dns_latency": self.dns_latency,
+            "connect_latency": max(
+                0.0,
+                self.connection_latency - self.dns_latency - self.tls_handshake_latency,
+            ),
+            "tls_handshake_latency": self.tls_handshake_latency,
+            "connection_reused": self.connection_reused,
+            "time_to_headers": self.time_to_headers,
+        }
+
+
+# timings of the request sent by the current task
+connection_timings: ContextVar[Optional[ConnectionTimings]] = ContextVar(
+    "connection_timings", default=None
+)
+
+
+def elapsed_ms(start: Optional[float]) -> float:
+    return (time.perf_counter() - start) * 1000 if start is not None else 0.0
+
+
+async def on_request_start(session: ClientSession, ctx: SimpleNamespace, params: Any):
+    timings = connection_timings.get()
+    if timings is not None and timings.request_start is None:
+        timings.request_start = time.perf_counter()
+
+
+async def on_request_end(session: ClientSession, ctx: SimpleNamespace, params: Any):
+    timings = connection_timings.get()
+    if timings is not None and not timings.time_to_headers:
+        timings.time_to_headers = elapsed_ms(timings.request_start)
+
+
+async def on_dns_resolvehost_start(
+    session: ClientSession, ctx: SimpleNamespace, params: Any
+):
+    timings = connection_timings.get()
+    if timings is not None:
+        timings.dns_start = time.perf_counter()
+
+
+async def on_dns_resolvehost_end(
+    session: ClientSession, ctx: SimpleNamespace, params: Any
+):
+    timings = connection_timings.get()
+    if timings is not None:
+        timings.dns_latency += elapsed_ms(timings.dns_start)
+
+
+async def on_connection_create_start(
+    session: ClientSession, ctx: SimpleNamespace, params: Any
+):
+    timings = connection_timings.get()
+    if timings is not None:
+        timings.connection_start = time.perf_counter()
+
+
+async def on_connection_create_end(
+    session: ClientSession, ctx: SimpleNamespace, params: Any
+):
+    timings = connection_timings.get()
+    if timings is not None:
+        timings.connection_latency += elapsed_ms(timings.connection_start)
+
+
+async def on_connection_reuseconn(
+    session: ClientSession, ctx: SimpleNamespace, params: Any
+):
+    timings = connection_timings.get()
+    if timings is not None:
+        timings.connection_reused = True
+
+
+@lru_cache(maxsize=1)
+def get_request_trace_config() -> TraceConfig:
+    """Tracing hooks recording the connection phases of the requests into their timings."""
+    trace_config = TraceConfig()
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_request_end.append(on_request_end)
+    trace_config.on_dns_resolvehost_start.append(on_dns_resolvehost_start)
+    trace_config.on_dns_resolvehost_end.append(on_dns_resolvehost_end)
+    trace_config.on_connection_create_start.append(on_connection_create_start)
+    trace_config.on_connection_create_end.append(on_connection_create_end)
+    trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+    return trace_config
+
+
+class TimedSSLObject(ssl.SSLObject):
+    """Adds the time of its TLS handshake to the timings of the request opening the connection.
+
+    aiohttp reports the creation of a connection as a single step, so the
+    handshake is timed on the TLS object asyncio creates for the connection."""
+
+    timings: Optional[ConnectionTimings] = None
+    handshake_start: Optional[float] = None
+
+    def do_handshake(self) -> None:
+        if self.handshake_start is None:
+            self.timings = connection_timings.get()
+            self.handshake_start = time.perf_counter()
+        # raises until the handshake is done
+        super().do_handshake()
+        if self.timings is not None:
+            self.timings.tls_handshake_latency += elapsed_ms(self.handshake_start)
+            self.timings = None
 
 
 async def time_async_func(coroutine: Coroutine) -> int:
@@ -50,27 +232,93 @@ async def time_async_func(coroutine: Coroutine) -> int:
     return int((end - start) * 1000)
 
 
-async def ping_endpoint(host: str, port: int):
-    """Ping endpoint and return latency in ms."""
-    await asyncio.get_running_loop().create_connection(
-        lambda: Protocol(), host=host, port=port
+async def resolve_address(host: str, port: int) -> Tuple[str, int]:
+    infos = await asyncio.get_running_loop().getaddrinfo(
+        host, port, type=socket.SOCK_STREAM
     )
+    if not infos:
+        raise ValueError(f"Could not resolve {host}:{port}.")
+    address = infos[0][4]
+    return str(address[0]), int(address[1])
+
+
+async def ping_endpoint(host: str, port: int) -> float:
+    """Time opening a TCP connection to an endpoint in ms.
+
+    The name is resolved beforehand, so the time is one round trip."""
+    address, port = await resolve_address(host, port)
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+    transport, _ = await loop.create_connection(Protocol, host=address, port=port)
+    latency = (time.perf_counter() - start) * 1000
+    transport.close()
+    return latency
+
+
+@lru_cache(maxsize=1)
+def get_ssl_context() -> ssl.SSLContext:
+    return ssl.create_default_context()
+
+
+def time_tls_handshakes(context: ssl.SSLContext):
+    """Let the connections opened with this context time their TLS handshake.
+
+    Only set on the instance, so other SSL contexts in the process keep the
+    plain ssl.SSLObject."""
+    context.sslobject_class = TimedSSLObject  # type: ignore[misc]
+
+
+def untime_tls_handshakes(context: ssl.SSLContext):
+    if "sslobject_class" in vars(context):
+        del context.sslobject_class
+
+
+@lru_cache(maxsize=1)
+def get_timed_ssl_context() -> ssl.SSLContext:
+    """SSL context of the native client's sessions, timing their TLS handshakes."""
+    context = ssl.create_default_context()
+    time_tls_handshakes(context)
+    return context
+
+
+def get_litellm_ssl_context() -> Optional[ssl.SSLContext]:
+    """The cached SSL context litellm opens its connections with, None if it verifies nothing."""
+    ssl_config = litellm_http_handler.get_ssl_configuration()
+    return ssl_config if isinstance(ssl_config, ssl.SSLContext) else None
+
+
+async def ping_endpoint_tls(host: str, port: int) -> Tuple[float, float]:
+    """Time opening a TCP connection to an endpoint and the TLS handshake on it in ms."""
+    address, port = await resolve_address(host, port)
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+    transport, protocol = await loop.create_connection(
+        Protocol, host=address, port=port
+    )
+    connected = time.perf_counter()
+    try:
+        tls_transport = await loop.start_tls(
+            transport, protocol, get_ssl_context(), server_hostname=host
+        )
+    except BaseException:
+        transport.close()
+        raise
+    handshake_done = time.perf_counter()
+    if tls_transport is not None:
+        tls_transport.close()
+    transport.close()
+    return (connected - start) * 1000, (handshake_done - connected) * 1000
 
 
 async def option_request_endpoint(
-    session: ClientSession, url: str, headers: CIMultiDict[str]
+    session: Optional[ClientSession],
+    url: Optional[str],
+    headers: Optional[CIMultiDict[str]],
 ):
     if session is None or url is None or headers is None:
         raise ValueError(
             "Cannot send option request to endpoint without previously observed session, url or headers."
         )
-    del_keys = [
-        key
-        for key in headers.keys()
-        if key.startswith("x-stainless") or key == "content-length"
-    ]
-    for key in del_keys:
-        del headers[key]
     await session.options(url, headers=headers)
 
 
@@ -82,7 +330,7 @@ def patch_aiohttp_client_session():
         def patched_init(self, *args, **kwargs):
             # Retrieve existing middlewares or start with an empty list
             middlewares = list(kwargs.get("middlewares", []))
-            observe_url_middleware = ObserveURLMiddleware()
+            observe_url_middleware = get_observe_url_middleware()
             # Check if your middleware is already present to avoid duplicates
             if observe_url_middleware not in middlewares:
                 middlewares.append(observe_url_middleware)
@@ -90,14 +338,25 @@ def patch_aiohttp_client_session():
             # Update kwargs with the new middleware list
             kwargs["middlewares"] = tuple(middlewares)
 
+            trace_configs = list(kwargs.get("trace_configs") or [])
+            if get_request_trace_config() not in trace_configs:
+                trace_configs.append(get_request_trace_config())
+            kwargs["trace_configs"] = trace_configs
+
             # Call the original __init__ with the modified arguments
             original_init(self, *args, **kwargs)
 
         setattr(ClientSession, CLIENT_SESSION_INIT_BACKUP_ATTR, original_init)
         ClientSession.__init__ = patched_init
+        litellm_ssl_context = get_litellm_ssl_context()
+        if litellm_ssl_context is not None:
+            time_tls_handshakes(litellm_ssl_context)
 
 
 def unpatch_aiohttp_client_session():
     if hasattr(ClientSession, CLIENT_SESSION_INIT_BACKUP_ATTR):
         ClientSession.__init__ = getattr(ClientSession, CLIENT_SESSION_INIT_BACKUP_ATTR)
         delattr(ClientSession, CLIENT_SESSION_INIT_BACKUP_ATTR)
+        litellm_ssl_context = get_litellm_ssl_context()
+        if litellm_ssl_context is not None:
+            untime_tls_handshakes(litellm_ssl_context)
@@ -1,5 +1,6 @@
 import asyncio
 import logging
+from typing import Set
 
 from tokenflood.io import IOContext
 from tokenflood.logging_utils import global_warn_once_filter
@@ -7,16 +8,11 @@ from tokenflood.models.endpoint_spec import EndpointSpec
 from tokenflood.models.data.error_data import ErrorContext
 from tokenflood.models.data.llm_request_data import LLMRequestContext
 from tokenflood.models.run_specs.observation_spec import ObservationSpec
-from tokenflood.models.data.ping_request_data import PingRequestContext
-from tokenflood.networking import (
-    ObserveURLMiddleware,
-    option_request_endpoint,
-    time_async_func,
-)
+from tokenflood.native_client import close_native_session
 from tokenflood.runner import (
+    NetworkLatencySampler,
     get_warm_session,
     handle_llm_result,
-    handle_ping_result,
     send_llm_request,
 )
 from tokenflood.schedule import create_even_schedule
@@ -30,28 +26,37 @@ async def run_observation(
     observation_spec: ObservationSpec,
     io_context: IOContext,
 ):
-    url_observer = ObserveURLMiddleware()
     io_context.activate()
     await io_context.wait_for_pending_writes()
     log.info("Warming up.")
-    error = await get_warm_session(endpoint_spec, io_context)
+    error = await get_warm_session(
+        endpoint_spec,
+        io_context,
+        requests_per_second=observation_spec.requests_per_second_during_polling,
+        num_generation_tokens=observation_spec.load_type.get_expected_output_length(),
+    )
 
     if error:
         log.error(f"Not starting observation due to error: {error}")
         await io_context.wait_for_pending_writes()
+        await close_native_session()
         return
 
-    llm_request_tasks = set()
-    ping_tasks = set()
+    llm_request_tasks: Set[asyncio.Task] = set()
     num_pings = 0
     load_type = observation_spec.load_type
-    message_lists = load_type.create_message_lists(observation_spec.total_num_requests)
+    message_lists = load_type.iter_message_lists(observation_spec.total_num_requests)
     request_per_second_phase = observation_spec.requests_per_second_during_polling
     i = 0
     burst_pauses = create_even_schedule(
         observation_spec.num_requests, observation_spec.within_seconds
     )
     inter_polling_pause = observation_spec.get_inter_polling_pause()
+    sampler = NetworkLatencySampler(
+        endpoint_spec,
+        io_context,
+        ErrorContext(requests_per_second_phase=request_per_second_phase, group_id=0),
+    )
     log.info(f"Doing {observation_spec.num_polls} polls in total.")
     for poll_idx in range(observation_spec.num_polls):
         log.info(f"Starting poll {poll_idx + 1}.")
@@ -59,15 +64,17 @@ async def run_observation(
             requests_per_second_phase=request_per_second_phase, group_id=poll_idx
         )
         for burst_idx in range(observation_spec.num_requests):
+            message_list = next(message_lists)
             request_context = LLMRequestContext(
                 datetime=get_exact_date_str(),
                 expected_input_tokens=load_type.get_expected_prompt_length(),
                 expected_prefix_tokens=load_type.get_expected_prefix_length(),
                 expected_output_tokens=load_type.get_expected_output_length(),
                 requests_per_second_phase=request_per_second_phase,
+                concurrency=len(llm_request_tasks) + 1,
                 request_number=i,
                 model=endpoint_spec.provider_model_str,
-                prompt=message_lists[i][0]["content"],
+                prompt=message_list[0]["content"],
                 group_id=poll_idx,
             )
             log.info(
@@ -76,7 +83,7 @@ async def run_observation(
             t = asyncio.create_task(
                 send_llm_request(
                     endpoint_spec,
-                    message_lists[i],
+                    message_list,
                     load_type.get_expected_output_length(),
                 )
             )
@@ -88,36 +95,22 @@ async def run_observation(
 
             # ping once per poll
             if poll_idx >= num_pings:
-                ping_context = PingRequestContext(
-                    datetime=get_exact_date_str(),
-                    endpoint_url=str(url_observer.url),
-                    requests_per_second_phase=request_per_second_phase,
-                    group_id=poll_idx,
-                )
-                pt = asyncio.create_task(
-                    time_async_func(
-                        option_request_endpoint(
-                            url_observer.session,
-                            str(url_observer.url),
-                            url_observer.headers,
-                        )
-                    )
-                )
-                ping_tasks.add(pt)
-                pt.add_done_callback(
-                    handle_ping_result(io_context, ping_context, error_context)
-                )
-                pt.add_done_callback(ping_tasks.discard)
+                sampler.error_context = error_context
+                sampler.sample()
                 num_pings += 1
                 await asyncio.sleep(burst_pauses[burst_idx])
             i += 1
         if poll_idx < observation_spec.num_polls - 1:
+            # lets the io context summarize the polls so far
+            await io_context.wait_for_pending_writes()
             log.info(f"Sleeping {inter_polling_pause}s until next polling phase")
             await asyncio.sleep(inter_polling_pause)
             global_warn_once_filter.clear()
 
     log.info("Waiting for all requests to come back.")
-    while llm_request_tasks or ping_tasks:
+    while llm_request_tasks:
         await asyncio.sleep(1.0)
+    await sampler.stop()
     # make sure all data can be flushed
     await io_context.wait_for_pending_writes()
+    await close_native_session()
@@ -1,28 +1,54 @@
 import asyncio
+import math
 import os
 import datetime
 import time
-from typing import Callable, Optional, cast
+from typing import Callable, List, Optional, Sequence, Set, Tuple, cast
 import logging
 
 import litellm
+import litellm.llms.custom_httpx.http_handler as litellm_http_handler
 from litellm import acompletion
 from litellm.types.utils import ModelResponse, Usage
 from tqdm import tqdm
 
-from tokenflood.constants import ERROR_RING_BUFFER_SIZE
+from tokenflood.constants import (
+    ERROR_RING_BUFFER_SIZE,
+    PING_METHOD_OPTIONS,
+    PING_METHOD_TLS,
+    PING_TIMEOUT_SECONDS,
+    SEND_LAG_WARNING_LIMIT_MS,
+    WARMUP_CONCURRENCY_HEADROOM,
+    WARMUP_GENERATION_TOKENS,
+    WARMUP_MAX_CONNECTIONS,
+)
+from tokenflood.dispatcher import DeadlineDispatcher
 from tokenflood.io import IOContext
-from tokenflood.logging_utils import global_warn_once_filter
+from tokenflood.logging_utils import WARN_ONCE_KEY, global_warn_once_filter
 from tokenflood.models.endpoint_spec import EndpointSpec
 from tokenflood.models.data.error_data import ErrorContext, ErrorData
-from tokenflood.models.data.llm_request_data import LLMRequestContext, LLMRequestData
+from tokenflood.models.data.llm_request_data import (
+    LLMRequestContext,
+    LLMRequestData,
+    LLMRequestResult,
+    TOKEN_ARRIVALS_KEY,
+)
 from tokenflood.messages import create_message_list_from_prompt
 from tokenflood.models.message_list import MessageList
 from tokenflood.models.data.ping_request_data import PingData, PingRequestContext
+from tokenflood.models.data.token_arrival_data import TokenArrivalData
+from tokenflood.models.load_types.load_type import SpecificLoadType
 from tokenflood.models.run_specs.load_test_spec import LoadTestSpec, LoadTestPhase
+from tokenflood.native_client import close_native_session, send_native_llm_request
 from tokenflood.networking import (
-    ObserveURLMiddleware,
+    ConnectionTimings,
+    ObservedEndpoint,
+    connection_timings,
+    get_observed_endpoint,
+    observed_endpoint,
     option_request_endpoint,
+    ping_endpoint,
+    ping_endpoint_tls,
     time_async_func,
 )
 from tokenflood.schedule import create_load_test_phase_schedule
@@ -60,32 +86,37 @@ def handle_llm_result(
     io_context: IOContext,
     llm_request_context: LLMRequestContext,
     error_context: ErrorContext,
-) -> Callable[[asyncio.Task[ModelResponse]], None]:
+) -> Callable[[asyncio.Task[LLMRequestResult]], None]:
     """Callback to handle llm request results and errors."""
 
-    def on_done(task: asyncio.Task[ModelResponse]):
+    def on_done(task: asyncio.Task[LLMRequestResult]):
         handle_error(io_context, error_context)(task)
         if not task.cancelled() and not task.exception():
-            model_response: ModelResponse = task.result()
-            data = LLMRequestData.from_response_and_context(
-                model_response, llm_request_context
-            )
+            result: LLMRequestResult = task.result()
+            data = LLMRequestData.from_result_and_context(result, llm_request_context)
             data.warn_on_diverging_measurements()
             io_context.write_llm_request(data.model_dump())
+            io_context.write_token_arrivals(
+                TokenArrivalData(
+                    group_id=llm_request_context.group_id,
+                    request_number=llm_request_context.request_number,
+                    arrivals=result.token_arrivals,
+                ).model_dump()
+            )
 
     return on_done
 
 
 def handle_ping_result(
     io_context: IOContext, ping_context: PingRequestContext, error_context: ErrorContext
-) -> Callable[[asyncio.Task[int]], None]:
-    """Callback to handle ping request results and errors."""
+) -> Callable[[asyncio.Task[Tuple[float, float]]], None]:
+    """Callback to handle ping results and errors."""
 
-    def on_done(task: asyncio.Task[int]):
+    def on_done(task: asyncio.Task[Tuple[float, float]]):
         handle_error(io_context, error_context)(task)
         if not task.cancelled() and not task.exception():
-            latency: int = task.result()
-            data = PingData.from_context(ping_context, latency)
+            latency, tls_handshake_latency = task.result()
+            data = PingData.from_context(ping_context, latency, tls_handshake_latency)
             io_context.write_network_latency(data.model_dump())
 
     return on_done
@@ -111,96 +142,305 @@ async def run_load_test_phase(
     io_context: IOContext,
 ) -> bool:
     schedule = create_load_test_phase_schedule(load_phase, load_test_spec.burstiness)
+    return await dispatch_load_test_phase(
+        test_description,
+        phase,
+        load_test_spec,
+        load_phase,
+        endpoint_spec,
+        io_context,
+        DeadlineDispatcher.from_schedule(schedule),
+        list(range(len(schedule))),
+    )
+
+
+async def dispatch_load_test_phase(
+    test_description: str,
+    phase: int,
+    load_test_spec: LoadTestSpec,
+    load_phase: LoadTestPhase,
+    endpoint_spec: EndpointSpec,
+    io_context: IOContext,
+    dispatcher: DeadlineDispatcher,
+    request_numbers: Sequence[int],
+    start_time: Optional[float] = None,
+    quiet: bool = False,
+    with_pings: bool = True,
+    sharded: bool = False,
+) -> bool:
+    """Send the requests of a phase (or a shard of it) along the dispatcher's deadlines.
+
+    start_time is the monotonic time at which the phase starts, defaulting to now.
+    Quiet dispatches neither show a progress bar nor log progress information.
+    Sharded dispatches record their concurrency as shard_concurrency."""
     load_type = load_test_spec.load_type
-    message_lists = load_type.create_message_lists(len(schedule))
+    message_lists = load_type.iter_message_lists(
+        len(request_numbers), stream=(phase, *request_numbers[:1])
+    )
     error_context = ErrorContext(
         requests_per_second_phase=load_phase.requests_per_second, group_id=phase
     )
     error_threshold_tripped = False
     error_rate = 0.0
-    num_pings = 0
-    llm_request_tasks = set()
-    ping_tasks = set()
-    url_observer = ObserveURLMiddleware()
+    llm_request_tasks: Set[asyncio.Task] = set()
+    sampler = NetworkLatencySampler(endpoint_spec, io_context, error_context)
 
-    pbar = tqdm(range(len(schedule)), desc=test_description)
+    pbar = tqdm(range(len(request_numbers)), desc=test_description, disable=quiet)
+    dispatcher.start(start_time)
+    if with_pings:
+        sampler.start()
     for i in pbar:
         error_rate = io_context.error_rate()
-        pbar.set_postfix({"error rate": round(error_rate, 2)})
+        pbar.set_postfix(
+            {
+                "error rate": round(error_rate, 2),
+                "send lag": f"{dispatcher.mean_send_lag:.1f}ms",
+            }
+        )
         if error_rate > load_test_spec.error_limit:
             error_threshold_tripped = True
             break
-        request_context = LLMRequestContext(
-            datetime=get_exact_date_str(),
-            expected_input_tokens=load_type.get_expected_prompt_length(),
-            expected_prefix_tokens=load_type.get_expected_prefix_length(),
-            expected_output_tokens=load_type.get_expected_output_length(),
-            requests_per_second_phase=load_phase.requests_per_second,
-            request_number=i,
-            model=endpoint_spec.provider_model_str,
-            prompt=message_lists[i][0]["content"],
-            group_id=phase,
+        message_list = next(message_lists)
+        await io_context.wait_for_capacity()
+        send_lag = dispatcher.record_send(i)
+        send_load_request(
+            endpoint_spec,
+            io_context,
+            load_type,
+            message_list,
+            request_numbers[i],
+            error_context,
+            llm_request_tasks,
+            sharded=sharded,
         )
-        t = asyncio.create_task(
-            send_llm_request(
-                endpoint_spec,
-                message_lists[i],
-                load_type.get_expected_output_length(),
-            )
+        warn_on_send_lag(send_lag)
+        await dispatcher.wait_for_send_slot(i + 1)
+    if not quiet:
+        log_dispatch(dispatcher, load_phase.requests_per_second)
+        log.info("Waiting for all requests to come back.")
+    await drain_requests([llm_request_tasks], [sampler], [io_context])
+    if error_threshold_tripped:
+        log.error(
+            f"Aborting the phase because the error rate exceeded {int(error_rate * 100)}% for the last {ERROR_RING_BUFFER_SIZE} requests."
         )
-        t.add_done_callback(
-            handle_llm_result(io_context, request_context, error_context)
+    elif not quiet:
+        log.info("Finished the phase.")
+    return error_threshold_tripped
+
+
+def send_load_request(
+    endpoint_spec: EndpointSpec,
+    io_context: IOContext,
+    load_type: SpecificLoadType,
+    message_list: MessageList,
+    request_number: int,
+    error_context: ErrorContext,
+    llm_request_tasks: Set[asyncio.Task],
+    date_str: Optional[str] = None,
+    sharded: bool = False,
+) -> asyncio.Task:
+    """Send a request and record its result under the group of the error context.
+
+    The request is kept in llm_request_tasks while it is in flight, the
+    requests in there make up its recorded concurrency. In sharded runs they
+    are only the ones of this process, so they are recorded as its
+    shard_concurrency instead."""
+    in_flight = len(llm_request_tasks) + 1
+    request_context = LLMRequestContext(
+        datetime=date_str or get_exact_date_str(),
+        expected_input_tokens=load_type.get_expected_prompt_length(),
+        expected_prefix_tokens=load_type.get_expected_prefix_length(),
+        expected_output_tokens=load_type.get_expected_output_length(),
+        requests_per_second_phase=error_context.requests_per_second_phase,
+        concurrency=0 if sharded else in_flight,
+        shard_concurrency=in_flight if sharded else 0,
+        request_number=request_number,
+        model=endpoint_spec.provider_model_str,
+        prompt=message_list[0]["content"],
+        group_id=error_context.group_id,
+    )
+    t = asyncio.create_task(
+        send_llm_request(
+            endpoint_spec,
+            message_list,
+            load_type.get_expected_output_length(),
         )
-        llm_request_tasks.add(t)
-        t.add_done_callback(llm_request_tasks.discard)
-        await asyncio.sleep(schedule[i])
-        # ping at most every second
-        if sum(schedule[: i + 1]) > num_pings:
-            ping_context = PingRequestContext(
-                datetime=get_exact_date_str(),
-                endpoint_url=str(url_observer.url),
-                requests_per_second_phase=load_phase.requests_per_second,
-                group_id=phase,
-            )
-            pt = asyncio.create_task(
-                time_async_func(
-                    option_request_endpoint(
-                        url_observer.session,
-                        str(url_observer.url),
-                        url_observer.headers,
-                    )
-                )
+    )
+    t.add_done_callback(handle_llm_result(io_context, request_context, error_context))
+    llm_request_tasks.add(t)
+    t.add_done_callback(llm_request_tasks.discard)
+    return t
+
+
+def log_dispatch(dispatcher: DeadlineDispatcher, requests_per_second: float):
+    log.info(
+        f"Sent {dispatcher.num_sent} requests at "
+        f"{dispatcher.achieved_requests_per_second:.2f} requests/s "
+        f"(target {requests_per_second:.2f} requests/s) with a mean send lag of "
+        f"{dispatcher.mean_send_lag:.1f}ms (max {dispatcher.max_send_lag:.1f}ms)."
+    )
+
+
+async def ping_observed_endpoint(
+    observed: ObservedEndpoint, method: str
+) -> Tuple[float, float]:
+    """Latency and TLS handshake latency in ms to the url the requests went to."""
+    if observed.url is None or observed.host is None or observed.port is None:
+        raise ValueError("Cannot ping the endpoint without a previously observed url.")
+    if method == PING_METHOD_OPTIONS:
+        latency = await time_async_func(
+            option_request_endpoint(
+                observed.session, str(observed.url), observed.ping_headers
             )
-            ping_tasks.add(pt)
-            pt.add_done_callback(
-                handle_ping_result(io_context, ping_context, error_context)
+        )
+        return latency, 0.0
+    if method == PING_METHOD_TLS and observed.url.scheme == "https":
+        return await ping_endpoint_tls(observed.host, observed.port)
+    return await ping_endpoint(observed.host, observed.port), 0.0
+
+
+class NetworkLatencySampler:
+    """Samples the network latency to the endpoint in a background task.
+
+    Samples are taken at the endpoint's pings_per_second, independent of the
+    requests, and labeled with the error context in effect when they are
+    taken. By default, the latency is the time to open a TCP connection,
+    which keeps the server's request handling out of it."""
+
+    def __init__(
+        self,
+        endpoint_spec: EndpointSpec,
+        io_context: IOContext,
+        error_context: ErrorContext,
+    ) -> None:
+        self.observed = get_observed_endpoint(endpoint_spec)
+        self.method = endpoint_spec.ping_method
+        self.interval = 1 / endpoint_spec.pings_per_second
+        self.io_context = io_context
+        self.error_context = error_context
+        self.ping_tasks: Set[asyncio.Task] = set()
+        self.sampling_task: Optional[asyncio.Task] = None
+
+    def sample(self):
+        # nothing to ping before a request has revealed the url of the endpoint
+        if self.observed.url is None:
+            return
+        ping_context = PingRequestContext(
+            datetime=get_exact_date_str(),
+            endpoint_url=str(self.observed.url),
+            requests_per_second_phase=self.error_context.requests_per_second_phase,
+            group_id=self.error_context.group_id,
+            method=self.method,
+        )
+        pt = asyncio.create_task(
+            asyncio.wait_for(
+                ping_observed_endpoint(self.observed, self.method),
+                PING_TIMEOUT_SECONDS,
             )
-            pt.add_done_callback(ping_tasks.discard)
-            num_pings += 1
-    log.info("Waiting for all requests to come back.")
-    while llm_request_tasks or ping_tasks:
+        )
+        self.ping_tasks.add(pt)
+        pt.add_done_callback(
+            handle_ping_result(self.io_context, ping_context, self.error_context)
+        )
+        pt.add_done_callback(self.ping_tasks.discard)
+
+    async def sample_periodically(self):
+        loop = asyncio.get_running_loop()
+        next_sample = loop.time()
+        while True:
+            next_sample += self.interval
+            await asyncio.sleep(max(0.0, next_sample - loop.time()))
+            self.sample()
+
+    def start(self):
+        self.sampling_task = asyncio.create_task(self.sample_periodically())
+
+    async def stop(self):
+        """Stop sampling and wait for the samples in flight."""
+        if self.sampling_task is not None:
+            self.sampling_task.cancel()
+            await asyncio.gather(self.sampling_task, return_exceptions=True)
+            self.sampling_task = None
+        await asyncio.gather(*self.ping_tasks, return_exceptions=True)
+
+
+async def drain_requests(
+    llm_request_tasks: Sequence[Set[asyncio.Task]],
+    samplers: Sequence[NetworkLatencySampler],
+    io_contexts: Sequence[IOContext],
+):
+    """Wait for the requests in flight, stop sampling and flush all data."""
+    while any(llm_request_tasks):
         await asyncio.sleep(1.0)
-
+    for sampler in samplers:
+        await sampler.stop()
     # make sure all data can be flushed
-    await io_context.wait_for_pending_writes()
-    if error_threshold_tripped:
-        log.error(
-            f"Aborting the phase because the error rate exceeded {int(error_rate * 100)}% for the last {ERROR_RING_BUFFER_SIZE} requests."
+    for io_context in io_contexts:
+        await io_context.wait_for_pending_writes()
+
+
+def warn_on_send_lag(send_lag: float):
+    if send_lag > SEND_LAG_WARNING_LIMIT_MS:
+        log.warning(
+            f"A request was sent {send_lag:.0f}ms after its scheduled time. The load generator cannot keep up with the request rate, so the achieved rate will be lower than the target. This warning type will only appear once per phase.",
+            extra={WARN_ONCE_KEY: "send_lag"},
         )
-    else:
-        log.info("Finished the phase.")
-    return error_threshold_tripped
 
 
-async def warm_up_session(endpoint_spec: EndpointSpec, idx: int = 0):
+async def warm_up_session(
+    endpoint_spec: EndpointSpec,
+    idx: int = 0,
+    num_generation_tokens: int = WARMUP_GENERATION_TOKENS,
+):
     message_list = create_message_list_from_prompt(f"warmup ping{idx}")
-    return await send_llm_request(endpoint_spec, message_list, 20)
+    return await send_llm_request(endpoint_spec, message_list, num_generation_tokens)
+
+
+def apply_litellm_pool_options(endpoint_spec: EndpointSpec):
+    """Set the pool options of the aiohttp session litellm creates for its requests.
+
+    litellm reads them when it creates its session and keeps the session
+    for the rest of the process."""
+    if endpoint_spec.pool_size is not None:
+        litellm_http_handler.AIOHTTP_CONNECTOR_LIMIT = endpoint_spec.pool_size  # type: ignore[misc]
+    if endpoint_spec.pool_size_per_host is not None:
+        litellm_http_handler.AIOHTTP_CONNECTOR_LIMIT_PER_HOST = (  # type: ignore[misc]
+            endpoint_spec.pool_size_per_host
+        )
+    if endpoint_spec.keepalive_timeout is not None:
+        litellm_http_handler.AIOHTTP_KEEPALIVE_TIMEOUT = math.ceil(  # type: ignore[misc]
+            endpoint_spec.keepalive_timeout
+        )
 
 
 async def send_llm_request(
     endpoint_spec: EndpointSpec,
     messages: MessageList,
     num_generation_tokens: int,
+) -> LLMRequestResult:
+    timings = ConnectionTimings()
+    token = connection_timings.set(timings)
+    observed_token = observed_endpoint.set(get_observed_endpoint(endpoint_spec))
+    try:
+        if endpoint_spec.client == "native":
+            result = await send_native_llm_request(
+                endpoint_spec, messages, num_generation_tokens
+            )
+        else:
+            model_response = await send_litellm_request(
+                endpoint_spec, messages, num_generation_tokens
+            )
+            result = LLMRequestResult.from_model_response(model_response)
+    finally:
+        connection_timings.reset(token)
+        observed_endpoint.reset(observed_token)
+    return result.model_copy(update=timings.get_fields())
+
+
+async def send_litellm_request(
+    endpoint_spec: EndpointSpec,
+    messages: MessageList,
+    num_generation_tokens: int,
 ) -> ModelResponse:
     first_token_time = None
     start_time = time.time()
@@ -222,15 +462,19 @@ async def send_llm_request(
         stream_options={"include_usage": True},
     )
     chunks = []
+    token_arrivals = []
     async for chunk in response:
         delta = chunk.choices[0].delta
-        if first_token_time is None and (
+        if (
             hasattr(delta, "content")
             and delta.content
             or hasattr(delta, "reasoning_content")
             and delta.reasoning_content
         ):
-            first_token_time = time.time()
+            arrival_time = time.time()
+            if first_token_time is None:
+                first_token_time = arrival_time
+            token_arrivals.append(int((arrival_time - start_time) * 1_000_000))
         chunks.append(chunk)
     end_time = time.time()
     end = datetime.datetime.now()
@@ -271,6 +515,7 @@ async def send_llm_request(
         avg_tpot * 1000
     )
     model_response._hidden_params[LLMRequestData.F.latency] = total_duration * 1000
+    model_response._hidden_params[TOKEN_ARRIVALS_KEY] = token_arrivals
 
     return model_response
 
@@ -281,19 +526,75 @@ def make_test_description(
     return f"Load test {load_test_spec.name} phase {phase}: {load_test_phase.requests_per_second:.2f} requests/s"
 
 
+def estimate_peak_concurrency(
+    requests_per_second: float, latency_seconds: float
+) -> int:
+    """Requests in flight at a request rate by Little's law, with headroom for fluctuations."""
+    return math.ceil(
+        requests_per_second * latency_seconds * WARMUP_CONCURRENCY_HEADROOM
+    )
+
+
 async def get_warm_session(
-    endpoint_spec: EndpointSpec, io_context: IOContext
+    endpoint_spec: EndpointSpec,
+    io_context: IOContext,
+    requests_per_second: float = 0.0,
+    concurrency: int = 1,
+    num_generation_tokens: int = WARMUP_GENERATION_TOKENS,
 ) -> Optional[str]:
-    error = None
+    """Warm up the connection pool for the peak concurrency of the first phase.
+
+    A first request of the run's output length opens a connection and
+    measures the latency, from which the concurrency at the request rate
+    follows. That many short requests are then sent at once, so the pool
+    opens a connection for each of them."""
+    apply_litellm_pool_options(endpoint_spec)
     error_context = ErrorContext(requests_per_second_phase=-1.0, group_id=-1)
-    for i in range(20):
-        t = asyncio.create_task(warm_up_session(endpoint_spec, i))
-        t.add_done_callback(handle_error(io_context, error_context))
-        result = (await asyncio.gather(t, return_exceptions=True))[0]
-        if isinstance(result, Exception):
-            error = str(result)
-            break
-    return error
+
+    async def warm_up(num_requests: int, num_tokens: int) -> Optional[str]:
+        tasks = []
+        for i in range(num_requests):
+            t = asyncio.create_task(warm_up_session(endpoint_spec, i, num_tokens))
+            t.add_done_callback(handle_error(io_context, error_context))
+            tasks.append(t)
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        errors = [str(result) for result in results if isinstance(result, Exception)]
+        return errors[0] if errors else None
+
+    start = time.perf_counter()
+    error = await warm_up(1, num_generation_tokens)
+    if error:
+        return error
+    num_connections = max(
+        concurrency,
+        estimate_peak_concurrency(requests_per_second, time.perf_counter() - start),
+    )
+    num_connections = min(
+        num_connections,
+        endpoint_spec.max_pool_size or WARMUP_MAX_CONNECTIONS,
+        WARMUP_MAX_CONNECTIONS,
+    )
+    if num_connections <= 1:
+        return None
+    log.info(f"Opening {num_connections} connections.")
+    # opening the connections does not need long completions
+    return await warm_up(num_connections, WARMUP_GENERATION_TOKENS)
+
+
+async def warm_up_for_load_test(
+    endpoint_spec: EndpointSpec,
+    load_test_spec: LoadTestSpec,
+    io_context: IOContext,
+    num_shards: int = 1,
+) -> Optional[str]:
+    """Warm up for the first phase of a load test, sharded across num_shards processes."""
+    first_phase = load_test_spec.create_load_test_phases()[0]
+    return await get_warm_session(
+        endpoint_spec,
+        io_context,
+        requests_per_second=first_phase.requests_per_second / num_shards,
+        num_generation_tokens=load_test_spec.load_type.get_expected_output_length(),
+    )
 
 
 async def run_load_test(
@@ -303,11 +604,12 @@ async def run_load_test(
     await io_context.wait_for_pending_writes()
     load_test_phases = load_test_spec.create_load_test_phases()
     log.info("Warming up.")
-    error = await get_warm_session(endpoint_spec, io_context)
+    error = await warm_up_for_load_test(endpoint_spec, load_test_spec, io_context)
     if error:
         log.error(f"Not starting run due to error during warmup: {error}")
         # letting any writes finish
         await io_context.wait_for_pending_writes()
+        await close_native_session()
         return
     for i, load_test_phase in enumerate(load_test_phases):
         test_description = make_test_description(load_test_spec, i + 1, load_test_phase)
@@ -323,3 +625,142 @@ async def run_load_test(
             log.error("Ending the run because the error threshold was tripped.")
             break
         global_warn_once_filter.clear()
+    await close_native_session()
+
+
+async def dispatch_comparison_phase(
+    test_description: str,
+    phase: int,
+    load_test_spec: LoadTestSpec,
+    load_phase: LoadTestPhase,
+    endpoint_specs: Sequence[EndpointSpec],
+    io_contexts: Sequence[IOContext],
+    round_robin: bool = False,
+) -> List[bool]:
+    """Send the requests of a phase to several endpoints along one schedule.
+
+    Every request goes to all endpoints at once with the same prompt or, with
+    round_robin, to one endpoint after the other. Returns for each endpoint
+    whether its error threshold was tripped. Tripped endpoints receive no
+    further requests, while the others keep going."""
+    load_type = load_test_spec.load_type
+    schedule = create_load_test_phase_schedule(load_phase, load_test_spec.burstiness)
+    dispatcher = DeadlineDispatcher.from_schedule(schedule)
+    message_lists = load_type.iter_message_lists(len(schedule), stream=(phase, 0))
+    num_endpoints = len(endpoint_specs)
+    # in round robin mode, each endpoint only receives its share of the rate
+    error_context = ErrorContext(
+        requests_per_second_phase=load_phase.requests_per_second
+        / (num_endpoints if round_robin else 1),
+        group_id=phase,
+    )
+    tripped = [False] * num_endpoints
+    llm_request_tasks: List[Set[asyncio.Task]] = [set() for _ in endpoint_specs]
+    samplers = [
+        NetworkLatencySampler(endpoint_spec, io_context, error_context)
+        for endpoint_spec, io_context in zip(endpoint_specs, io_contexts)
+    ]
+
+    pbar = tqdm(range(len(schedule)), desc=test_description)
+    dispatcher.start()
+    for sampler in samplers:
+        sampler.start()
+    for i in pbar:
+        error_rates = [io_context.error_rate() for io_context in io_contexts]
+        pbar.set_postfix(
+            {
+                "error rate": round(max(error_rates), 2),
+                "send lag": f"{dispatcher.mean_send_lag:.1f}ms",
+            }
+        )
+        for j, error_rate in enumerate(error_rates):
+            if error_rate > load_test_spec.error_limit and not tripped[j]:
+                tripped[j] = True
+                log.error(
+                    f"Stopping the requests to {endpoint_specs[j].folder_name} because the error rate exceeded {int(error_rate * 100)}% for the last {ERROR_RING_BUFFER_SIZE} requests."
+                )
+        if all(tripped):
+            break
+        # the prompts are drawn for every request, so both modes share the same ones
+        message_list = next(message_lists)
+        targets = [i % num_endpoints] if round_robin else range(num_endpoints)
+        date_str = get_exact_date_str()
+        send_lag = dispatcher.record_send(i)
+        for j in targets:
+            if not tripped[j]:
+                send_load_request(
+                    endpoint_specs[j],
+                    io_contexts[j],
+                    load_type,
+                    message_list,
+                    i,
+                    error_context,
+                    llm_request_tasks[j],
+                    date_str,
+                )
+        warn_on_send_lag(send_lag)
+        await dispatcher.wait_for_send_slot(i + 1)
+    log_dispatch(dispatcher, load_phase.requests_per_second)
+    log.info("Waiting for all requests to come back.")
+    await drain_requests(llm_request_tasks, samplers, io_contexts)
+    log.info("Finished the phase.")
+    return tripped
+
+
+async def run_comparison_load_test(
+    endpoint_specs: Sequence[EndpointSpec],
+    load_test_spec: LoadTestSpec,
+    io_contexts: Sequence[IOContext],
+    round_robin: bool = False,
+):
+    """Run a load test against several endpoints along one shared schedule.
+
+    Each endpoint writes to its own io context, so every endpoint gets a
+    regular run of its own that can be compared to the others."""
+    if len(endpoint_specs) != len(io_contexts):
+        raise ValueError(
+            f"Need one io context per endpoint, got {len(io_contexts)} for {len(endpoint_specs)} endpoints."
+        )
+    for io_context in io_contexts:
+        io_context.activate()
+        await io_context.wait_for_pending_writes()
+    load_test_phases = load_test_spec.create_load_test_phases()
+    log.info("Warming up.")
+    num_shards = len(endpoint_specs) if round_robin else 1
+    errors = await asyncio.gather(
+        *[
+            warm_up_for_load_test(endpoint_spec, load_test_spec, io_context, num_shards)
+            for endpoint_spec, io_context in zip(endpoint_specs, io_contexts)
+        ]
+    )
+    for endpoint_spec, error in zip(endpoint_specs, errors):
+        if error:
+            log.error(
+                f"Not starting run due to error during warmup of {endpoint_spec.folder_name}: {error}"
+            )
+    if any(errors):
+        # letting any writes finish
+        for io_context in io_contexts:
+            await io_context.wait_for_pending_writes()
+        await close_native_session()
+        return
+    remaining = list(range(len(endpoint_specs)))
+    for i, load_test_phase in enumerate(load_test_phases):
+        test_description = make_test_description(load_test_spec, i + 1, load_test_phase)
+        tripped = await dispatch_comparison_phase(
+            test_description,
+            i,
+            load_test_spec,
+            load_test_phase,
+            [endpoint_specs[j] for j in remaining],
+            [io_contexts[j] for j in remaining],
+            round_robin,
+        )
+        remaining = [j for j, t in zip(remaining, tripped) if not t]
+        if not remaining:
+            log.error(
+                "Ending the run because the error threshold was tripped for all endpoints."
+            )
+            break
+        global_warn_once_filter.clear()
+    await close_native_session()
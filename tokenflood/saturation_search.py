@@ -0,0 +1,196 @@
+import logging
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from tokenflood.io import IOContext, ObservedIOContext, write_file
+from tokenflood.logging_utils import global_warn_once_filter
+from tokenflood.models.data.saturation_search_data import (
+    SaturationSearchSummary,
+    SearchProbe,
+)
+from tokenflood.models.endpoint_spec import EndpointSpec
+from tokenflood.models.run_specs.latency_slo import LatencySLO
+from tokenflood.models.run_specs.saturation_search_spec import SaturationSearchSpec
+from tokenflood.native_client import close_native_session
+from tokenflood.runner import get_warm_session, run_load_test_phase
+
+log = logging.getLogger(__name__)
+
+
+class SaturationBracket:
+    """Narrows down the highest request rate that meets the SLO.
+
+    The rate grows exponentially until a probe fails, then the bracket
+    between the highest passing and the lowest failing rate is bisected."""
+
+    def __init__(
+        self,
+        start_requests_per_second: float,
+        growth_factor: float,
+        precision: float,
+        min_requests_per_second: float,
+    ):
+        self.growth_factor = growth_factor
+        self.precision = precision
+        self.min_requests_per_second = min_requests_per_second
+        self.lower: Optional[float] = None
+        self.upper: Optional[float] = None
+        self.rate: Optional[float] = start_requests_per_second
+
+    def record(self, requests_per_second: float, passed: bool):
+        if passed:
+            self.lower = max(self.lower or 0.0, requests_per_second)
+        else:
+            self.upper = min(self.upper or float("inf"), requests_per_second)
+        self.rate = self.get_next_rate()
+
+    def get_next_rate(self) -> Optional[float]:
+        """The rate to probe next or None once the search is done."""
+        if self.upper is None:
+            return (self.lower or 0.0) * self.growth_factor
+        lower = self.lower or 0.0
+        if self.upper - lower <= self.precision * self.upper:
+            return None
+        rate = (lower + self.upper) / 2
+        if rate < self.min_requests_per_second:
+            return None
+        return rate
+
+
+class ProbeTally:
+    """Collects the SLO metric and the errors of every probe from the written records."""
+
+    def __init__(self, slo: LatencySLO):
+        self.slo = slo
+        self.values: Dict[int, List[float]] = defaultdict(list)
+        self.errors: Counter[int] = Counter()
+
+    def add_llm_request(self, data: Dict):
+        self.values[data["group_id"]].append(data[self.slo.metric])
+
+    def add_error(self, data: Dict):
+        self.errors[data["group_id"]] += 1
+
+    def evaluate(
+        self, group_id: int, requests_per_second: float, error_threshold_tripped: bool
+    ) -> SearchProbe:
+        values = self.values[group_id]
+        num_errors = self.errors[group_id]
+        num_requests = len(values) + num_errors
+        error_rate = num_errors / num_requests if num_requests > 0 else 0.0
+        metric_value = (
+            float(np.percentile(values, self.slo.percentile)) if values else None
+        )
+        passed = (
+            not error_threshold_tripped
+            and metric_value is not None
+            and metric_value <= self.slo.limit_ms
+            and error_rate <= self.slo.max_error_rate
+        )
+        return SearchProbe(
+            group_id=group_id,
+            requests_per_second=requests_per_second,
+            num_requests=num_requests,
+            num_errors=num_errors,
+            error_rate=error_rate,
+            metric_value=metric_value,
+            passed=passed,
+        )
+
+
+def describe_slo(slo: LatencySLO) -> str:
+    return (
+        f"p{slo.percentile:g} {slo.metric} < {slo.limit_ms:g}ms "
+        f"with an error rate < {slo.max_error_rate * 100:g}%"
+    )
+
+
+async def run_saturation_search(
+    endpoint_spec: EndpointSpec,
+    search_spec: SaturationSearchSpec,
+    io_context: IOContext,
+    summary_file: Optional[str] = None,
+) -> Optional[SaturationSearchSummary]:
+    """Search the highest request rate that meets the SLO with short load test probes.
+
+    Every probe is written as its own group, so the results can be inspected
+    like a load test. The outcome is written to summary_file if given."""
+    tally = ProbeTally(search_spec.slo)
+    observed_io_context = ObservedIOContext(
+        io_context, tally.add_llm_request, tally.add_error
+    )
+    observed_io_context.activate()
+    await observed_io_context.wait_for_pending_writes()
+    log.info("Warming up.")
+    error = await get_warm_session(
+        endpoint_spec,
+        observed_io_context,
+        requests_per_second=search_spec.start_requests_per_second,
+        num_generation_tokens=search_spec.load_type.get_expected_output_length(),
+    )
+    if error:
+        log.error(f"Not starting search due to error during warmup: {error}")
+        # letting any writes finish
+        await observed_io_context.wait_for_pending_writes()
+        await close_native_session()
+        return None
+
+    log.info(f"Searching the capacity for {describe_slo(search_spec.slo)}.")
+    probe_load_test_spec = search_spec.create_probe_load_test_spec()
+    bracket = SaturationBracket(
+        search_spec.start_requests_per_second,
+        search_spec.growth_factor,
+        search_spec.precision,
+        search_spec.min_requests_per_second,
+    )
+    probes: List[SearchProbe] = []
+    while bracket.rate is not None and len(probes) < search_spec.max_probes:
+        group_id = len(probes)
+        probe_phase = search_spec.create_probe_phase(bracket.rate)
+        error_threshold_tripped = await run_load_test_phase(
+            f"Saturation search {search_spec.name} probe {group_id + 1}: {bracket.rate:.2f} requests/s",
+            group_id,
+            probe_load_test_spec,
+            probe_phase,
+            endpoint_spec,
+            observed_io_context,
+        )
+        probe = tally.evaluate(group_id, bracket.rate, error_threshold_tripped)
+        probes.append(probe)
+        metric_value = (
+            f"{probe.metric_value:.1f}ms" if probe.metric_value is not None else "n/a"
+        )
+        log.info(
+            f"Probe at {probe.requests_per_second:.2f} requests/s "
+            f"{'met' if probe.passed else 'missed'} the SLO: "
+            f"p{search_spec.slo.percentile:g} {search_spec.slo.metric} of {metric_value}, "
+            f"error rate of {probe.error_rate * 100:.1f}%."
+        )
+        bracket.record(probe.requests_per_second, probe.passed)
+        global_warn_once_filter.clear()
+        # errors of an overloaded probe must not trip the error limit of the next one
+        io_context.state_watch.clear()
+
+    summary = SaturationSearchSummary(
+        slo=search_spec.slo,
+        capacity_requests_per_second=bracket.lower,
+        probes=tuple(probes),
+    )
+    if bracket.rate is not None:
+        log.warning(
+            f"Stopped the search after {search_spec.max_probes} probes before it converged."
+        )
+    if summary.capacity_requests_per_second is None:
+        log.warning(
+            f"None of the probed rates met the SLO {describe_slo(search_spec.slo)}."
+        )
+    else:
+        log.info(
+            f"The highest rate meeting the SLO is {summary.capacity_requests_per_second:.2f} requests/s."
+        )
+    if summary_file is not None:
+        write_file(summary_file, summary.model_dump_json(indent=2))
+    await close_native_session()
+    return summary
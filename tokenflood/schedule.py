@@ -2,7 +2,10 @@ from typing import List
 
 import numpy as np
 
-from tokenflood.models.run_specs.load_test_spec import LoadTestPhase
+from tokenflood.models.run_specs.load_test_spec import (
+    LoadTestPhase,
+    LoadTestPhaseShard,
+)
 
 highest_burstiness_control = 21
 
@@ -38,3 +41,36 @@ def create_load_test_phase_schedule(
     total_length = pauses.sum()
     pauses = pauses / (total_length / load_phase.duration_seconds)
     return list(pauses) + [0.0]
+
+
+def create_send_offsets(schedule: List[float]) -> List[float]:
+    """Turn the pauses of a schedule into send times relative to the phase start."""
+    if len(schedule) == 0:
+        return []
+    return [0.0] + list(np.cumsum(schedule[:-1]))
+
+
+def create_load_test_phase_shards(
+    phase: int,
+    load_phase: LoadTestPhase,
+    schedule: List[float],
+    num_shards: int,
+    start_time: float,
+) -> List[LoadTestPhaseShard]:
+    """Split a phase schedule round-robin into shards that keep the absolute send times.
+
+    start_time is the unix timestamp at which all shards start the phase."""
+    send_offsets = create_send_offsets(schedule)
+    end_offset = float(sum(schedule))
+    return [
+        LoadTestPhaseShard(
+            phase=phase,
+            load_phase=load_phase,
+            shard_idx=shard_idx,
+            send_offsets=tuple(float(o) for o in send_offsets[shard_idx::num_shards]),
+            request_numbers=tuple(range(shard_idx, len(schedule), num_shards)),
+            end_offset=end_offset,
+            start_time=start_time,
+        )
+        for shard_idx in range(num_shards)
+    ]
@@ -0,0 +1,265 @@
+import os
+from collections import defaultdict
+from typing import Dict, Iterable, Mapping, Optional, Sequence, Set, cast
+
+import pandas as pd
+
+from tokenflood.columnar import get_columnar_file, read_columnar
+from tokenflood.constants import (
+    ERROR_FILE,
+    GROUP_ID,
+    LLM_REQUESTS_FILE,
+    NETWORK_LATENCY_FILE,
+    SUMMARY_FILE,
+    SUMMARY_METRIC_FIELDS,
+    SUMMARY_PERCENTILES,
+)
+from tokenflood.models.data.latency_histogram import LatencyHistogram
+from tokenflood.models.data.summary_data import (
+    GroupSummary,
+    MetricSummary,
+    RunSummary,
+)
+
+# fields of the first request that label a group
+GROUP_LABEL_FIELDS = ("datetime", "requests_per_second_phase", "concurrency")
+
+
+def summarize_histogram(
+    histogram: LatencyHistogram, percentiles: Sequence[int]
+) -> MetricSummary:
+    return MetricSummary(
+        count=histogram.count,
+        mean=histogram.mean or 0.0,
+        percentiles={p: histogram.percentile(p) or 0.0 for p in percentiles},
+        histogram=histogram,
+    )
+
+
+def make_histogram(values: Iterable[float]) -> LatencyHistogram:
+    histogram = LatencyHistogram()
+    for value in values:
+        histogram.record(value)
+    return histogram
+
+
+def make_group_summary(
+    group_id: int,
+    num_requests: int,
+    num_errors: int,
+    first_request: Optional[Mapping],
+    histograms: Mapping[str, Mapping[str, LatencyHistogram]],
+    percentiles: Sequence[int],
+    throughput: Optional[float] = None,
+) -> GroupSummary:
+    first_request = first_request or {}
+    return GroupSummary(
+        group_id=group_id,
+        num_requests=num_requests,
+        num_errors=num_errors,
+        **{field: first_request.get(field) for field in GROUP_LABEL_FIELDS},
+        throughput=throughput,
+        metrics={
+            results_file: {
+                field: summarize_histogram(histogram, percentiles)
+                for field, histogram in field_histograms.items()
+                if histogram.count > 0
+            }
+            for results_file, field_histograms in histograms.items()
+        },
+    )
+
+
+class GroupAccumulator:
+    def __init__(self) -> None:
+        self.num_requests = 0
+        self.num_errors = 0
+        self.first_request: Optional[Dict] = None
+        self.throughput: Optional[float] = None
+        self.histograms: Dict[str, Dict[str, LatencyHistogram]] = {
+            results_file: defaultdict(LatencyHistogram)
+            for results_file in SUMMARY_METRIC_FIELDS
+        }
+
+    def add(self, results_file: str, data: Dict):
+        for field in SUMMARY_METRIC_FIELDS[results_file]:
+            self.histograms[results_file][field].record(data[field])
+
+
+class RunSummaryCollector:
+    """Collects a histogram of every metric per group from the written records.
+
+    Only the groups that received records since the last summary are
+    summarized again."""
+
+    def __init__(self, percentiles: Sequence[int] = SUMMARY_PERCENTILES):
+        self.percentiles = tuple(percentiles)
+        self.groups: Dict[int, GroupAccumulator] = defaultdict(GroupAccumulator)
+        self.group_summaries: Dict[int, GroupSummary] = {}
+        self.changed_groups: Set[int] = set()
+
+    def add_llm_request(self, data: Dict):
+        group = self.groups[data[GROUP_ID]]
+        group.num_requests += 1
+        if group.first_request is None:
+            group.first_request = {field: data[field] for field in GROUP_LABEL_FIELDS}
+        group.add(LLM_REQUESTS_FILE, data)
+        self.changed_groups.add(data[GROUP_ID])
+
+    def add_network_latency(self, data: Dict):
+        self.groups[data[GROUP_ID]].add(NETWORK_LATENCY_FILE, data)
+        self.changed_groups.add(data[GROUP_ID])
+
+    def add_error(self, data: Dict):
+        self.groups[data[GROUP_ID]].num_errors += 1
+        self.changed_groups.add(data[GROUP_ID])
+
+    def add_throughput(self, data: Dict):
+        self.groups[data[GROUP_ID]].throughput = data["throughput"]
+        self.changed_groups.add(data[GROUP_ID])
+
+    def summarize(self, complete: bool) -> RunSummary:
+        for group_id in self.changed_groups:
+            group = self.groups[group_id]
+            self.group_summaries[group_id] = make_group_summary(
+                group_id,
+                group.num_requests,
+                group.num_errors,
+                group.first_request,
+                {
+                    results_file: {
+                        field: histogram.model_copy(deep=True)
+                        for field, histogram in field_histograms.items()
+                    }
+                    for results_file, field_histograms in group.histograms.items()
+                },
+                self.percentiles,
+                group.throughput,
+            )
+        self.changed_groups.clear()
+        return RunSummary(
+            percentiles=self.percentiles,
+            complete=complete,
+            groups=tuple(
+                self.group_summaries[group_id]
+                for group_id in sorted(self.group_summaries)
+            ),
+        )
+
+
+def read_results_columns(path: str, columns: Sequence[str]) -> pd.DataFrame:
+    """Read the given columns of a results file, an empty frame if there is none."""
+    columnar_file = get_columnar_file(path)
+    if os.path.isfile(columnar_file):
+        return read_columnar(columnar_file, columns)
+    if os.path.isfile(path):
+        return pd.read_csv(path, usecols=lambda name: name in columns)
+    return pd.DataFrame(columns=list(columns))
+
+
+def summarize_run_folder(
+    run_folder: str, percentiles: Sequence[int] = SUMMARY_PERCENTILES
+) -> RunSummary:
+    """Summarize the groups of a run from its raw results files."""
+    llm_request_df = read_results_columns(
+        os.path.join(run_folder, LLM_REQUESTS_FILE),
+        (GROUP_ID, *GROUP_LABEL_FIELDS, *SUMMARY_METRIC_FIELDS[LLM_REQUESTS_FILE]),
+    )
+    network_latency_df = read_results_columns(
+        os.path.join(run_folder, NETWORK_LATENCY_FILE),
+        (GROUP_ID, *SUMMARY_METRIC_FIELDS[NETWORK_LATENCY_FILE]),
+    )
+    error_df = read_results_columns(os.path.join(run_folder, ERROR_FILE), (GROUP_ID,))
+    frames: Dict[str, Dict[int, pd.DataFrame]] = {
+        results_file: {
+            int(cast(int, group_id)): group_df
+            for group_id, group_df in df.groupby(GROUP_ID)
+        }
+        for results_file, df in [
+            (LLM_REQUESTS_FILE, llm_request_df),
+            (NETWORK_LATENCY_FILE, network_latency_df),
+        ]
+    }
+    num_errors: Dict[int, int] = {
+        int(cast(int, group_id)): int(count)
+        for group_id, count in error_df[GROUP_ID].value_counts().items()
+    }
+    group_ids = sorted(
+        set(frames[LLM_REQUESTS_FILE])
+        | set(frames[NETWORK_LATENCY_FILE])
+        | set(num_errors)
+    )
+    groups = []
+    for group_id in group_ids:
+        group_requests = frames[LLM_REQUESTS_FILE].get(group_id)
+        first_request = (
+            group_requests.head(1).to_dict("records")[0]
+            if group_requests is not None
+            else None
+        )
+        histograms = {
+            results_file: {
+                field: make_histogram(frames[results_file][group_id][field].tolist())
+                for field in fields
+                if group_id in frames[results_file]
+                and field in frames[results_file][group_id]
+            }
+            for results_file, fields in SUMMARY_METRIC_FIELDS.items()
+        }
+        groups.append(
+            make_group_summary(
+                group_id,
+                len(group_requests) if group_requests is not None else 0,
+                num_errors.get(group_id, 0),
+                first_request,
+                histograms,
+                percentiles,
+            )
+        )
+    return RunSummary(
+        percentiles=tuple(percentiles),
+        complete=True,
+        groups=tuple(groups),
+    )
+
+
+def read_run_summary(summary_file: str) -> Optional[RunSummary]:
+    if not os.path.isfile(summary_file):
+        return None
+    with open(summary_file) as f:
+        return RunSummary.model_validate_json(f.read())
+
+
+def compute_run_summary(run_folder: str) -> RunSummary:
+    """The written summary of a run, or one from the raw results files if the
+    written one is missing or incomplete."""
+    summary = read_run_summary(os.path.join(run_folder, SUMMARY_FILE))
+    if summary is not None and summary.complete:
+        return summary
+    return summarize_run_folder(run_folder)
+
+
+def format_group_summary(
+    group: GroupSummary, results_file: str, field: str, percentiles: Sequence[int]
+) -> str:
+    description = (
+        f"group {group.group_id}: {group.num_requests} requests, "
+        f"{group.num_errors} errors"
+    )
+    if group.requests_per_second_phase is not None:
+        description += f", {group.requests_per_second_phase:.2f} requests/s"
+    if group.concurrency is not None:
+        description += f", concurrency {group.concurrency}"
+    if group.throughput is not None:
+        description += f", throughput {group.throughput:.2f} requests/s"
+    metric_summary = group.metrics.get(results_file, {}).get(field)
+    if metric_summary is None:
+        return description + f", no {field} values"
+    values = ", ".join(
+        [f"mean {metric_summary.mean:.1f}"]
+        + [
+            f"p{p} {metric_summary.histogram.percentile(p) or 0.0:.1f}"
+            for p in percentiles
+        ]
+    )
+    return description + f", {field}: {values}"
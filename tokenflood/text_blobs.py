@@ -0,0 +1,133 @@
+import functools
+import gzip
+import hashlib
+import os
+import struct
+from typing import Callable, Dict, Set, Tuple
+
+# blake2b digest of the text, compression codec, payload length
+RECORD_HEADER = struct.Struct("<16sBI")
+TEXT_HASH_BYTES = 16
+NO_COMPRESSION = "none"
+GZIP_COMPRESSION = "gzip"
+ZSTD_COMPRESSION = "zstd"
+TEXT_COMPRESSIONS = [NO_COMPRESSION, GZIP_COMPRESSION, ZSTD_COMPRESSION]
+
+
+def get_text_hash(text: str) -> str:
+    return hashlib.blake2b(text.encode(), digest_size=TEXT_HASH_BYTES).hexdigest()
+
+
+def get_zstandard():
+    try:
+        import zstandard  # type: ignore[import-not-found]
+    except ImportError as e:
+        raise ValueError(
+            "zstd compression needs the zstandard package: pip install tokenflood[zstd]"
+        ) from e
+    return zstandard
+
+
+def compress(data: bytes, compression: str) -> bytes:
+    if compression == NO_COMPRESSION:
+        return data
+    elif compression == GZIP_COMPRESSION:
+        return gzip.compress(data, compresslevel=6, mtime=0)
+    elif compression == ZSTD_COMPRESSION:
+        return get_zstandard().ZstdCompressor().compress(data)
+    raise ValueError(
+        f"Unknown text compression {compression}. Must be one of {TEXT_COMPRESSIONS}."
+    )
+
+
+def decompress(payload: bytes, compression: str) -> bytes:
+    if compression == NO_COMPRESSION:
+        return payload
+    elif compression == GZIP_COMPRESSION:
+        return gzip.decompress(payload)
+    elif compression == ZSTD_COMPRESSION:
+        return get_zstandard().ZstdDecompressor().decompress(payload)
+    raise ValueError(f"Unknown text compression {compression}.")
+
+
+def encode_text_record(text_hash: str, text: str, compression: str) -> bytes:
+    payload = compress(text.encode(), compression)
+    header = RECORD_HEADER.pack(
+        bytes.fromhex(text_hash), TEXT_COMPRESSIONS.index(compression), len(payload)
+    )
+    return header + payload
+
+
+def encode_text_blob(text: str, compression: str) -> Tuple[str, bytes]:
+    """Hash of the text and its record for the blob file."""
+    text_hash = get_text_hash(text)
+    return text_hash, encode_text_record(text_hash, text, compression)
+
+
+class TextBlobStore:
+    """Writes every distinct text once and hands out its hash instead.
+
+    Only new texts are encoded. Their records are handed to write as a
+    function producing them, so the compression can happen where the
+    writing does. Empty texts are not stored and keep an empty hash."""
+
+    def __init__(self, write: Callable[[Callable[[], bytes]], None], compression: str):
+        if compression not in TEXT_COMPRESSIONS:
+            raise ValueError(
+                f"Unknown text compression {compression}. Must be one of {TEXT_COMPRESSIONS}."
+            )
+        if compression == ZSTD_COMPRESSION:
+            get_zstandard()
+        self.write = write
+        self.compression = compression
+        self.stored_hashes: Set[str] = set()
+
+    def put(self, text: str) -> str:
+        if not text:
+            return ""
+        text_hash = get_text_hash(text)
+        if text_hash not in self.stored_hashes:
+            self.write(
+                functools.partial(encode_text_record, text_hash, text, self.compression)
+            )
+            self.stored_hashes.add(text_hash)
+        return text_hash
+
+
+def read_text_blob_index(path: str) -> Dict[str, Tuple[int, int, str]]:
+    """Map every hash in a blob file to the offset, length and compression of its payload.
+
+    Only the record headers are read. A record that is cut off at the end of
+    the file, because it is still being written, is skipped."""
+    index = {}
+    file_size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        offset = 0
+        while offset + RECORD_HEADER.size <= file_size:
+            f.seek(offset)
+            digest, codec, length = RECORD_HEADER.unpack(f.read(RECORD_HEADER.size))
+            offset += RECORD_HEADER.size
+            if offset + length > file_size:
+                break
+            index[digest.hex()] = (offset, length, TEXT_COMPRESSIONS[codec])
+            offset += length
+    return index
+
+
+class TextBlobReader:
+    """Resolves text hashes from a blob file, reading only the requested texts."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.index = read_text_blob_index(path)
+
+    def get(self, text_hash: str) -> str:
+        if not text_hash:
+            return ""
+        if text_hash not in self.index:
+            # the blob file might have grown since the index was read
+            self.index = read_text_blob_index(self.path)
+        offset, length, compression = self.index[text_hash]
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            return decompress(f.read(length), compression).decode()
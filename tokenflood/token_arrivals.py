@@ -0,0 +1,58 @@
+import struct
+from typing import Dict, Iterator, Sequence, Tuple
+
+import numpy as np
+
+from tokenflood.models.data.token_arrival_data import TokenArrivalData
+
+# group id, request number, number of arrivals
+RECORD_HEADER = struct.Struct("<iII")
+DELTA_DTYPE = np.dtype("<u4")
+
+
+def encode_token_arrivals(data: TokenArrivalData) -> bytes:
+    """Encode the arrivals of one request as a header followed by uint32 deltas."""
+    deltas = np.diff(np.asarray(data.arrivals, dtype=np.int64), prepend=0)
+    return (
+        RECORD_HEADER.pack(data.group_id, data.request_number, len(deltas))
+        + deltas.astype(DELTA_DTYPE).tobytes()
+    )
+
+
+def decode_token_arrivals(buffer: bytes) -> Iterator[TokenArrivalData]:
+    offset = 0
+    while offset + RECORD_HEADER.size <= len(buffer):
+        group_id, request_number, num_arrivals = RECORD_HEADER.unpack_from(
+            buffer, offset
+        )
+        offset += RECORD_HEADER.size
+        deltas = np.frombuffer(
+            buffer, dtype=DELTA_DTYPE, count=num_arrivals, offset=offset
+        )
+        offset += num_arrivals * DELTA_DTYPE.itemsize
+        yield TokenArrivalData(
+            group_id=group_id,
+            request_number=request_number,
+            arrivals=tuple(np.cumsum(deltas, dtype=np.int64).tolist()),
+        )
+
+
+def read_token_arrivals(path: str) -> Dict[Tuple[int, int], Tuple[int, ...]]:
+    """Read a token arrivals file into a mapping of (group id, request number) to arrivals."""
+    with open(path, "rb") as f:
+        buffer = f.read()
+    return {
+        (data.group_id, data.request_number): data.arrivals
+        for data in decode_token_arrivals(buffer)
+    }
+
+
+def calculate_inter_token_latencies(
+    arrivals: Sequence[int],
+) -> Tuple[float, float, float]:
+    """Median, 99th percentile and maximum of the gaps between chunk arrivals in ms."""
+    if len(arrivals) < 2:
+        return 0.0, 0.0, 0.0
+    gaps = np.diff(np.asarray(arrivals, dtype=np.float64)) / 1000
+    p50, p99 = np.percentile(gaps, [50, 99])
+    return float(p50), float(p99), float(gaps.max())
@@ -15,8 +15,22 @@ def get_exact_date_str() -> str:
     return f"{datetime_with_milliseconds}(UTC)"
 
 
-def get_date_str() -> str:
-    return datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+def shift_exact_date_str(date_str: str, seconds: float) -> str:
+    """Shift a date string created by get_exact_date_str by the given number of seconds."""
+    parsed = datetime.datetime.strptime(
+        date_str.removesuffix("(UTC)"), "%Y-%m-%d_%H-%M-%S.%f"
+    )
+    shifted = parsed + datetime.timedelta(seconds=seconds)
+    return f"{shifted.strftime('%Y-%m-%d_%H-%M-%S.%f')[:-3]}(UTC)"
+
+
+def get_date_str(timestamp: Optional[float] = None) -> str:
+    date = (
+        datetime.datetime.now()
+        if timestamp is None
+        else datetime.datetime.fromtimestamp(timestamp)
+    )
+    return date.strftime("%Y-%m-%d_%H-%M-%S")
 
 
 def get_run_name(date_str: str, task_type: str, name: str, endpoint_spec: EndpointSpec):
@@ -0,0 +1,66 @@
+import os
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+
+from tokenflood.columnar import (
+    make_columnar_frame,
+    read_chunks,
+    read_manifest,
+    select_dtypes,
+)
+from tokenflood.visualization_frontend.csv_tail import concat_results
+
+
+class ColumnarTailReader:
+    """Keeps the decoded rows of a growing columnar file and only decodes the new chunks.
+
+    The chunks are only ever appended, so a chunk that is still being
+    written is left for the next read. The file is read from the start again
+    if it shrank or was replaced."""
+
+    def __init__(
+        self,
+        path: str,
+        columns: Optional[Tuple[str, ...]] = None,
+        dtypes: Optional[Dict[str, str]] = None,
+    ):
+        self.path = path
+        self.columns = columns
+        # compact dtypes to convert the decoded columns to
+        self.dtypes = dtypes or {}
+        self.reset()
+
+    def reset(self) -> None:
+        self.offset = 0
+        self.file_id: Optional[Tuple[int, int]] = None
+        self.column_dtypes: Dict[str, str] = {}
+        self.df = pd.DataFrame()
+
+    def read(self) -> pd.DataFrame:
+        stat = os.stat(self.path)
+        file_id = (stat.st_dev, stat.st_ino)
+        if file_id != self.file_id or stat.st_size < self.offset:
+            self.reset()
+            self.file_id = file_id
+        if stat.st_size == self.offset:
+            return self.df
+        with open(self.path, "rb") as f:
+            if self.offset == 0:
+                self.column_dtypes, self.offset = read_manifest(f)
+            chunks, self.offset = read_chunks(
+                f, self.offset, stat.st_size, self.column_dtypes, self.columns
+            )
+        if chunks or self.df.empty:
+            new_df = self.convert(
+                make_columnar_frame(
+                    select_dtypes(self.column_dtypes, self.columns), chunks
+                )
+            )
+            self.df = new_df if self.df.empty else concat_results(self.df, new_df)
+        return self.df
+
+    def convert(self, df: pd.DataFrame) -> pd.DataFrame:
+        return df.astype(
+            {name: self.dtypes[name] for name in df.columns if name in self.dtypes}
+        )
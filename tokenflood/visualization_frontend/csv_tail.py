@@ -0,0 +1,91 @@
+import os
+from io import BytesIO
+from typing import Any, Optional, Tuple
+
+import pandas as pd
+
+QUOTE = b'"'
+NEWLINE = b"\n"
+
+
+def find_last_record_end(data: bytes) -> int:
+    """Position after the last complete csv record in data, 0 if there is none.
+
+    data must start at a record boundary. A newline only ends a record if it
+    is not inside a quoted field, that is after an even number of quotes."""
+    end = data.rfind(NEWLINE)
+    num_quotes = data.count(QUOTE, 0, max(end, 0))
+    while end >= 0:
+        if num_quotes % 2 == 0:
+            return end + 1
+        previous_end = data.rfind(NEWLINE, 0, end)
+        num_quotes -= data.count(QUOTE, previous_end + 1, end)
+        end = previous_end
+    return 0
+
+
+def concat_results(df: pd.DataFrame, new_df: pd.DataFrame) -> pd.DataFrame:
+    """Append new rows, keeping categorical columns categorical.
+
+    pandas falls back to object columns when concatenating categoricals with
+    different categories, so both sides get the union of the categories."""
+    categories = {
+        name: df[name].cat.categories.union(new_df[name].cat.categories)
+        for name in df.columns
+        if isinstance(df[name].dtype, pd.CategoricalDtype)
+        and isinstance(new_df[name].dtype, pd.CategoricalDtype)
+    }
+    if categories:
+        df = df.assign(
+            **{name: df[name].cat.set_categories(c) for name, c in categories.items()}
+        )
+        new_df = new_df.assign(
+            **{
+                name: new_df[name].cat.set_categories(c)
+                for name, c in categories.items()
+            }
+        )
+    return pd.concat([df, new_df], ignore_index=True)
+
+
+class CSVTailReader:
+    """Keeps the parsed rows of a growing csv file and only parses what was appended.
+
+    A trailing record that is still being written is left for the next read.
+    The file is read from the start again if it shrank or was replaced."""
+
+    def __init__(self, path: str, **read_csv_kwargs: Any):
+        self.path = path
+        self.read_csv_kwargs = read_csv_kwargs
+        self.reset()
+
+    def reset(self) -> None:
+        self.offset = 0
+        self.file_id: Optional[Tuple[int, int]] = None
+        self.header = b""
+        self.df = pd.DataFrame()
+
+    def read(self) -> pd.DataFrame:
+        stat = os.stat(self.path)
+        file_id = (stat.st_dev, stat.st_ino)
+        if file_id != self.file_id or stat.st_size < self.offset:
+            self.reset()
+            self.file_id = file_id
+        if stat.st_size == self.offset:
+            return self.df
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            data = f.read(stat.st_size - self.offset)
+        end = find_last_record_end(data)
+        if end == 0:
+            return self.df
+        if not self.header:
+            self.header = data[: data.index(NEWLINE) + 1]
+            self.df = pd.read_csv(BytesIO(data[:end]), **self.read_csv_kwargs)
+        else:
+            new_df = pd.read_csv(
+                BytesIO(self.header + data[:end]), **self.read_csv_kwargs
+            )
+            self.df = concat_results(self.df, new_df)
+        self.offset += end
+        return self.df
@@ -1,16 +1,20 @@
 from __future__ import annotations
 
 import os.path
+import re
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Callable, TypeVar, Union, Generic, Type, Sequence
+from typing import Callable, Optional, TypeVar, Union, Generic, Type, Sequence
 
+import numpy as np
 import pandas as pd
 
 from tokenflood.visualization_frontend.aggregation_func import AggregationFunc
-from tokenflood.constants import GROUP_ID
+from tokenflood.constants import GROUP_ID, LLM_REQUESTS_FILE, SUMMARY_METRIC_FIELDS
+from tokenflood.models.data.summary_data import RunSummary
 from tokenflood.models.util import numeric
-from tokenflood.visualization_frontend.io import read_dataframe
+from tokenflood.summaries import GROUP_LABEL_FIELDS
+from tokenflood.visualization_frontend.io import find_run_summary, read_dataframe
 from tokenflood.visualization_frontend.metrics import Metric
 from tokenflood.visualization_frontend.utils import cache_if_run_data_stayed_the_same
 
@@ -31,7 +35,20 @@ def aggregate_data(
     metric: Type[Metric],
     aggregation_funcs: Sequence[AggregationFunc],
 ) -> list[AggregationTrace]:
-    df = read_dataframe(run_folder, metric.file)
+    summary = find_run_summary(run_folder)
+    if summary is not None and summary.complete:
+        traces = aggregate_summary(summary, run_folder, metric, aggregation_funcs)
+        if traces is not None:
+            return traces
+    columns = {metric.field_name, GROUP_ID}
+    columns.update(aggregation_func.field for aggregation_func in aggregation_funcs)
+    df = read_dataframe(run_folder, metric.file, columns=tuple(sorted(columns)))
+    if metric.field_name not in df.columns:
+        # runs recorded before the metric existed
+        return []
+    df = add_group_labels(run_folder, df, aggregation_funcs)
+    if not all(func.field in df.columns for func in aggregation_funcs):
+        return []
     aggregations = {
         aggregation_func.name: pd.NamedAgg(aggregation_func.field, aggregation_func.f)
         for aggregation_func in aggregation_funcs
@@ -52,6 +69,100 @@ def aggregate_data(
     return traces
 
 
+def aggregate_group_values(
+    run_folder: str, metric: Type[Metric], label_func: AggregationFunc
+) -> list[AggregationTrace]:
+    """Trace of a value the run summary keeps once per group, like the throughput."""
+    summary = find_run_summary(run_folder)
+    labels = []
+    values = []
+    for group in summary.groups if summary is not None else ():
+        label = getattr(group, label_func.field)
+        value = getattr(group, metric.field_name)
+        if label is None or value is None:
+            continue
+        labels.append(label_func.f(pd.Series([label])))
+        values.append(value)
+    if not labels:
+        return []
+    return [
+        AggregationTrace(
+            labels, values, metric.field_name, os.path.basename(run_folder)
+        )
+    ]
+
+
+def add_group_labels(
+    run_folder: str, df: pd.DataFrame, aggregation_funcs: Sequence[AggregationFunc]
+) -> pd.DataFrame:
+    """Add the label fields a results file lacks from the llm requests of the same group.
+
+    The network latencies of concurrency tests, for example, are not
+    labeled with the concurrency themselves."""
+    missing = sorted(
+        {func.field for func in aggregation_funcs if func.field not in df.columns}
+    )
+    if not missing or GROUP_ID not in df.columns:
+        return df
+    labels = read_dataframe(
+        run_folder, LLM_REQUESTS_FILE, columns=tuple(sorted({GROUP_ID, *missing}))
+    )
+    if not all(field in labels.columns for field in missing):
+        return df
+    return df.merge(labels.drop_duplicates(GROUP_ID), on=GROUP_ID)
+
+
+def aggregate_summary(
+    summary: RunSummary,
+    run_folder: str,
+    metric: Type[Metric],
+    aggregation_funcs: Sequence[AggregationFunc],
+) -> Optional[list[AggregationTrace]]:
+    """Traces from the per group summaries of a run.
+
+    Any percentile is taken from the histograms, so it is an approximation
+    within the histograms' relative error of the quantile of the raw data,
+    not the exact value pandas computes from it. None if the summaries lack
+    the metric or the aggregations are not percentiles or means, so that the
+    raw data has to be aggregated instead."""
+    percentiles: dict[str, int] = {}
+    label_func = None
+    for func in aggregation_funcs:
+        if func.name == "label":
+            label_func = func
+        elif func.name != "mean":
+            match = re.fullmatch(r"p(\d+)", func.name)
+            if match is None:
+                return None
+            percentiles[func.name] = int(match.group(1))
+    if label_func is None or label_func.field not in GROUP_LABEL_FIELDS:
+        return None
+    if metric.field_name not in SUMMARY_METRIC_FIELDS.get(metric.file, ()):
+        return None
+    labels = []
+    values: dict[str, list[numeric]] = {func.name: [] for func in aggregation_funcs}
+    for group in summary.groups:
+        metric_summary = group.metrics.get(metric.file, {}).get(metric.field_name)
+        label = getattr(group, label_func.field)
+        if metric_summary is None or label is None:
+            continue
+        labels.append(label_func.f(pd.Series([label])))
+        for func in aggregation_funcs:
+            if func.name == "mean":
+                values[func.name].append(metric_summary.mean)
+            elif func.name in percentiles:
+                values[func.name].append(
+                    metric_summary.histogram.percentile(percentiles[func.name]) or 0.0
+                )
+    return [
+        AggregationTrace(
+            labels, values[func.name], func.name, os.path.basename(run_folder)
+        )
+        for func in aggregation_funcs
+        if func.name != "label"
+    ]
+
+
 X = TypeVar("X")
 LabelFunc = Callable[[pd.Series], X]
 
@@ -61,5 +172,9 @@ def get_observation_group_label(s: pd.Series) -> datetime:
     return datetime.strptime(date_str, "%Y-%m-%d_%H-%M-%S").replace(tzinfo=timezone.utc)
 
 
-def get_load_group_label(s: pd.Series) -> str:
-    return s.iloc[0]
+def get_load_group_label(s: pd.Series) -> numeric | str:
+    label = s.iloc[0]
+    if isinstance(label, np.floating):
+        # the shortest decimal of a compact float32, not its float64 expansion
+        return float(np.format_float_positional(label))
+    return label
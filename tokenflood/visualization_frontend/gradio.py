@@ -16,20 +16,19 @@ from tokenflood.visualization_frontend.aggregation_func import AggregationFunc
 
 from tokenflood.constants import (
     DEFAULT_PERCENTILES_STR,
+    HISTOGRAM_RELATIVE_ERROR,
     WARNING_LIMIT_PERCENTAGE,
-    LOAD_TEST_SPEC_FILE,
     OBSERVATION_SPEC_FILE,
+    CONCURRENCY_TEST_SPEC_FILE,
     ENDPOINT_SPEC_FILE,
+    SUMMARY_FILE,
 )
-from tokenflood.io import (
-    get_relative_file_path,
-    is_load_test_result_folder,
-    is_observation_result_folder,
-)
+from tokenflood.io import get_relative_file_path
 from tokenflood.models.data.divergence import TokenDivergence
 from tokenflood.models.util import numeric
 from tokenflood.visualization_frontend.data import (
     aggregate_data,
+    aggregate_group_values,
     get_load_group_label,
     get_observation_group_label,
     AggregationTrace,
@@ -37,21 +36,34 @@ from tokenflood.visualization_frontend.data import (
 from tokenflood.visualization_frontend.io import (
     get_load_test_runs,
     get_observation_runs,
+    get_concurrency_test_runs,
     get_error_dataframe,
     get_llm_request_dataframe,
     get_network_dataframe,
     get_run_spec_file,
+    find_load_test_spec_file,
     get_observation_spec_file,
+    get_concurrency_test_spec_file,
     get_endpoint_spec_file,
+    resolve_texts,
 )
 from tokenflood.visualization_frontend.metrics import (
     RequestLatency,
     NetworkLatency,
+    TLSHandshakeLatency,
     metric_mapping,
     Metric,
     TimeToFirstToken,
     AverageTimePerOutputToken,
     DecodingLatency,
+    InterTokenLatencyP50,
+    InterTokenLatencyP99,
+    MaxStall,
+    TimeToHeaders,
+    DNSLatency,
+    ConnectLatency,
+    RequestTLSHandshakeLatency,
+    Throughput,
 )
 from tokenflood.visualization_frontend.percentiles import (
     percentiles_to_aggregation_funcs,
@@ -59,6 +71,7 @@ from tokenflood.visualization_frontend.percentiles import (
     percentiles_to_str,
 )
 from tokenflood.visualization_frontend.plots import (
+    make_concurrency_plot,
     make_observation_latency_plot,
     make_run_latency_plot,
 )
@@ -67,16 +80,40 @@ log = logging.getLogger(__name__)
 
 LOAD_TEST = "load-test"
 OBSERVATION_TEST = "observation"
+CONCURRENCY_TEST = "concurrency-test"
 
 RUNS_QUERY_PARAM = "runs"
 RUN_TYPE_QUERY_PARAM = "run_type"
 METRIC_QUERY_PARAM = "metric"
 PERCENTILES_QUERY_PARAM = "percentiles"
 
+METRIC_NAMES = [
+    RequestLatency.name,
+    TimeToFirstToken.name,
+    DecodingLatency.name,
+    InterTokenLatencyP50.name,
+    InterTokenLatencyP99.name,
+    MaxStall.name,
+    TimeToHeaders.name,
+    DNSLatency.name,
+    ConnectLatency.name,
+    RequestTLSHandshakeLatency.name,
+    AverageTimePerOutputToken.name,
+    NetworkLatency.name,
+    TLSHandshakeLatency.name,
+]
+
+
+def get_metric_names(run_type: str) -> list[str]:
+    # only concurrency tests have a throughput of their own, load tests have a target rate
+    if run_type == CONCURRENCY_TEST:
+        return METRIC_NAMES + [Throughput.name]
+    return METRIC_NAMES
+
 
 def initialize_run_type_from_url(results_folder: str, query_params: dict) -> str:
     run_type = query_params.get(RUN_TYPE_QUERY_PARAM, "")
-    if run_type in {LOAD_TEST, OBSERVATION_TEST}:
+    if run_type in {LOAD_TEST, OBSERVATION_TEST, CONCURRENCY_TEST}:
         return run_type
 
     load_tests = get_load_test_runs(results_folder)
@@ -86,45 +123,28 @@ def initialize_run_type_from_url(results_folder: str, query_params: dict) -> str
     observation_tests = get_observation_runs(results_folder)
     if len(observation_tests) > 0:
         return OBSERVATION_TEST
+
+    concurrency_tests = get_concurrency_test_runs(results_folder)
+    if len(concurrency_tests) > 0:
+        return CONCURRENCY_TEST
     return LOAD_TEST
 
 
 def initialize_runs_from_url(
     results_folder: str, run_type: str, query_params: dict
 ) -> tuple[list[str], list[str]]:
-    valid_runs = []
-    results_folder_abs_path = os.path.realpath(results_folder)
-
-    raw_runs = [run.strip() for run in query_params.get("runs", "").split(",")]
-    for run in raw_runs:
-        safe_name = os.path.basename(run)
-        if not safe_name or safe_name in {".", ".."}:
-            continue
-        full_path = os.path.realpath(os.path.join(results_folder_abs_path, safe_name))
-
-        try:
-            is_inside = (
-                os.path.commonpath([results_folder_abs_path, full_path])
-                == results_folder_abs_path
-            )
-            is_dir = os.path.isdir(full_path)
-            is_not_same = not os.path.samefile(full_path, results_folder_abs_path)
-            is_proper_type_dir = False
-            if run_type == LOAD_TEST:
-                is_proper_type_dir = is_load_test_result_folder(full_path)
-            elif run_type == OBSERVATION_TEST:
-                is_proper_type_dir = is_observation_result_folder(full_path)
-
-            if is_inside and is_not_same and is_dir and is_proper_type_dir:
-                valid_runs.append(safe_name)
-        except (FileNotFoundError, ValueError):
-            continue
-
     options = []
     if run_type == LOAD_TEST:
         options = get_load_test_runs(results_folder)
     elif run_type == OBSERVATION_TEST:
         options = get_observation_runs(results_folder)
+    elif run_type == CONCURRENCY_TEST:
+        options = get_concurrency_test_runs(results_folder)
+
+    # the options only hold run folders directly inside the results folder
+    available_runs = set(options)
+    raw_runs = [run.strip() for run in query_params.get("runs", "").split(",")]
+    valid_runs = [run for run in raw_runs if run in available_runs]
 
     if len(valid_runs) > 0:
         return valid_runs, options
@@ -132,9 +152,9 @@ def initialize_runs_from_url(
         return options[:1], options
 
 
-def initialize_metric_from_url(query_params: dict) -> str:
+def initialize_metric_from_url(query_params: dict, run_type: str = LOAD_TEST) -> str:
     metric = query_params.get(METRIC_QUERY_PARAM, RequestLatency.name)
-    if metric in metric_mapping:
+    if metric in get_metric_names(run_type):
         return metric
     return RequestLatency.name
 
@@ -154,14 +174,14 @@ def initialize_with_folder(
 
         run_type = initialize_run_type_from_url(results_folder, params)
         runs, run_choices = initialize_runs_from_url(results_folder, run_type, params)
-        metric = initialize_metric_from_url(params)
+        metric = initialize_metric_from_url(params, run_type)
         percentiles = initialize_percentiles_from_url(params)
 
         return (
             gr.Dropdown(choices=run_choices, value=runs),
             runs,
             gr.Dropdown(value=run_type),
-            gr.Dropdown(value=metric),
+            gr.Dropdown(choices=get_metric_names(run_type), value=metric),
             gr.Textbox(value=percentiles),
             percentiles,
         )
@@ -256,6 +276,8 @@ def args_to_tuple(*args):
 def load_runs_for_type(results_folder: str, run_type: str) -> list[str]:
     if run_type == LOAD_TEST:
         return get_load_test_runs(results_folder)
+    elif run_type == CONCURRENCY_TEST:
+        return get_concurrency_test_runs(results_folder)
     else:
         return get_observation_runs(results_folder)
 
@@ -272,11 +294,22 @@ def update_runs_for_type(
     return gr.Dropdown(runs, value=value), value
 
 
+def update_metrics_for_type(run_type: str, metric_name: str) -> gr.Dropdown:
+    metric_names = get_metric_names(run_type)
+    if metric_name not in metric_names:
+        metric_name = RequestLatency.name
+    return gr.Dropdown(
+        metric_names, value=metric_name, info=metric_mapping[metric_name].explanation
+    )
+
+
 def get_plot_func(
     run_type: str,
 ) -> Callable[[list[list[AggregationTrace]], Type[Metric]], gr.Plot]:
     if run_type == LOAD_TEST:
         return make_run_latency_plot
+    elif run_type == CONCURRENCY_TEST:
+        return make_concurrency_plot
     else:
         return make_observation_latency_plot
 
@@ -286,6 +319,8 @@ def get_label_func(run_type: str) -> AggregationFunc:
         return AggregationFunc(
             get_load_group_label, "label", 10000, "requests_per_second_phase"
         )
+    elif run_type == CONCURRENCY_TEST:
+        return AggregationFunc(get_load_group_label, "label", 10000, "concurrency")
     else:
         return AggregationFunc(get_observation_group_label, "label", 10000, "datetime")
 
@@ -298,6 +333,13 @@ def collect_trace_groups(
     percentiles: str,
 ) -> list[list[AggregationTrace]]:
     label_func = get_label_func(run_type)
+    if metric.file == SUMMARY_FILE:
+        return [
+            aggregate_group_values(
+                os.path.join(results_folder, run), metric, label_func
+            )
+            for run in runs
+        ]
     aggregation_funcs = tuple(
         sorted(
             [
@@ -341,6 +383,12 @@ def make_sort_columns(run_type: str) -> Callable[[str], float]:
         else:
             return 0.0
 
+    def sort_columns_concurrency_test(title: str) -> float:
+        if title.endswith(" concurrent"):
+            return float(title.split(" ")[0])
+        else:
+            return 0.0
+
     def sort_columns_observation(title: str) -> float:
         try:
             dtime = datetime.datetime.fromisoformat(title)
@@ -350,6 +398,8 @@ def make_sort_columns(run_type: str) -> Callable[[str], float]:
 
     if run_type == LOAD_TEST:
         return sort_columns_load_test
+    elif run_type == CONCURRENCY_TEST:
+        return sort_columns_concurrency_test
     else:
         return sort_columns_observation
 
@@ -377,10 +427,13 @@ def make_table(
                 "metric": metric_name,
             }
             for i, x in enumerate(trace.x):
+                value = f"{round(trace.y[i], 2)} {metric.unit}"
                 if run_type == LOAD_TEST:
-                    data[str(x) + " rps"] = str(round(trace.y[i], 2)) + " ms"
+                    data[str(x) + " rps"] = value
+                elif run_type == CONCURRENCY_TEST:
+                    data[str(x) + " concurrent"] = value
                 elif run_type == OBSERVATION_TEST:
-                    data[str(x)] = str(round(trace.y[i], 2)) + " ms"
+                    data[str(x)] = value
                 else:
                     data[x] = round(trace.y[i])
             rows.append(data)
@@ -409,7 +462,7 @@ def update_data(
 
 
 def make_frame_visible(data, run_type) -> gr.DataFrame:
-    visible = run_type == LOAD_TEST
+    visible = run_type in {LOAD_TEST, CONCURRENCY_TEST}
     return gr.DataFrame(data, visible=visible)
 
 
@@ -508,7 +561,7 @@ def create_gradio_blocks(results_folder: str) -> Blocks:
         with gr.Row(equal_height=True):
             with gr.Column(scale=1):
                 run_type_dropdown = gr.Dropdown(
-                    [LOAD_TEST, OBSERVATION_TEST],
+                    [LOAD_TEST, CONCURRENCY_TEST, OBSERVATION_TEST],
                     value=LOAD_TEST,
                     label="Run type",
                 )
@@ -525,13 +578,7 @@ def create_gradio_blocks(results_folder: str) -> Blocks:
         with gr.Row(equal_height=True):
             with gr.Column(scale=1):
                 metric_dropdown = gr.Dropdown(
-                    [
-                        RequestLatency.name,
-                        TimeToFirstToken.name,
-                        DecodingLatency.name,
-                        AverageTimePerOutputToken.name,
-                        NetworkLatency.name,
-                    ],
+                    get_metric_names(LOAD_TEST),
                     value=RequestLatency.name,
                     label="Metric",
                     info=RequestLatency.explanation,
@@ -540,6 +587,9 @@ def create_gradio_blocks(results_folder: str) -> Blocks:
                 percentiles_textbox = gr.Textbox(
                     stored_percentiles.value,
                     label="Percentiles (comma separated, 1-100)",
+                    info="Finished runs are plotted from their summary histograms, "
+                    f"within {HISTOGRAM_RELATIVE_ERROR:.0%} of the exact percentiles "
+                    "of the raw data.",
                     interactive=True,
                 )
 
@@ -610,7 +660,12 @@ def create_gradio_blocks(results_folder: str) -> Blocks:
                                     if run_type == LOAD_TEST:
                                         make_yaml_code_element(
                                             get_run_spec_file(run_folder),
-                                            LOAD_TEST_SPEC_FILE,
+                                            find_load_test_spec_file(run_folder),
+                                        )
+                                    elif run_type == CONCURRENCY_TEST:
+                                        make_yaml_code_element(
+                                            get_concurrency_test_spec_file(run_folder),
+                                            CONCURRENCY_TEST_SPEC_FILE,
                                         )
                                     else:
                                         make_yaml_code_element(
@@ -626,7 +681,7 @@ def create_gradio_blocks(results_folder: str) -> Blocks:
                             "Raw Request Data (first 25 rows)", open=False
                         ):
                             gr.DataFrame(
-                                llm_request_data.head(25),
+                                resolve_texts(run_folder, llm_request_data.head(25)),
                                 label="llm request data",
                                 buttons=["fullscreen", "copy"],
                                 show_row_numbers=True,
@@ -661,6 +716,11 @@ def create_gradio_blocks(results_folder: str) -> Blocks:
             inputs=[stored_results_folder, run_type_dropdown],
             outputs=[runs_dropdown, stored_runs],
         )
+        run_type_dropdown.input(
+            update_metrics_for_type,
+            inputs=[run_type_dropdown, metric_dropdown],
+            outputs=[metric_dropdown],
+        )
         runs_dropdown.input(
             id_func_list,
             inputs=[runs_dropdown],
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
 import os
-from typing import Callable, Optional
+import sqlite3
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Set, Tuple, Type, Union
 
 import pandas as pd
 import logging
+from pydantic import BaseModel
 
 from tokenflood.constants import (
     ERROR_FILE,
@@ -13,47 +16,233 @@ from tokenflood.constants import (
     ENDPOINT_SPEC_FILE,
     LOAD_TEST_SPEC_FILE,
     OBSERVATION_SPEC_FILE,
+    CONCURRENCY_TEST_SPEC_FILE,
+    SATURATION_SEARCH_SPEC_FILE,
+    ADAPTIVE_LOAD_TEST_SPEC_FILE,
+    CSV_TAIL_READER_CACHE_SIZE,
+    SUMMARY_FILE,
+    TEXT_BLOB_FIELDS,
+    TEXT_BLOBS_FILE,
 )
-from tokenflood.io import (
-    is_load_test_result_folder,
-    is_observation_result_folder,
-    read_file,
-)
+from tokenflood.io import read_file
+from tokenflood.catalog import ResultsCatalog, get_catalog_file
+from tokenflood.columnar import get_columnar_file
+from tokenflood.models.data.error_data import ErrorData
+from tokenflood.models.data.llm_request_data import LLMRequestData
+from tokenflood.models.data.ping_request_data import PingData
+from tokenflood.models.data.summary_data import RunSummary
+from tokenflood.summaries import read_run_summary
+from tokenflood.text_blobs import TextBlobReader
+from tokenflood.visualization_frontend.columnar_tail import ColumnarTailReader
+from tokenflood.visualization_frontend.csv_tail import CSVTailReader
+from tokenflood.visualization_frontend.run_index import RunIndex
 from tokenflood.visualization_frontend.utils import cache_if_csv_stayed_the_same
 
 log = logging.getLogger(__name__)
 
 
-@cache_if_csv_stayed_the_same
-def read_dataframe(path: str, csv_file: str = "") -> pd.DataFrame:
+# low cardinality text columns
+CATEGORICAL_FIELDS = ("model", "endpoint_url", "type", "method")
+
+
+def get_compact_dtypes(*model_types: Type[BaseModel]) -> Dict[str, str]:
+    """Narrow dtypes for the numeric and low cardinality columns of the results."""
+    dtypes = {}
+    for model_type in model_types:
+        for name, field in model_type.model_fields.items():
+            if field.annotation is bool:
+                dtypes[name] = "bool"
+            elif field.annotation is int:
+                dtypes[name] = "int32"
+            elif field.annotation is float:
+                dtypes[name] = "float32"
+            elif name in CATEGORICAL_FIELDS:
+                dtypes[name] = "category"
+    return dtypes
+
+
+# per results file, as fields like the latency differ in type between them
+COMPACT_DTYPES = {
+    LLM_REQUESTS_FILE: get_compact_dtypes(LLMRequestData),
+    NETWORK_LATENCY_FILE: get_compact_dtypes(PingData),
+    ERROR_FILE: get_compact_dtypes(ErrorData),
+}
+
+
+def get_file_compact_dtypes(path: str) -> Dict[str, str]:
+    return COMPACT_DTYPES.get(os.path.basename(path), {})
+
+
+def get_compact_dtype_kwargs(path: str, columns: Tuple[str, ...]) -> Dict[str, Any]:
+    dtypes = get_file_compact_dtypes(path)
+    return {
+        "usecols": lambda name: name in columns,
+        "dtype": {name: dtypes[name] for name in columns if name in dtypes},
+    }
+
+
+TailReader = Union[CSVTailReader, ColumnarTailReader]
+
+tail_readers: OrderedDict[Tuple[str, Optional[Tuple[str, ...]]], TailReader] = (
+    OrderedDict()
+)
+
+
+def read_tail(
+    path: str,
+    columns: Optional[Tuple[str, ...]],
+    make_reader: Callable[[], TailReader],
+) -> pd.DataFrame:
+    """Read a growing results file with the tail reader kept for it and the columns."""
+    key = (path, columns)
+    if key not in tail_readers:
+        tail_readers[key] = make_reader()
+        if len(tail_readers) > CSV_TAIL_READER_CACHE_SIZE:
+            tail_readers.popitem(last=False)
+    tail_readers.move_to_end(key)
+    try:
+        return tail_readers[key].read()
+    except Exception:
+        del tail_readers[key]
+        raise
+
+
+def read_columnar_results(
+    path: str, columns: Optional[Tuple[str, ...]] = None
+) -> pd.DataFrame:
+    """Read the columnar counterpart of a growing results file, only decoding the new chunks."""
+    columnar_file = get_columnar_file(path)
+    dtypes = get_file_compact_dtypes(path) if columns is not None else {}
+    return read_tail(
+        columnar_file,
+        columns,
+        lambda: ColumnarTailReader(columnar_file, columns, dtypes),
+    )
+
+
+def read_csv_results(
+    path: str, columns: Optional[Tuple[str, ...]] = None
+) -> pd.DataFrame:
+    """Read a growing csv results file, only parsing what was appended since the last read."""
+    kwargs = get_compact_dtype_kwargs(path, columns) if columns is not None else {}
+    return read_tail(path, columns, lambda: CSVTailReader(path, **kwargs))
+
+
+def read_dataframe(
+    path: str, csv_file: str = "", columns: Optional[Tuple[str, ...]] = None
+) -> pd.DataFrame:
+    """Read a results file, preferring its columnar counterpart if there is one.
+
+    Given columns, only those are read and they get compact dtypes. Columns
+    that runs recorded before they existed do not have are left out."""
     if csv_file:
         path = os.path.join(path, csv_file)
     df = pd.DataFrame()
     try:
-        df = pd.read_csv(path)
+        if os.path.isfile(get_columnar_file(path)):
+            df = read_columnar_results(path, columns)
+        else:
+            df = read_csv_results(path, columns)
     except Exception as e:
         log.error(str(e))
     return df
 
 
-def get_runs(
-    folder: str, predicate: Optional[Callable[[str], bool]] = None
-) -> list[str]:
-    if not os.path.isdir(folder):
-        return []
-    runs = sorted(os.listdir(folder), reverse=True)
-    runs = [os.path.join(folder, run) for run in runs]
-    if predicate:
-        runs = [run for run in runs if predicate(run)]
-    return [os.path.basename(run) for run in runs]
+@cache_if_csv_stayed_the_same
+def read_summary_file(path: str, summary_file: str = "") -> Optional[RunSummary]:
+    """Read the per group summary of a run, None if there is none."""
+    if summary_file:
+        path = os.path.join(path, summary_file)
+    try:
+        return read_run_summary(path)
+    except Exception as e:
+        log.error(str(e))
+        return None
+
+
+def open_catalog(results_folder: str) -> Optional[ResultsCatalog]:
+    """The catalog of a results folder, None if it has none."""
+    catalog_file = get_catalog_file(results_folder)
+    if not os.path.isfile(catalog_file):
+        return None
+    try:
+        return ResultsCatalog(catalog_file)
+    except sqlite3.Error as e:
+        log.error(str(e))
+        return None
+
+
+def get_catalogued_run_summary(run_folder: str) -> Optional[RunSummary]:
+    catalog = open_catalog(os.path.dirname(os.path.normpath(run_folder)))
+    if catalog is None:
+        return None
+    try:
+        return catalog.get_run_summary(os.path.basename(os.path.normpath(run_folder)))
+    except sqlite3.Error as e:
+        log.error(str(e))
+        return None
+    finally:
+        catalog.close()
+
+
+def find_run_summary(run_folder: str) -> Optional[RunSummary]:
+    """The written summary of a run, else its catalogued one, None if it has neither."""
+    summary = read_summary_file(run_folder, SUMMARY_FILE)
+    if summary is None:
+        # runs from before the summary files can have one in the catalog
+        summary = get_catalogued_run_summary(run_folder)
+    return summary
+
+
+def get_catalogued_runs(folder: str) -> Dict[str, str]:
+    """Spec file of every catalogued run of a results folder."""
+    catalog = open_catalog(folder)
+    if catalog is None:
+        return {}
+    try:
+        return catalog.get_run_spec_files()
+    except sqlite3.Error as e:
+        log.error(str(e))
+        return {}
+    finally:
+        catalog.close()
+
+
+run_indexes: Dict[str, RunIndex] = {}
+
+
+def get_runs(folder: str, run_spec_files: Optional[Set[str]] = None) -> list[str]:
+    """List the runs of a results folder, newest first.
+
+    Optionally only those with one of the given spec files, which tell the
+    run types apart."""
+    if folder not in run_indexes:
+        run_indexes[folder] = RunIndex(folder, get_catalogued_runs)
+    run_index = run_indexes[folder]
+    run_index.refresh()
+    return run_index.get_runs(
+        frozenset(run_spec_files) if run_spec_files is not None else None
+    )
+
+
+LOAD_TEST_RUN_SPEC_FILES = {
+    LOAD_TEST_SPEC_FILE,
+    SATURATION_SEARCH_SPEC_FILE,
+    ADAPTIVE_LOAD_TEST_SPEC_FILE,
+}
 
 
 def get_load_test_runs(folder: str) -> list[str]:
-    return get_runs(folder, is_load_test_result_folder)
+    """Load test runs, including saturation searches and adaptive load tests."""
+    return get_runs(folder, LOAD_TEST_RUN_SPEC_FILES)
 
 
 def get_observation_runs(folder: str) -> list[str]:
-    return get_runs(folder, is_observation_result_folder)
+    return get_runs(folder, {OBSERVATION_SPEC_FILE})
+
+
+def get_concurrency_test_runs(folder: str) -> list[str]:
+    return get_runs(folder, {CONCURRENCY_TEST_SPEC_FILE})
 
 
 def get_error_dataframe(folder: str) -> pd.DataFrame:
@@ -64,17 +253,54 @@ def get_endpoint_spec_file(run_folder: str) -> str:
     return read_file(os.path.join(run_folder, ENDPOINT_SPEC_FILE))
 
 
+def find_load_test_spec_file(run_folder: str) -> str:
+    """Name of the spec file of a result folder shown among the load tests."""
+    for spec_file in [SATURATION_SEARCH_SPEC_FILE, ADAPTIVE_LOAD_TEST_SPEC_FILE]:
+        if os.path.isfile(os.path.join(run_folder, spec_file)):
+            return spec_file
+    return LOAD_TEST_SPEC_FILE
+
+
 def get_run_spec_file(run_folder: str) -> str:
-    return read_file(os.path.join(run_folder, LOAD_TEST_SPEC_FILE))
+    return read_file(os.path.join(run_folder, find_load_test_spec_file(run_folder)))
 
 
 def get_observation_spec_file(run_folder: str) -> str:
     return read_file(os.path.join(run_folder, OBSERVATION_SPEC_FILE))
 
 
+def get_concurrency_test_spec_file(run_folder: str) -> str:
+    return read_file(os.path.join(run_folder, CONCURRENCY_TEST_SPEC_FILE))
+
+
 def get_llm_request_dataframe(folder: str) -> pd.DataFrame:
     return read_dataframe(folder, LLM_REQUESTS_FILE)
 
 
 def get_network_dataframe(folder: str) -> pd.DataFrame:
     return read_dataframe(folder, NETWORK_LATENCY_FILE)
+
+
+def resolve_texts(run_folder: str, llm_request_data: pd.DataFrame) -> pd.DataFrame:
+    """Replace the text hashes of the given rows with the texts they stand for.
+
+    Runs without a text blob file keep the texts in the llm request file and
+    are returned as they are. Hashes whose text cannot be found stay."""
+    text_blob_file = os.path.join(run_folder, TEXT_BLOBS_FILE)
+    if not os.path.isfile(text_blob_file):
+        return llm_request_data
+    reader = TextBlobReader(text_blob_file)
+
+    def resolve(text_hash) -> str:
+        if not isinstance(text_hash, str):
+            return ""
+        try:
+            return reader.get(text_hash)
+        except KeyError:
+            return text_hash
+
+    llm_request_data = llm_request_data.copy()
+    for field in TEXT_BLOB_FIELDS:
+        if field in llm_request_data.columns:
+            llm_request_data[field] = llm_request_data[field].map(resolve)
+    return llm_request_data
@@ -2,7 +2,7 @@ from dataclasses import dataclass
 from typing import ClassVar
 
 
-from tokenflood.constants import LLM_REQUESTS_FILE, NETWORK_LATENCY_FILE
+from tokenflood.constants import LLM_REQUESTS_FILE, NETWORK_LATENCY_FILE, SUMMARY_FILE
 from tokenflood.models.data.llm_request_data import LLMRequestData
 from tokenflood.models.data.ping_request_data import PingData
 
@@ -13,6 +13,7 @@ class Metric:
     file: ClassVar[str]
     name: ClassVar[str]
     explanation: ClassVar[str]
+    unit: ClassVar[str] = "ms"
 
 
 class RequestLatency(Metric):
@@ -36,6 +37,57 @@ class DecodingLatency(Metric):
     explanation = "Latency of the output generation past the first token."
 
 
+class InterTokenLatencyP50(Metric):
+    field_name = LLMRequestData.F.inter_token_latency_p50
+    file = LLM_REQUESTS_FILE
+    name = "Inter-token latency p50"
+    explanation = "Median gap between two streamed chunks of a request."
+
+
+class InterTokenLatencyP99(Metric):
+    field_name = LLMRequestData.F.inter_token_latency_p99
+    file = LLM_REQUESTS_FILE
+    name = "Inter-token latency p99"
+    explanation = (
+        "99th percentile of the gaps between two streamed chunks of a request."
+    )
+
+
+class MaxStall(Metric):
+    field_name = LLMRequestData.F.max_stall
+    file = LLM_REQUESTS_FILE
+    name = "Max stall"
+    explanation = "Longest gap between two streamed chunks of a request, e.g. caused by preemption."
+
+
+class TimeToHeaders(Metric):
+    field_name = LLMRequestData.F.time_to_headers
+    file = LLM_REQUESTS_FILE
+    name = "Time to headers"
+    explanation = "Time until the response headers arrived, including connection setup and upload of the request."
+
+
+class DNSLatency(Metric):
+    field_name = LLMRequestData.F.dns_latency
+    file = LLM_REQUESTS_FILE
+    name = "DNS latency"
+    explanation = "Time to resolve the endpoint's host name. Zero for requests over reused connections or cached names."
+
+
+class ConnectLatency(Metric):
+    field_name = LLMRequestData.F.connect_latency
+    file = LLM_REQUESTS_FILE
+    name = "Connect latency"
+    explanation = "Time to open a new TCP connection for a request, zero for requests over reused connections."
+
+
+class RequestTLSHandshakeLatency(Metric):
+    field_name = LLMRequestData.F.tls_handshake_latency
+    file = LLM_REQUESTS_FILE
+    name = "Request TLS handshake latency"
+    explanation = "Time of the TLS handshake on a new connection for a request, zero for requests over reused connections."
+
+
 class AverageTimePerOutputToken(Metric):
     field_name = LLMRequestData.F.average_time_per_output_token
     file = LLM_REQUESTS_FILE
@@ -47,9 +99,23 @@ class NetworkLatency(Metric):
     field_name = PingData.F.latency
     file = NETWORK_LATENCY_FILE
     name = "Network Latency"
-    explanation = (
-        "Network latency measured by pinging the endpoint with non-generating requests."
-    )
+    explanation = "Time to open a TCP connection to the endpoint, or of an OPTIONS request with the endpoint's ping_method options."
+
+
+class TLSHandshakeLatency(Metric):
+    field_name = PingData.F.tls_handshake_latency
+    file = NETWORK_LATENCY_FILE
+    name = "TLS handshake latency"
+    explanation = "Time of the TLS handshake after opening a connection to the endpoint. Only measured with the endpoint's ping_method tls."
+
+
+class Throughput(Metric):
+    # a single value per group, kept in the run summary
+    field_name = "throughput"
+    file = SUMMARY_FILE
+    name = "Throughput"
+    explanation = "Completed requests per second of each phase of a concurrency test."
+    unit = "rps"
 
 
 metric_mapping = {
@@ -57,5 +123,14 @@ metric_mapping = {
     TimeToFirstToken.name: TimeToFirstToken,
     AverageTimePerOutputToken.name: AverageTimePerOutputToken,
     DecodingLatency.name: DecodingLatency,
+    InterTokenLatencyP50.name: InterTokenLatencyP50,
+    InterTokenLatencyP99.name: InterTokenLatencyP99,
+    MaxStall.name: MaxStall,
+    TimeToHeaders.name: TimeToHeaders,
+    DNSLatency.name: DNSLatency,
+    ConnectLatency.name: ConnectLatency,
+    RequestTLSHandshakeLatency.name: RequestTLSHandshakeLatency,
     NetworkLatency.name: NetworkLatency,
+    TLSHandshakeLatency.name: TLSHandshakeLatency,
+    Throughput.name: Throughput,
 }
@@ -17,7 +17,9 @@ from tokenflood.visualization_frontend.metrics import Metric
 PLOT_ELEMENT_ID = "main_plot"
 
 
-def plot_base(trace_groups: list[list[AggregationTrace]]) -> go.Figure:
+def plot_base(
+    trace_groups: list[list[AggregationTrace]], metric: Type[Metric]
+) -> go.Figure:
     fig = go.Figure()
     traces = []
     for i, trace_group in enumerate(trace_groups):
@@ -35,16 +37,16 @@ def plot_base(trace_groups: list[list[AggregationTrace]]) -> go.Figure:
                     legendgroup=trace.run,
                     legendgrouptitle_text=trace.run,
                     line=dict(color=color, dash=style),
-                    hovertemplate="<b>%{fullData.name}</b>: %{y:.2f} ms<extra></extra>",
+                    hovertemplate=f"<b>%{{fullData.name}}</b>: %{{y:.2f}} {metric.unit}<extra></extra>",
                 )
             )
     fig.add_traces(traces)
     fig.update_traces(mode="markers+lines")
     fig.update_layout(
-        yaxis_title="latency in ms",
+        yaxis_title=f"{metric.name.lower()} in {metric.unit}",
         hovermode="x unified",
         height=900,
-        yaxis=dict(rangemode="tozero", ticksuffix=" ms"),
+        yaxis=dict(rangemode="tozero", ticksuffix=f" {metric.unit}"),
     )
     fig.layout.template = "plotly_dark"
     return fig
@@ -57,7 +59,7 @@ def make_title(text: str) -> dict:
 def make_observation_latency_plot(
     trace_groups: list[list[AggregationTrace]], metric: Type[Metric]
 ) -> gr.Plot:
-    fig = plot_base(trace_groups)
+    fig = plot_base(trace_groups, metric)
     fig.update_layout(
         xaxis_title="datetime", title=make_title(f"{metric.name} over time")
     )
@@ -68,10 +70,21 @@ def make_observation_latency_plot(
 def make_run_latency_plot(
     trace_groups: list[list[AggregationTrace]], metric: Type[Metric]
 ) -> gr.Plot:
-    fig = plot_base(trace_groups)
+    fig = plot_base(trace_groups, metric)
     fig.update_layout(
         xaxis_title="requests per second",
         title=make_title(f"{metric.name} across request rates"),
         xaxis=dict(ticksuffix=" rps"),
     )
     return gr.Plot(fig, elem_id=PLOT_ELEMENT_ID)
+
+
+def make_concurrency_plot(
+    trace_groups: list[list[AggregationTrace]], metric: Type[Metric]
+) -> gr.Plot:
+    fig = plot_base(trace_groups, metric)
+    fig.update_layout(
+        xaxis_title="concurrent requests",
+        title=make_title(f"{metric.name} across concurrency levels"),
+    )
+    return gr.Plot(fig, elem_id=PLOT_ELEMENT_ID)
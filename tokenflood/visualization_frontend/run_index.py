@@ -0,0 +1,103 @@
+import os
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, FrozenSet, List, Optional
+
+from tokenflood.constants import RUN_INDEX_SETTLE_SECONDS
+from tokenflood.io import find_run_spec_file_name
+
+
+@dataclass(frozen=True)
+class RunIndexEntry:
+    mtime: int
+    # None if the folder is no run (yet)
+    run_spec_file: Optional[str]
+    # modified so shortly before it was checked that it has to be checked again
+    unsettled: bool
+
+
+def is_unsettled(mtime: int, checked_at: int) -> bool:
+    return checked_at - mtime < RUN_INDEX_SETTLE_SECONDS * 1_000_000_000
+
+
+class RunIndex:
+    """Spec files of the run folders of a results folder.
+
+    Keyed by the modification times of the results folder and of its run
+    folders, so only new or changed folders are validated again. While the
+    results folder stays the same, only the folders that are no run yet are
+    looked at again."""
+
+    def __init__(
+        self, folder: str, get_catalogued_runs: Callable[[str], Dict[str, str]]
+    ) -> None:
+        self.folder = folder
+        self.get_catalogued_runs = get_catalogued_runs
+        self.mtime: Optional[int] = None
+        self.entries: Dict[str, RunIndexEntry] = {}
+        # sorted runs per set of spec files, cleared on every change
+        self.listings: Dict[Optional[FrozenSet[str]], List[str]] = {}
+
+    def refresh(self) -> None:
+        checked_at = time.time_ns()
+        try:
+            mtime = os.stat(self.folder).st_mtime_ns
+        except OSError:
+            if self.entries:
+                self.entries = {}
+                self.listings = {}
+            self.mtime = None
+            return
+        if mtime != self.mtime:
+            names = os.listdir(self.folder)
+            if len(names) != len(self.entries) or not all(
+                name in self.entries for name in names
+            ):
+                self.entries = {
+                    name: self.entries[name] for name in names if name in self.entries
+                }
+                self.listings = {}
+        else:
+            names = [
+                name
+                for name, entry in self.entries.items()
+                if entry.run_spec_file is None or entry.unsettled
+            ]
+        catalogued_runs: Optional[Dict[str, str]] = None
+        for name in names:
+            path = os.path.join(self.folder, name)
+            try:
+                run_mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                if self.entries.pop(name, None) is not None:
+                    self.listings = {}
+                continue
+            entry = self.entries.get(name)
+            if entry is not None and entry.mtime == run_mtime and not entry.unsettled:
+                continue
+            if catalogued_runs is None:
+                catalogued_runs = self.get_catalogued_runs(self.folder)
+            run_spec_file = catalogued_runs.get(name) or find_run_spec_file_name(path)
+            if entry is None or entry.run_spec_file != run_spec_file:
+                self.listings = {}
+            self.entries[name] = RunIndexEntry(
+                run_mtime, run_spec_file, is_unsettled(run_mtime, checked_at)
+            )
+        # an unsettled results folder is listed again on the next refresh
+        self.mtime = None if is_unsettled(mtime, checked_at) else mtime
+
+    def get_runs(self, run_spec_files: Optional[FrozenSet[str]] = None) -> List[str]:
+        """Runs with one of the given spec files, newest first."""
+        if run_spec_files not in self.listings:
+            self.listings[run_spec_files] = sorted(
+                [
+                    name
+                    for name, entry in self.entries.items()
+                    if entry.run_spec_file is not None
+                    and (
+                        run_spec_files is None or entry.run_spec_file in run_spec_files
+                    )
+                ],
+                reverse=True,
+            )
+        return list(self.listings[run_spec_files])
@@ -1,6 +1,7 @@
 import os
 from functools import lru_cache, wraps
 
+from tokenflood.columnar import get_columnar_file
 from tokenflood.constants import LLM_REQUESTS_FILE, ERROR_FILE, NETWORK_LATENCY_FILE
 
 
@@ -42,7 +43,9 @@ def cache_if_run_data_stayed_the_same(func):
 def cache_if_csv_stayed_the_same(func):
     # Base cache that will store the actual results
     @lru_cache(maxsize=128)
-    def cached_wrapper(path, file_size, csv_file="", *args, **kwargs):
+    def cached_wrapper(
+        path, file_size, columnar_file_size, csv_file="", *args, **kwargs
+    ):
         return func(path, csv_file, *args, **kwargs)
 
     @wraps(func)
@@ -51,7 +54,10 @@ def cache_if_csv_stayed_the_same(func):
         if csv_file:
             real_path = os.path.join(path, csv_file)
         file_size = get_file_size(real_path)
-        # Pass the size into the cache key automatically
-        return cached_wrapper(path, file_size, csv_file, *args, **kwargs)
+        columnar_file_size = get_file_size(get_columnar_file(real_path))
+        # Pass the sizes into the cache key automatically
+        return cached_wrapper(
+            path, file_size, columnar_file_size, csv_file, *args, **kwargs
+        )
 
     return wrapper
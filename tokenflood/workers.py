@@ -0,0 +1,375 @@
+import asyncio
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+from multiprocessing.process import BaseProcess
+from multiprocessing.queues import Queue
+from multiprocessing.sharedctypes import Synchronized
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from tqdm import tqdm
+
+from tokenflood.constants import (
+    ERROR_RECORD,
+    LLM_REQUEST_RECORD,
+    WORKER_PHASE_START_DELAY_SECONDS,
+    WORKER_RESULT_BATCH_SIZE,
+)
+from tokenflood.dispatcher import DeadlineDispatcher, monotonic_from_timestamp
+from tokenflood.io import ForwardingIOContext, IOContext, write_record
+from tokenflood.logging_utils import configure_logging, global_warn_once_filter
+from tokenflood.models.endpoint_spec import EndpointSpec
+from tokenflood.models.run_specs.load_test_spec import (
+    LoadTestPhaseShard,
+    LoadTestSpec,
+)
+from tokenflood.native_client import close_native_session
+from tokenflood.networking import patch_aiohttp_client_session
+from tokenflood.runner import (
+    dispatch_load_test_phase,
+    warm_up_for_load_test,
+    make_test_description,
+)
+from tokenflood.schedule import (
+    create_load_test_phase_schedule,
+    create_load_test_phase_shards,
+)
+
+log = logging.getLogger(__name__)
+
+READY = "ready"
+PHASE_DONE = "phase_done"
+CONTROL_MESSAGES = {READY, PHASE_DONE}
+
+Message = Tuple[str, Dict[str, Any]]
+
+
+def run_worker(
+    worker_idx: int,
+    endpoint_spec: EndpointSpec,
+    load_test_spec: LoadTestSpec,
+    command_queue: Queue,
+    result_queue: Queue,
+    shared_error_rate: Synchronized,
+    num_workers: int = 1,
+):
+    """Entry point of a worker process."""
+    configure_logging()
+    patch_aiohttp_client_session()
+    asyncio.run(
+        worker_loop(
+            worker_idx,
+            endpoint_spec,
+            load_test_spec,
+            command_queue,
+            result_queue,
+            shared_error_rate,
+            num_workers,
+        )
+    )
+
+
+async def worker_loop(
+    worker_idx: int,
+    endpoint_spec: EndpointSpec,
+    load_test_spec: LoadTestSpec,
+    command_queue: Queue,
+    result_queue: Queue,
+    shared_error_rate: Synchronized,
+    num_workers: int = 1,
+):
+    """Warm up, then run phase shards from the command queue until receiving None."""
+    io_context = ForwardingIOContext(
+        lambda record_type, data: result_queue.put((record_type, data)),
+        lambda: shared_error_rate.value,
+    )
+    error = await warm_up_for_load_test(
+        endpoint_spec, load_test_spec, io_context, num_workers
+    )
+    result_queue.put((READY, {"worker": worker_idx, "error": error}))
+    if error:
+        await close_native_session()
+        return
+    loop = asyncio.get_running_loop()
+    while True:
+        shard: Optional[LoadTestPhaseShard] = await loop.run_in_executor(
+            None, command_queue.get
+        )
+        if shard is None:
+            break
+        phase_result = await run_shard(
+            endpoint_spec,
+            load_test_spec,
+            shard,
+            io_context,
+            monotonic_from_timestamp(shard.start_time),
+        )
+        result_queue.put((PHASE_DONE, {"worker": worker_idx, **phase_result}))
+        global_warn_once_filter.clear()
+    await close_native_session()
+
+
+async def run_shard(
+    endpoint_spec: EndpointSpec,
+    load_test_spec: LoadTestSpec,
+    shard: LoadTestPhaseShard,
+    io_context: IOContext,
+    start_time: float,
+) -> Dict[str, Any]:
+    """Dispatch a phase shard starting at the given monotonic time and report its stats."""
+    dispatcher = DeadlineDispatcher.from_shard(shard)
+    error_threshold_tripped = await dispatch_load_test_phase(
+        make_test_description(load_test_spec, shard.phase + 1, shard.load_phase),
+        shard.phase,
+        load_test_spec,
+        shard.load_phase,
+        endpoint_spec,
+        io_context,
+        dispatcher,
+        shard.request_numbers,
+        start_time=start_time,
+        quiet=True,
+        with_pings=shard.shard_idx == 0,
+        sharded=True,
+    )
+    return {
+        "error_threshold_tripped": error_threshold_tripped,
+        "num_sent": dispatcher.num_sent,
+        "achieved_requests_per_second": dispatcher.achieved_requests_per_second,
+        "max_send_lag": dispatcher.max_send_lag,
+        "error": None,
+    }
+
+
+def make_failed_phase_result(error: str) -> Dict[str, Any]:
+    """Phase result of a load generator whose shard raised an exception."""
+    return {
+        "error_threshold_tripped": False,
+        "num_sent": 0,
+        "achieved_requests_per_second": 0.0,
+        "max_send_lag": 0.0,
+        "error": error,
+    }
+
+
+class ShardResultCollector:
+    """Receives the records and control messages of sharded load generators.
+
+    Records go into the IOContext right away, control messages are queued
+    until the coordinating coroutine waits for them."""
+
+    def __init__(self, io_context: IOContext):
+        self.io_context = io_context
+        self.control_messages: asyncio.Queue[Message] = asyncio.Queue()
+        self.pbar: Optional[tqdm] = None
+
+    def handle_message(self, message_type: str, data: Dict[str, Any]):
+        if message_type in CONTROL_MESSAGES:
+            self.control_messages.put_nowait((message_type, data))
+            return
+        write_record(self.io_context, message_type, data)
+        if self.pbar is not None and message_type in {
+            LLM_REQUEST_RECORD,
+            ERROR_RECORD,
+        }:
+            self.pbar.update()
+
+    async def receive(self, expected_type: str, num_messages: int) -> List[Dict]:
+        """Wait for a control message of the given type from every load generator."""
+        results: List[Dict] = []
+        while len(results) < num_messages:
+            try:
+                message_type, data = await asyncio.wait_for(
+                    self.control_messages.get(), timeout=1.0
+                )
+            except asyncio.TimeoutError:
+                self.check_alive()
+                continue
+            if message_type != expected_type:
+                raise RuntimeError(
+                    f"Expected {expected_type} from load generators but received {message_type}."
+                )
+            results.append(data)
+        return results
+
+    def check_alive(self):
+        """Raise a RuntimeError if a load generator went away."""
+        pass
+
+
+class WorkerResultCollector(ShardResultCollector):
+    """Merges the records of all worker processes into the parent's IOContext.
+
+    A reader thread drains the result queue in batches and hands them to the
+    event loop. After every batch the global error rate is published back
+    to the workers through shared memory."""
+
+    def __init__(
+        self,
+        io_context: IOContext,
+        result_queue: Queue,
+        shared_error_rate: Synchronized,
+        processes: List[BaseProcess],
+    ):
+        super().__init__(io_context)
+        self.result_queue = result_queue
+        self.shared_error_rate = shared_error_rate
+        self.processes = processes
+        self.stopped = threading.Event()
+        self.reader: Optional[threading.Thread] = None
+
+    def start(self):
+        loop = asyncio.get_running_loop()
+        self.reader = threading.Thread(
+            target=self._read, args=(loop,), daemon=True, name="worker-results"
+        )
+        self.reader.start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.reader is not None:
+            self.reader.join()
+
+    def _read(self, loop: asyncio.AbstractEventLoop):
+        while not self.stopped.is_set():
+            try:
+                messages = [self.result_queue.get(timeout=0.1)]
+            except queue.Empty:
+                continue
+            try:
+                while len(messages) < WORKER_RESULT_BATCH_SIZE:
+                    messages.append(self.result_queue.get_nowait())
+            except queue.Empty:
+                pass
+            loop.call_soon_threadsafe(self._handle, messages)
+
+    def _handle(self, messages: List[Message]):
+        for message_type, data in messages:
+            self.handle_message(message_type, data)
+        self.shared_error_rate.value = self.io_context.error_rate()
+
+    def check_alive(self):
+        for process in self.processes:
+            if not process.is_alive():
+                raise RuntimeError(
+                    f"Worker process {process.name} exited unexpectedly with code {process.exitcode}."
+                )
+
+
+async def run_sharded_load_test_phases(
+    load_test_spec: LoadTestSpec,
+    collector: ShardResultCollector,
+    send_shards: Callable[[List[LoadTestPhaseShard]], Awaitable[None]],
+    num_shards: int,
+    start_delay: float,
+):
+    """Run all phases of a load test on load generators that are already warm.
+
+    Every phase schedule is split into num_shards shards that start
+    start_delay seconds after being handed out."""
+    io_context = collector.io_context
+    for i, load_test_phase in enumerate(load_test_spec.create_load_test_phases()):
+        schedule = create_load_test_phase_schedule(
+            load_test_phase, load_test_spec.burstiness
+        )
+        shards = create_load_test_phase_shards(
+            i, load_test_phase, schedule, num_shards, time.time() + start_delay
+        )
+        collector.pbar = tqdm(
+            total=len(schedule),
+            desc=make_test_description(load_test_spec, i + 1, load_test_phase),
+        )
+        await send_shards(shards)
+        phase_results = await collector.receive(PHASE_DONE, num_shards)
+        await io_context.wait_for_pending_writes()
+        collector.pbar.close()
+        collector.pbar = None
+        log.info(
+            f"Sent {sum(r['num_sent'] for r in phase_results)} requests at "
+            f"{sum(r['achieved_requests_per_second'] for r in phase_results):.2f} requests/s "
+            f"(target {load_test_phase.requests_per_second:.2f} requests/s) with a max send lag of "
+            f"{max(r['max_send_lag'] for r in phase_results):.1f}ms."
+        )
+        errors = [r["error"] for r in phase_results if r.get("error")]
+        if errors:
+            log.error(f"Ending the run because a load generator failed: {errors[0]}")
+            break
+        if any(r["error_threshold_tripped"] for r in phase_results):
+            log.error("Ending the run because the error threshold was tripped.")
+            break
+        log.info("Finished the phase.")
+        global_warn_once_filter.clear()
+
+
+async def run_load_test_with_workers(
+    endpoint_spec: EndpointSpec,
+    load_test_spec: LoadTestSpec,
+    io_context: IOContext,
+    num_workers: int,
+):
+    """Run a load test with each phase sharded across several worker processes.
+
+    Every worker runs its own event loop and client session. The parent
+    creates the schedules, hands out the shards with a shared start time and
+    writes all results into its own IOContext."""
+    io_context.activate()
+    await io_context.wait_for_pending_writes()
+    mp_context = multiprocessing.get_context("spawn")
+    command_queues: List[Queue] = [mp_context.Queue() for _ in range(num_workers)]
+    result_queue: Queue = mp_context.Queue()
+    shared_error_rate = mp_context.Value("d", 0.0)
+    processes: List[BaseProcess] = [
+        mp_context.Process(
+            target=run_worker,
+            args=(
+                worker_idx,
+                endpoint_spec,
+                load_test_spec,
+                command_queues[worker_idx],
+                result_queue,
+                shared_error_rate,
+                num_workers,
+            ),
+            name=f"tokenflood-worker-{worker_idx}",
+            daemon=True,
+        )
+        for worker_idx in range(num_workers)
+    ]
+    for process in processes:
+        process.start()
+    collector = WorkerResultCollector(
+        io_context, result_queue, shared_error_rate, processes
+    )
+    collector.start()
+
+    async def send_shards(shards: List[LoadTestPhaseShard]):
+        for command_queue, shard in zip(command_queues, shards):
+            command_queue.put(shard)
+
+    try:
+        log.info(f"Warming up {num_workers} workers.")
+        ready_messages = await collector.receive(READY, num_workers)
+        errors = [m["error"] for m in ready_messages if m["error"]]
+        if errors:
+            log.error(f"Not starting run due to error during warmup: {errors[0]}")
+            await io_context.wait_for_pending_writes()
+            return
+        await run_sharded_load_test_phases(
+            load_test_spec,
+            collector,
+            send_shards,
+            num_workers,
+            WORKER_PHASE_START_DELAY_SECONDS,
+        )
+    finally:
+        for command_queue in command_queues:
+            command_queue.put(None)
+        loop = asyncio.get_running_loop()
+        for process in processes:
+            await loop.run_in_executor(None, process.join)
+        # give the reader a chance to pick up the last records
+        await asyncio.sleep(0.2)
+        collector.stop()
+        await io_context.wait_for_pending_writes()